@@ -0,0 +1,280 @@
+"""지표 함수와 프레임당 파이프라인의 성능 벤치마크.
+
+사용 예::
+
+    python -m benchmarks.bench_metrics -o bench.json
+    python -m benchmarks.bench_metrics -o bench.json --compare baseline.json --max-slowdown 15
+
+:mod:`cam_tuner_gui.metric.metrics` 의 각 함수와 캡처 → 변환 → 지표 → pixmap
+파이프라인을 배포 해상도(640x480, 1280x800, 1920x1200)의 합성 프레임으로
+재고 결과를 JSON 으로 쓴다. ``--compare`` 를 주면 기준 JSON 과 중앙값을
+비교해 ``--max-slowdown`` % 넘게 느려진 항목이 있으면 종료 코드 1 을 낸다.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+from dataclasses import dataclass
+import json
+import platform
+import statistics
+import time
+from typing import Callable, Sequence
+
+import cv2
+import numpy as np
+
+from cam_tuner_gui.capture.synthetic import SyntheticSource
+from cam_tuner_gui.metric import metrics as m
+from cam_tuner_gui.metric.engine import FRAME_METRICS, FrameContext, MetricEngine
+
+
+RESOLUTIONS = ((640, 480), (1280, 800), (1920, 1200))
+SCHEMA_VERSION = 1
+FLICKER_FRAMES = 10
+
+# 지표마다 의미 있는 값이 나오는 합성 패턴에서 잰다.
+METRIC_CASES: dict[str, tuple[str, Callable]] = {
+    "calc_mtf50": ("slanted_edge", m.calc_mtf50),
+    "calc_snr": ("flat", m.calc_snr),
+    "calc_lapvar": ("slanted_edge", m.calc_lapvar),
+    "calc_motion_blur_width": ("moving_edge", m.calc_motion_blur_width),
+    "calc_motion_blur_profile": ("moving_edge", m.calc_motion_blur_profile),
+}
+PIPELINE_STAGES = ("capture", "convert", "metrics", "pixmap")
+
+# pixmap 단계용 QApplication. 한 번 만들면 프로세스가 끝날 때까지 둔다.
+_app = None
+
+
+@dataclass
+class Regression:
+    """기준보다 느려진 항목."""
+
+    name: str
+    baseline_ms: float
+    current_ms: float
+
+    @property
+    def slowdown(self) -> float:
+        """느려진 비율(%)."""
+        return (self.current_ms / self.baseline_ms - 1.0) * 100
+
+
+def parse_resolution(text: str) -> tuple[int, int]:
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def _stats(samples: Sequence[float]) -> dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "median_ms": statistics.median(ordered),
+        "p90_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))],
+        "min_ms": ordered[0],
+        "runs": len(ordered),
+    }
+
+
+def time_call(fn: Callable[[], object], repeat: int, warmup: int = 2) -> dict[str, float]:
+    """``fn`` 을 ``repeat`` 번 따로 재서 밀리초 통계를 돌려준다."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e3)
+    return _stats(samples)
+
+
+def _frame(pattern: str, width: int, height: int) -> np.ndarray:
+    return SyntheticSource(pattern, width, height).read()[1]
+
+
+def bench_metrics(width: int, height: int, repeat: int) -> dict[str, dict]:
+    """:mod:`metrics` 함수별 시간."""
+    results = {}
+    for name, (pattern, fn) in METRIC_CASES.items():
+        frame = _frame(pattern, width, height)
+        results[name] = time_call(lambda: fn(frame), repeat)
+    frames = [_frame("flicker", width, height)] * FLICKER_FRAMES
+    results["detect_flicker"] = time_call(lambda: m.detect_flicker(frames), repeat)
+    return results
+
+
+def _pixmap_stage() -> Callable[[np.ndarray], object] | None:
+    """BGR 프레임을 QPixmap 으로 바꾸는 함수. PySide6 가 없으면 ``None``."""
+    try:
+        from PySide6.QtGui import QImage, QPixmap
+        from PySide6.QtWidgets import QApplication
+    except ImportError:
+        return None
+    if not (os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY")):
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    global _app
+    if QApplication.instance() is None:
+        _app = QApplication([])
+
+    def to_pixmap(image: np.ndarray):
+        h, w = image.shape[:2]
+        qimage = QImage(image.data, w, h, image.strides[0], QImage.Format_BGR888)
+        return QPixmap.fromImage(qimage)
+
+    return to_pixmap
+
+
+def bench_pipeline(
+    width: int, height: int, repeat: int, pixmap: bool = True
+) -> dict[str, dict]:
+    """캡처 → 변환 → 지표 → pixmap 단계별 시간과 합계."""
+    source = SyntheticSource("slanted_edge", width, height)
+    engine = MetricEngine()
+    buffer = np.empty((height, width, 3), np.uint8)
+    to_pixmap = _pixmap_stage() if pixmap else None
+    samples: dict[str, list[float]] = {stage: [] for stage in PIPELINE_STAGES}
+    samples["total"] = []
+    for i in range(repeat + 2):
+        t0 = time.perf_counter()
+        source.read(buffer)
+        t1 = time.perf_counter()
+        ctx = FrameContext(buffer)
+        ctx.gray
+        t2 = time.perf_counter()
+        engine.compute(ctx)
+        t3 = time.perf_counter()
+        if to_pixmap is not None:
+            to_pixmap(buffer)
+        t4 = time.perf_counter()
+        if i < 2:
+            continue
+        marks = (t0, t1, t2, t3, t4)
+        for stage, start, end in zip(PIPELINE_STAGES, marks, marks[1:]):
+            samples[stage].append((end - start) * 1e3)
+        samples["total"].append((t4 - t0) * 1e3)
+    if to_pixmap is None:
+        del samples["pixmap"]
+    return {f"pipeline.{stage}": _stats(vals) for stage, vals in samples.items()}
+
+
+def run(
+    resolutions: Sequence[tuple[int, int]] = RESOLUTIONS,
+    repeat: int = 20,
+    pixmap: bool = True,
+) -> dict:
+    """전체 벤치마크를 돌려 JSON 으로 쓸 딕셔너리를 만든다."""
+    results = {}
+    for width, height in resolutions:
+        label = f"{width}x{height}"
+        cases = bench_metrics(width, height, repeat)
+        cases.update(bench_pipeline(width, height, repeat, pixmap))
+        for case, stats in cases.items():
+            results[f"{case}@{label}"] = dict(stats, case=case, resolution=label)
+    return {
+        "version": SCHEMA_VERSION,
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+            "opencv": cv2.__version__,
+            "opencv_threads": cv2.getNumThreads(),
+            "frame_metrics": list(FRAME_METRICS),
+        },
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare(
+    current: dict,
+    baseline: dict,
+    max_slowdown: float = 10.0,
+    min_delta_ms: float = 0.05,
+) -> list[Regression]:
+    """기준보다 ``max_slowdown`` % 넘게 (그리고 ``min_delta_ms`` 넘게) 느려진 항목.
+
+    아주 짧은 항목은 측정 잡음이 비율로 크게 보이므로 절대 차이가
+    ``min_delta_ms`` 이하면 넘어간다. 기준에 없는 항목은 비교하지 않는다.
+    """
+    regressions = []
+    base = baseline.get("results", {})
+    for name, stats in current.get("results", {}).items():
+        if name not in base:
+            continue
+        old = base[name]["median_ms"]
+        new = stats["median_ms"]
+        if old <= 0 or new - old <= min_delta_ms:
+            continue
+        if (new / old - 1.0) * 100 > max_slowdown:
+            regressions.append(Regression(name, old, new))
+    return regressions
+
+
+def format_table(current: dict, baseline: dict | None = None) -> str:
+    """결과(와 기준 대비 변화율)를 사람이 읽을 표로."""
+    base = (baseline or {}).get("results", {})
+    lines = [f"{'case':<44}{'median ms':>11}{'p90 ms':>11}{'change':>10}"]
+    for name, stats in current["results"].items():
+        change = ""
+        if name in base and base[name]["median_ms"] > 0:
+            pct = (stats["median_ms"] / base[name]["median_ms"] - 1.0) * 100
+            change = f"{pct:+.1f}%"
+        lines.append(
+            f"{name:<44}{stats['median_ms']:>11.3f}{stats['p90_ms']:>11.3f}{change:>10}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.bench_metrics",
+        description="Benchmark metric functions and the per-frame pipeline.",
+    )
+    parser.add_argument("-o", "--output", default="bench.json", help="result JSON path")
+    parser.add_argument(
+        "--resolutions",
+        default=",".join(f"{w}x{h}" for w, h in RESOLUTIONS),
+        help="comma separated WxH list",
+    )
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per case")
+    parser.add_argument("--no-pixmap", action="store_true", help="skip the Qt pixmap stage")
+    parser.add_argument("--compare", default=None, help="baseline JSON to compare against")
+    parser.add_argument(
+        "--max-slowdown", type=float, default=10.0, help="allowed slowdown in percent"
+    )
+    parser.add_argument(
+        "--min-delta-ms", type=float, default=0.05, help="ignore smaller absolute slowdowns"
+    )
+    args = parser.parse_args(argv)
+
+    resolutions = [parse_resolution(r) for r in args.resolutions.split(",") if r]
+    current = run(resolutions, args.repeat, pixmap=not args.no_pixmap)
+    with open(args.output, "w", encoding="utf-8") as fp:
+        json.dump(current, fp, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fp:
+            baseline = json.load(fp)
+    print(format_table(current, baseline))
+    if baseline is None:
+        return 0
+    regressions = compare(current, baseline, args.max_slowdown, args.min_delta_ms)
+    for reg in regressions:
+        print(
+            f"REGRESSION {reg.name}: {reg.baseline_ms:.3f} -> {reg.current_ms:.3f} ms "
+            f"(+{reg.slowdown:.1f}%)",
+            file=sys.stderr,
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
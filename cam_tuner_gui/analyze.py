@@ -0,0 +1,248 @@
+"""녹화/동영상/이미지 시퀀스를 오프라인으로 일괄 분석하는 CLI.
+
+사용 예::
+
+    python -m cam_tuner_gui.analyze captures/ -o metrics.npz --workers 8
+
+입력 디렉터리 아래의 ``.camrec`` 녹화, 동영상 파일, 이미지 시퀀스(같은
+디렉터리의 이미지 파일들)를 찾아 프레임 구간 단위 작업으로 나누고,
+프로세스 풀에서 ``metric.engine`` 의 지표를 계산한다. 결과는 열 단위로
+CSV 또는 npz 파일에 저장한다. ``--cache DIR`` 을 주면 프레임 지표를
+디스크 캐시에 남겨 같은 입력을 다시 분석할 때 계산을 건너뛴다.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+from dataclasses import dataclass
+import functools
+import multiprocessing
+import os
+import struct
+import sys
+from typing import Sequence
+import warnings
+
+import cv2
+import numpy as np
+
+from cam_tuner_gui.capture.recording import RECORDING_SUFFIX, Recording
+from cam_tuner_gui.metric.cache import MetricCache
+from cam_tuner_gui.metric.engine import (
+    FRAME_METRICS,
+    FrameContext,
+    MetricEngine,
+)
+from cam_tuner_gui.metric.flicker import FlickerAnalyzer
+
+
+VIDEO_SUFFIXES = (".avi", ".mp4", ".mkv", ".mov")
+IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff")
+
+FLICKER_WINDOW = 10
+COLUMNS = ("source", "frame") + tuple(FRAME_METRICS) + ("flicker", "delta_l")
+
+
+@dataclass(frozen=True)
+class Source:
+    """분석할 입력 하나."""
+
+    kind: str
+    name: str
+    paths: tuple[str, ...]
+    frames: int
+
+
+@dataclass(frozen=True)
+class Task:
+    """한 워커가 처리할 프레임 구간 ``[start, stop)``."""
+
+    source: Source
+    start: int
+    stop: int
+
+
+def discover(root: str) -> list[Source]:
+    """디렉터리(또는 파일)에서 분석할 입력을 찾는다.
+
+    열 수 없는 녹화 파일은 경고만 내고 건너뛴다.
+    """
+    if os.path.isfile(root):
+        files = [root]
+        dirs: list[tuple[str, list[str]]] = []
+    else:
+        files = []
+        dirs = []
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            names = sorted(filenames)
+            files.extend(os.path.join(dirpath, n) for n in names)
+            images = [os.path.join(dirpath, n) for n in names if n.lower().endswith(IMAGE_SUFFIXES)]
+            if images:
+                dirs.append((dirpath, images))
+    sources = []
+    for path in files:
+        lower = path.lower()
+        if lower.endswith(RECORDING_SUFFIX):
+            try:
+                count = len(Recording(path))
+            except (ValueError, struct.error, OSError) as exc:
+                warnings.warn(f"skipping unreadable recording {path}: {exc}", stacklevel=2)
+                continue
+            sources.append(Source("recording", path, (path,), count))
+        elif lower.endswith(VIDEO_SUFFIXES):
+            cap = cv2.VideoCapture(path)
+            count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            cap.release()
+            if count > 0:
+                sources.append(Source("video", path, (path,), count))
+    for dirpath, images in dirs:
+        sources.append(Source("images", dirpath, tuple(images), len(images)))
+    if os.path.isfile(root) and root.lower().endswith(IMAGE_SUFFIXES):
+        sources.append(Source("images", root, (root,), 1))
+    return sources
+
+
+def plan(sources: Sequence[Source], chunk: int) -> list[Task]:
+    """입력을 ``chunk`` 프레임 단위 작업으로 나눈다."""
+    tasks = []
+    for source in sources:
+        for start in range(0, source.frames, chunk):
+            tasks.append(Task(source, start, min(start + chunk, source.frames)))
+    return tasks
+
+
+def _iter_frames(task: Task):
+    """``(입력 안 프레임 번호, 프레임)`` 을 낸다. 읽지 못한 프레임은 건너뛴다."""
+    source = task.source
+    if source.kind == "recording":
+        rec = Recording(source.paths[0])
+        for i in range(task.start, task.stop):
+            yield i, rec.frame(i)
+    elif source.kind == "video":
+        cap = cv2.VideoCapture(source.paths[0])
+        cap.set(cv2.CAP_PROP_POS_FRAMES, task.start)
+        try:
+            for i in range(task.start, task.stop):
+                ret, frame = cap.read()
+                if not ret:
+                    return
+                yield i, frame
+        finally:
+            cap.release()
+    else:
+        for i in range(task.start, task.stop):
+            frame = cv2.imread(source.paths[i], cv2.IMREAD_COLOR)
+            if frame is not None:
+                yield i, frame
+
+
+def _init_worker() -> None:
+    # 프로세스마다 OpenCV 스레드를 하나로 제한해 코어를 과점유하지 않게 한다.
+    cv2.setNumThreads(1)
+
+
+def analyze_task(task: Task, cache_dir: str | None = None) -> dict[str, np.ndarray]:
+    """작업 하나의 프레임들을 분석해 열 배열로 반환한다."""
+    cache = MetricCache(path=cache_dir) if cache_dir else None
+    engine = MetricEngine(FRAME_METRICS, cache=cache)
+    rows = {name: [] for name in FRAME_METRICS}
+    luma = []
+    index = []
+    for i, frame in _iter_frames(task):
+        ctx = FrameContext(frame)
+        result = engine.compute(ctx)
+        for name in FRAME_METRICS:
+            rows[name].append(getattr(result, name))
+        luma.append(ctx.mean)
+        index.append(i)
+    columns = {name: np.asarray(vals, np.float64) for name, vals in rows.items()}
+    columns["frame"] = np.asarray(index, np.int64)
+    columns["luma"] = np.asarray(luma, np.float64)
+    return columns
+
+
+def _flicker_series(luma: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """프레임마다 직전 ``FLICKER_WINDOW`` 프레임으로 계산한 (플리커율, ΔL)."""
+    analyzer = FlickerAnalyzer(FLICKER_WINDOW, history=FLICKER_WINDOW)
+    rate = np.zeros(luma.size, np.float64)
+    delta_l = np.zeros(luma.size, np.float64)
+    for i, value in enumerate(luma):
+        analyzer.update(value)
+        rate[i] = analyzer.rate
+        delta_l[i] = analyzer.delta_l
+    return rate, delta_l
+
+
+def analyze(
+    sources: Sequence[Source],
+    workers: int | None = None,
+    chunk: int = 64,
+    cache_dir: str | None = None,
+) -> dict[str, np.ndarray]:
+    """입력 목록을 프로세스 풀에서 분석해 열 배열 딕셔너리로 반환한다."""
+    tasks = plan(sources, chunk)
+    workers = workers or os.cpu_count() or 1
+    run = functools.partial(analyze_task, cache_dir=cache_dir)
+    if workers > 1 and len(tasks) > 1:
+        with multiprocessing.Pool(workers, initializer=_init_worker) as pool:
+            parts = pool.map(run, tasks, chunksize=1)
+    else:
+        parts = [run(t) for t in tasks]
+
+    columns: dict[str, list[np.ndarray]] = {name: [] for name in COLUMNS}
+    by_source: dict[str, list[dict[str, np.ndarray]]] = {}
+    for task, part in zip(tasks, parts):
+        by_source.setdefault(task.source.name, []).append(part)
+    for name, source_parts in by_source.items():
+        count = sum(p["frame"].size for p in source_parts)
+        columns["source"].append(np.full(count, name, dtype=object))
+        for col in ("frame",) + tuple(FRAME_METRICS):
+            columns[col].append(np.concatenate([p[col] for p in source_parts]))
+        luma = np.concatenate([p["luma"] for p in source_parts])
+        rate, delta_l = _flicker_series(luma)
+        columns["flicker"].append(rate)
+        columns["delta_l"].append(delta_l)
+    result = {}
+    for name, arrays in columns.items():
+        result[name] = np.concatenate(arrays) if arrays else np.empty(0)
+    result["source"] = result["source"].astype(str)
+    return result
+
+
+def write_results(columns: dict[str, np.ndarray], path: str) -> None:
+    """열 배열을 확장자에 따라 CSV 또는 npz 로 저장한다."""
+    if path.lower().endswith(".npz"):
+        np.savez(path, **columns)
+        return
+    with open(path, "w", newline="", encoding="utf-8") as fp:
+        writer = csv.writer(fp)
+        writer.writerow(COLUMNS)
+        writer.writerows(zip(*(columns[c].tolist() for c in COLUMNS)))
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m cam_tuner_gui.analyze",
+        description="Run image-quality metrics over recorded sequences.",
+    )
+    parser.add_argument("inputs", nargs="+", help="directories or files to analyze")
+    parser.add_argument("-o", "--output", default="metrics.csv", help=".csv or .npz")
+    parser.add_argument("-j", "--workers", type=int, default=None)
+    parser.add_argument("--chunk", type=int, default=64, help="frames per task")
+    parser.add_argument("--cache", default=None, help="on-disk metric cache directory")
+    args = parser.parse_args(argv)
+
+    sources = [s for root in args.inputs for s in discover(root)]
+    if not sources:
+        print("No recordings, videos or images found.", file=sys.stderr)
+        return 1
+    columns = analyze(sources, args.workers, args.chunk, args.cache)
+    write_results(columns, args.output)
+    print(f"{len(columns['frame'])} frames from {len(sources)} sources -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
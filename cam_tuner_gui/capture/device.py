@@ -2,44 +2,198 @@
 
 from __future__ import annotations
 
+from collections import deque
+import threading
+import time
+from typing import Iterator
+import warnings
+
 import cv2
 import numpy as np
 
+from .pipeline import TeePipeline
+from .pool import Frame, FramePool
+from .recording import RECORDING_SUFFIX, Recorder, RecordingSource
+from .synthetic import SyntheticSource
+from .v4l2 import V4L2Device
+
+V4L2_PREFIX = "v4l2:"
+SYNTHETIC_PREFIX = "synthetic"
+TEE_PREFIX = "tee:"
+
+
+class FrameRing:
+    """고정 크기 프레임 링 버퍼.
+
+    가득 차면 가장 오래된 프레임을 버린다(drop-oldest). 캡처 스레드가
+    ``put`` 하고 소비자는 ``latest``/``get`` 으로 읽는다.
+
+    :class:`~cam_tuner_gui.capture.pool.Frame` 레코드를 넣으면 버려지는
+    프레임은 풀에 반환되고, ``latest`` 는 참조를 하나 늘려서 돌려준다.
+    """
+
+    def __init__(self, capacity: int = 4) -> None:
+        """버퍼 용량을 받아 초기화."""
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self._frames: deque = deque(maxlen=capacity)
+        self._cond = threading.Condition()
+        self._latest = None
+        self._closed = False
+        self.dropped = 0
+        self.count = 0
+
+    @property
+    def capacity(self) -> int:
+        """버퍼 용량."""
+        return self._frames.maxlen or 0
+
+    @property
+    def closed(self) -> bool:
+        """생산자가 종료되었는지 여부."""
+        return self._closed
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def put(self, frame) -> None:
+        """프레임을 추가한다. 가득 차 있으면 가장 오래된 프레임을 버린다."""
+        with self._cond:
+            if len(self._frames) == self._frames.maxlen:
+                self._drop(self._frames.popleft())
+                self.dropped += 1
+            self._frames.append(frame)
+            previous = self._latest
+            if isinstance(frame, Frame):
+                frame.retain()
+            self._latest = frame
+            if isinstance(previous, Frame):
+                previous.release()
+            self.count += 1
+            self._cond.notify_all()
+
+    def latest(self):
+        """가장 최근 프레임을 반환한다. 없으면 ``None``.
 
-class _DummyCapture:
-    """카메라가 없을 때 사용할 간단한 더미 캡처 객체."""
+        :class:`Frame` 이면 호출자가 ``release()`` 해야 한다.
+        """
+        frame = self._latest
+        if isinstance(frame, Frame):
+            with self._cond:
+                frame = self._latest
+                return frame.retain() if frame is not None else None
+        return frame
+
+    def discard_oldest(self) -> bool:
+        """가장 오래된 프레임 하나를 버린다. 버린 프레임이 없으면 ``False``."""
+        with self._cond:
+            if not self._frames:
+                return False
+            self._drop(self._frames.popleft())
+            self.dropped += 1
+            return True
 
-    def __init__(self) -> None:
-        self._opened = True
+    def clear(self) -> None:
+        """보관 중인 프레임을 모두 버린다."""
+        with self._cond:
+            while self._frames:
+                self._drop(self._frames.popleft())
+            self._drop(self._latest)
+            self._latest = None
 
-    def isOpened(self) -> bool:  # type: ignore[override]
-        return self._opened
+    @staticmethod
+    def _drop(frame) -> None:
+        if isinstance(frame, Frame):
+            frame.release()
 
-    def read(self):
-        frame = np.zeros((480, 640, 3), np.uint8)
-        return True, frame
+    def get(self, timeout: float | None = None):
+        """가장 오래된 프레임을 꺼낸다.
 
-    def release(self) -> None:  # type: ignore[override]
-        self._opened = False
+        ``timeout`` 이 0이면 기다리지 않는다. 시간 초과 또는 버퍼가 닫힌
+        뒤 비어 있으면 ``None`` 을 반환한다.
+        """
+        with self._cond:
+            if not self._frames and not self._closed and timeout != 0:
+                self._cond.wait_for(
+                    lambda: self._frames or self._closed, timeout=timeout
+                )
+            if self._frames:
+                return self._frames.popleft()
+            return None
 
-    def open(self, *args, **kwargs) -> None:  # type: ignore[override]
-        self._opened = True
+    def close(self) -> None:
+        """생산 종료를 알리고 대기 중인 소비자를 깨운다."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
 
-    def set(self, *args, **kwargs):  # type: ignore[override]
-        return True
 
 class CameraDevice:
-    """단일 카메라 장치를 제어하고 프레임을 스트림하는 클래스."""
+    """단일 카메라 장치를 제어하고 프레임을 스트림하는 클래스.
+
+    ``threaded=True`` 이면 ``cap.read()`` 를 별도 스레드에서 돌려
+    :class:`FrameRing` 에 채우고, GUI 쪽은 ``latest()``/``iter_frames()`` 로
+    블로킹 없이 프레임을 가져간다.
 
-    def __init__(self, device_id: str) -> None:
-        """디바이스 ID를 받아 초기화."""
+    ``pool_size > 0`` 이면 프레임 풀 모드로 동작한다. 프레임은 미리 할당한
+    버퍼에 ``cap.read(image=...)`` 로 디코딩되고, ``read_pooled()``,
+    ``latest()``, ``iter_frames()`` 는 :class:`Frame` 레코드를 돌려준다.
+    받은 레코드는 사용 후 ``release()`` 해야 한다.
+    """
+
+    def __init__(
+        self,
+        device_id: str,
+        threaded: bool = False,
+        ring_size: int = 4,
+        pool_size: int = 0,
+        v4l2_buffers: int = 4,
+        preview_size: tuple[int, int] = (640, 400),
+    ) -> None:
+        """디바이스 ID와 캡처 모드를 받아 초기화."""
         self.device_id = device_id
+        self.v4l2_buffers = v4l2_buffers
+        self.preview_size = preview_size
+        self.threaded = threaded
+        self.ring_size = ring_size
+        self.pool_size = pool_size
+        self._pool: FramePool | None = None
+        self._seq = 0
+        self._recorder: Recorder | None = None
+        self._record_lock = threading.Lock()
         self.cap: cv2.VideoCapture | None = None
-        self._temp_video_path: str | None = None
+        self._ring: FrameRing | None = None
+        self._thread: threading.Thread | None = None
+        self._stop_event = threading.Event()
+        self._teardown_lock = threading.Lock()
+        # 캡처 스레드별 상태: False 면 실행 중, True 면 정리를 스레드에 넘겼다.
+        self._handoff: dict[threading.Thread, bool] = {}
 
     def start_stream(self) -> None:
-        """카메라 스트림을 시작한다."""
-        if self.cap is None:
+        """카메라 스트림을 시작한다.
+
+        ``device_id`` 가 ``v4l2:`` 로 시작하면 :class:`V4L2Device` 로 직접 연다
+        (예: ``v4l2:/dev/video0``, ``v4l2:0``). ``synthetic`` 또는
+        ``synthetic:<pattern>`` 이면 :class:`SyntheticSource` 를, ``.camrec``
+        파일 경로면 녹화 재생 소스 :class:`RecordingSource` 를 쓴다.
+        ``tee:<소스 엘리먼트>`` 면 :class:`TeePipeline` 으로 열어 GStreamer 가
+        ``preview_size`` 미리보기를 따로 만든다 (예:
+        ``tee:v4l2src device=/dev/video0 ! image/jpeg ! jpegdec``).
+        """
+        native = self.device_id.startswith(V4L2_PREFIX)
+        synthetic = self.device_id.startswith(SYNTHETIC_PREFIX)
+        playback = self.device_id.endswith(RECORDING_SUFFIX)
+        tee = self.device_id.startswith(TEE_PREFIX)
+        if self.cap is None and playback:
+            self.cap = RecordingSource(self.device_id, realtime=True, loop=True)
+        elif self.cap is None and synthetic:
+            pattern = self.device_id.partition(":")[2] or "slanted_edge"
+            self.cap = SyntheticSource(pattern, realtime=True)
+        elif self.cap is None and native:
+            self.cap = self._open_v4l2()
+        elif self.cap is None and tee:
+            self.cap = self._open_tee()
+        elif self.cap is None:
             # device_id may be index or gstreamer string
             try:
                 index = int(self.device_id)
@@ -47,54 +201,297 @@ class CameraDevice:
             except ValueError:
                 # treat as gstreamer pipeline
                 self.cap = cv2.VideoCapture(self.device_id, cv2.CAP_GSTREAMER)
-        if not self.cap.isOpened():
+        if (
+            self.cap is not None
+            and not self.cap.isOpened()
+            and not (native or synthetic or playback or tee)
+        ):
             try:
                 index = int(self.device_id)
                 self.cap.open(index)
             except ValueError:
                 self.cap.open(self.device_id, cv2.CAP_GSTREAMER)
 
-        if not self.cap.isOpened():
-            # 장치를 열 수 없을 때 더미 캡처 객체를 사용한다.
-            import tempfile, os
-
-            self._temp_video_path = tempfile.mktemp(suffix=".avi")
-            writer = cv2.VideoWriter(
-                self._temp_video_path,
-                cv2.VideoWriter_fourcc(*"MJPG"),
-                30,
-                (640, 480),
-            )
-            if writer.isOpened():
-                frame = np.zeros((480, 640, 3), np.uint8)
-                for _ in range(30):
-                    writer.write(frame)
-                writer.release()
-                self.cap = cv2.VideoCapture(self._temp_video_path)
-            else:
-                writer.release()
-                self.cap = _DummyCapture()
+        if self.cap is None or not self.cap.isOpened():
+            # 장치를 열 수 없을 때 메모리 합성 테스트 차트를 사용한다.
+            self.cap = SyntheticSource(realtime=True)
+
+        if self.pool_size > 0 and self._pool is None:
+            self._pool = FramePool(self.pool_size)
+        if self.threaded and self._thread is None:
+            self._start_capture_thread()
+
+    def _open_v4l2(self) -> V4L2Device | None:
+        """V4L2 mmap 백엔드로 장치를 연다. 실패하면 ``None``."""
+        path = self.device_id[len(V4L2_PREFIX):]
+        if path.isdigit():
+            path = f"/dev/video{path}"
+        device = V4L2Device(path, buffer_count=self.v4l2_buffers)
+        try:
+            device.open()
+            device.start()
+        except OSError:
+            device.close()
+            return None
+        return device
+
+    def _open_tee(self) -> TeePipeline | None:
+        """미리보기/분석 갈래로 나눈 GStreamer 파이프라인을 연다. 실패하면 ``None``."""
+        pipeline = TeePipeline(self.device_id[len(TEE_PREFIX):], self.preview_size)
+        try:
+            pipeline.play()
+        except RuntimeError:
+            return None
+        return pipeline
+
+    def _start_capture_thread(self) -> None:
+        """캡처 스레드를 시작한다.
+
+        스레드는 장치·링·풀과 중지 이벤트를 인자로 받아 쓰므로
+        :meth:`stop_stream` 이 속성을 비운 뒤에도 안전하게 빠져나온다.
+        """
+        self._ring = FrameRing(self.ring_size)
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(
+            target=self._capture_loop,
+            args=(self.cap, self._ring, self._pool, self._stop_event),
+            name=f"capture-{self.device_id}",
+            daemon=True,
+        )
+        self._handoff[self._thread] = False
+        self._thread.start()
+
+    def _capture_loop(
+        self, cap, ring: FrameRing, pool: FramePool | None, stop: threading.Event
+    ) -> None:
+        """스트림이 멈출 때까지 프레임을 읽어 링 버퍼에 넣는다."""
+        try:
+            while not stop.is_set():
+                if pool is not None:
+                    frame = self._read_into_pool(ring, cap, pool, stop)
+                    if frame is None:
+                        break
+                else:
+                    ret, frame = cap.read()
+                    if not ret:
+                        break
+                    self._record(frame)
+                ring.put(frame)
+        finally:
+            ring.close()
+            with self._teardown_lock:
+                handoff = self._handoff.pop(threading.current_thread(), False)
+            if handoff:
+                # stop_stream 이 기다리다 포기했으므로 마지막 정리는 스레드가 한다.
+                ring.clear()
+                self._release_cap(cap)
+
+    @staticmethod
+    def _release_cap(cap) -> None:
+        if cap is not None and cap.isOpened():
+            cap.release()
+
+    def _acquire_buffer(
+        self,
+        ring: FrameRing | None,
+        pool: FramePool | None = None,
+        stop: threading.Event | None = None,
+    ):
+        """풀에서 버퍼를 빌린다.
+
+        풀이 비어 있으면 링 버퍼의 오래된 프레임을 먼저 버리고, 그래도
+        없으면 소비자가 반환할 때까지 기다린다.
+        """
+        pool = self._pool if pool is None else pool
+        stop = self._stop_event if stop is None else stop
+        while True:
+            acquired = pool.acquire(timeout=0)
+            if acquired is not None:
+                return acquired
+            if ring is not None and ring.discard_oldest():
+                continue
+            acquired = pool.acquire(timeout=0.05)
+            if acquired is not None:
+                return acquired
+            if ring is not None and stop.is_set():
+                return None
+            if ring is None:
+                raise RuntimeError("Frame pool exhausted")
+
+    def _read_into_pool(
+        self,
+        ring: FrameRing | None = None,
+        cap=None,
+        pool: FramePool | None = None,
+        stop: threading.Event | None = None,
+    ) -> Frame | None:
+        """풀 버퍼에 한 프레임을 읽어 :class:`Frame` 으로 반환한다.
+
+        ``cap``/``pool`` 을 주지 않으면 장치의 현재 값을 쓴다.
+        """
+        cap = self.cap if cap is None else cap
+        pool = self._pool if pool is None else pool
+        if not pool.allocated:
+            ret, image = cap.read()
+            if not ret:
+                return None
+            pool.allocate(image.shape, image.dtype)
+        else:
+            image = None
+        acquired = self._acquire_buffer(ring, pool, stop)
+        if acquired is None:
+            return None
+        slot, buf = acquired
+        if image is None:
+            ret, image = cap.read(image=buf)
+            if not ret:
+                pool.put_back(slot)
+                return None
+        if image is not buf:
+            # 첫 프레임이거나 해상도가 바뀐 경우에만 복사가 일어난다.
+            if not pool.matches(image):
+                pool.allocate(image.shape, image.dtype)
+                acquired = self._acquire_buffer(ring, pool, stop)
+                if acquired is None:
+                    return None
+                slot, buf = acquired
+            np.copyto(buf, image)
+        timestamp = time.monotonic()
+        self._seq += 1
+        self._record(buf, self._seq, timestamp)
+        return pool.wrap(slot, self._seq, timestamp)
 
     def stop_stream(self) -> None:
-        """카메라 스트림을 중지한다."""
-        if self.cap is not None and self.cap.isOpened():
-            self.cap.release()
-        if self._temp_video_path:
-            import os
+        """카메라 스트림을 중지한다.
 
-            try:
-                os.remove(self._temp_video_path)
-            except OSError:
-                pass
-            self._temp_video_path = None
+        캡처 스레드가 ``read()`` 에 묶여 2초 안에 끝나지 않으면 경고를 내고,
+        링과 장치 정리는 그 스레드가 빠져나가면서 하도록 넘긴다.
+        """
+        release = True
+        thread = self._thread
+        if thread is not None:
+            self._stop_event.set()
+            thread.join(timeout=2.0)
+            with self._teardown_lock:
+                running = thread in self._handoff
+                if running:
+                    self._handoff[thread] = True
+            self._thread = None
+            if running:
+                release = False
+                warnings.warn(
+                    f"capture thread for {self.device_id} did not stop; "
+                    "it will release the device when read() returns",
+                    RuntimeWarning,
+                    stacklevel=2,
+                )
+            else:
+                self._ring.clear()
+            self._ring = None
+        self.stop_recording()
+        self._pool = None
+        if release:
+            self._release_cap(self.cap)
         self.cap = None
 
     def read_frame(self):
-        """한 프레임을 반환한다."""
+        """한 프레임을 반환한다.
+
+        스레드 모드에서는 링 버퍼의 다음 프레임을 기다려 반환한다.
+        프레임 풀 모드에서도 호출자가 소유하는 ndarray 사본을 반환한다.
+        """
+        if self._pool is not None:
+            with self.read_pooled() as frame:
+                return frame.image.copy()
         if self.cap is None or not self.cap.isOpened():
             raise RuntimeError("Stream not started")
+        if self._ring is not None:
+            frame = self._ring.get(timeout=1.0)
+            if frame is None:
+                raise RuntimeError("Failed to read frame")
+            return frame
         ret, frame = self.cap.read()
         if not ret:
             raise RuntimeError("Failed to read frame")
+        self._record(frame)
+        return frame
+
+    def start_recording(self, path: str, fps: float | None = None, **params) -> Recorder:
+        """이후 캡처되는 모든 프레임을 ``path`` 에 녹화한다.
+
+        ``params`` 는 초기 파라미터 상태로 기록되며, 이후 변경은 반환된
+        :class:`Recorder` 의 ``update_params`` 로 알린다.
+        """
+        if self._recorder is not None:
+            raise RuntimeError("Already recording")
+        if fps is None:
+            fps = self.cap.get(cv2.CAP_PROP_FPS) if self.cap is not None else 0.0
+        recorder = Recorder(path, fps=fps or 30.0)
+        recorder.update_params(**params)
+        with self._record_lock:
+            self._recorder = recorder
+        return recorder
+
+    def stop_recording(self) -> None:
+        """녹화를 끝내고 파일을 닫는다."""
+        with self._record_lock:
+            recorder, self._recorder = self._recorder, None
+        if recorder is not None:
+            recorder.close()
+
+    @property
+    def recording(self) -> bool:
+        """녹화 중인지 여부."""
+        return self._recorder is not None
+
+    def _record(self, image, seq: int | None = None, timestamp: float | None = None) -> None:
+        if self._recorder is None:
+            return
+        with self._record_lock:
+            if self._recorder is not None:
+                self._recorder.write(image, seq, timestamp)
+
+    def read_pooled(self) -> Frame:
+        """프레임 풀 모드에서 다음 프레임을 :class:`Frame` 으로 반환한다."""
+        if self.cap is None or not self.cap.isOpened():
+            raise RuntimeError("Stream not started")
+        if self._pool is None:
+            raise RuntimeError("Frame pool not enabled")
+        if self._ring is not None:
+            frame = self._ring.get(timeout=1.0)
+        else:
+            frame = self._read_into_pool()
+        if frame is None:
+            raise RuntimeError("Failed to read frame")
         return frame
 
+    def latest(self):
+        """가장 최근에 캡처된 프레임을 블로킹 없이 반환한다.
+
+        스레드 모드가 아니거나 아직 프레임이 없으면 ``None``.
+        """
+        if self._ring is None:
+            return None
+        return self._ring.latest()
+
+    def iter_frames(self, block: bool = False) -> Iterator:
+        """링 버퍼에 쌓인 프레임을 오래된 순서로 꺼낸다.
+
+        ``block=False`` 이면 현재 버퍼에 있는 프레임만 비우고 끝난다.
+        ``block=True`` 이면 스트림이 멈출 때까지 새 프레임을 기다린다.
+        """
+        ring = self._ring
+        if ring is None:
+            return
+        timeout = None if block else 0
+        while True:
+            frame = ring.get(timeout=timeout)
+            if frame is None:
+                return
+            yield frame
+
+    @property
+    def dropped_frames(self) -> int:
+        """링 버퍼가 가득 차서 버려진 프레임 수."""
+        return self._ring.dropped if self._ring is not None else 0
+
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import cv2
+import numpy as np
 
 class GstPipeline:
     """캡처를 위한 GStreamer 파이프라인을 관리한다."""
@@ -22,3 +23,225 @@ class GstPipeline:
         if self.cap.isOpened():
             self.cap.release()
 
+
+
+def _require_gst():
+    """GStreamer(PyGObject) 모듈을 불러와 초기화한다."""
+    try:
+        import gi
+
+        gi.require_version("Gst", "1.0")
+        from gi.repository import Gst  # type: ignore
+    except (ImportError, ValueError) as exc:
+        raise RuntimeError("PyGObject with GStreamer 1.0 is required") from exc
+    if not Gst.is_initialized():
+        Gst.init(None)
+    return Gst
+
+
+def build_tee_pipeline(
+    source: str,
+    preview_size: tuple[int, int] = (640, 400),
+    full_size: tuple[int, int] | None = None,
+    max_buffers: int = 2,
+    drop: bool = True,
+) -> str:
+    """소스 하나를 미리보기/분석 두 갈래로 나누는 파이프라인 문자열을 만든다.
+
+    미리보기 갈래는 GStreamer 안에서 ``preview_size`` 로 축소한 뒤 BGR 로
+    변환되고 (축소를 먼저 해 videoconvert 는 미리보기 크기 픽셀만 변환한다),
+    분석 갈래는 원본 해상도(또는 ``full_size``) BGR 프레임을 내보낸다.
+    미리보기는 ``preview_size`` 로 늘이므로 소스와 가로세로 비를 맞춘다.
+    각 갈래는 ``leaky`` 큐와 ``max-buffers``/``drop`` 이 걸린 appsink 로
+    끝나므로 소비자가 늦어도 메모리가 쌓이지 않는다.
+    """
+    pw, ph = preview_size
+    full_caps = "video/x-raw,format=BGR"
+    if full_size is not None:
+        full_caps += f",width={full_size[0]},height={full_size[1]}"
+    drop_flag = "true" if drop else "false"
+    leaky = " leaky=downstream" if drop else ""
+    queue = f"queue max-size-buffers={max_buffers} max-size-bytes=0 max-size-time=0{leaky}"
+    sink = f"max-buffers={max_buffers} drop={drop_flag} sync=false"
+    return (
+        f"{source} ! tee name=t "
+        f"t. ! {queue} ! videoscale ! video/x-raw,width={pw},height={ph} ! "
+        f"videoconvert ! video/x-raw,format=BGR ! "
+        f"appsink name={TeePipeline.PREVIEW} {sink} "
+        f"t. ! {queue} ! videoconvert ! {full_caps} ! "
+        f"appsink name={TeePipeline.FULL} {sink}"
+    )
+
+
+class TeePipeline:
+    """tee 로 나눈 미리보기/분석 appsink 에서 프레임을 직접 당겨오는 파이프라인.
+
+    ``cv2.VideoCapture`` 를 거치지 않고 PyGObject 로 GStreamer 를 다룬다.
+    GUI 는 ``pull_preview()`` 로 축소된 프레임을, 지표 계산은
+    ``pull_full()`` 로 원본 프레임을 받는다.
+
+    ``grab``/``retrieve``/``read``/``isOpened``/``release`` 도 있어
+    ``CameraDevice.cap`` 이나 :class:`~cam_tuner_gui.capture.sync.CaptureGroup`
+    에 그대로 쓸 수 있다. ``grab`` 은 분석 갈래 프레임을 잡고 미리보기 갈래의
+    최신 프레임을 :attr:`preview` 에 둔다. 소스가 라이브이고 파이프라인 시계가
+    CLOCK_MONOTONIC 이면 :attr:`capture_time` 은 버퍼 PTS 를 그 시계로 옮긴
+    캡처 시각이고, 아니면 ``None`` 이다.
+    """
+
+    PREVIEW = "preview"
+    FULL = "full"
+
+    def __init__(
+        self,
+        source: str,
+        preview_size: tuple[int, int] = (640, 400),
+        full_size: tuple[int, int] | None = None,
+        max_buffers: int = 2,
+        drop: bool = True,
+    ) -> None:
+        """소스 엘리먼트 문자열과 갈래별 설정을 받아 초기화."""
+        self.pipeline_desc = build_tee_pipeline(
+            source, preview_size, full_size, max_buffers, drop
+        )
+        self._pipeline = None
+        self._sinks: dict = {}
+        self._live = False
+        self._clock_base: float | None = None
+        self._grabbed: np.ndarray | None = None
+        self._size = (0, 0)
+        self.preview: np.ndarray | None = None
+        self.capture_time: float | None = None
+
+    def play(self, timeout: float = 5.0) -> None:
+        """파이프라인을 PLAYING 상태로 전환한다."""
+        if self._pipeline is not None:
+            return
+        Gst = _require_gst()
+        pipeline = Gst.parse_launch(self.pipeline_desc)
+        self._sinks = {
+            name: pipeline.get_by_name(name) for name in (self.PREVIEW, self.FULL)
+        }
+        ret = pipeline.set_state(Gst.State.PLAYING)
+        if ret == Gst.StateChangeReturn.ASYNC:
+            ret, _, _ = pipeline.get_state(int(timeout * Gst.SECOND))
+        if ret == Gst.StateChangeReturn.FAILURE:
+            pipeline.set_state(Gst.State.NULL)
+            raise RuntimeError(f"Failed to start pipeline: {self.pipeline_desc}")
+        # 라이브 소스는 preroll 하지 않는다. 그때만 PTS 가 캡처 시각을 따른다.
+        self._live = ret == Gst.StateChangeReturn.NO_PREROLL
+        self._clock_base = None
+        self._pipeline = pipeline
+
+    def isOpened(self) -> bool:
+        return self._pipeline is not None
+
+    def pull(self, branch: str, timeout: float = 0.1):
+        """지정한 갈래의 appsink 에서 한 프레임을 당겨온다.
+
+        ``(pts_seconds, frame)`` 을 반환하며, 시간 안에 샘플이 없으면 ``None``.
+        """
+        if self._pipeline is None:
+            raise RuntimeError("Pipeline not started")
+        Gst = _require_gst()
+        sample = self._sinks[branch].emit(
+            "try-pull-sample", int(timeout * Gst.SECOND)
+        )
+        if sample is None:
+            return None
+        structure = sample.get_caps().get_structure(0)
+        width = structure.get_value("width")
+        height = structure.get_value("height")
+        buf = sample.get_buffer()
+        ok, info = buf.map(Gst.MapFlags.READ)
+        if not ok:
+            return None
+        try:
+            data = np.frombuffer(info.data, np.uint8)
+            stride = data.size // height
+            frame = data.reshape(height, stride)[:, : width * 3]
+            frame = frame.reshape(height, width, 3).copy()
+        finally:
+            buf.unmap(info)
+        pts = buf.pts / Gst.SECOND if buf.pts != Gst.CLOCK_TIME_NONE else None
+        return pts, frame
+
+    def pull_preview(self, timeout: float = 0.1):
+        """미리보기(축소) 갈래에서 프레임을 당겨온다."""
+        return self.pull(self.PREVIEW, timeout)
+
+    def pull_full(self, timeout: float = 0.1):
+        """분석(원본 해상도) 갈래에서 프레임을 당겨온다."""
+        return self.pull(self.FULL, timeout)
+
+    # VideoCapture 호환 ---------------------------------------------------------
+
+    def _clock_time(self, pts: float | None) -> float | None:
+        """버퍼 PTS(러닝 타임)를 ``time.monotonic()`` 과 같은 시계의 초로 옮긴다."""
+        if pts is None or not self._live:
+            return None
+        if self._clock_base is None:
+            Gst = _require_gst()
+            clock = self._pipeline.get_clock()
+            if not isinstance(clock, Gst.SystemClock):
+                return None
+            if clock.props.clock_type != Gst.ClockType.MONOTONIC:
+                return None
+            self._clock_base = self._pipeline.get_base_time() / Gst.SECOND
+        return self._clock_base + pts
+
+    def grab(self, timeout: float = 1.0) -> bool:
+        """분석 갈래에서 다음 프레임을 잡고 미리보기 갈래는 최신 프레임만 남긴다."""
+        pulled = self.pull_full(timeout)
+        if pulled is None:
+            return False
+        pts, self._grabbed = pulled
+        self._size = self._grabbed.shape[1], self._grabbed.shape[0]
+        self.capture_time = self._clock_time(pts)
+        while True:
+            preview = self.pull_preview(0)
+            if preview is None:
+                break
+            self.preview = preview[1]
+        return True
+
+    def retrieve(self, image: np.ndarray | None = None):
+        """잡아 둔 분석 갈래 프레임을 ``(ret, frame)`` 으로 반환한다."""
+        frame, self._grabbed = self._grabbed, None
+        if frame is None:
+            return False, None
+        if image is not None and image.shape == frame.shape and image.dtype == frame.dtype:
+            np.copyto(image, frame)
+            frame = image
+        return True, frame
+
+    def read(self, image: np.ndarray | None = None):
+        if not self.grab():
+            return False, None
+        return self.retrieve(image)
+
+    def get(self, prop: int) -> float:
+        """마지막 분석 갈래 프레임 크기만 안다. 그 밖의 속성은 0."""
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self._size[0])
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self._size[1])
+        return 0.0
+
+    def set(self, prop: int, value) -> bool:
+        """파이프라인 속성은 바꾸지 않는다."""
+        return False
+
+    def release(self) -> None:
+        self.stop()
+
+    def stop(self) -> None:
+        """파이프라인을 정지하고 자원을 해제한다."""
+        if self._pipeline is None:
+            return
+        Gst = _require_gst()
+        self._pipeline.set_state(Gst.State.NULL)
+        self._pipeline = None
+        self._sinks = {}
+        self._grabbed = None
+        self.preview = None
+        self.capture_time = None
@@ -0,0 +1,157 @@
+"""미리 할당한 프레임 버퍼 풀 모듈.
+
+``cap.read(image=buf)`` 로 재사용 버퍼에 바로 디코딩해 프레임마다
+새 ndarray 를 만들지 않도록 한다.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+import threading
+
+import numpy as np
+
+
+class Frame:
+    """풀 버퍼에 담긴 한 프레임과 메타데이터.
+
+    ``seq`` 는 캡처 순번, ``timestamp`` 는 ``time.monotonic()`` 기준 캡처
+    시각(초)이다. 사용이 끝나면 ``release()`` 로 버퍼를 풀에 돌려준다.
+    여러 소비자가 공유할 때는 ``retain()`` 으로 참조를 늘린다.
+    """
+
+    __slots__ = ("seq", "timestamp", "image", "_pool", "_slot", "_refs")
+
+    def __init__(
+        self,
+        seq: int,
+        timestamp: float,
+        image: np.ndarray,
+        pool: FramePool | None = None,
+        slot: int = -1,
+    ) -> None:
+        self.seq = seq
+        self.timestamp = timestamp
+        self.image = image
+        self._pool = pool
+        self._slot = slot
+        self._refs = 1
+
+    @property
+    def released(self) -> bool:
+        """버퍼가 이미 반환되었는지 여부."""
+        return self.image is None
+
+    def retain(self) -> Frame:
+        """참조 수를 하나 늘리고 자기 자신을 반환한다."""
+        if self._pool is None:
+            self._refs += 1
+            return self
+        with self._pool._cond:
+            if self.image is None:
+                raise RuntimeError("Frame already released")
+            self._refs += 1
+        return self
+
+    def release(self) -> None:
+        """참조를 하나 반환한다. 마지막 참조면 버퍼를 풀에 돌려준다."""
+        pool = self._pool
+        if pool is None:
+            self._refs -= 1
+            if self._refs <= 0:
+                self.image = None
+            return
+        with pool._cond:
+            if self.image is None:
+                return
+            self._refs -= 1
+            if self._refs > 0:
+                return
+            self.image = None
+            pool._give_back(self._slot)
+
+    def __enter__(self) -> Frame:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+    def __repr__(self) -> str:
+        return f"Frame(seq={self.seq}, timestamp={self.timestamp:.6f})"
+
+
+class FramePool:
+    """같은 크기의 프레임 버퍼를 미리 할당해 돌려 쓰는 풀.
+
+    버퍼 크기는 첫 프레임을 본 뒤 ``allocate`` 로 정한다. 해상도가 바뀌면
+    다시 ``allocate`` 하며, 이전 세대의 버퍼 반환은 무시된다.
+    """
+
+    def __init__(self, size: int) -> None:
+        """버퍼 개수를 받아 초기화."""
+        if size < 1:
+            raise ValueError("size must be >= 1")
+        self.size = size
+        self._buffers: list[np.ndarray] = []
+        self._free: deque[int] = deque()
+        self._cond = threading.Condition()
+        self._generation = 0
+        self.shape: tuple[int, ...] | None = None
+        self.dtype: np.dtype | None = None
+
+    @property
+    def allocated(self) -> bool:
+        """버퍼가 할당되었는지 여부."""
+        return bool(self._buffers)
+
+    @property
+    def available(self) -> int:
+        """지금 빌릴 수 있는 버퍼 수."""
+        return len(self._free)
+
+    def allocate(self, shape: tuple[int, ...], dtype=np.uint8) -> None:
+        """주어진 모양으로 버퍼를 (다시) 할당한다."""
+        with self._cond:
+            self._generation += 1
+            self.shape = tuple(shape)
+            self.dtype = np.dtype(dtype)
+            self._buffers = [np.empty(shape, dtype) for _ in range(self.size)]
+            self._free = deque(range(self.size))
+            self._cond.notify_all()
+
+    def matches(self, image: np.ndarray) -> bool:
+        """이미지가 현재 버퍼 모양/타입과 같은지 확인한다."""
+        return image.shape == self.shape and image.dtype == self.dtype
+
+    def acquire(self, timeout: float | None = None) -> tuple[int, np.ndarray] | None:
+        """빈 버퍼 하나를 빌린다.
+
+        ``timeout`` 이 0이면 기다리지 않는다. 빌릴 버퍼가 없으면 ``None``.
+        반환하는 슬롯 번호에는 세대 정보가 포함되어 있다.
+        """
+        with self._cond:
+            if not self._free and timeout != 0:
+                self._cond.wait_for(lambda: self._free, timeout=timeout)
+            if not self._free:
+                return None
+            index = self._free.popleft()
+            slot = self._generation * self.size + index
+            return slot, self._buffers[index]
+
+    def wrap(self, slot: int, seq: int, timestamp: float) -> Frame:
+        """빌린 슬롯을 :class:`Frame` 레코드로 감싼다."""
+        image = self._buffers[slot % self.size]
+        return Frame(seq, timestamp, image, self, slot)
+
+    def put_back(self, slot: int) -> None:
+        """:meth:`wrap` 하지 않은 슬롯을 그대로 반환한다."""
+        with self._cond:
+            self._give_back(slot)
+
+    def _give_back(self, slot: int) -> None:
+        """슬롯을 반환한다. 호출자가 ``_cond`` 를 잡고 있어야 한다."""
+        generation, index = divmod(slot, self.size)
+        if generation != self._generation:
+            return
+        self._free.append(index)
+        self._cond.notify()
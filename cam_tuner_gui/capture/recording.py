@@ -0,0 +1,402 @@
+"""원시 프레임 녹화 컨테이너와 memmap 재생 소스.
+
+파일 구조 (리틀 엔디언)::
+
+    [파일 헤더 64B]
+    [청크 헤더 32B][청크 메타 JSON][패딩][프레임 N개 원시 데이터] ...
+    [프레임 인덱스 (offset u8, seq u8, ts f8) × 프레임 수]
+    [푸터 16B: b"CTIX", 프레임 수 u4, 인덱스 오프셋 u8]
+
+청크는 추가만 되며(append-only), 닫을 때 인덱스와 푸터를 덧붙인다. 인덱스가
+있으면 임의 프레임을 O(1) 로 찾고, 녹화가 비정상 종료되어 푸터가 없으면
+청크 헤더를 따라가며 인덱스를 다시 만든다. 헤더는 첫 프레임이 들어올 때
+쓰므로 프레임 없이 닫힌 파일(0 바이트)이나 헤더가 잘린 파일은 프레임 0개인
+녹화로 읽는다.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+import json
+import os
+import queue
+import struct
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+RECORDING_SUFFIX = ".camrec"
+
+_MAGIC = b"CAMREC01"
+_HEADER = struct.Struct("<8sIIIdI4sQ20x")
+_CHUNK = struct.Struct("<4sIIQ12x")
+_CHUNK_MAGIC = b"CHNK"
+_FOOTER = struct.Struct("<4sIQ")
+_FOOTER_MAGIC = b"CTIX"
+_ALIGN = 64
+INDEX_DTYPE = np.dtype([("offset", "<u8"), ("seq", "<u8"), ("ts", "<f8")])
+
+
+def _pad(size: int) -> int:
+    return -size % _ALIGN
+
+
+class Recorder:
+    """프레임과 프레임별 메타데이터를 청크 단위로 기록한다.
+
+    프레임은 미리 할당한 청크 버퍼에 복사되고, 가득 찬 청크는 별도 스레드가
+    한 번에 디스크에 쓴다. 쓰기가 밀리면 ``write`` 가 기다린다(버퍼 2개).
+    ``update_params`` 로 바꾼 파라미터 상태는 이후 프레임들의 메타데이터로
+    함께 저장된다.
+    """
+
+    def __init__(self, path: str, fps: float = 30.0, chunk_frames: int = 32) -> None:
+        """저장 경로, 기록 FPS, 청크당 프레임 수를 받아 초기화."""
+        if chunk_frames < 1:
+            raise ValueError("chunk_frames must be >= 1")
+        self.path = path
+        self.fps = fps
+        self.chunk_frames = chunk_frames
+        self.count = 0
+        self._fp = open(path, "wb")
+        # GUI 스레드가 바꾸고 캡처 스레드가 읽으므로 딕셔너리는 제자리에서
+        # 고치지 않고 통째로 바꾸며, 더티 플래그와 함께 잠금으로 보호한다.
+        self._params: dict = {}
+        self._params_dirty = True
+        self._params_lock = threading.Lock()
+        self._shape: tuple[int, ...] | None = None
+        self._dtype: np.dtype | None = None
+        self._chunks: list[np.ndarray] = []
+        self._current = 0
+        self._fill = 0
+        self._meta: dict = {}
+        self._index: list[tuple[int, int, float]] = []
+        self._queue: queue.Queue = queue.Queue(maxsize=1)
+        self._free: queue.Queue = queue.Queue()
+        self._error: BaseException | None = None
+        self._thread = threading.Thread(
+            target=self._flush_loop, name="recorder", daemon=True
+        )
+        self._thread.start()
+
+    def __enter__(self) -> Recorder:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def update_params(self, **params) -> None:
+        """현재 파라미터 상태를 갱신한다. 다른 스레드에서 불러도 된다."""
+        with self._params_lock:
+            self._params = {**self._params, **params}
+            self._params_dirty = True
+
+    def _start(self, frame: np.ndarray) -> None:
+        self._shape = frame.shape
+        self._dtype = frame.dtype
+        h, w = frame.shape[:2]
+        channels = frame.shape[2] if frame.ndim == 3 else 1
+        self._fp.write(
+            _HEADER.pack(
+                _MAGIC,
+                1,
+                w,
+                h,
+                float(self.fps),
+                channels,
+                frame.dtype.str.encode().ljust(4, b"\0"),
+                frame.nbytes,
+            )
+        )
+        self._chunks = [
+            np.empty((self.chunk_frames,) + frame.shape, frame.dtype) for _ in range(2)
+        ]
+        self._free.put(1)
+        self._new_meta()
+
+    def _new_meta(self) -> None:
+        self._meta = {"seq": [], "ts": [], "params": []}
+        # 청크마다 첫 프레임의 파라미터를 기록해 청크 단위로 독립적이게 한다.
+        with self._params_lock:
+            self._params_dirty = True
+
+    def write(
+        self,
+        frame: np.ndarray,
+        seq: int | None = None,
+        timestamp: float | None = None,
+        params: dict | None = None,
+    ) -> None:
+        """프레임 하나를 기록한다."""
+        if self._error is not None:
+            raise RuntimeError("Recorder flush failed") from self._error
+        if self._fp is None:
+            raise RuntimeError("Recorder closed")
+        if self._shape is None:
+            self._start(frame)
+        elif frame.shape != self._shape or frame.dtype != self._dtype:
+            raise ValueError("Frame shape changed during recording")
+        if params:
+            self.update_params(**params)
+        chunk = self._chunks[self._current]
+        np.copyto(chunk[self._fill], frame)
+        meta = self._meta
+        meta["seq"].append(self.count if seq is None else int(seq))
+        meta["ts"].append(time.monotonic() if timestamp is None else float(timestamp))
+        with self._params_lock:
+            snapshot = self._params if self._params_dirty else None
+            self._params_dirty = False
+        if snapshot is not None:
+            meta["params"].append([self._fill, snapshot])
+        self._fill += 1
+        self.count += 1
+        if self._fill == self.chunk_frames:
+            self._submit()
+
+    def _submit(self) -> None:
+        """채운 청크를 기록 스레드에 넘기고 다른 버퍼로 전환한다."""
+        if self._fill == 0:
+            return
+        self._queue.put((self._current, self._fill, self._meta))
+        self._current = self._free.get()
+        self._fill = 0
+        self._new_meta()
+
+    def _flush_loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            index, count, meta = item
+            try:
+                self._write_chunk(self._chunks[index][:count], meta)
+            except BaseException as exc:  # noqa: BLE001 - 쓰기 스레드 오류 전달
+                self._error = exc
+            self._free.put(index)
+
+    def _write_chunk(self, frames: np.ndarray, meta: dict) -> None:
+        fp = self._fp
+        body = json.dumps(meta, separators=(",", ":")).encode()
+        start = fp.tell()
+        data_offset = start + _CHUNK.size + len(body) + _pad(_CHUNK.size + len(body))
+        fp.write(_CHUNK.pack(_CHUNK_MAGIC, len(frames), len(body), data_offset))
+        fp.write(body)
+        fp.write(b"\0" * (data_offset - fp.tell()))
+        fp.write(memoryview(np.ascontiguousarray(frames)).cast("B"))
+        stride = frames[0].nbytes
+        for i, (seq, ts) in enumerate(zip(meta["seq"], meta["ts"])):
+            self._index.append((data_offset + i * stride, seq, ts))
+
+    def close(self) -> None:
+        """남은 청크를 기록하고 인덱스와 푸터를 써서 파일을 닫는다."""
+        if self._fp is None:
+            return
+        if self._shape is not None:
+            self._submit()
+        self._queue.put(None)
+        self._thread.join()
+        fp = self._fp
+        self._fp = None
+        try:
+            if self._shape is not None:
+                index = np.array(self._index, dtype=INDEX_DTYPE)
+                offset = fp.tell()
+                fp.write(index.tobytes())
+                fp.write(_FOOTER.pack(_FOOTER_MAGIC, len(index), offset))
+        finally:
+            fp.close()
+        if self._error is not None:
+            raise RuntimeError("Recorder flush failed") from self._error
+
+
+class Recording:
+    """녹화 파일을 memmap 으로 열어 프레임을 복사 없이 읽는다."""
+
+    def __init__(self, path: str) -> None:
+        """녹화 파일 경로를 받아 헤더와 인덱스를 읽는다."""
+        self.path = path
+        size = os.path.getsize(path)
+        self._chunk_params: list[tuple[int, dict]] | None = None
+        self._param_starts: list[int] = []
+        if size < _HEADER.size:
+            # 첫 프레임 전에 닫혔거나 헤더를 쓰다 끊긴 녹화.
+            with open(path, "rb") as fp:
+                head = fp.read(len(_MAGIC))
+            if head != _MAGIC[: len(head)]:
+                raise ValueError(f"Not a recording file: {path}")
+            self._mm = np.zeros(0, np.uint8)
+            self.version = 0
+            self.fps = 0.0
+            self.dtype = np.dtype(np.uint8)
+            self.shape = (0, 0)
+            self.frame_bytes = 0
+            self.index = np.zeros(0, INDEX_DTYPE)
+            return
+        self._mm = np.memmap(path, np.uint8, mode="r")
+        magic, version, w, h, fps, channels, dtype, frame_bytes = _HEADER.unpack_from(
+            self._mm, 0
+        )
+        if magic != _MAGIC:
+            raise ValueError(f"Not a recording file: {path}")
+        self.version = version
+        self.fps = fps
+        self.dtype = np.dtype(dtype.rstrip(b"\0").decode())
+        self.shape = (h, w) if channels == 1 else (h, w, channels)
+        self.frame_bytes = frame_bytes
+        self.index = self._read_index()
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def _read_index(self) -> np.ndarray:
+        mm = self._mm
+        if len(mm) >= _HEADER.size + _FOOTER.size:
+            magic, count, offset = _FOOTER.unpack_from(mm, len(mm) - _FOOTER.size)
+            if magic == _FOOTER_MAGIC:
+                return np.frombuffer(
+                    mm, INDEX_DTYPE, count=count, offset=offset
+                )
+        return self._scan_chunks()
+
+    def _scan_chunks(self) -> np.ndarray:
+        """푸터가 없을 때 청크 헤더를 따라가며 인덱스를 다시 만든다."""
+        entries = []
+        pos = _HEADER.size
+        mm = self._mm
+        while pos + _CHUNK.size <= len(mm):
+            magic, count, meta_len, data_offset = _CHUNK.unpack_from(mm, pos)
+            end = data_offset + count * self.frame_bytes
+            if magic != _CHUNK_MAGIC or end > len(mm):
+                break
+            meta = json.loads(bytes(mm[pos + _CHUNK.size : pos + _CHUNK.size + meta_len]))
+            for i, (seq, ts) in enumerate(zip(meta["seq"], meta["ts"])):
+                entries.append((data_offset + i * self.frame_bytes, seq, ts))
+            pos = end
+        return np.array(entries, dtype=INDEX_DTYPE)
+
+    def frame(self, i: int) -> np.ndarray:
+        """i번째 프레임을 memmap 뷰로 반환한다 (복사 없음, 읽기 전용)."""
+        offset = int(self.index["offset"][i])
+        return self._mm[offset : offset + self.frame_bytes].view(self.dtype).reshape(
+            self.shape
+        )
+
+    def timestamp(self, i: int) -> float:
+        return float(self.index["ts"][i])
+
+    def seq(self, i: int) -> int:
+        return int(self.index["seq"][i])
+
+    def params(self, i: int) -> dict:
+        """i번째 프레임 시점의 파라미터 상태를 반환한다."""
+        if self._chunk_params is None:
+            self._chunk_params = self._load_params()
+            self._param_starts = [start for start, _ in self._chunk_params]
+        offset = int(self.index["offset"][i])
+        # 변경점은 파일 순서(오프셋 오름차순)이므로 이분 탐색한다.
+        pos = bisect_right(self._param_starts, offset)
+        return self._chunk_params[pos - 1][1] if pos else {}
+
+    def _load_params(self) -> list[tuple[int, dict]]:
+        """청크 메타에서 (프레임 오프셋, 파라미터) 변경점 목록을 만든다."""
+        changes = []
+        pos = _HEADER.size
+        mm = self._mm
+        limit = int(self.index["offset"][-1]) if len(self.index) else 0
+        while pos <= limit and pos + _CHUNK.size <= len(mm):
+            magic, count, meta_len, data_offset = _CHUNK.unpack_from(mm, pos)
+            if magic != _CHUNK_MAGIC:
+                break
+            meta = json.loads(bytes(mm[pos + _CHUNK.size : pos + _CHUNK.size + meta_len]))
+            for i, params in meta["params"]:
+                changes.append((data_offset + i * self.frame_bytes, params))
+            pos = data_offset + count * self.frame_bytes
+        return changes
+
+
+class RecordingSource:
+    """녹화 파일을 ``cv2.VideoCapture`` 처럼 재생하는 소스.
+
+    ``read()`` 는 디코딩 없이 memmap 뷰를 그대로 돌려준다. 뷰는 읽기 전용이며,
+    ``image`` 를 넘기면 그 버퍼로 복사한다(프레임 풀 모드 호환).
+    ``realtime=True`` 면 기록된 타임스탬프 간격대로 재생한다.
+    """
+
+    def __init__(self, path: str, realtime: bool = False, loop: bool = False) -> None:
+        """녹화 파일 경로와 재생 방식을 받아 초기화."""
+        self.recording = Recording(path)
+        self.realtime = realtime
+        self.loop = loop
+        self.position = 0
+        self.timestamp = 0.0
+        self._current = -1
+        self._opened = True
+        self._clock: tuple[float, float] | None = None
+
+    def isOpened(self) -> bool:
+        return self._opened
+
+    def release(self) -> None:
+        self._opened = False
+
+    def grab(self) -> bool:
+        rec = self.recording
+        if not self._opened or len(rec) == 0:
+            return False
+        if self.position >= len(rec):
+            if not self.loop:
+                return False
+            self.position = 0
+            self._clock = None
+        ts = rec.timestamp(self.position)
+        if self.realtime:
+            now = time.monotonic()
+            if self._clock is None:
+                self._clock = (now, ts)
+            due = self._clock[0] + (ts - self._clock[1])
+            if due > now:
+                time.sleep(due - now)
+        self._current = self.position
+        self.timestamp = ts
+        self.position += 1
+        return True
+
+    def retrieve(self, image: np.ndarray | None = None, flag: int = 0):
+        if self._current < 0:
+            return False, None
+        frame = self.recording.frame(self._current)
+        if image is not None and image.shape == frame.shape and image.dtype == frame.dtype:
+            np.copyto(image, frame)
+            return True, image
+        return True, frame
+
+    def read(self, image: np.ndarray | None = None):
+        if not self.grab():
+            return False, None
+        return self.retrieve(image)
+
+    def get(self, prop: int) -> float:
+        rec = self.recording
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return float(len(rec))
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return float(self.position)
+        if prop == cv2.CAP_PROP_FPS:
+            return float(rec.fps)
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(rec.shape[1])
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(rec.shape[0])
+        if prop == cv2.CAP_PROP_POS_MSEC:
+            return self.timestamp * 1000.0
+        return 0.0
+
+    def set(self, prop: int, value) -> bool:
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            self.position = max(0, min(int(value), len(self.recording)))
+            self._clock = None
+            return True
+        return False
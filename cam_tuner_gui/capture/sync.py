@@ -0,0 +1,263 @@
+"""여러 카메라의 프레임을 타임스탬프 기준으로 맞춰 캡처하는 모듈."""
+
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+from typing import Iterator, Sequence
+
+import cv2
+
+from .device import CameraDevice, FrameRing
+
+
+class SyncedFrames:
+    """한 번에 맞춰 캡처된 N개 카메라의 프레임 묶음.
+
+    ``skew`` 는 묶음 안에서 가장 이른/늦은 타임스탬프 차이(초)이다.
+    ``previews`` 는 화면 표시용 축소 프레임이다 (만들지 않았으면 ``frames``).
+    """
+
+    __slots__ = ("seq", "frames", "timestamps", "skew", "previews")
+
+    def __init__(
+        self,
+        seq: int,
+        frames: list,
+        timestamps: list[float],
+        previews: list | None = None,
+    ) -> None:
+        self.seq = seq
+        self.frames = frames
+        self.timestamps = timestamps
+        self.previews = frames if previews is None else previews
+        self.skew = max(timestamps) - min(timestamps) if timestamps else 0.0
+
+    def __repr__(self) -> str:
+        return f"SyncedFrames(seq={self.seq}, skew={self.skew * 1e3:.2f} ms)"
+
+
+class CaptureGroup:
+    """여러 캡처 장치를 묶어 grab/retrieve 를 분리해 동시에 캡처한다.
+
+    ``read()`` 는 모든 장치에서 ``grab()`` 을 먼저 연달아 호출해 노출
+    시점을 최대한 모은 뒤 ``retrieve()`` 로 디코딩한다. ``parallel=True`` 면
+    장치별 grab 을 스레드에서 동시에 돌려 전체 지연이 장치들의 합이 아니라
+    최댓값이 되게 한다.
+
+    grab 시각 차이가 ``tolerance`` 를 넘으면 늦게 잡힌 장치를 기준으로
+    앞선 장치를 최대 ``max_regrab`` 번 다시 grab 해 맞춘다. 시각은 장치가
+    ``capture_time`` (예: :class:`~cam_tuner_gui.capture.v4l2.V4L2Device` 의
+    커널 타임스탬프)을 주면 그 값을, 아니면 grab 이 끝난 호스트 시각을 쓴다.
+    둘 다 CLOCK_MONOTONIC 기준이라 섞어 써도 비교할 수 있다.
+
+    grab 은 캡처 객체를 직접 부르므로 자체 캡처 스레드가 도는
+    ``CameraDevice(threaded=True)`` 는 받지 않는다. GUI 처럼 블로킹 없이
+    읽으려면 :meth:`start` 로 묶음 캡처 스레드를 띄우고
+    :meth:`latest`/:meth:`iter_frames` 로 꺼낸다.
+
+    ``preview_size`` 를 주면 묶음마다 그 크기 안에 들어가는 (가로세로 비를
+    지킨) 표시용 프레임도 만든다. 장치가 ``preview`` 를 주면
+    (:class:`~cam_tuner_gui.capture.pipeline.TeePipeline`) 그것을 쓰고, 아니면
+    캡처 스레드에서 줄인다. GUI 스레드는 원본을 축소하지 않는다.
+    """
+
+    def __init__(
+        self,
+        captures: Sequence,
+        tolerance: float = 0.005,
+        parallel: bool = False,
+        max_regrab: int = 2,
+        history: int = 120,
+        preview_size: tuple[int, int] | None = None,
+    ) -> None:
+        """캡처 객체(또는 ``CameraDevice``) 목록과 동기 허용 오차(초)를 받아 초기화."""
+        if not captures:
+            raise ValueError("captures must not be empty")
+        for source in captures:
+            if isinstance(source, CameraDevice) and source.threaded:
+                # 캡처 스레드와 같은 cap 에서 grab 이 경쟁한다.
+                raise ValueError("threaded CameraDevice cannot join a CaptureGroup")
+        self._sources = list(captures)
+        self.tolerance = tolerance
+        self.parallel = parallel
+        self.max_regrab = max_regrab
+        self.preview_size = preview_size
+        self._seq = 0
+        self._skews: deque[float] = deque(maxlen=history)
+        self._executor: ThreadPoolExecutor | None = None
+        self._ring: FrameRing | None = None
+        self._thread: threading.Thread | None = None
+        self._stop_event = threading.Event()
+        self.error: Exception | None = None
+        if parallel:
+            self._executor = ThreadPoolExecutor(
+                max_workers=len(self._sources), thread_name_prefix="grab"
+            )
+
+    def __len__(self) -> int:
+        return len(self._sources)
+
+    def _cap(self, index: int):
+        source = self._sources[index]
+        # CameraDevice 는 cap 속성을, 캡처 객체는 자기 자신을 쓴다.
+        cap = getattr(source, "cap", source)
+        if cap is None:
+            raise RuntimeError("Stream not started")
+        return cap
+
+    def _grab_one(self, index: int) -> float:
+        cap = self._cap(index)
+        if not cap.grab():
+            raise RuntimeError(f"Failed to grab frame from device {index}")
+        stamp = getattr(cap, "capture_time", None)
+        return time.monotonic() if stamp is None else stamp
+
+    def grab_all(self, indices: Sequence[int] | None = None) -> list[float]:
+        """지정한 장치들에서 grab 하고 각 grab 완료 시각을 반환한다."""
+        if indices is None:
+            indices = range(len(self._sources))
+        if self._executor is not None and len(indices) > 1:
+            return list(self._executor.map(self._grab_one, indices))
+        return [self._grab_one(i) for i in indices]
+
+    def retrieve_all(self) -> list:
+        """마지막 grab 한 프레임을 모든 장치에서 디코딩해 반환한다."""
+        frames = []
+        for index in range(len(self._sources)):
+            ret, frame = self._cap(index).retrieve()
+            if not ret:
+                raise RuntimeError(f"Failed to retrieve frame from device {index}")
+            frames.append(frame)
+        return frames
+
+    def read(self) -> SyncedFrames:
+        """동기화된 프레임 묶음을 하나 캡처한다."""
+        timestamps = self.grab_all()
+        for _ in range(self.max_regrab):
+            newest = max(timestamps)
+            lagging = [
+                i for i, ts in enumerate(timestamps) if newest - ts > self.tolerance
+            ]
+            if not lagging:
+                break
+            for i, ts in zip(lagging, self.grab_all(lagging)):
+                timestamps[i] = ts
+        frames = self.retrieve_all()
+        previews = None
+        if self.preview_size is not None:
+            previews = [self._preview(i, frame) for i, frame in enumerate(frames)]
+        self._seq += 1
+        synced = SyncedFrames(self._seq, frames, timestamps, previews)
+        self._skews.append(synced.skew)
+        return synced
+
+    def _preview(self, index: int, frame):
+        preview = getattr(self._cap(index), "preview", None)
+        if preview is not None:
+            return preview
+        pw, ph = self.preview_size
+        h, w = frame.shape[:2]
+        scale = min(pw / w, ph / h)
+        if scale >= 1.0:
+            return frame
+        size = (max(1, round(w * scale)), max(1, round(h * scale)))
+        return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+    def skew_stats(self) -> dict[str, float]:
+        """최근 묶음들의 skew 통계(초)를 반환한다."""
+        if not self._skews:
+            return {"mean": 0.0, "max": 0.0, "within_tolerance": 1.0}
+        skews = list(self._skews)
+        within = sum(s <= self.tolerance for s in skews) / len(skews)
+        return {
+            "mean": sum(skews) / len(skews),
+            "max": max(skews),
+            "within_tolerance": within,
+        }
+
+    # 백그라운드 캡처 -------------------------------------------------------------
+
+    def start(self, ring_size: int = 4) -> None:
+        """스레드에서 :meth:`read` 를 반복해 묶음을 링 버퍼(drop-oldest)에 채운다."""
+        if self._thread is not None:
+            return
+        self._ring = FrameRing(ring_size)
+        self.error = None
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._capture_loop, name="capture-group", daemon=True
+        )
+        self._thread.start()
+
+    def _capture_loop(self) -> None:
+        ring = self._ring
+        try:
+            while not self._stop_event.is_set():
+                ring.put(self.read())
+        except Exception as exc:  # noqa: BLE001 - 소비자가 error 로 확인한다
+            self.error = exc
+        finally:
+            ring.close()
+
+    @property
+    def running(self) -> bool:
+        """캡처 스레드가 돌고 있는지 여부."""
+        return self._ring is not None and not self._ring.closed
+
+    def stop(self) -> None:
+        """캡처 스레드를 멈춘다. 캡처 장치는 닫지 않는다."""
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join(timeout=2.0)
+        self._thread = None
+        self._ring.clear()
+
+    def latest(self) -> SyncedFrames | None:
+        """가장 최근 묶음. 캡처 스레드가 없거나 아직 없으면 ``None``."""
+        return self._ring.latest() if self._ring is not None else None
+
+    def iter_frames(self) -> Iterator[SyncedFrames]:
+        """링 버퍼에 쌓인 묶음을 오래된 순서로 기다리지 않고 꺼낸다."""
+        ring = self._ring
+        if ring is None:
+            return
+        while True:
+            synced = ring.get(timeout=0)
+            if synced is None:
+                return
+            yield synced
+
+    def close(self) -> None:
+        """캡처 스레드와 grab 스레드 풀을 정리한다. 캡처 장치는 닫지 않는다."""
+        self.stop()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+def pair_by_timestamp(
+    streams: Sequence[Sequence], tolerance: float
+) -> list[tuple[list, float]]:
+    """스트림별로 타임스탬프 순 정렬된 프레임 목록을 묶음으로 짝짓는다.
+
+    각 항목은 ``timestamp`` 속성을 가져야 한다
+    (:class:`~cam_tuner_gui.capture.pool.Frame` 등). 모든 스트림의 프레임이
+    ``tolerance`` 안에 들어오는 묶음만 ``(frames, skew)`` 로 반환한다.
+    """
+    positions = [0] * len(streams)
+    pairs: list[tuple[list, float]] = []
+    while all(pos < len(s) for pos, s in zip(positions, streams)):
+        heads = [s[pos] for pos, s in zip(positions, streams)]
+        stamps = [f.timestamp for f in heads]
+        skew = max(stamps) - min(stamps)
+        if skew <= tolerance:
+            pairs.append((heads, skew))
+            positions = [p + 1 for p in positions]
+        else:
+            # 가장 이른 프레임은 더 이상 짝이 없으므로 건너뛴다.
+            positions[stamps.index(min(stamps))] += 1
+    return pairs
@@ -0,0 +1,362 @@
+"""메모리 안에서 테스트 차트 프레임을 만드는 합성 영상 소스.
+
+카메라가 없을 때의 대체 입력이자, 정답 값을 알고 있는 지표 검증/벤치마크용
+입력이다. 패턴별 템플릿을 한 번만 계산해 두고 프레임마다 노이즈·게인만
+벡터 연산으로 더한다.
+
+노출/게인/감마 컨트롤(``set``)은 간단한 센서 모델로 프레임에 반영해
+파라미터 스윕과 지연 측정을 카메라 없이 검증할 수 있게 한다. 기준 값
+(노출 100, 게인 0, 감마 100)에서는 모델이 꺼진 것과 같은 프레임이 나온다.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+
+import cv2
+import numpy as np
+
+
+PATTERNS = ("slanted_edge", "flat", "flicker", "moving_edge")
+
+_LOW = 0.2 * 255
+_HIGH = 0.8 * 255
+_NOISE_ROWS = 16
+
+# 센서 모델 기준 값. 노출 100·게인 0·감마 100 이 원래 패턴 그대로다.
+_REF_EXPOSURE = 100.0
+_REF_GAMMA = 100.0
+# 게인 64 마다 신호와 노이즈가 1 배씩 커진다.
+_GAIN_UNIT = 64.0
+_SENSOR_PROPS = {
+    cv2.CAP_PROP_EXPOSURE: _REF_EXPOSURE,
+    cv2.CAP_PROP_GAIN: 0.0,
+    cv2.CAP_PROP_GAMMA: _REF_GAMMA,
+}
+
+
+def _erf(x: np.ndarray) -> np.ndarray:
+    """벡터화한 erf 근사 (Abramowitz-Stegun 7.1.26, 오차 < 1.5e-7)."""
+    sign = np.sign(x)
+    x = np.abs(x)
+    t = 1.0 / (1.0 + 0.3275911 * x)
+    poly = t * (
+        0.254829592
+        + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429)))
+    )
+    return sign * (1.0 - poly * np.exp(-x * x))
+
+
+class SyntheticSource:
+    """``cv2.VideoCapture`` 와 같은 인터페이스로 합성 프레임을 내보낸다.
+
+    패턴
+    ----
+    ``slanted_edge``
+        ``edge_angle`` 도 기울어진 에지를 σ=``edge_sigma`` 가우시안으로 흐린
+        차트. MTF(f) = exp(-2π²σ²f²) 이므로 MTF50 정답은 :attr:`true_mtf50`.
+    ``flat``
+        균일 회색에 σ=``noise_sigma`` 가우시안 노이즈.
+    ``flicker``
+        균일 회색의 밝기를 ``flicker_hz`` 로 ``flicker_depth`` 만큼 변조한다.
+        ``line_time`` > 0 이면 행마다 노출 시점이 달라 롤링 셔터 밴딩이 생긴다.
+    ``moving_edge``
+        수직 에지가 ``speed`` px/frame 으로 좌우 왕복하며 ``blur_px`` 길이의
+        박스 블러를 가진다. 10–90% 폭 정답은 :attr:`true_blur_width`.
+
+    ``realtime=False`` 면 지연 없이 최대 속도로 프레임을 만들고,
+    타임스탬프는 ``index / fps`` 로 계산한다.
+
+    센서 모델
+    ---------
+    ``set`` 으로 쓴 노출/게인/감마는 ``control_latency`` 프레임 뒤부터
+    반영되고, ``settle_tau`` > 0 이면 그 뒤 시간 상수 ``settle_tau``
+    프레임으로 지수 수렴한다. 밝기는 ``노출/100 × (1 + 게인/64)`` 배,
+    노이즈 σ 는 ``1 + 게인/64`` 배, ``moving_edge`` 블러 길이는
+    ``노출/100`` 배가 되고, 감마는 ``(v/255)^(100/감마)`` 톤 커브다.
+    """
+
+    def __init__(
+        self,
+        pattern: str = "slanted_edge",
+        width: int = 640,
+        height: int = 480,
+        fps: float = 30.0,
+        noise_sigma: float = 2.0,
+        edge_angle: float = 5.0,
+        edge_sigma: float = 1.0,
+        flicker_hz: float = 100.0,
+        flicker_depth: float = 0.1,
+        line_time: float = 0.0,
+        blur_px: float = 8.0,
+        speed: float = 4.0,
+        realtime: bool = False,
+        seed: int = 0,
+        control_latency: int = 2,
+        settle_tau: float = 0.0,
+    ) -> None:
+        """패턴 종류와 해상도, FPS, 패턴별 정답 파라미터, 컨트롤 지연/수렴 시간(프레임)을 받아 초기화."""
+        if pattern not in PATTERNS:
+            raise ValueError(f"Unknown pattern: {pattern}")
+        self.pattern = pattern
+        self.width = int(width)
+        self.height = int(height)
+        self.fps = float(fps)
+        self.noise_sigma = noise_sigma
+        self.edge_angle = edge_angle
+        self.edge_sigma = edge_sigma
+        self.flicker_hz = flicker_hz
+        self.flicker_depth = flicker_depth
+        self.line_time = line_time
+        self.blur_px = blur_px
+        self.speed = speed
+        self.realtime = realtime
+        self.seed = seed
+        self.control_latency = max(int(control_latency), 0)
+        self.settle_tau = settle_tau
+        self.index = 0
+        self.timestamp = 0.0
+        self._current = -1
+        self._props: dict[int, float] = dict(_SENSOR_PROPS)
+        # 반영 대기 중인 컨트롤 (반영 프레임, 속성, 값), 반영된 목표값, 현재 실효값.
+        self._pending: list[tuple[int, int, float]] = []
+        self._target = dict(_SENSOR_PROPS)
+        self._sensor = dict(_SENSOR_PROPS)
+        self._noise_scale = 1.0
+        self._template_blur = blur_px
+        self._lut: np.ndarray | None = None
+        self._lut_gamma = _REF_GAMMA
+        self._opened = True
+        self._start: float | None = None
+        self._gray: np.ndarray | None = None
+        self._build()
+
+    # 정답 값 -----------------------------------------------------------------
+
+    @property
+    def true_mtf50(self) -> float:
+        """``slanted_edge`` 의 이론 MTF50 (cycles/pixel)."""
+        return math.sqrt(math.log(2) / 2) / (math.pi * self.edge_sigma)
+
+    @property
+    def true_blur_width(self) -> float:
+        """``moving_edge`` 의 이론 10–90% 전이 폭 (px)."""
+        return 0.8 * self._blur_length
+
+    @property
+    def true_snr(self) -> float:
+        """``flat`` 의 이론 SNR (dB). 감마 1 이고 포화하지 않을 때 정확하다."""
+        if self.noise_sigma == 0:
+            return float("inf")
+        signal = min(self._mid * self._signal_gain, 255.0)
+        return 20 * math.log10(signal / (self.noise_sigma * self._noise_gain))
+
+    # 센서 모델 ---------------------------------------------------------------
+
+    @property
+    def _noise_gain(self) -> float:
+        return 1.0 + self._sensor[cv2.CAP_PROP_GAIN] / _GAIN_UNIT
+
+    @property
+    def _signal_gain(self) -> float:
+        return self._sensor[cv2.CAP_PROP_EXPOSURE] / _REF_EXPOSURE * self._noise_gain
+
+    @property
+    def _blur_length(self) -> float:
+        return self.blur_px * self._sensor[cv2.CAP_PROP_EXPOSURE] / _REF_EXPOSURE
+
+    @property
+    def settled(self) -> bool:
+        """쓴 컨트롤이 모두 반영되고 수렴했는지."""
+        return not self._pending and all(
+            abs(self._sensor[p] - self._target[p]) < 1e-6 for p in _SENSOR_PROPS
+        )
+
+    def _advance_sensor(self) -> None:
+        """``_current`` 프레임 시점까지 밀린 컨트롤을 반영하고 실효값을 수렴시킨다."""
+        if self._pending:
+            due = [c for c in self._pending if c[0] <= self._current]
+            for _, prop, value in due:
+                self._target[prop] = value
+            self._pending = [c for c in self._pending if c[0] > self._current]
+        alpha = 1.0 - math.exp(-1.0 / self.settle_tau) if self.settle_tau > 0 else 1.0
+        for prop, target in self._target.items():
+            value = self._sensor[prop]
+            if value != target:
+                value += (target - value) * alpha
+                # 거의 다 왔으면 목표값에 붙여 무한히 다가가지 않게 한다.
+                if abs(target - value) < 1e-3 * max(abs(target), 1.0):
+                    value = target
+                self._sensor[prop] = value
+        if self.pattern == "moving_edge" and self._blur_length != self._template_blur:
+            self._template = self._make_template()
+        if self._noise_gain != self._noise_scale:
+            self._make_noise(self._noise_gain)
+
+    # 템플릿 ------------------------------------------------------------------
+
+    @property
+    def _mid(self) -> float:
+        return (_LOW + _HIGH) / 2
+
+    def _build(self) -> None:
+        """패턴 템플릿과 노이즈 뱅크를 미리 계산한다."""
+        h, w = self.height, self.width
+        self._template = self._make_template()
+        rng = np.random.default_rng(self.seed)
+        self._noise_unit = rng.standard_normal((h + _NOISE_ROWS, w), np.float32)
+        self._make_noise(self._noise_gain)
+        if self.pattern == "flicker" and self.line_time > 0:
+            self._template_f = self._template.astype(np.float32)
+            self._row_offsets = np.arange(h, dtype=np.float32)[:, None] * self.line_time
+        self._gray = np.empty((h, w), np.uint8)
+
+    def _make_template(self) -> np.ndarray:
+        h, w = self.height, self.width
+        if self.pattern == "slanted_edge":
+            theta = math.radians(self.edge_angle)
+            y, x = np.mgrid[0:h, 0:w].astype(np.float32)
+            dist = (x - w / 2) * math.cos(theta) - (y - h / 2) * math.sin(theta)
+            sigma = max(self.edge_sigma, 1e-3)
+            esf = 0.5 * (1.0 + _erf(dist / (sigma * math.sqrt(2))))
+            template = _LOW + (_HIGH - _LOW) * esf
+        elif self.pattern == "moving_edge":
+            # 에지가 왕복할 여유만큼 넓은 템플릿을 만들고 프레임마다 잘라 쓴다.
+            self._travel = max(w // 2, 1)
+            x = np.arange(w + self._travel, dtype=np.float32)
+            center = (w + self._travel) / 2
+            self._template_blur = self._blur_length
+            ramp = np.clip((x - center) / max(self._template_blur, 1e-3) + 0.5, 0.0, 1.0)
+            row = _LOW + (_HIGH - _LOW) * ramp
+            template = np.repeat(row[None, :], h, axis=0)
+        else:
+            template = np.full((h, w), self._mid, np.float32)
+        return np.round(template).astype(np.uint8)
+
+    def _make_noise(self, scale: float) -> None:
+        # 부호 있는 노이즈를 양/음 두 장의 uint8 로 나눠 두면 프레임마다
+        # 포화 덧셈/뺄셈 두 번으로 끝난다. 행 오프셋을 바꿔 가며 잘라 써서
+        # 프레임마다 다른 노이즈가 나오게 한다.
+        noise = np.round(self._noise_unit * (self.noise_sigma * scale))
+        np.clip(noise, -255, 255, out=noise)
+        self._noise_pos = np.maximum(noise, 0).astype(np.uint8)
+        self._noise_neg = np.maximum(-noise, 0).astype(np.uint8)
+        self._noise_scale = scale
+
+    def _tone_curve(self) -> np.ndarray | None:
+        gamma = self._sensor[cv2.CAP_PROP_GAMMA]
+        if gamma == _REF_GAMMA:
+            return None
+        if self._lut is None or gamma != self._lut_gamma:
+            levels = np.arange(256, dtype=np.float32) / 255.0
+            exponent = _REF_GAMMA / max(gamma, 1.0)
+            self._lut = np.round(255.0 * levels**exponent).astype(np.uint8)
+            self._lut_gamma = gamma
+        return self._lut
+
+    def _render(self, dst: np.ndarray | None) -> np.ndarray:
+        """마지막으로 grab 한 프레임을 ``dst`` 에 그려 반환한다."""
+        h, w = self.height, self.width
+        index = self._current
+        offset = index % _NOISE_ROWS
+        gray = self._gray
+        if self.pattern == "moving_edge":
+            period = 2 * self._travel
+            pos = (index * self.speed) % period
+            shift = int(pos if pos <= self._travel else period - pos)
+            np.copyto(gray, self._template[:, shift : shift + w])
+        elif self.pattern == "flicker":
+            t = index / self.fps
+            phase = 2 * math.pi * self.flicker_hz
+            if self.line_time > 0:
+                rows = 1.0 + self.flicker_depth * np.sin(phase * (t + self._row_offsets))
+                cv2.convertScaleAbs(self._template_f * rows, dst=gray)
+            else:
+                gain = 1.0 + self.flicker_depth * math.sin(phase * t)
+                cv2.convertScaleAbs(self._template, dst=gray, alpha=gain)
+        else:
+            np.copyto(gray, self._template)
+        signal = self._signal_gain
+        if signal != 1.0:
+            cv2.convertScaleAbs(gray, dst=gray, alpha=signal)
+        cv2.add(gray, self._noise_pos[offset : offset + h], dst=gray)
+        cv2.subtract(gray, self._noise_neg[offset : offset + h], dst=gray)
+        lut = self._tone_curve()
+        if lut is not None:
+            cv2.LUT(gray, lut, dst=gray)
+        return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR, dst=dst)
+
+    # VideoCapture 호환 ---------------------------------------------------------
+
+    def isOpened(self) -> bool:
+        return self._opened
+
+    def open(self, *args, **kwargs) -> bool:
+        self._opened = True
+        return True
+
+    def release(self) -> None:
+        self._opened = False
+
+    def grab(self) -> bool:
+        """다음 프레임 시점으로 진행한다. ``realtime`` 이면 FPS 에 맞춰 기다린다."""
+        if not self._opened:
+            return False
+        if self.realtime:
+            now = time.monotonic()
+            if self._start is None:
+                self._start = now
+            due = self._start + self.index / self.fps
+            if due > now:
+                time.sleep(due - now)
+        self._current = self.index
+        self.timestamp = self.index / self.fps
+        self.index += 1
+        self._advance_sensor()
+        return True
+
+    def retrieve(self, image: np.ndarray | None = None, flag: int = 0):
+        if not self._opened or self._current < 0:
+            return False, None
+        return True, self._render(self._fit(image))
+
+    def read(self, image: np.ndarray | None = None):
+        if not self.grab():
+            return False, None
+        return self.retrieve(image)
+
+    def _fit(self, image: np.ndarray | None) -> np.ndarray | None:
+        if image is not None and image.shape == (self.height, self.width, 3):
+            return image
+        return None
+
+    def get(self, prop: int) -> float:
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.width)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.height)
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return float(self.index)
+        if prop == cv2.CAP_PROP_POS_MSEC:
+            return self.timestamp * 1000.0
+        return self._props.get(prop, 0.0)
+
+    def set(self, prop: int, value) -> bool:
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            self.width = int(value)
+            self._build()
+        elif prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            self.height = int(value)
+            self._build()
+        elif prop == cv2.CAP_PROP_FPS:
+            self.fps = float(value)
+            self._start = None
+        else:
+            self._props[prop] = float(value)
+            if prop in _SENSOR_PROPS:
+                # 다음에 grab 할 프레임부터 control_latency 프레임 뒤에 반영된다.
+                self._pending.append((self.index + self.control_latency, prop, float(value)))
+        return True
@@ -0,0 +1,672 @@
+"""ctypes ioctl 기반 V4L2 mmap 스트리밍 백엔드.
+
+``cv2.VideoCapture`` 를 거치지 않고 드라이버 버퍼 큐(REQBUFS/QBUF/DQBUF)를
+직접 다룬다. 프레임은 mmap 버퍼 위의 ``memoryview`` 로 복사 없이 넘겨주며,
+커널이 기록한 타임스탬프와 시퀀스 번호를 함께 제공한다.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import fcntl
+import mmap
+import os
+import select
+from typing import Callable
+
+import cv2
+import numpy as np
+
+
+# --- ioctl 번호 -------------------------------------------------------------
+
+_IOC_NRBITS = 8
+_IOC_TYPEBITS = 8
+_IOC_SIZEBITS = 14
+_IOC_NRSHIFT = 0
+_IOC_TYPESHIFT = _IOC_NRSHIFT + _IOC_NRBITS
+_IOC_SIZESHIFT = _IOC_TYPESHIFT + _IOC_TYPEBITS
+_IOC_DIRSHIFT = _IOC_SIZESHIFT + _IOC_SIZEBITS
+_IOC_WRITE = 1
+_IOC_READ = 2
+
+
+def _IOC(direction: int, nr: int, size: int) -> int:
+    return (
+        (direction << _IOC_DIRSHIFT)
+        | (ord("V") << _IOC_TYPESHIFT)
+        | (nr << _IOC_NRSHIFT)
+        | (size << _IOC_SIZESHIFT)
+    )
+
+
+def _IOR(nr: int, struct) -> int:
+    return _IOC(_IOC_READ, nr, ctypes.sizeof(struct))
+
+
+def _IOW(nr: int, struct) -> int:
+    return _IOC(_IOC_WRITE, nr, ctypes.sizeof(struct))
+
+
+def _IOWR(nr: int, struct) -> int:
+    return _IOC(_IOC_READ | _IOC_WRITE, nr, ctypes.sizeof(struct))
+
+
+def fourcc(code: str) -> int:
+    """4문자 픽셀 포맷 코드를 V4L2 정수 값으로 변환한다."""
+    a, b, c, d = (ord(ch) for ch in code)
+    return a | (b << 8) | (c << 16) | (d << 24)
+
+
+def fourcc_str(value: int) -> str:
+    """V4L2 픽셀 포맷 정수 값을 4문자 코드로 변환한다."""
+    return "".join(chr((value >> (8 * i)) & 0xFF) for i in range(4))
+
+
+V4L2_CAP_VIDEO_CAPTURE = 0x00000001
+V4L2_CAP_STREAMING = 0x04000000
+V4L2_BUF_TYPE_VIDEO_CAPTURE = 1
+V4L2_MEMORY_MMAP = 1
+V4L2_FIELD_ANY = 0
+V4L2_BUF_FLAG_TIMESTAMP_MASK = 0x0000E000
+V4L2_BUF_FLAG_TIMESTAMP_MONOTONIC = 0x00002000
+
+V4L2_CTRL_FLAG_DISABLED = 0x0001
+V4L2_CTRL_FLAG_READ_ONLY = 0x0004
+V4L2_CTRL_FLAG_INACTIVE = 0x0010
+V4L2_CTRL_FLAG_NEXT_CTRL = 0x80000000
+V4L2_CTRL_TYPE_INTEGER = 1
+V4L2_CTRL_TYPE_BOOLEAN = 2
+V4L2_CTRL_TYPE_MENU = 3
+V4L2_CTRL_TYPE_BUTTON = 4
+V4L2_CTRL_TYPE_CTRL_CLASS = 6
+V4L2_CTRL_TYPE_INTEGER_MENU = 9
+
+V4L2_CID_BASE = 0x00980900
+V4L2_CID_LASTP1 = V4L2_CID_BASE + 44
+V4L2_CID_CONTRAST = V4L2_CID_BASE + 1
+V4L2_CID_GAMMA = V4L2_CID_BASE + 16
+V4L2_CID_GAIN = V4L2_CID_BASE + 19
+V4L2_CID_CAMERA_CLASS_BASE = 0x009A0900
+V4L2_CID_CAMERA_LASTP1 = V4L2_CID_CAMERA_CLASS_BASE + 40
+V4L2_CID_EXPOSURE_AUTO = V4L2_CID_CAMERA_CLASS_BASE + 1
+V4L2_CID_EXPOSURE_ABSOLUTE = V4L2_CID_CAMERA_CLASS_BASE + 2
+
+# OpenCV 속성 → V4L2 컨트롤. OpenCV V4L 백엔드처럼 값은 단위 변환 없이 넘긴다.
+PROP_CIDS = {
+    cv2.CAP_PROP_EXPOSURE: V4L2_CID_EXPOSURE_ABSOLUTE,
+    cv2.CAP_PROP_AUTO_EXPOSURE: V4L2_CID_EXPOSURE_AUTO,
+    cv2.CAP_PROP_GAIN: V4L2_CID_GAIN,
+    cv2.CAP_PROP_GAMMA: V4L2_CID_GAMMA,
+    cv2.CAP_PROP_CONTRAST: V4L2_CID_CONTRAST,
+}
+
+
+# --- 구조체 -----------------------------------------------------------------
+
+
+class v4l2_capability(ctypes.Structure):
+    _fields_ = [
+        ("driver", ctypes.c_char * 16),
+        ("card", ctypes.c_char * 32),
+        ("bus_info", ctypes.c_char * 32),
+        ("version", ctypes.c_uint32),
+        ("capabilities", ctypes.c_uint32),
+        ("device_caps", ctypes.c_uint32),
+        ("reserved", ctypes.c_uint32 * 3),
+    ]
+
+
+class v4l2_pix_format(ctypes.Structure):
+    _fields_ = [
+        ("width", ctypes.c_uint32),
+        ("height", ctypes.c_uint32),
+        ("pixelformat", ctypes.c_uint32),
+        ("field", ctypes.c_uint32),
+        ("bytesperline", ctypes.c_uint32),
+        ("sizeimage", ctypes.c_uint32),
+        ("colorspace", ctypes.c_uint32),
+        ("priv", ctypes.c_uint32),
+        ("flags", ctypes.c_uint32),
+        ("ycbcr_enc", ctypes.c_uint32),
+        ("quantization", ctypes.c_uint32),
+        ("xfer_func", ctypes.c_uint32),
+    ]
+
+
+class _v4l2_format_fmt(ctypes.Union):
+    _fields_ = [
+        ("pix", v4l2_pix_format),
+        ("raw_data", ctypes.c_uint8 * 200),
+        # 커널 union 에는 포인터를 가진 멤버가 있어 8바이트 정렬된다.
+        ("_align", ctypes.c_void_p),
+    ]
+
+
+class v4l2_format(ctypes.Structure):
+    _fields_ = [
+        ("type", ctypes.c_uint32),
+        ("fmt", _v4l2_format_fmt),
+    ]
+
+
+class v4l2_requestbuffers(ctypes.Structure):
+    _fields_ = [
+        ("count", ctypes.c_uint32),
+        ("type", ctypes.c_uint32),
+        ("memory", ctypes.c_uint32),
+        ("capabilities", ctypes.c_uint32),
+        ("flags", ctypes.c_uint8),
+        ("reserved", ctypes.c_uint8 * 3),
+    ]
+
+
+class timeval(ctypes.Structure):
+    _fields_ = [
+        ("tv_sec", ctypes.c_long),
+        ("tv_usec", ctypes.c_long),
+    ]
+
+
+class v4l2_timecode(ctypes.Structure):
+    _fields_ = [
+        ("type", ctypes.c_uint32),
+        ("flags", ctypes.c_uint32),
+        ("frames", ctypes.c_uint8),
+        ("seconds", ctypes.c_uint8),
+        ("minutes", ctypes.c_uint8),
+        ("hours", ctypes.c_uint8),
+        ("userbits", ctypes.c_uint8 * 4),
+    ]
+
+
+class _v4l2_buffer_m(ctypes.Union):
+    _fields_ = [
+        ("offset", ctypes.c_uint32),
+        ("userptr", ctypes.c_ulong),
+        ("planes", ctypes.c_void_p),
+        ("fd", ctypes.c_int32),
+    ]
+
+
+class v4l2_buffer(ctypes.Structure):
+    _fields_ = [
+        ("index", ctypes.c_uint32),
+        ("type", ctypes.c_uint32),
+        ("bytesused", ctypes.c_uint32),
+        ("flags", ctypes.c_uint32),
+        ("field", ctypes.c_uint32),
+        ("timestamp", timeval),
+        ("timecode", v4l2_timecode),
+        ("sequence", ctypes.c_uint32),
+        ("memory", ctypes.c_uint32),
+        ("m", _v4l2_buffer_m),
+        ("length", ctypes.c_uint32),
+        ("reserved2", ctypes.c_uint32),
+        ("request_fd", ctypes.c_int32),
+    ]
+
+
+class v4l2_control(ctypes.Structure):
+    _fields_ = [
+        ("id", ctypes.c_uint32),
+        ("value", ctypes.c_int32),
+    ]
+
+
+class v4l2_queryctrl(ctypes.Structure):
+    _fields_ = [
+        ("id", ctypes.c_uint32),
+        ("type", ctypes.c_uint32),
+        ("name", ctypes.c_char * 32),
+        ("minimum", ctypes.c_int32),
+        ("maximum", ctypes.c_int32),
+        ("step", ctypes.c_int32),
+        ("default_value", ctypes.c_int32),
+        ("flags", ctypes.c_uint32),
+        ("reserved", ctypes.c_uint32 * 2),
+    ]
+
+
+class _v4l2_querymenu_item(ctypes.Union):
+    _pack_ = 1
+    _fields_ = [
+        ("name", ctypes.c_char * 32),
+        ("value", ctypes.c_int64),
+    ]
+
+
+class v4l2_querymenu(ctypes.Structure):
+    _pack_ = 1
+    _fields_ = [
+        ("id", ctypes.c_uint32),
+        ("index", ctypes.c_uint32),
+        ("item", _v4l2_querymenu_item),
+        ("reserved", ctypes.c_uint32),
+    ]
+
+
+VIDIOC_QUERYCAP = _IOR(0, v4l2_capability)
+VIDIOC_G_FMT = _IOWR(4, v4l2_format)
+VIDIOC_S_FMT = _IOWR(5, v4l2_format)
+VIDIOC_REQBUFS = _IOWR(8, v4l2_requestbuffers)
+VIDIOC_QUERYBUF = _IOWR(9, v4l2_buffer)
+VIDIOC_QBUF = _IOWR(15, v4l2_buffer)
+VIDIOC_DQBUF = _IOWR(17, v4l2_buffer)
+VIDIOC_STREAMON = _IOW(18, ctypes.c_int)
+VIDIOC_STREAMOFF = _IOW(19, ctypes.c_int)
+VIDIOC_G_CTRL = _IOWR(27, v4l2_control)
+VIDIOC_S_CTRL = _IOWR(28, v4l2_control)
+VIDIOC_QUERYCTRL = _IOWR(36, v4l2_queryctrl)
+VIDIOC_QUERYMENU = _IOWR(37, v4l2_querymenu)
+
+
+def xioctl(ioctl: Callable, fd: int, request: int, arg) -> None:
+    """시그널로 끊긴 ioctl 을 다시 부른다."""
+    while True:
+        try:
+            ioctl(fd, request, arg, True)
+            return
+        except InterruptedError:
+            continue
+
+
+def _menu_items(ioctl: Callable, fd: int, qc: v4l2_queryctrl) -> dict[int, str]:
+    items = {}
+    for index in range(qc.minimum, qc.maximum + 1):
+        qm = v4l2_querymenu()
+        qm.id = qc.id
+        qm.index = index
+        try:
+            xioctl(ioctl, fd, VIDIOC_QUERYMENU, qm)
+        except OSError:
+            # 메뉴 번호는 비어 있을 수 있다.
+            continue
+        if qc.type == V4L2_CTRL_TYPE_INTEGER_MENU:
+            items[index] = str(qm.item.value)
+        else:
+            items[index] = qm.item.name.decode(errors="replace")
+    return items
+
+
+def query_controls(
+    fd: int, ioctl: Callable | None = None
+) -> list[tuple[v4l2_queryctrl, dict[int, str]]]:
+    """장치의 컨트롤과 메뉴 항목을 모두 읽는다 (VIDIOC_QUERYCTRL/QUERYMENU).
+
+    ``V4L2_CTRL_FLAG_NEXT_CTRL`` 로 차례로 훑고, 이를 모르는 오래된
+    드라이버면 사용자/카메라 클래스의 표준 ID 를 하나씩 묻는다. 꺼진
+    컨트롤과 클래스 표지는 뺀다.
+    """
+    ioctl = ioctl or fcntl.ioctl
+    found = []
+
+    def keep(qc: v4l2_queryctrl) -> None:
+        if qc.flags & V4L2_CTRL_FLAG_DISABLED or qc.type == V4L2_CTRL_TYPE_CTRL_CLASS:
+            return
+        menu = {}
+        if qc.type in (V4L2_CTRL_TYPE_MENU, V4L2_CTRL_TYPE_INTEGER_MENU):
+            menu = _menu_items(ioctl, fd, qc)
+        found.append((v4l2_queryctrl.from_buffer_copy(qc), menu))
+
+    qc = v4l2_queryctrl()
+    qc.id = V4L2_CTRL_FLAG_NEXT_CTRL
+    while True:
+        try:
+            xioctl(ioctl, fd, VIDIOC_QUERYCTRL, qc)
+        except OSError:
+            break
+        keep(qc)
+        qc.id |= V4L2_CTRL_FLAG_NEXT_CTRL
+    if found:
+        return found
+    for cid in (
+        *range(V4L2_CID_BASE, V4L2_CID_LASTP1),
+        *range(V4L2_CID_CAMERA_CLASS_BASE + 1, V4L2_CID_CAMERA_LASTP1),
+    ):
+        qc = v4l2_queryctrl()
+        qc.id = cid
+        try:
+            xioctl(ioctl, fd, VIDIOC_QUERYCTRL, qc)
+        except OSError:
+            continue
+        keep(qc)
+    return found
+
+
+# --- 디바이스 ---------------------------------------------------------------
+
+
+class V4L2Frame:
+    """mmap 버퍼 하나를 가리키는 디큐된 프레임.
+
+    ``data`` 는 드라이버 버퍼 위의 ``memoryview`` 이므로 ``release()`` 로
+    다시 큐에 넣기 전까지만 유효하다. ``timestamp`` 는 커널이 기록한
+    시각(초), ``sequence`` 는 드라이버 프레임 번호이다. ``monotonic`` 이면
+    ``timestamp`` 가 CLOCK_MONOTONIC 이라 ``time.monotonic()`` 과 비교할 수 있다.
+    """
+
+    __slots__ = (
+        "index", "sequence", "timestamp", "monotonic", "bytesused", "data", "_device"
+    )
+
+    def __init__(
+        self,
+        device: V4L2Device,
+        index: int,
+        sequence: int,
+        timestamp: float,
+        data: memoryview,
+        monotonic: bool = False,
+    ) -> None:
+        self._device = device
+        self.index = index
+        self.sequence = sequence
+        self.timestamp = timestamp
+        self.monotonic = monotonic
+        self.bytesused = len(data)
+        self.data = data
+
+    def to_ndarray(self) -> np.ndarray:
+        """버퍼를 복사 없이 1차원 uint8 배열로 본다."""
+        return np.frombuffer(self.data, np.uint8)
+
+    def release(self) -> None:
+        """버퍼를 드라이버 큐에 돌려준다."""
+        device = self._device
+        if device is None:
+            return
+        self._device = None
+        try:
+            self.data.release()
+        except BufferError:
+            # 파생된 배열이 남아 있으면 view 를 닫지 못한다. 버퍼는 그대로
+            # 재사용되므로 이후 내용은 보장되지 않는다.
+            pass
+        device.queue(self.index)
+
+    def __enter__(self) -> V4L2Frame:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+class V4L2Device:
+    """V4L2 캡처 디바이스를 mmap 스트리밍 모드로 연다.
+
+    ``ioctl`` 을 주입할 수 있어 실제 장치 대신 파일 기반 가짜 장치로
+    테스트할 수 있다. ``read``/``grab``/``retrieve``/``isOpened``/``release``
+    를 제공하므로 ``CameraDevice.cap`` 자리에 그대로 쓸 수 있다.
+
+    :attr:`capture_time` 은 마지막으로 읽은(grab 한) 프레임의 커널
+    타임스탬프다. 드라이버가 CLOCK_MONOTONIC 으로 찍지 않으면 ``None``.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        width: int | None = None,
+        height: int | None = None,
+        pixelformat: str | None = None,
+        buffer_count: int = 4,
+        ioctl: Callable | None = None,
+    ) -> None:
+        """장치 경로와 스트림 포맷, 드라이버 버퍼 수를 받아 초기화."""
+        if buffer_count < 1:
+            raise ValueError("buffer_count must be >= 1")
+        self.path = path
+        self.width = width
+        self.height = height
+        self.pixelformat = pixelformat
+        self.buffer_count = buffer_count
+        self.bytesperline = 0
+        self.sizeimage = 0
+        self.driver = ""
+        self.card = ""
+        self._ioctl = ioctl or fcntl.ioctl
+        self._fd: int | None = None
+        self._buffers: list[mmap.mmap] = []
+        self._streaming = False
+        self._grabbed: V4L2Frame | None = None
+        self.capture_time: float | None = None
+
+    # 설정 ------------------------------------------------------------------
+
+    def _xioctl(self, request: int, arg) -> None:
+        xioctl(self._ioctl, self._fd, request, arg)
+
+    def open(self) -> None:
+        """장치를 열고 포맷 설정, 버퍼 요청, mmap, 초기 큐잉까지 수행한다."""
+        if self._fd is not None:
+            return
+        self._fd = os.open(self.path, os.O_RDWR | os.O_NONBLOCK)
+        try:
+            cap = v4l2_capability()
+            self._xioctl(VIDIOC_QUERYCAP, cap)
+            caps = cap.device_caps or cap.capabilities
+            if not caps & V4L2_CAP_VIDEO_CAPTURE or not caps & V4L2_CAP_STREAMING:
+                raise OSError(f"{self.path} does not support streaming capture")
+            self.driver = cap.driver.decode(errors="replace")
+            self.card = cap.card.decode(errors="replace")
+            self._configure_format()
+            self._request_buffers(self.buffer_count)
+            for index in range(len(self._buffers)):
+                self.queue(index)
+        except Exception:
+            self.close()
+            raise
+
+    def _configure_format(self) -> None:
+        fmt = v4l2_format()
+        fmt.type = V4L2_BUF_TYPE_VIDEO_CAPTURE
+        self._xioctl(VIDIOC_G_FMT, fmt)
+        pix = fmt.fmt.pix
+        if self.width or self.height or self.pixelformat:
+            if self.width:
+                pix.width = self.width
+            if self.height:
+                pix.height = self.height
+            if self.pixelformat:
+                pix.pixelformat = fourcc(self.pixelformat)
+            pix.field = V4L2_FIELD_ANY
+            self._xioctl(VIDIOC_S_FMT, fmt)
+        # 드라이버가 조정한 실제 값을 반영한다.
+        self.width = pix.width
+        self.height = pix.height
+        self.pixelformat = fourcc_str(pix.pixelformat)
+        self.bytesperline = pix.bytesperline
+        self.sizeimage = pix.sizeimage
+
+    def _request_buffers(self, count: int) -> None:
+        req = v4l2_requestbuffers()
+        req.count = count
+        req.type = V4L2_BUF_TYPE_VIDEO_CAPTURE
+        req.memory = V4L2_MEMORY_MMAP
+        self._xioctl(VIDIOC_REQBUFS, req)
+        if count and req.count < 1:
+            raise OSError(f"{self.path}: driver allocated no buffers")
+        for index in range(req.count):
+            buf = self._new_buffer(index)
+            self._xioctl(VIDIOC_QUERYBUF, buf)
+            self._buffers.append(
+                mmap.mmap(
+                    self._fd,
+                    buf.length,
+                    mmap.MAP_SHARED,
+                    mmap.PROT_READ | mmap.PROT_WRITE,
+                    offset=buf.m.offset,
+                )
+            )
+        if count:
+            # 드라이버가 요청과 다른 개수를 줄 수 있다.
+            self.buffer_count = len(self._buffers)
+
+    @staticmethod
+    def _new_buffer(index: int = 0) -> v4l2_buffer:
+        buf = v4l2_buffer()
+        buf.index = index
+        buf.type = V4L2_BUF_TYPE_VIDEO_CAPTURE
+        buf.memory = V4L2_MEMORY_MMAP
+        return buf
+
+    # 스트리밍 ----------------------------------------------------------------
+
+    def start(self) -> None:
+        """STREAMON 으로 캡처를 시작한다."""
+        if self._fd is None:
+            self.open()
+        if not self._streaming:
+            self._xioctl(VIDIOC_STREAMON, ctypes.c_int(V4L2_BUF_TYPE_VIDEO_CAPTURE))
+            self._streaming = True
+
+    def stop(self) -> None:
+        """STREAMOFF 로 캡처를 멈춘다. 큐에 있던 버퍼는 모두 회수된다."""
+        self._drop_grabbed()
+        if self._streaming:
+            self._xioctl(VIDIOC_STREAMOFF, ctypes.c_int(V4L2_BUF_TYPE_VIDEO_CAPTURE))
+            self._streaming = False
+
+    def queue(self, index: int) -> None:
+        """버퍼를 드라이버 큐에 넣는다(QBUF)."""
+        if self._fd is None:
+            return
+        self._xioctl(VIDIOC_QBUF, self._new_buffer(index))
+
+    def dequeue(self, timeout: float | None = 1.0) -> V4L2Frame | None:
+        """채워진 버퍼 하나를 꺼낸다(DQBUF). 시간 초과면 ``None``."""
+        if self._fd is None:
+            raise RuntimeError("Device not open")
+        if not self._streaming:
+            self.start()
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return None
+        buf = self._new_buffer()
+        try:
+            self._xioctl(VIDIOC_DQBUF, buf)
+        except BlockingIOError:
+            return None
+        timestamp = buf.timestamp.tv_sec + buf.timestamp.tv_usec * 1e-6
+        clock = buf.flags & V4L2_BUF_FLAG_TIMESTAMP_MASK
+        monotonic = clock == V4L2_BUF_FLAG_TIMESTAMP_MONOTONIC
+        view = memoryview(self._buffers[buf.index])[: buf.bytesused]
+        return V4L2Frame(self, buf.index, buf.sequence, timestamp, view, monotonic)
+
+    # VideoCapture 호환 ---------------------------------------------------------
+
+    def isOpened(self) -> bool:
+        return self._fd is not None
+
+    def read(self, image: np.ndarray | None = None):
+        """한 프레임을 BGR 로 변환해 ``(ret, frame)`` 으로 반환한다."""
+        if not self.grab():
+            return False, None
+        return self.retrieve(image)
+
+    def grab(self) -> bool:
+        """다음 프레임을 디큐해 변환하지 않고 잡아 둔다. 앞서 잡은 프레임은 돌려준다.
+
+        여러 장치를 맞춰 캡처할 때(:class:`~cam_tuner_gui.capture.sync.CaptureGroup`)
+        변환 전에 모든 장치의 프레임을 먼저 잡는 데 쓴다.
+        """
+        self._drop_grabbed()
+        try:
+            frame = self.dequeue()
+        except OSError:
+            return False
+        if frame is None:
+            return False
+        self._grabbed = frame
+        self.capture_time = frame.timestamp if frame.monotonic else None
+        return True
+
+    def retrieve(self, image: np.ndarray | None = None):
+        """잡아 둔 프레임을 BGR 로 변환해 ``(ret, frame)`` 으로 반환하고 버퍼를 돌려준다."""
+        frame, self._grabbed = self._grabbed, None
+        if frame is None:
+            return False, None
+        with frame:
+            bgr = self.decode(frame.to_ndarray(), image)
+        return bgr is not None, bgr
+
+    def _drop_grabbed(self) -> None:
+        frame, self._grabbed = self._grabbed, None
+        if frame is not None:
+            frame.release()
+
+    def decode(self, raw: np.ndarray, dst: np.ndarray | None = None):
+        """원시 버퍼를 현재 픽셀 포맷에 맞게 BGR 이미지로 변환한다."""
+        w, h = self.width, self.height
+        if self.pixelformat == "YUYV":
+            stride = self.bytesperline or w * 2
+            packed = raw[: stride * h].reshape(h, stride)[:, : w * 2].reshape(h, w, 2)
+            return cv2.cvtColor(packed, cv2.COLOR_YUV2BGR_YUYV, dst=dst)
+        if self.pixelformat == "GREY":
+            stride = self.bytesperline or w
+            gray = raw[: stride * h].reshape(h, stride)[:, :w]
+            return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR, dst=dst)
+        if self.pixelformat == "MJPG":
+            return cv2.imdecode(raw, cv2.IMREAD_COLOR)
+        raise ValueError(f"Unsupported pixel format: {self.pixelformat}")
+
+    def query_controls(self) -> list[tuple[v4l2_queryctrl, dict[int, str]]]:
+        """장치 컨트롤 목록. :func:`query_controls` 참고."""
+        if self._fd is None:
+            raise RuntimeError("Device not open")
+        return query_controls(self._fd, self._ioctl)
+
+    def set(self, prop: int, value) -> bool:
+        """:data:`PROP_CIDS` 에 있는 속성을 VIDIOC_S_CTRL 로 쓴다."""
+        cid = PROP_CIDS.get(prop)
+        if cid is None or self._fd is None:
+            return False
+        ctrl = v4l2_control()
+        ctrl.id = cid
+        ctrl.value = int(round(value))
+        try:
+            self._xioctl(VIDIOC_S_CTRL, ctrl)
+        except OSError:
+            return False
+        return True
+
+    def get(self, prop: int) -> float:
+        """:data:`PROP_CIDS` 에 있는 속성을 VIDIOC_G_CTRL 로 읽는다. 그 밖에는 0."""
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.width or 0)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.height or 0)
+        cid = PROP_CIDS.get(prop)
+        if cid is None or self._fd is None:
+            return 0.0
+        ctrl = v4l2_control()
+        ctrl.id = cid
+        try:
+            self._xioctl(VIDIOC_G_CTRL, ctrl)
+        except OSError:
+            return 0.0
+        return float(ctrl.value)
+
+    def release(self) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """스트림을 멈추고 버퍼를 해제한 뒤 장치를 닫는다."""
+        if self._fd is None:
+            return
+        try:
+            self.stop()
+        except OSError:
+            pass
+        for mm in self._buffers:
+            try:
+                mm.close()
+            except BufferError:
+                pass
+        self._buffers = []
+        try:
+            self._request_buffers(0)
+        except OSError:
+            pass
+        os.close(self._fd)
+        self._fd = None
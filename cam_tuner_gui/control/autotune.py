@@ -0,0 +1,431 @@
+"""지표 목표를 향해 노출/게인을 찾는 폐루프 자동 튜너.
+
+사용 예::
+
+    python -m cam_tuner_gui.control.autotune synthetic:moving_edge --roi 0,0,150,480
+
+목적 지표(기본 SNR)를 :data:`~cam_tuner_gui.metric.thresholds.THRESHOLDS`
+에서 만든 제약(기본 모션 블러 ≤ 5 px, 플리커 ≤ 10 %) 아래에서 최대화한다.
+파라미터마다 차례로 황금분할 탐색을 하는 좌표 탐색이라 점 하나를 잴 때마다
+구간이 0.618 배로 줄고, 한 번 잰 점은 기억해 두고 다시 재지 않는다.
+
+점 하나는 :class:`~cam_tuner_gui.control.sweep.CameraTarget` 으로 바뀐
+파라미터만 쓰고, :func:`~cam_tuner_gui.control.sweep.capture_settled` 로
+안정된 프레임 ``frames_per_eval`` 장을 받아 잰다. 결과
+(:class:`TuneResult`)에는 쓴 장치 쓰기 수와 읽은 프레임 수가 남는다.
+
+제약을 어기는 점은 항상 지키는 점보다 나쁘고, 어기는 점끼리는 위반 정도로
+비교한다. 장면이 움직이면 위반 정도도 흔들리므로 ``violation_tolerance``
+배 안의 차이는 같은 것으로 보고 낮은 값 쪽을 고른다. 목적 지표가 단봉이고
+제약 경계가 하나면 황금분할이 경계 근처로 수렴한다.
+포화 픽셀 비율(``clipped``, %)도 제약으로 둬서 게인을 올려 화면을 날려
+버린 점이 SNR 로 이기지 않게 한다.
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass, field
+import math
+import sys
+import time
+from typing import TYPE_CHECKING, Hashable, Iterable, Mapping, Sequence
+
+import numpy as np
+
+from cam_tuner_gui.control.caps import FALLBACK_CONTROLS, ControlDescriptor
+from cam_tuner_gui.control.sweep import (
+    CameraTarget,
+    SettleDetector,
+    capture_settled,
+    frame_stats,
+)
+from cam_tuner_gui.metric.engine import (
+    FRAME_METRICS,
+    FULL_TIER,
+    MetricEngine,
+    Tier,
+    flicker_from_means,
+)
+from cam_tuner_gui.metric.thresholds import THRESHOLDS, UPPER_BOUNDS
+
+if TYPE_CHECKING:
+    from cam_tuner_gui.control.latency import LatencyTable
+
+
+__all__ = [
+    "AutoTuner",
+    "Constraint",
+    "Evaluation",
+    "TuneResult",
+    "clipped_percent",
+    "threshold_constraints",
+]
+
+# 튜너가 직접 재는 지표. 엔진 프레임 지표와 함께 제약/목적에 쓸 수 있다.
+TUNER_METRICS = ("flicker", "clipped")
+
+_INVPHI = (math.sqrt(5) - 1) / 2
+
+
+@dataclass(frozen=True)
+class Constraint:
+    """지표 하나의 상한(``upper``) 또는 하한."""
+
+    metric: str
+    limit: float
+    upper: bool = True
+
+    def violation(self, metrics: Mapping[str, float]) -> float:
+        """기준을 넘은 정도 (``|limit|`` 로 나눈 값, 최대 1). 지키면 0, 못 재면 1.
+
+        크게 어긴 점끼리는 얼마나 어겼는지보다 어떤 제약을 어겼는지가
+        중요하므로 1 에서 자른다. 장면이 움직여 흔들리는 위반 정도(포화
+        비율 등)가 탐색 방향을 뒤집지 않게 한다.
+        """
+        value = metrics.get(self.metric)
+        if value is None or not math.isfinite(value):
+            return 1.0
+        excess = value - self.limit if self.upper else self.limit - value
+        return min(max(excess, 0.0) / max(abs(self.limit), 1e-9), 1.0)
+
+
+def threshold_constraints(
+    names: Iterable[str] = ("motion_blur", "flicker")
+) -> list[Constraint]:
+    """:data:`THRESHOLDS` 의 기준값으로 만든 제약들."""
+    return [Constraint(name, THRESHOLDS[name], name in UPPER_BOUNDS) for name in names]
+
+
+def clipped_percent(image: np.ndarray, step: int = 4) -> float:
+    """``step`` px 격자로 뽑은 픽셀 중 포화(255)한 비율 (%)."""
+    if image.ndim == 3:
+        image = image[::step, ::step, 1]
+    else:
+        image = image[::step, ::step]
+    return float(np.count_nonzero(image >= 255)) * 100.0 / max(image.size, 1)
+
+
+@dataclass
+class Evaluation:
+    """파라미터 점 하나를 잰 결과. ``score`` 는 클수록 좋게 부호를 맞춘 목적 값."""
+
+    params: dict[str, int]
+    metrics: dict[str, float] = field(default_factory=dict)
+    violation: float = 0.0
+    score: float = float("-inf")
+    frames: int = 0
+    error: str = ""
+
+    @property
+    def feasible(self) -> bool:
+        return not self.error and self.violation == 0.0
+
+
+@dataclass
+class TuneResult:
+    """튜닝 결과. ``writes``/``frames`` 는 튜닝 전체에서 쓴 장치 쓰기와 읽은 프레임 수."""
+
+    params: dict[str, int]
+    metrics: dict[str, float]
+    feasible: bool
+    evaluations: list[Evaluation]
+    writes: int = 0
+    frames: int = 0
+    elapsed: float = 0.0
+
+    def summary(self) -> str:
+        status = "PASS" if self.feasible else "FAIL"
+        params = ", ".join(f"{k}={v}" for k, v in self.params.items())
+        metrics = ", ".join(f"{k}={v:.2f}" for k, v in self.metrics.items())
+        return (
+            f"{status} {params} | {metrics} | {len(self.evaluations)} points, "
+            f"{self.writes} writes, {self.frames} frames, {self.elapsed:.2f}s"
+        )
+
+
+class AutoTuner:
+    """제약 아래에서 목적 지표를 최적화하는 좌표 황금분할 탐색.
+
+    ``params`` 순서대로 한 축씩 ``controls`` 범위 안에서 황금분할로 찾고,
+    한 바퀴 돌아도 값이 바뀌지 않거나 ``max_rounds`` 바퀴를 돌면 멈춘다.
+    축마다 구간이 ``resolution`` (기본: 컨트롤 step 과 범위의 0.5 % 중 큰
+    것) 이하가 되면 끝낸다. 목적 값 차이가 ``objective_tolerance`` 이하이거나
+    제약 위반 정도의 비가 ``1 + violation_tolerance`` 이하면 같은 것으로 보고
+    낮은 파라미터 값(짧은 노출, 낮은 게인)을 고른다.
+
+    ``tier`` 는 :class:`~cam_tuner_gui.metric.engine.MetricEngine` 과 같은
+    단계 또는 지표별 단계 매핑이다. 예를 들어 SNR 은 평탄한 ROI 에서 재야
+    장면 내용이 아닌 노이즈를 본다. ``latency_table`` 을 주면 스윕과 같이
+    쌓인 반영 지연을 처음부터 쓰고 잰 지연을 다시 쌓는다.
+
+    안정 판정 허용 차이는 스윕보다 느슨하다. 모션 블러를 재려면 장면이
+    움직여야 하는데, 움직이는 장면은 평균 밝기가 프레임마다 조금씩 변해
+    엄격한 기준으로는 안정되지 않는다.
+    """
+
+    def __init__(
+        self,
+        objective: str = "snr",
+        maximize: bool = True,
+        constraints: Iterable[Constraint] | None = None,
+        params: Sequence[str] = ("exposure_abs", "gain"),
+        controls: Mapping[str, ControlDescriptor] = FALLBACK_CONTROLS,
+        start: Mapping[str, float] | None = None,
+        frames_per_eval: int = 3,
+        tier: Tier | Mapping[str, Tier] = FULL_TIER,
+        resolution: Mapping[str, float] | None = None,
+        max_rounds: int = 2,
+        objective_tolerance: float = 0.1,
+        violation_tolerance: float = 0.5,
+        max_clipped: float | None = 1.0,
+        tolerance: float = 1.0,
+        rel_tolerance: float = 0.01,
+        stable: int = 2,
+        max_settle_frames: int = 30,
+        latency: int | None = None,
+        latency_table: LatencyTable | None = None,
+    ) -> None:
+        """목적 지표와 제약, 탐색할 파라미터와 컨트롤 범위, 점마다 잴 프레임 수, 안정 판정 값, 지연 표를 받는다."""
+        self.objective = objective
+        self.maximize = maximize
+        self.constraints = list(
+            threshold_constraints() if constraints is None else constraints
+        )
+        if max_clipped is not None:
+            self.constraints.append(Constraint("clipped", max_clipped))
+        names = {objective} | {c.metric for c in self.constraints}
+        unknown = sorted(n for n in names if n not in FRAME_METRICS and n not in TUNER_METRICS)
+        if unknown:
+            raise ValueError(f"Unknown metrics: {', '.join(unknown)}")
+        missing = [p for p in params if p not in controls]
+        if missing:
+            raise ValueError(f"No control range for: {', '.join(missing)}")
+        self.params = tuple(params)
+        self.controls = controls
+        self.start = dict(start or {})
+        self.frames_per_eval = max(int(frames_per_eval), 2 if "flicker" in names else 1)
+        self.tier = tier
+        self.resolution = dict(resolution or {})
+        self.max_rounds = max(int(max_rounds), 1)
+        self.objective_tolerance = objective_tolerance
+        self.violation_tolerance = violation_tolerance
+        self.detector = SettleDetector(
+            tolerance, rel_tolerance, stable, max_settle_frames, latency
+        )
+        self.latency = latency
+        self.latency_table = latency_table
+        self._frame_metrics = tuple(n for n in FRAME_METRICS if n in names)
+        self._baseline: tuple[float, float] | None = None
+        self._key: Hashable = None
+
+    # 평가 --------------------------------------------------------------------
+
+    def _snap(self, param: str, value: float) -> int:
+        return self.controls[param].clamp(value)
+
+    def _resolution(self, param: str) -> float:
+        if param in self.resolution:
+            return self.resolution[param]
+        desc = self.controls[param]
+        return max(desc.step, 0.005 * (desc.maximum - desc.minimum), 1)
+
+    def _objective(self, evaluation: Evaluation) -> float:
+        value = evaluation.metrics.get(self.objective, float("nan"))
+        if not math.isfinite(value):
+            return float("-inf")
+        return value if self.maximize else -value
+
+    def _at_least(self, x: Evaluation, y: Evaluation) -> bool:
+        """``x`` 가 ``y`` 보다 나쁘지 않은지 (허용 차이 안이면 같다고 본다)."""
+        if x.error or y.error:
+            return not x.error
+        if x.feasible != y.feasible:
+            return x.feasible
+        if x.feasible:
+            return x.score >= y.score - self.objective_tolerance
+        return x.violation <= y.violation * (1.0 + self.violation_tolerance)
+
+    def _evaluate(
+        self, target: CameraTarget, engine: MetricEngine, params: dict[str, int]
+    ) -> Evaluation:
+        evaluation = Evaluation(dict(params))
+        frames_before = target.frames
+        try:
+            written = target.apply(params)
+        except (KeyError, RuntimeError) as exc:
+            evaluation.error = str(exc)
+        else:
+            kept = capture_settled(
+                target, self.detector, self._baseline, self.frames_per_eval
+            )
+            detector = self.detector
+            if detector.first_change is not None:
+                # 바뀐 게 안 보이는 점에서는 배운 컨트롤 지연만큼만 기다린다.
+                detector.latency = max(detector.latency or 0, detector.first_change)
+                if self.latency_table is not None:
+                    for param_id in written:
+                        self.latency_table.record(self._key, param_id, detector.first_change)
+            if kept is None:
+                evaluation.error = "no frame"
+            else:
+                self._baseline = kept[-1][1]
+                evaluation.metrics = self._measure(engine, kept)
+        evaluation.frames = target.frames - frames_before
+        evaluation.violation = sum(c.violation(evaluation.metrics) for c in self.constraints)
+        evaluation.score = self._objective(evaluation)
+        return evaluation
+
+    def _measure(self, engine: MetricEngine, kept) -> dict[str, float]:
+        values: dict[str, list[float]] = {name: [] for name in self._frame_metrics}
+        clipped = []
+        for image, _ in kept:
+            result = engine.compute(image, observe=False).as_dict()
+            for name in self._frame_metrics:
+                values[name].append(result[name])
+            clipped.append(clipped_percent(image))
+        metrics = {name: float(np.mean(vals)) for name, vals in values.items()}
+        metrics["flicker"] = flicker_from_means([stats[0] for _, stats in kept])
+        metrics["clipped"] = float(np.mean(clipped))
+        return metrics
+
+    # 탐색 --------------------------------------------------------------------
+
+    def run(self, camera, key: Hashable = None) -> TuneResult:
+        """``camera`` (``CameraDevice`` 또는 ``VideoCapture`` 호환)에서 튜닝한다.
+
+        ``key`` 는 ``latency_table`` 에서 이 카메라의 지연을 찾고 쌓을 장치 키다.
+        """
+        start_time = time.monotonic()
+        self._key = key
+        self.detector.latency = self.latency
+        if self.latency is None and self.latency_table is not None:
+            self.detector.latency = self.latency_table.hint(key, self.params)
+        target = CameraTarget(camera)
+        engine = MetricEngine(self._frame_metrics, tier=self.tier)
+        first = target.read()
+        self._baseline = frame_stats(first) if first is not None else None
+        seen: dict[tuple[int, ...], Evaluation] = {}
+        evaluations: list[Evaluation] = []
+
+        def evaluate(point: dict[str, int]) -> Evaluation:
+            key = tuple(point[p] for p in self.params)
+            evaluation = seen.get(key)
+            if evaluation is None:
+                evaluation = seen[key] = self._evaluate(target, engine, point)
+                evaluations.append(evaluation)
+            return evaluation
+
+        current = {
+            p: self._snap(p, self.start.get(p, self.controls[p].minimum))
+            for p in self.params
+        }
+        best = evaluate(current)
+        for _ in range(self.max_rounds):
+            previous = dict(best.params)
+            for param in self.params:
+                best = self._search_axis(param, best.params, evaluate)
+            if best.params == previous:
+                break
+        return TuneResult(
+            dict(best.params),
+            dict(best.metrics),
+            best.feasible,
+            evaluations,
+            target.writes,
+            target.frames,
+            time.monotonic() - start_time,
+        )
+
+    def _search_axis(self, param: str, fixed: Mapping[str, int], evaluate) -> Evaluation:
+        """``param`` 한 축을 황금분할로 찾는다. 나머지 축은 ``fixed`` 로 고정."""
+        desc = self.controls[param]
+        resolution = self._resolution(param)
+
+        def at(value: float) -> Evaluation:
+            return evaluate({**fixed, param: self._snap(param, value)})
+
+        a, b = float(desc.minimum), float(desc.maximum)
+        c = b - _INVPHI * (b - a)
+        d = a + _INVPHI * (b - a)
+        fc, fd = at(c), at(d)
+        while b - a > resolution:
+            # 같으면 낮은 쪽 구간을 남긴다.
+            if self._at_least(fc, fd):
+                b, d, fd = d, c, fc
+                c = b - _INVPHI * (b - a)
+                fc = at(c)
+            else:
+                a, c, fc = c, d, fd
+                d = a + _INVPHI * (b - a)
+                fd = at(d)
+        candidates = [at(a), fc, fd, at(b), evaluate(dict(fixed))]
+        return self._pick(param, candidates)
+
+    def _pick(self, param: str, candidates: list[Evaluation]) -> Evaluation:
+        """다른 후보보다 나쁘지 않은 후보 중 파라미터 값이 가장 낮은 것."""
+        ordered = sorted(candidates, key=lambda e: e.params[param])
+        for evaluation in ordered:
+            if all(self._at_least(evaluation, other) for other in ordered):
+                return evaluation
+        # 허용 차이 때문에 순서가 꼬이면 제약, 목적 값 순으로 고른다.
+        return max(ordered, key=lambda e: (e.feasible, -e.violation, e.score))
+
+
+def _parse_roi(text: str) -> tuple[int, int, int, int]:
+    values = tuple(int(v) for v in text.split(","))
+    if len(values) != 4:
+        raise argparse.ArgumentTypeError("ROI must be x,y,w,h")
+    return values
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    from cam_tuner_gui.capture.device import CameraDevice
+    from cam_tuner_gui.control.caps import describe_controls
+
+    parser = argparse.ArgumentParser(
+        prog="python -m cam_tuner_gui.control.autotune",
+        description="Search exposure/gain for the best metric within thresholds.",
+    )
+    parser.add_argument("device", help="camera device id (e.g. 0, v4l2:0, synthetic:moving_edge)")
+    parser.add_argument("--objective", default="snr", choices=tuple(FRAME_METRICS))
+    parser.add_argument("--minimize", action="store_true")
+    parser.add_argument(
+        "--constraint",
+        action="append",
+        default=None,
+        choices=tuple(THRESHOLDS),
+        help="threshold to respect (repeatable, default: motion_blur and flicker)",
+    )
+    parser.add_argument("--roi", type=_parse_roi, default=None, help="x,y,w,h for the objective")
+    parser.add_argument("--frames", type=int, default=3, help="frames per evaluated point")
+    parser.add_argument(
+        "--settle-tolerance", type=float, default=1.0, help="settle tolerance (DN)"
+    )
+    args = parser.parse_args(argv)
+
+    camera = CameraDevice(args.device)
+    camera.start_stream()
+    if camera.cap is None:
+        print(f"cannot open {args.device}", file=sys.stderr)
+        return 1
+    try:
+        tier = {args.objective: Tier.from_rois([args.roi])} if args.roi else FULL_TIER
+        tuner = AutoTuner(
+            args.objective,
+            not args.minimize,
+            threshold_constraints(args.constraint or ("motion_blur", "flicker")),
+            controls=describe_controls(args.device, camera.cap),
+            frames_per_eval=args.frames,
+            tier=tier,
+            tolerance=args.settle_tolerance,
+        )
+        result = tuner.run(camera)
+    finally:
+        camera.stop_stream()
+    print(result.summary())
+    return 0 if result.feasible else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
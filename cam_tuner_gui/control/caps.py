@@ -0,0 +1,240 @@
+"""장치 컨트롤 능력(범위·기본값·메뉴·플래그) 탐색과 장치별 캐시.
+
+V4L2 장치는 ``VIDIOC_QUERYCTRL``/``VIDIOC_QUERYMENU`` 로 컨트롤을 한 번
+훑어 :class:`ControlDescriptor` 표를 만든다. 표는 sysfs 에서 읽은 USB
+VID/PID/시리얼(:class:`DeviceKey`)로 :class:`ControlTable` 에 캐시하므로
+같은 카메라로 다시 바꿔도 다시 묻지 않는다. V4L2 로 물을 수 없는 장치
+(합성 소스, 녹화 재생, V4L2 가 없는 플랫폼)는 :data:`FALLBACK_CONTROLS`
+를 쓴다.
+
+``inactive`` 는 탐색 시점의 상태다. 예를 들어 노출 시간은 자동 노출이
+켜져 있으면 inactive 로 나오지만 수동으로 바꾸면 쓸 수 있다.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import os
+from pathlib import Path
+import re
+import threading
+from typing import Callable, Hashable, Mapping, NamedTuple
+
+from cam_tuner_gui.capture import v4l2
+from cam_tuner_gui.capture.device import V4L2_PREFIX
+
+
+__all__ = [
+    "CONTROL_TABLE",
+    "ControlDescriptor",
+    "ControlTable",
+    "DeviceKey",
+    "FALLBACK_CONTROLS",
+    "describe_controls",
+    "device_path",
+    "probe_v4l2",
+    "usb_key",
+]
+
+# 표준 V4L2 컨트롤 → 파라미터 ID (:class:`~cam_tuner_gui.control.params.ParamMap`).
+_CID_PARAMS = {
+    v4l2.V4L2_CID_EXPOSURE_ABSOLUTE: "exposure_abs",
+    v4l2.V4L2_CID_EXPOSURE_AUTO: "auto_exposure",
+    v4l2.V4L2_CID_GAIN: "gain",
+    v4l2.V4L2_CID_GAMMA: "gamma",
+    v4l2.V4L2_CID_CONTRAST: "contrast",
+}
+_KINDS = {
+    v4l2.V4L2_CTRL_TYPE_INTEGER: "int",
+    v4l2.V4L2_CTRL_TYPE_BOOLEAN: "bool",
+    v4l2.V4L2_CTRL_TYPE_MENU: "menu",
+    v4l2.V4L2_CTRL_TYPE_BUTTON: "button",
+    v4l2.V4L2_CTRL_TYPE_INTEGER_MENU: "menu",
+}
+
+
+@dataclass(frozen=True)
+class ControlDescriptor:
+    """컨트롤 하나의 값 범위와 상태."""
+
+    name: str
+    minimum: int
+    maximum: int
+    step: int = 1
+    default: int = 0
+    kind: str = "int"
+    menu: Mapping[int, str] = field(default_factory=dict)
+    read_only: bool = False
+    inactive: bool = False
+    cid: int | None = None
+
+    @property
+    def writable(self) -> bool:
+        return not self.read_only
+
+    def clamp(self, value) -> int:
+        """범위 안으로 자르고 ``step`` 격자에 맞춘 값."""
+        value = min(max(int(round(value)), self.minimum), self.maximum)
+        step = max(self.step, 1)
+        return self.minimum + (value - self.minimum) // step * step
+
+
+# V4L2 로 물을 수 없을 때 쓰는 범위. 예전 슬라이더 범위와 같다.
+FALLBACK_CONTROLS: dict[str, ControlDescriptor] = {
+    "exposure_abs": ControlDescriptor("exposure_abs", 1, 1000, default=100),
+    "gain": ControlDescriptor("gain", 0, 255),
+    "gamma": ControlDescriptor("gamma", 0, 500),
+    "contrast": ControlDescriptor("contrast", 0, 255),
+    "auto_exposure": ControlDescriptor(
+        "auto_exposure",
+        1,
+        3,
+        default=3,
+        kind="menu",
+        menu={1: "Manual Mode", 3: "Aperture Priority Mode"},
+    ),
+}
+
+
+class DeviceKey(NamedTuple):
+    """USB 장치 식별자. 시리얼이 없는 장치는 빈 문자열."""
+
+    vid: str
+    pid: str
+    serial: str
+
+
+def device_path(device_id: str) -> str | None:
+    """``CameraDevice`` 장치 ID 에 해당하는 V4L2 노드 경로. 없으면 ``None``."""
+    if device_id.startswith(V4L2_PREFIX):
+        device_id = device_id[len(V4L2_PREFIX):]
+    if device_id.isdigit():
+        return f"/dev/video{device_id}"
+    if device_id.startswith("/dev/video"):
+        return device_id
+    return None
+
+
+def _read(path: Path) -> str:
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return ""
+
+
+def usb_key(path: str, sysfs: str | os.PathLike = "/sys") -> DeviceKey | None:
+    """V4L2 노드의 USB VID/PID/시리얼. USB 장치가 아니면 ``None``."""
+    node = Path(sysfs) / "class" / "video4linux" / Path(path).name / "device"
+    try:
+        current = node.resolve(strict=True)
+    except OSError:
+        return None
+    # device 링크는 USB 인터페이스를 가리키고, idVendor 는 그 위 장치에 있다.
+    for directory in (current, *current.parents[:3]):
+        vid = _read(directory / "idVendor")
+        if vid:
+            return DeviceKey(vid, _read(directory / "idProduct"), _read(directory / "serial"))
+    return None
+
+
+def _control_name(raw: bytes) -> str:
+    name = raw.decode(errors="replace").lower()
+    return re.sub(r"[^0-9a-z]+", "_", name).strip("_")
+
+
+def _descriptors(
+    controls: list[tuple[v4l2.v4l2_queryctrl, dict[int, str]]]
+) -> dict[str, ControlDescriptor]:
+    table = {}
+    for qc, menu in controls:
+        name = _CID_PARAMS.get(qc.id) or _control_name(qc.name)
+        table[name] = ControlDescriptor(
+            name,
+            qc.minimum,
+            qc.maximum,
+            qc.step,
+            qc.default_value,
+            _KINDS.get(qc.type, "other"),
+            menu,
+            bool(qc.flags & v4l2.V4L2_CTRL_FLAG_READ_ONLY),
+            bool(qc.flags & v4l2.V4L2_CTRL_FLAG_INACTIVE),
+            qc.id,
+        )
+    return table
+
+
+def probe_v4l2(
+    target: str | v4l2.V4L2Device, ioctl: Callable | None = None
+) -> dict[str, ControlDescriptor] | None:
+    """V4L2 장치(열린 :class:`V4L2Device` 또는 노드 경로)의 컨트롤 표.
+
+    물을 수 없으면 ``None``. 경로를 주면 컨트롤 조회용으로 따로 열었다
+    닫으므로 다른 백엔드가 스트리밍 중이어도 된다.
+    """
+    try:
+        if isinstance(target, v4l2.V4L2Device):
+            controls = target.query_controls()
+        else:
+            fd = os.open(target, os.O_RDWR | os.O_NONBLOCK)
+            try:
+                controls = v4l2.query_controls(fd, ioctl)
+            finally:
+                os.close(fd)
+    except (OSError, RuntimeError):
+        return None
+    return _descriptors(controls) or None
+
+
+class ControlTable:
+    """장치별 컨트롤 표 캐시.
+
+    USB 장치는 :class:`DeviceKey` 로, 그 밖의 장치는 장치 ID 문자열로
+    묶는다. ``probes`` 는 실제로 장치에 물은 횟수다.
+    """
+
+    def __init__(self, sysfs: str | os.PathLike = "/sys", ioctl: Callable | None = None) -> None:
+        """sysfs 루트와 (테스트용) ioctl 함수를 받는다."""
+        self.sysfs = sysfs
+        self.ioctl = ioctl
+        self.probes = 0
+        self._tables: dict[Hashable, dict[str, ControlDescriptor]] = {}
+        self._lock = threading.Lock()
+
+    def key(self, device_id: str) -> Hashable:
+        path = device_path(device_id)
+        return (usb_key(path, self.sysfs) if path else None) or device_id
+
+    def describe(self, device_id: str, capture=None) -> dict[str, ControlDescriptor]:
+        """``device_id`` 의 컨트롤 표. 처음 보는 장치면 탐색해 캐시한다."""
+        key = self.key(device_id)
+        with self._lock:
+            table = self._tables.get(key)
+        if table is not None:
+            return table
+        table = None
+        path = device_path(device_id)
+        if isinstance(capture, v4l2.V4L2Device) and capture.isOpened():
+            table = probe_v4l2(capture)
+        elif path is not None:
+            table = probe_v4l2(path, self.ioctl)
+        self.probes += 1
+        table = table or dict(FALLBACK_CONTROLS)
+        with self._lock:
+            return self._tables.setdefault(key, table)
+
+    def forget(self, device_id: str) -> None:
+        """``device_id`` 장치의 캐시를 지운다 (펌웨어 교체 등)."""
+        with self._lock:
+            self._tables.pop(self.key(device_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tables.clear()
+
+
+CONTROL_TABLE = ControlTable()
+
+
+def describe_controls(device_id: str, capture=None) -> dict[str, ControlDescriptor]:
+    """프로세스 공용 :data:`CONTROL_TABLE` 에서 장치의 컨트롤 표를 얻는다."""
+    return CONTROL_TABLE.describe(device_id, capture)
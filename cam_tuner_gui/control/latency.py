@@ -0,0 +1,340 @@
+"""컨트롤 쓰기 → 프레임 반영 지연 측정.
+
+UVC 카메라는 컨트롤을 쓴 뒤 보통 2–5 프레임이 지나야 바뀐 값이 보인다.
+:class:`LatencyMonitor` 는 쓰기마다 시각을 남기고, 그 뒤 들어오는 프레임의
+평균 밝기/표준편차(:func:`~cam_tuner_gui.control.sweep.frame_stats`)가 쓰기
+직전 프레임과 달라지는 첫 프레임을 찾는다. 결과는 장치·파라미터별
+:class:`LatencyHistogram` 으로 :class:`LatencyTable` 에 모인다.
+
+지연 ``N`` 프레임은 쓰기 뒤 ``N`` 번째로 캡처된 프레임에서 처음 바뀐 값이
+보였다는 뜻이다 (:attr:`~cam_tuner_gui.control.sweep.SettleDetector.first_change`
+와 같은 단위). 표는 스윕/튜너의 안정 판정 지연
+(:meth:`LatencyTable.hint`)과 쓰기 워커의 파라미터별 간격
+(:meth:`LatencyTable.settle_times`)으로 다시 쓰인다.
+
+장면이 움직이면 쓰기와 상관없이 통계가 바뀌므로 정지 장면에서 재야 한다.
+쓰기가 여러 개 겹치면 각 쓰기 뒤 처음 바뀐 프레임을 모두 그 쓰기의
+반영으로 본다.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Mapping
+from dataclasses import dataclass
+import threading
+import time
+from typing import Hashable, Iterable, Iterator
+
+import numpy as np
+
+from cam_tuner_gui.control.sweep import CameraTarget, SettleDetector, frame_stats
+
+
+__all__ = [
+    "LATENCY_TABLE",
+    "LatencyHistogram",
+    "LatencyMonitor",
+    "LatencySample",
+    "LatencyTable",
+    "measure_latency",
+]
+
+_BARS = " ▁▂▃▄▅▆▇█"
+
+
+@dataclass(frozen=True)
+class LatencySample:
+    """쓰기 하나의 반영 지연. ``seconds`` 는 타임스탬프가 없으면 ``None``."""
+
+    param_id: str
+    value: float
+    frames: int
+    seconds: float | None = None
+
+
+class LatencyHistogram:
+    """지연 프레임 수 히스토그램. ``max_frames`` 이상은 마지막 칸에 센다.
+
+    시간(초)은 분위수 계산용으로 최근 ``history`` 개만 보관한다.
+    """
+
+    def __init__(self, max_frames: int = 30, history: int = 256) -> None:
+        self.counts = np.zeros(max_frames + 1, np.int64)
+        self.seconds: deque[float] = deque(maxlen=history)
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    def add(self, frames: int, seconds: float | None = None) -> None:
+        self.counts[min(max(int(frames), 0), len(self.counts) - 1)] += 1
+        if seconds is not None:
+            self.seconds.append(float(seconds))
+
+    def quantile(self, q: float) -> int | None:
+        """``q`` 분위수 지연(프레임). 샘플이 없으면 ``None``."""
+        total = self.count
+        if total == 0:
+            return None
+        cumulative = np.cumsum(self.counts)
+        return int(np.searchsorted(cumulative, q * total))
+
+    def seconds_quantile(self, q: float) -> float | None:
+        if not self.seconds:
+            return None
+        return float(np.quantile(np.fromiter(self.seconds, float), q))
+
+    def sparkline(self) -> str:
+        """0 프레임부터 가장 긴 지연까지의 막대 문자열."""
+        nonzero = np.flatnonzero(self.counts)
+        if nonzero.size == 0:
+            return ""
+        counts = self.counts[: nonzero[-1] + 1]
+        levels = np.ceil(counts * (len(_BARS) - 1) / counts.max()).astype(int)
+        return "".join(_BARS[level] for level in levels)
+
+
+class LatencyTable:
+    """장치·파라미터별 지연 히스토그램 모음.
+
+    장치 키는 보통 :meth:`~cam_tuner_gui.control.caps.ControlTable.key`
+    (USB VID/PID/시리얼)라 같은 카메라면 노드가 바뀌어도 이어서 쌓인다.
+    """
+
+    def __init__(self, max_frames: int = 30) -> None:
+        self.max_frames = max_frames
+        self._histograms: dict[tuple[Hashable, str], LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self, device: Hashable, param_id: str, frames: int, seconds: float | None = None
+    ) -> None:
+        with self._lock:
+            histogram = self._histograms.get((device, param_id))
+            if histogram is None:
+                histogram = self._histograms[(device, param_id)] = LatencyHistogram(
+                    self.max_frames
+                )
+            histogram.add(frames, seconds)
+
+    def histogram(self, device: Hashable, param_id: str) -> LatencyHistogram | None:
+        with self._lock:
+            return self._histograms.get((device, param_id))
+
+    def params(self, device: Hashable) -> list[str]:
+        with self._lock:
+            return sorted(p for d, p in self._histograms if d == device)
+
+    def hint(
+        self, device: Hashable, params: Iterable[str], quantile: float = 0.9
+    ) -> int | None:
+        """``params`` 중 가장 느린 파라미터의 ``quantile`` 지연(프레임). 모르면 ``None``.
+
+        :class:`~cam_tuner_gui.control.sweep.SettleDetector` 의 ``latency`` 로 쓴다.
+        """
+        hints = []
+        with self._lock:
+            for param_id in params:
+                histogram = self._histograms.get((device, param_id))
+                if histogram is not None and histogram.count:
+                    hints.append(histogram.quantile(quantile))
+        return max(hints) if hints else None
+
+    def settle_times(
+        self, device: Hashable, quantile: float = 0.9, fps: float = 30.0
+    ) -> Mapping[str, float]:
+        """파라미터별 반영 시간(초)을 돌려주는 실시간 매핑.
+
+        :class:`~cam_tuner_gui.control.writer.ParamWriter` 의 ``settle`` 로
+        주면 쓸 때마다 그때까지 쌓인 측정으로 간격을 정한다. 시간 샘플이
+        없으면 프레임 지연을 ``fps`` 로 나눈다.
+        """
+        return _SettleTimes(self, device, quantile, fps)
+
+    def summary(self, device: Hashable, quantile: float = 0.9) -> list[str]:
+        """장치의 파라미터별 한 줄 요약 (중앙값/분위수 지연, 샘플 수, 분포)."""
+        lines = []
+        for param_id in self.params(device):
+            histogram = self.histogram(device, param_id)
+            with self._lock:
+                p50, pq = histogram.quantile(0.5), histogram.quantile(quantile)
+                seconds = histogram.seconds_quantile(0.5)
+                count, bars = histogram.count, histogram.sparkline()
+            text = f"{param_id}: p50 {p50} / p{round(quantile * 100)} {pq} frames"
+            if seconds is not None:
+                text += f" ({seconds * 1000:.0f} ms)"
+            lines.append(f"{text}, n={count} {bars}")
+        return lines
+
+    def clear(self, device: Hashable | None = None) -> None:
+        with self._lock:
+            if device is None:
+                self._histograms.clear()
+            else:
+                for key in [k for k in self._histograms if k[0] == device]:
+                    del self._histograms[key]
+
+
+class _SettleTimes(Mapping):
+    def __init__(self, table: LatencyTable, device: Hashable, quantile: float, fps: float):
+        self._table = table
+        self._device = device
+        self._quantile = quantile
+        self._fps = fps
+
+    def __getitem__(self, param_id: str) -> float:
+        histogram = self._table.histogram(self._device, param_id)
+        if histogram is None or not histogram.count:
+            raise KeyError(param_id)
+        with self._table._lock:
+            seconds = histogram.seconds_quantile(self._quantile)
+            if seconds is None:
+                seconds = histogram.quantile(self._quantile) / self._fps
+        return seconds
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._table.params(self._device))
+
+    def __len__(self) -> int:
+        return len(self._table.params(self._device))
+
+
+LATENCY_TABLE = LatencyTable()
+
+
+class _Probe:
+    __slots__ = ("param_id", "value", "timestamp", "baseline", "base_seq")
+
+    def __init__(self, param_id, value, timestamp, baseline, base_seq) -> None:
+        self.param_id = param_id
+        self.value = value
+        self.timestamp = timestamp
+        self.baseline = baseline
+        self.base_seq = base_seq
+
+
+class LatencyMonitor:
+    """쓰기(:meth:`mark`)와 프레임(:meth:`observe`)을 받아 지연을 잰다.
+
+    두 메서드는 같은 스레드(예: GUI 스레드)에서 부른다. 타임스탬프는
+    ``time.monotonic()`` 기준이며 ``CameraDevice`` 프레임의 ``timestamp`` 와
+    같다. 최근 프레임 통계를 보관해 두므로 쓰기 결과가 늦게 알려져도 쓰기
+    시각 뒤의 프레임부터 다시 센다. 프레임 ``seq`` 를 주면 미리보기처럼
+    일부 프레임만 보더라도 캡처된 프레임 수로 지연을 센다.
+
+    ``max_frames`` 안에 바뀐 게 보이지 않으면 :attr:`unresolved`, 반영 전에
+    같은 파라미터를 다시 쓰면 :attr:`superseded` 로 센다.
+    """
+
+    def __init__(
+        self,
+        device: Hashable = None,
+        table: LatencyTable = LATENCY_TABLE,
+        tolerance: float = 0.5,
+        rel_tolerance: float = 0.005,
+        max_frames: int = 30,
+    ) -> None:
+        """장치 키, 결과를 쌓을 표, 통계 허용 차이, 최대 대기 프레임 수를 받는다."""
+        self.device = device
+        self.table = table
+        self.max_frames = max_frames
+        self.unresolved = 0
+        self.superseded = 0
+        self._detector = SettleDetector(tolerance, rel_tolerance)
+        self._history: deque[tuple[float, int, tuple[float, float]]] = deque(
+            maxlen=2 * max_frames
+        )
+        self._probes: dict[str, _Probe] = {}
+        self._seq = 0
+
+    @property
+    def pending(self) -> list[str]:
+        """아직 반영이 보이지 않은 파라미터들."""
+        return list(self._probes)
+
+    def mark(
+        self, param_id: str, value, timestamp: float | None = None
+    ) -> list[LatencySample]:
+        """``timestamp`` 에 끝난 쓰기를 등록한다. 이미 본 뒤 프레임으로 판정된 샘플을 돌려준다."""
+        if timestamp is None:
+            timestamp = time.monotonic()
+        if param_id in self._probes:
+            self.superseded += 1
+        before = [entry for entry in self._history if entry[0] < timestamp]
+        if not before:
+            # 쓰기 전 프레임을 모르면 무엇이 바뀌었는지 판정할 수 없다.
+            self._probes.pop(param_id, None)
+            self.unresolved += 1
+            return []
+        _, base_seq, baseline = before[-1]
+        probe = self._probes[param_id] = _Probe(param_id, value, timestamp, baseline, base_seq)
+        for t, seq, stats in self._history:
+            if t >= timestamp:
+                sample = self._feed(probe, t, seq, stats)
+                if sample is not None or param_id not in self._probes:
+                    return [sample] if sample is not None else []
+        return []
+
+    def observe(
+        self, image: np.ndarray, timestamp: float | None = None, seq: int | None = None
+    ) -> list[LatencySample]:
+        """프레임 하나를 넣고 이번에 반영이 확인된 쓰기들을 돌려준다."""
+        if timestamp is None:
+            timestamp = time.monotonic()
+        self._seq = self._seq + 1 if seq is None else seq
+        stats = frame_stats(image)
+        self._history.append((timestamp, self._seq, stats))
+        samples = []
+        for probe in list(self._probes.values()):
+            if timestamp >= probe.timestamp:
+                sample = self._feed(probe, timestamp, self._seq, stats)
+                if sample is not None:
+                    samples.append(sample)
+        return samples
+
+    def _feed(
+        self, probe: _Probe, timestamp: float, seq: int, stats: tuple[float, float]
+    ) -> LatencySample | None:
+        frames = seq - probe.base_seq
+        if self._detector.similar(stats, probe.baseline):
+            if frames >= self.max_frames:
+                del self._probes[probe.param_id]
+                self.unresolved += 1
+            return None
+        del self._probes[probe.param_id]
+        seconds = timestamp - probe.timestamp
+        self.table.record(self.device, probe.param_id, frames, seconds)
+        return LatencySample(probe.param_id, probe.value, frames, seconds)
+
+
+def measure_latency(
+    camera,
+    param_id: str,
+    values: Iterable[float],
+    device: Hashable = None,
+    table: LatencyTable = LATENCY_TABLE,
+    **monitor_kwargs,
+) -> list[LatencySample]:
+    """``camera`` 에 ``values`` 를 차례로 쓰며 각 쓰기의 반영 지연을 잰다.
+
+    카메라 없이 돌 수 있는 계측 모드다. 프레임을 직접 읽으므로 쓰기 뒤의
+    프레임만 센다. 바뀐 게 보이지 않은 쓰기는 결과에서 빠진다.
+    """
+    target = CameraTarget(camera)
+    monitor = LatencyMonitor(device, table, **monitor_kwargs)
+    samples = []
+    for value in values:
+        frame = target.read()
+        if frame is None:
+            break
+        monitor.observe(frame)
+        target.write(param_id, value)
+        found = monitor.mark(param_id, value)
+        while not found and param_id in monitor.pending:
+            frame = target.read()
+            if frame is None:
+                return samples
+            found = monitor.observe(frame)
+        samples.extend(found)
+    return samples
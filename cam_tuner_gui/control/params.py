@@ -21,9 +21,20 @@ class ParamMap:
         """파라미터 정보를 반환한다."""
         return self._map.get(name)
 
+    def __iter__(self):
+        return iter(self._map)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._map
+
+
+# 매핑은 바뀌지 않으므로 호출마다 만들지 않고 하나를 같이 쓴다.
+PARAM_MAP = ParamMap()
+
+
 def set_param(capture: cv2.VideoCapture, param_id: str, value) -> None:
     """주어진 파라미터 ID에 값을 설정한다."""
-    prop = ParamMap().get(param_id)
+    prop = PARAM_MAP.get(param_id)
     if prop is None:
         raise KeyError(f"Unknown parameter: {param_id}")
     if not capture.set(prop, value):
@@ -32,7 +43,7 @@ def set_param(capture: cv2.VideoCapture, param_id: str, value) -> None:
 
 def get_param(capture: cv2.VideoCapture, param_id: str):
     """현재 장치에서 주어진 파라미터 값을 읽어 반환한다."""
-    prop = ParamMap().get(param_id)
+    prop = PARAM_MAP.get(param_id)
     if prop is None:
         raise KeyError(f"Unknown parameter: {param_id}")
     return capture.get(prop)
@@ -0,0 +1,447 @@
+"""파라미터 조합을 차례로 적용하며 지표를 재는 스윕 엔진.
+
+:func:`grid` 로 만든 점(예: 노출 × 게인 × 감마)마다
+
+1. 앞 점과 달라진 파라미터만 :func:`~cam_tuner_gui.control.params.set_param` 으로 쓰고,
+2. :class:`SettleDetector` 로 프레임 평균 밝기와 표준편차가 움직이다
+   멈출 때까지(또는 바뀌지 않는 채로 컨트롤 지연이 지날 때까지) 보고,
+3. 안정된 프레임(안정 판정에 쓴 프레임 포함) ``frames_per_point`` 장의
+   지표를 :class:`~cam_tuner_gui.metric.engine.MetricEngine` 으로 계산해
+4. :class:`SweepResult` 를 콜백(예: :meth:`SweepTable.append`)으로 흘려보낸다.
+
+고정 시간 대기 대신 통계로 안정을 판정하므로 센서가 빨리 수렴하면 바로
+다음 점으로 넘어간다. 바뀌는 게 보이지 않는 점은 앞 점들에서 배운 컨트롤
+지연만큼만 기다린다. 카메라마다 스레드 하나로 병렬로 돈다.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+import csv
+from dataclasses import dataclass, field
+import itertools
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Hashable, Iterable, Mapping, Sequence
+
+import cv2
+import numpy as np
+
+from cam_tuner_gui.control.params import set_param
+from cam_tuner_gui.metric.engine import FRAME_METRICS, MetricEngine
+
+if TYPE_CHECKING:
+    from cam_tuner_gui.control.latency import LatencyTable
+
+
+__all__ = [
+    "CameraTarget",
+    "ParamSweep",
+    "SettleDetector",
+    "SweepResult",
+    "SweepTable",
+    "capture_settled",
+    "frame_stats",
+    "grid",
+]
+
+
+def grid(**axes: Iterable[float]) -> list[dict[str, float]]:
+    """축별 값 목록의 모든 조합. 앞에 준 축이 가장 느리게 바뀐다.
+
+    ``grid(exposure_abs=[50, 100], gain=[0, 32])`` →
+    ``[{exposure_abs: 50, gain: 0}, {exposure_abs: 50, gain: 32}, ...]``
+    """
+    names = list(axes)
+    values = [list(v) for v in axes.values()]
+    return [dict(zip(names, combo)) for combo in itertools.product(*values)]
+
+
+def frame_stats(image: np.ndarray, step: int = 4) -> tuple[float, float]:
+    """프레임 평균 밝기와 표준편차 (채널 평균). ``step`` 간격 격자 화소만 본다."""
+    if step > 1:
+        height, width = image.shape[:2]
+        size = (max(width // step, 1), max(height // step, 1))
+        # 최근접 정수 배 축소는 격자 화소만 골라 연속 배열로 만든다.
+        image = cv2.resize(image, size, interpolation=cv2.INTER_NEAREST)
+    mean, std = cv2.meanStdDev(image)
+    return float(mean.mean()), float(std.mean())
+
+
+class SettleDetector:
+    """컨트롤을 쓴 뒤 프레임 통계가 안정됐는지 판정한다.
+
+    연속한 프레임의 평균/표준편차 차이가 ``tolerance`` (DN, 또는 값의
+    ``rel_tolerance`` 배 중 큰 것) 이하로 ``stable`` 번 이어지면 안정이다.
+    단, 쓰기 전(``baseline``)과 달라진 것이 보이지 않았다면 ``latency``
+    프레임이 지나기 전에는 안정으로 보지 않는다 — 컨트롤이 아직 반영되지
+    않은 프레임일 수 있다. ``latency`` 가 ``None`` 이면 ``max_frames`` 까지
+    기다린다. ``max_frames`` 가 지나면 :attr:`timed_out` 으로 끝낸다.
+    """
+
+    def __init__(
+        self,
+        tolerance: float = 0.5,
+        rel_tolerance: float = 0.005,
+        stable: int = 2,
+        max_frames: int = 30,
+        latency: int | None = None,
+    ) -> None:
+        """허용 차이, 필요한 연속 안정 횟수, 최대 프레임 수, 컨트롤 지연(프레임)을 받는다."""
+        self.tolerance = tolerance
+        self.rel_tolerance = rel_tolerance
+        self.stable = max(int(stable), 1)
+        self.max_frames = max_frames
+        self.latency = latency
+        self.reset()
+
+    def reset(self, baseline: tuple[float, float] | None = None) -> None:
+        """새 점을 시작한다. ``baseline`` 은 쓰기 직전 프레임 통계."""
+        self.baseline = baseline
+        self.frames = 0
+        self.first_change: int | None = None
+        self.timed_out = False
+        self._prev: tuple[float, float] | None = None
+        self._run = 0
+
+    def similar(self, a: tuple[float, float], b: tuple[float, float]) -> bool:
+        """두 프레임 통계가 허용 차이 안인지."""
+        return all(
+            abs(x - y) <= max(self.tolerance, self.rel_tolerance * abs(y))
+            for x, y in zip(a, b)
+        )
+
+    def update(self, stats: tuple[float, float]) -> bool:
+        """프레임 통계 하나를 넣고 안정됐으면 ``True``."""
+        self.frames += 1
+        if (
+            self.first_change is None
+            and self.baseline is not None
+            and not self.similar(stats, self.baseline)
+        ):
+            self.first_change = self.frames
+        if self._prev is not None and self.similar(stats, self._prev):
+            self._run += 1
+        else:
+            self._run = 0
+        self._prev = stats
+        if self.frames >= self.max_frames:
+            self.timed_out = True
+            return True
+        if self._run < self.stable:
+            return False
+        if self.first_change is not None or self.baseline is None:
+            return True
+        wait = self.max_frames if self.latency is None else self.latency
+        return self.frames > wait
+
+
+@dataclass
+class SweepResult:
+    """스윕 점 하나의 결과.
+
+    ``metrics`` 는 안정된 프레임들의 지표 평균, ``settle_frames`` 는 안정까지
+    본 프레임 수, ``settled`` 는 시간 초과 없이 안정됐는지다. 파라미터
+    쓰기가 실패하면 ``error`` 에 메시지를 담고 지표는 비워 둔다.
+    """
+
+    camera: Hashable
+    index: int
+    params: dict[str, float]
+    settle_frames: int = 0
+    settled: bool = True
+    frames: int = 0
+    luma: float = float("nan")
+    metrics: dict[str, float] = field(default_factory=dict)
+    elapsed: float = 0.0
+    error: str | None = None
+
+    def row(self) -> dict[str, Any]:
+        """표 한 행. 파라미터와 지표를 펼친다."""
+        row = {"camera": self.camera, "index": self.index}
+        row.update(self.params)
+        row.update(
+            settle_frames=self.settle_frames,
+            settled=self.settled,
+            frames=self.frames,
+            luma=self.luma,
+            elapsed=self.elapsed,
+        )
+        row.update(self.metrics)
+        row["error"] = self.error or ""
+        return row
+
+
+class SweepTable:
+    """스윕 결과를 모으는 표. :meth:`append` 를 스윕 콜백으로 쓴다."""
+
+    def __init__(self) -> None:
+        self.results: list[SweepResult] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    def append(self, result: SweepResult) -> None:
+        with self._lock:
+            self.results.append(result)
+
+    def rows(self) -> list[dict[str, Any]]:
+        with self._lock:
+            return [r.row() for r in self.results]
+
+    def best(
+        self, metric: str, camera: Hashable = None, maximize: bool = True
+    ) -> SweepResult | None:
+        """``metric`` 이 가장 좋은 점. ``camera`` 를 주면 그 카메라만 본다."""
+        with self._lock:
+            scored = [
+                r
+                for r in self.results
+                if metric in r.metrics
+                and np.isfinite(r.metrics[metric])
+                and (camera is None or r.camera == camera)
+            ]
+        if not scored:
+            return None
+        pick = max if maximize else min
+        return pick(scored, key=lambda r: r.metrics[metric])
+
+    def write_csv(self, path: str) -> None:
+        rows = self.rows()
+        columns: list[str] = []
+        for row in rows:
+            columns.extend(k for k in row if k not in columns)
+        with open(path, "w", newline="", encoding="utf-8") as fp:
+            writer = csv.DictWriter(fp, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+class CameraTarget:
+    """``CameraDevice`` 또는 ``VideoCapture`` 호환 객체에 읽기/쓰기를 맞춘다.
+
+    마지막으로 쓴 값을 기억해 바뀐 파라미터만 쓰고, 장치 쓰기(``writes``)와
+    읽은 프레임(``frames``) 수를 센다.
+    """
+
+    def __init__(self, camera) -> None:
+        self.camera = camera
+        self.current: dict[str, float] = {}
+        self.writes = 0
+        self.frames = 0
+
+    def read(self) -> np.ndarray | None:
+        camera = self.camera
+        self.frames += 1
+        if hasattr(camera, "read_frame"):
+            return camera.read_frame()
+        ret, frame = camera.read()
+        return frame if ret else None
+
+    def write(self, param_id: str, value) -> None:
+        capture = getattr(self.camera, "cap", self.camera)
+        self.writes += 1
+        set_param(capture, param_id, value)
+
+    def apply(self, params: Mapping[str, float]) -> list[str]:
+        """앞서 쓴 값과 다른 파라미터만 쓰고 쓴 파라미터들을 돌려준다.
+
+        실패하면 기억한 값을 버린다.
+        """
+        written = []
+        try:
+            for param_id, value in params.items():
+                if self.current.get(param_id) != value:
+                    self.write(param_id, value)
+                    self.current[param_id] = value
+                    written.append(param_id)
+        except (KeyError, RuntimeError):
+            # 쓰기 상태를 모르게 됐으므로 다음에 모두 다시 쓴다.
+            self.current.clear()
+            raise
+        return written
+
+
+def capture_settled(
+    target: CameraTarget,
+    detector: SettleDetector,
+    baseline: tuple[float, float] | None,
+    count: int,
+) -> list[tuple[np.ndarray, tuple[float, float]]] | None:
+    """안정될 때까지 읽고, 안정된 프레임 ``count`` 장과 그 통계를 돌려준다.
+
+    안정 판정에 쓴 마지막 프레임들은 이미 안정된 프레임이므로 다시 쓰고
+    모자란 만큼만 더 읽는다. 프레임을 못 읽으면 ``None``.
+    """
+    detector.reset(baseline)
+    recent: deque[tuple[np.ndarray, tuple[float, float]]] = deque(
+        maxlen=min(count, detector.stable + 1)
+    )
+    while True:
+        frame = target.read()
+        if frame is None:
+            return None
+        stats = frame_stats(frame)
+        if recent and not detector.similar(stats, recent[-1][1]):
+            recent.clear()
+        recent.append((frame, stats))
+        if detector.update(stats):
+            break
+    kept = list(recent)
+    while len(kept) < count:
+        frame = target.read()
+        if frame is None:
+            break
+        kept.append((frame, frame_stats(frame)))
+    return kept
+
+
+class ParamSweep:
+    """파라미터 점 목록을 카메라(들)에 적용하며 지표를 잰다.
+
+    ``metrics`` 는 점마다 계산할 프레임 지표, ``frames_per_point`` 는 평균할
+    프레임 수다. 안정 판정 설정은 :class:`SettleDetector` 와 같다.
+    ``learn_latency`` 면 밝기가 바뀐 점들에서 본 가장 긴 반영 지연을
+    기억해, 바뀌지 않는 점에서는 그만큼만 기다린다.
+
+    ``latency_table`` (:class:`~cam_tuner_gui.control.latency.LatencyTable`)
+    을 주면 ``latency`` 가 없을 때 카메라 키로 쌓인 지연을 처음부터 쓰고,
+    점마다 본 반영 지연을 쓴 파라미터별로 다시 쌓는다.
+    """
+
+    def __init__(
+        self,
+        points: Sequence[Mapping[str, float]],
+        frames_per_point: int = 3,
+        metrics: Iterable[str] = ("snr", "mtf50", "lapvar"),
+        tolerance: float = 0.5,
+        rel_tolerance: float = 0.005,
+        stable: int = 2,
+        max_settle_frames: int = 30,
+        latency: int | None = None,
+        learn_latency: bool = True,
+        latency_table: LatencyTable | None = None,
+    ) -> None:
+        """스윕할 점, 점당 프레임 수, 지표, 안정 판정 설정, 지연 표를 받는다."""
+        self.points = [dict(p) for p in points]
+        self.frames_per_point = max(int(frames_per_point), 1)
+        self.metrics = tuple(metrics)
+        unknown = [m for m in self.metrics if m not in FRAME_METRICS]
+        if unknown:
+            raise ValueError(f"Not frame metrics: {', '.join(unknown)}")
+        self.tolerance = tolerance
+        self.rel_tolerance = rel_tolerance
+        self.stable = stable
+        self.max_settle_frames = max_settle_frames
+        self.latency = latency
+        self.learn_latency = learn_latency
+        self.latency_table = latency_table
+        self._cancel = threading.Event()
+
+    def cancel(self) -> None:
+        """진행 중인 스윕을 현재 점이 끝나면 멈춘다."""
+        self._cancel.set()
+
+    def run(
+        self,
+        cameras: Mapping[Hashable, Any],
+        callback: Callable[[SweepResult], None] | None = None,
+    ) -> list[SweepResult]:
+        """모든 카메라에서 병렬로 스윕한다. 결과는 카메라, 점 순서."""
+        self._cancel.clear()
+        results: dict[Hashable, list[SweepResult]] = {}
+        errors: list[BaseException] = []
+
+        def worker(key: Hashable, camera) -> None:
+            try:
+                results[key] = self.run_camera(key, camera, callback)
+            except BaseException as exc:  # noqa: BLE001 - 호출 스레드에서 다시 낸다
+                errors.append(exc)
+                self._cancel.set()
+
+        threads = [
+            threading.Thread(target=worker, args=(key, cam), name=f"sweep-{key}", daemon=True)
+            for key, cam in cameras.items()
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+        return [r for key in cameras for r in results.get(key, [])]
+
+    def run_camera(
+        self,
+        key: Hashable,
+        camera,
+        callback: Callable[[SweepResult], None] | None = None,
+    ) -> list[SweepResult]:
+        """카메라 하나에서 점들을 차례로 잰다."""
+        target = CameraTarget(camera)
+        engine = MetricEngine(self.metrics)
+        detector = SettleDetector(
+            self.tolerance,
+            self.rel_tolerance,
+            self.stable,
+            self.max_settle_frames,
+            self.latency,
+        )
+        table = self.latency_table
+        if table is not None and detector.latency is None:
+            detector.latency = table.hint(key, {p for point in self.points for p in point})
+        results = []
+        last = target.read()
+        for index, point in enumerate(self.points):
+            if self._cancel.is_set():
+                break
+            start = time.monotonic()
+            result = SweepResult(key, index, dict(point))
+            baseline = frame_stats(last) if last is not None else None
+            try:
+                written = target.apply(point)
+            except (KeyError, RuntimeError) as exc:
+                result.error = str(exc)
+            else:
+                frame = self._measure(target, engine, detector, baseline, result)
+                if frame is not None:
+                    last = frame
+                if table is not None and detector.first_change is not None:
+                    for param_id in written:
+                        table.record(key, param_id, detector.first_change)
+            result.elapsed = time.monotonic() - start
+            results.append(result)
+            if callback is not None:
+                callback(result)
+        return results
+
+    def _measure(
+        self,
+        target: CameraTarget,
+        engine: MetricEngine,
+        detector: SettleDetector,
+        baseline: tuple[float, float] | None,
+        result: SweepResult,
+    ) -> np.ndarray | None:
+        kept = capture_settled(target, detector, baseline, self.frames_per_point)
+        if kept is None:
+            result.error = "no frame"
+            return None
+        result.settle_frames = detector.frames
+        result.settled = not detector.timed_out
+        if self.learn_latency and detector.first_change is not None:
+            detector.latency = max(detector.latency or 0, detector.first_change)
+
+        frames = [f for f, _ in kept]
+        sums: dict[str, list[float]] = {name: [] for name in self.metrics}
+        for image in frames:
+            values = engine.compute(image, key=result.camera, observe=False).as_dict()
+            for name, value in values.items():
+                sums[name].append(value)
+        result.frames = len(frames)
+        result.luma = float(np.mean([stats[0] for _, stats in kept]))
+        result.metrics = {
+            name: float(np.mean(vals)) for name, vals in sums.items() if vals
+        }
+        return frames[-1]
@@ -0,0 +1,182 @@
+"""장치 파라미터를 GUI 스레드 밖에서 쓰는 비동기 쓰기 워커.
+
+슬라이더를 끌면 ``valueChanged`` 가 수백 번 오고, UVC 장치의 컨트롤
+쓰기는 한 번에 수 ms 씩 막힐 수 있다. :class:`ParamWriter` 는 장치마다
+스레드 하나를 두고
+
+- 파라미터별로 아직 쓰지 않은 값을 하나만 남긴다 (마지막 값이 이긴다),
+- 같은 파라미터는 앞선 쓰기가 끝나고 ``settle`` 초가 지나야 다시 쓴다,
+- ``after`` 로 지정한 파라미터의 밀린 쓰기가 끝난 뒤에 쓴다 (프리셋의 의존 순서),
+- 쓰기 결과(성공/예외)를 ``callback(param_id, value, error)`` 로 알린다.
+
+콜백은 워커 스레드에서 불리므로 Qt 위젯을 바로 건드리면 안 된다
+(:class:`~cam_tuner_gui.ui.param_bridge.ParamBridge` 참고).
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Mapping
+
+from cam_tuner_gui.control.params import set_param
+
+
+__all__ = ["DEFAULT_SETTLE", "ParamWriter"]
+
+# 컨트롤 값은 빨라도 다음 프레임부터 반영되므로 기본 간격은 30 fps 한 프레임.
+DEFAULT_SETTLE = 1 / 30
+
+WriteCallback = Callable[[str, Any, "Exception | None"], None]
+
+
+class ParamWriter:
+    """한 장치의 파라미터 쓰기를 모아 별도 스레드에서 순서대로 쓴다.
+
+    ``settle`` 은 같은 파라미터를 다시 쓰기 전 기다릴 시간(초)이다.
+    파라미터마다 다르면 ``{param_id: 초}`` 로 주고, 빠진 파라미터는
+    :data:`DEFAULT_SETTLE` 을 쓴다. 스레드는 처음 :meth:`write` 할 때 띄운다.
+
+    :attr:`written_at` 은 파라미터별로 마지막 쓰기가 끝난 시각
+    (``time.monotonic()``)이다. 콜백보다 먼저 갱신되므로 콜백에서 반영 지연
+    측정(:mod:`cam_tuner_gui.control.latency`)의 기준 시각으로 쓸 수 있다.
+    """
+
+    def __init__(
+        self,
+        capture,
+        settle: float | Mapping[str, float] = DEFAULT_SETTLE,
+        callback: WriteCallback | None = None,
+    ) -> None:
+        """대상 캡처, 파라미터별 안정화 시간, 결과 콜백을 받는다."""
+        self.capture = capture
+        self.settle = settle
+        self.callback = callback
+        self.submitted = 0
+        self.written = 0
+        self.coalesced = 0
+        self.failed = 0
+        self.written_at: dict[str, float] = {}
+        self._pending: dict[str, Any] = {}
+        self._ready_at: dict[str, float] = {}
+        self._after: dict[str, str] = {}
+        self._busy = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+
+    def settle_time(self, param_id: str) -> float:
+        if isinstance(self.settle, Mapping):
+            return self.settle.get(param_id, DEFAULT_SETTLE)
+        return self.settle
+
+    @property
+    def pending(self) -> dict[str, Any]:
+        """아직 쓰지 않은 값들의 사본."""
+        with self._cond:
+            return dict(self._pending)
+
+    def write(self, param_id: str, value, after: str | None = None) -> None:
+        """``param_id`` 에 ``value`` 쓰기를 예약한다. 밀린 같은 파라미터 값은 버린다.
+
+        ``after`` 를 주면 그 파라미터의 밀린 쓰기가 끝난
+        뒤에 쓴다. 밀린 값을 덮어쓸 때 ``after`` 가 없으면 앞선 순서를 지킨다.
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("ParamWriter is closed")
+            if param_id in self._pending:
+                self.coalesced += 1
+            else:
+                self._after.pop(param_id, None)
+            if after is not None and after != param_id:
+                self._after[param_id] = after
+            self._pending[param_id] = value
+            self.submitted += 1
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="ParamWriter", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify_all()
+
+    def cancel(self) -> None:
+        """밀린 쓰기를 모두 버린다. 진행 중인 쓰기는 끝까지 한다."""
+        with self._cond:
+            self._pending.clear()
+            self._after.clear()
+            self._cond.notify_all()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """밀린 쓰기가 모두 끝날 때까지 기다린다. 시간 안에 끝나면 ``True``."""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self._pending and not self._busy, timeout
+            )
+
+    def close(self, timeout: float = 2.0) -> None:
+        """밀린 쓰기를 버리고 워커 스레드를 멈춘다."""
+        with self._cond:
+            self._closed = True
+            self._pending.clear()
+            self._after.clear()
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def __enter__(self) -> "ParamWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _next(self) -> tuple[str, Any] | None:
+        # 조건 변수를 잡은 채 불린다. 쓸 수 있는 파라미터가 생길 때까지 기다린다.
+        while not self._closed:
+            if not self._pending:
+                self._cond.wait()
+                continue
+            # 쓰기는 이 스레드 하나가 하므로 앞선 파라미터가 밀려 있지 않으면 끝난 것이다.
+            ready = [p for p in self._pending if self._after.get(p) not in self._pending]
+            if not ready:  # 순환 의존은 무시한다.
+                ready = list(self._pending)
+            now = time.monotonic()
+            param_id = min(ready, key=lambda p: self._ready_at.get(p, 0.0))
+            delay = self._ready_at.get(param_id, 0.0) - now
+            if delay > 0:
+                self._cond.wait(delay)
+                continue
+            self._busy = True
+            self._after.pop(param_id, None)
+            return param_id, self._pending.pop(param_id)
+        return None
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                item = self._next()
+            if item is None:
+                return
+            param_id, value = item
+            error = None
+            try:
+                set_param(self.capture, param_id, value)
+            except Exception as exc:  # noqa: BLE001 - 호출자에게 전달한다
+                error = exc
+            done = time.monotonic()
+            with self._cond:
+                self._ready_at[param_id] = done + self.settle_time(param_id)
+                if error is None:
+                    self.written += 1
+                    self.written_at[param_id] = done
+                else:
+                    self.failed += 1
+            if self.callback is not None:
+                try:
+                    self.callback(param_id, value, error)
+                except Exception:  # noqa: BLE001 - 콜백 오류로 워커가 멈추지 않게
+                    pass
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
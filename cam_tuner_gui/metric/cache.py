@@ -0,0 +1,149 @@
+"""프레임 내용 기준 지표 결과 캐시.
+
+같은 프레임을 여러 번 분석하는 경우(정지 장면, 멈춘 스트림, 리포트와
+CSV 를 연달아 저장, 녹화 재분석)에 다시 계산하지 않도록 지표 값을
+``(프레임 식별자, 지표 이름, 구현 버전, 파라미터)`` 로 저장한다. 구현 버전은
+지표 코드가 바뀌어 값이 달라질 때 올리는 번호로, 디스크에 남은 예전 값을
+다시 쓰지 않게 한다.
+
+프레임 식별자는 그레이 영상의 SHA-1 다이제스트(:func:`frame_digest`)
+또는 호출자가 주는 캡처 시퀀스 ID 다. 지표는 모두 그레이 영상에서
+계산하므로 그레이가 같으면 결과도 같다. 메모리 계층은 바이트 크기로
+제한되는 LRU 이고, ``path`` 를 주면 디스크 계층에도 남겨 오프라인 배치
+분석을 다시 돌릴 때 재사용한다. 시퀀스 ID 는 실행마다 달라지므로 디스크
+계층은 다이제스트(``bytes``) 식별자만 읽고 쓴다.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+import hashlib
+import os
+from pathlib import Path
+import pickle
+import threading
+from typing import Any, Hashable
+
+import numpy as np
+
+from cam_tuner_gui.util import atomic_write
+
+
+# 키와 OrderedDict 항목이 차지하는 대략의 고정 크기.
+_ENTRY_OVERHEAD = 128
+
+
+def frame_digest(gray: np.ndarray) -> bytes:
+    """그레이 영상의 모양과 픽셀로 만든 다이제스트."""
+    data = np.ascontiguousarray(gray)
+    h = hashlib.sha1(usedforsecurity=False)
+    h.update(repr((data.shape, data.dtype.str)).encode())
+    h.update(data.data)
+    return h.digest()
+
+
+class MetricCache:
+    """바이트 크기로 제한되는 LRU 지표 캐시. 선택적으로 디스크 계층을 둔다.
+
+    ``max_bytes`` 는 메모리 계층 값들의 pickle 크기 합 상한이다.
+    ``path`` 디렉터리의 디스크 계층은 크기 제한 없이 쌓이며, 여러 프로세스가
+    같은 디렉터리를 써도 되도록 파일을 원자적으로 바꿔 쓴다. 캡처 시퀀스
+    ID 는 실행마다 달라지므로 디스크 계층에는 내용 다이제스트(``bytes``)
+    식별자만 남기고, 다른 식별자는 메모리 계층에만 둔다.
+    """
+
+    def __init__(
+        self, max_bytes: int = 16 << 20, path: str | os.PathLike | None = None
+    ) -> None:
+        """메모리 계층 상한(바이트)과 디스크 계층 디렉터리를 받아 초기화."""
+        self.max_bytes = int(max_bytes)
+        self.path = Path(path) if path is not None else None
+        if self.path is not None:
+            self.path.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        """메모리 계층이 차지하는 대략의 바이트 수."""
+        return self._bytes
+
+    def _file(self, key: Hashable) -> Path:
+        name = hashlib.sha1(repr(key).encode(), usedforsecurity=False).hexdigest()
+        return self.path / name[:2] / f"{name[2:]}.pkl"
+
+    def _on_disk(self, ident: Hashable) -> bool:
+        return self.path is not None and isinstance(ident, bytes)
+
+    def get(
+        self, ident: Hashable, name: str, params: Hashable = (), version: Hashable = 0
+    ) -> Any | None:
+        """저장된 값. 없으면 ``None``."""
+        key = (ident, name, version, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+        if self._on_disk(ident):
+            try:
+                data = self._file(key).read_bytes()
+            except OSError:
+                pass
+            else:
+                value = pickle.loads(data)
+                self._remember(key, value, len(data))
+                with self._lock:
+                    self.hits += 1
+                return value
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(
+        self,
+        ident: Hashable,
+        name: str,
+        value: Any,
+        params: Hashable = (),
+        version: Hashable = 0,
+    ) -> None:
+        """값을 저장한다. 디스크 계층이 있고 ``ident`` 가 다이제스트면 파일로도 남긴다."""
+        key = (ident, name, version, params)
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self._remember(key, value, len(data))
+        if self._on_disk(ident):
+            self._write(self._file(key), data)
+
+    def _remember(self, key: Hashable, value: Any, size: int) -> None:
+        size += _ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+
+    @staticmethod
+    def _write(path: Path, data: bytes) -> None:
+        # 캐시는 다시 계산할 수 있으므로 fsync 하지 않는다.
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(path, data, sync=False)
+
+    def clear(self) -> None:
+        """메모리 계층을 비운다. 디스크 계층은 그대로 둔다."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
@@ -0,0 +1,431 @@
+"""한 번의 그레이 변환으로 여러 지표를 계산하는 지표 엔진.
+
+:class:`FrameContext` 는 프레임 하나에서 지표들이 공유하는 중간 결과
+(그레이, float32 그레이, 라플라시안, 피라미드 단계, ROI)를
+처음 필요할 때 한 번만 만든다. :class:`MetricEngine` 은 요청한 지표를
+지표별 :class:`Tier` (전체 해상도/피라미드 단계/ROI 목록) 에서 계산하고,
+카메라별 :class:`~cam_tuner_gui.metric.flicker.FlickerAnalyzer` 로 플리커를
+계산해 :class:`MetricResult` 로 돌려준다. :class:`~cam_tuner_gui.metric.cache.MetricCache`
+를 주면 같은 프레임의 프레임 지표는 다시 계산하지 않는다.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Callable, Hashable, Iterable, Mapping
+
+import cv2
+import numpy as np
+
+from cam_tuner_gui.metric.blur import blur_width
+from cam_tuner_gui.metric.cache import MetricCache, frame_digest
+from cam_tuner_gui.metric.flicker import FlickerAnalyzer, band_means
+from cam_tuner_gui.metric.sfr import Roi, SlantedEdgeSFR, slanted_edge_mtf50
+
+
+FULL = "full"
+PYRAMID = "pyramid"
+ROI = "roi"
+
+
+@dataclass(frozen=True)
+class Tier:
+    """지표를 계산할 해상도 단계.
+
+    ``full`` 은 원본 해상도(정확값), ``pyramid`` 는 ``level`` 번 절반으로 줄인
+    영상(근사값), ``roi`` 는 원본 해상도의 ``rois`` 영역들(정확값)이다.
+    """
+
+    kind: str = FULL
+    level: int = 0
+    rois: tuple[Roi, ...] = ()
+
+    @classmethod
+    def full(cls) -> Tier:
+        return cls()
+
+    @classmethod
+    def pyramid(cls, level: int) -> Tier:
+        if level < 1:
+            raise ValueError("pyramid level must be >= 1")
+        return cls(PYRAMID, int(level))
+
+    @classmethod
+    def from_rois(cls, rois: Iterable[Roi]) -> Tier:
+        rois = tuple(tuple(int(v) for v in roi) for roi in rois)
+        if not rois:
+            raise ValueError("rois must not be empty")
+        return cls(ROI, rois=rois)
+
+    @property
+    def label(self) -> str:
+        """결과에 붙는 짧은 이름 (``full``, ``pyr1``, ``roi3`` 등)."""
+        if self.kind == PYRAMID:
+            return f"pyr{self.level}"
+        if self.kind == ROI:
+            return f"roi{len(self.rois)}"
+        return FULL
+
+    @property
+    def exact(self) -> bool:
+        """원본 해상도 값인지 여부."""
+        return self.kind != PYRAMID
+
+
+FULL_TIER = Tier()
+
+
+class FrameContext:
+    """프레임 하나와 지표들이 공유하는 중간 결과를 지연 계산해 보관한다."""
+
+    __slots__ = (
+        "image",
+        "ident",
+        "_digest",
+        "_gray",
+        "_gray_f32",
+        "_laplacian",
+        "_mean",
+        "_levels",
+        "_crops",
+    )
+
+    def __init__(self, image: np.ndarray, ident: Hashable = None) -> None:
+        """프레임과 선택적인 식별자(예: ``(카메라, 캡처 시퀀스)``)를 받는다."""
+        self.image = image
+        self.ident = ident
+        self._digest: bytes | None = None
+        self._gray: np.ndarray | None = None
+        self._gray_f32: np.ndarray | None = None
+        self._laplacian: np.ndarray | None = None
+        self._mean: float | None = None
+        self._levels: list[FrameContext] | None = None
+        self._crops: dict[Roi, FrameContext] | None = None
+
+    @property
+    def gray(self) -> np.ndarray:
+        """uint8 그레이 영상. 입력이 이미 단일 채널이면 그대로 쓴다."""
+        if self._gray is None:
+            image = self.image
+            if image.ndim == 2:
+                self._gray = image
+            else:
+                self._gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        return self._gray
+
+    @property
+    def gray_f32(self) -> np.ndarray:
+        if self._gray_f32 is None:
+            self._gray_f32 = self.gray.astype(np.float32)
+        return self._gray_f32
+
+    @property
+    def laplacian(self) -> np.ndarray:
+        """float64 라플라시안 응답."""
+        if self._laplacian is None:
+            self._laplacian = cv2.Laplacian(self.gray, cv2.CV_64F)
+        return self._laplacian
+
+    @property
+    def mean(self) -> float:
+        """그레이 평균 밝기."""
+        if self._mean is None:
+            self._mean = float(self.gray.mean())
+        return self._mean
+
+    @property
+    def digest(self) -> Hashable:
+        """캐시 키로 쓰는 프레임 식별자. ``ident`` 가 없으면 그레이 영상 다이제스트."""
+        if self.ident is not None:
+            return self.ident
+        if self._digest is None:
+            self._digest = frame_digest(self.gray)
+        return self._digest
+
+    def level(self, n: int) -> FrameContext:
+        """``n`` 번째 피라미드 단계의 컨텍스트. 각 단계는 프레임당 한 번만 만든다."""
+        if n == 0:
+            return self
+        if self._levels is None:
+            self._levels = []
+        while len(self._levels) < n:
+            parent = self._levels[-1] if self._levels else self
+            self._levels.append(FrameContext(cv2.pyrDown(parent.gray)))
+        return self._levels[n - 1]
+
+    def crop(self, roi: Roi) -> FrameContext:
+        """그레이 영상의 ``roi`` (x, y, w, h) 영역 컨텍스트."""
+        if self._crops is None:
+            self._crops = {}
+        ctx = self._crops.get(roi)
+        if ctx is None:
+            x, y, w, h = roi
+            ctx = self._crops[roi] = FrameContext(self.gray[y : y + h, x : x + w])
+        return ctx
+
+
+# 지표 커널 -------------------------------------------------------------------
+
+
+def mtf50(ctx: FrameContext) -> float:
+    """전체 영상의 slanted-edge MTF50 (cycles/pixel). 에지가 없으면 0."""
+    return slanted_edge_mtf50(ctx.gray)
+
+
+def snr(ctx: FrameContext) -> float:
+    """평균/표준편차 기반 SNR (dB)."""
+    data = ctx.gray_f32
+    mean = float(data.mean())
+    std = float(data.std())
+    if std == 0:
+        return float("inf")
+    return float(20 * np.log10(mean / (std + 1e-8)))
+
+
+def lapvar(ctx: FrameContext) -> float:
+    """라플라시안 분산 샤프니스."""
+    return float(ctx.laplacian.var())
+
+
+def motion_blur(ctx: FrameContext) -> float:
+    """여러 스캔라인의 10–90% 에지 전이 폭 중앙값 (px)."""
+    return blur_width(ctx.gray)
+
+
+def flicker_from_means(means) -> float:
+    """프레임별 평균 밝기 시퀀스에서 플리커율을 계산한다."""
+    if len(means) == 0:
+        return 0.0
+    means = np.asarray(means, dtype=np.float64)
+    diffs = np.abs(np.diff(means))
+    if diffs.size == 0:
+        return 0.0
+    return float(diffs.mean() / (means.mean() + 1e-8) * 100)
+
+
+FRAME_METRICS: dict[str, Callable[[FrameContext], float]] = {
+    "mtf50": mtf50,
+    "snr": snr,
+    "lapvar": lapvar,
+    "motion_blur": motion_blur,
+}
+STREAM_METRICS = ("flicker", "delta_l")
+METRIC_NAMES = tuple(FRAME_METRICS) + STREAM_METRICS
+
+# 프레임 지표 구현 버전. 같은 입력에 다른 값을 내도록 바뀌면 올린다.
+# :class:`MetricCache` 키에 들어가 디스크 캐시의 예전 값을 무효로 만든다.
+METRIC_VERSIONS = {"mtf50": 2, "snr": 1, "lapvar": 1, "motion_blur": 1}
+
+# 피라미드 단계 값을 원본 픽셀 단위로 되돌리는 지수 (값 × 2^(level·지수)).
+# 주파수는 해상도에 반비례하고 폭은 비례한다. 나머지는 근사값 그대로 쓴다.
+_PYRAMID_SCALE = {"mtf50": -1, "motion_blur": 1}
+
+# 축소해도 위 단위 보정 뒤 원본 값의 추세를 따르는 기하 지표. 라이브
+# 미리보기는 이 지표를 pyr1 에서 근사해 ``pyr1`` 로 표시한다. 선명한 에지일수록
+# 덜 선명하게 나오므로(합성 차트에서 MTF50 은 최대 30%, 흐림 폭은 최대 55%)
+# 임계값 판정은 정확값(:attr:`Tier.exact`)에만 한다. SNR 과 라플라시안 분산은
+# 축소가 노이즈를 평균해 값 자체가 달라지므로(SNR +10 dB, 분산 1/4~1/20)
+# 넣지 않는다.
+SCALE_INVARIANT: tuple[str, ...] = ("mtf50", "motion_blur")
+
+
+def exact_label(label: str) -> bool:
+    """:attr:`Tier.label` 이 원본 해상도 값(전체/ROI)의 이름인지."""
+    return not label.startswith("pyr")
+
+
+def measure(
+    name: str, ctx: FrameContext, tier: Tier = FULL_TIER
+) -> tuple[float, tuple[float, ...]]:
+    """프레임 지표 하나를 ``tier`` 에서 계산해 (대표값, ROI별 값) 을 반환한다.
+
+    ROI 단계의 대표값은 ROI별 값의 평균이다.
+    """
+    kernel = FRAME_METRICS[name]
+    if tier.kind == ROI:
+        values = tuple(kernel(ctx.crop(roi)) for roi in tier.rois)
+        return float(np.mean(values)), values
+    if tier.kind == PYRAMID:
+        scale = 2.0 ** (tier.level * _PYRAMID_SCALE.get(name, 0))
+        return kernel(ctx.level(tier.level)) * scale, ()
+    return kernel(ctx), ()
+
+
+@dataclass
+class MetricResult:
+    """지표 계산 결과. 계산하지 않은 지표는 ``None``.
+
+    ``tiers`` 는 지표별로 값이 계산된 단계의 :attr:`Tier.label`,
+    ``per_roi`` 는 ROI 단계 지표의 ROI별 값, ``ages`` 는 스케줄러가 채우는
+    값의 나이(몇 프레임 전에 계산했는지, 0 이면 이번 프레임)다.
+    """
+
+    mtf50: float | None = None
+    snr: float | None = None
+    lapvar: float | None = None
+    motion_blur: float | None = None
+    flicker: float | None = None
+    delta_l: float | None = None
+    tiers: dict[str, str] = field(default_factory=dict)
+    per_roi: dict[str, tuple[float, ...]] = field(default_factory=dict)
+    ages: dict[str, int] = field(default_factory=dict)
+
+    def as_dict(self) -> dict[str, float]:
+        """계산된 지표만 이름→값 딕셔너리로 반환한다."""
+        return {
+            name: getattr(self, name)
+            for name in METRIC_NAMES
+            if getattr(self, name) is not None
+        }
+
+
+class MetricEngine:
+    """요청한 지표를 공유 중간 결과 위에서 한 번에 계산한다.
+
+    플리커는 프레임 하나로 정해지지 않으므로 ``key`` (카메라 등) 별로
+    :class:`FlickerAnalyzer` 에 평균 밝기만 넣어 계산한다. 프레임 자체를
+    버퍼에 들고 있거나 매번 다시 변환하지 않는다. ``flicker_bands`` > 1 이면
+    행 밴드별 평균도 넣어 롤링 셔터 밴딩을 추적한다.
+
+    ``tier`` 는 모든 프레임 지표에 쓸 :class:`Tier` 또는 지표 이름→Tier
+    매핑이다 (빠진 지표는 전체 해상도). 라이브 미리보기는 피라미드 단계로
+    싸게, 스냅샷/리포트는 ``compute(tier=FULL_TIER)`` 로 정확하게 계산한다.
+
+    MTF50 은 ``roi`` (x, y, w, h; ``None`` 이면 전체) 의 slanted-edge 로
+    측정하며, 에지 기하 정보는 ``key`` 별로 캐시한다.
+
+    ``cache`` 를 주면 프레임 지표 값을 :attr:`FrameContext.digest` 와 단계로
+    캐시한다. 플리커처럼 이력에 의존하는 지표는 캐시하지 않는다.
+    """
+
+    def __init__(
+        self,
+        metrics: Iterable[str] = METRIC_NAMES,
+        flicker_window: int = 10,
+        roi: Roi | None = None,
+        flicker_history: int = 1024,
+        flicker_bands: int = 1,
+        fps: float = 30.0,
+        tier: Tier | Mapping[str, Tier] = FULL_TIER,
+        cache: MetricCache | None = None,
+    ) -> None:
+        """계산할 지표 이름 목록, 플리커 창/이력 길이(프레임)와 밴드 수, MTF ROI, 기본 단계, 결과 캐시를 받아 초기화."""
+        self.metrics = self._validate(metrics)
+        self.flicker_window = flicker_window
+        self.flicker_history = flicker_history
+        self.flicker_bands = flicker_bands
+        self.fps = fps
+        self.roi = roi
+        self.tier = tier
+        self.cache = cache
+        self.sfr = SlantedEdgeSFR()
+        self._flicker: dict[Hashable, FlickerAnalyzer] = {}
+
+    @staticmethod
+    def _validate(metrics: Iterable[str]) -> tuple[str, ...]:
+        names = tuple(metrics)
+        unknown = [n for n in names if n not in METRIC_NAMES]
+        if unknown:
+            raise ValueError(f"Unknown metrics: {', '.join(unknown)}")
+        return names
+
+    @staticmethod
+    def _tier_for(name: str, tier: Tier | Mapping[str, Tier]) -> Tier:
+        if isinstance(tier, Tier):
+            return tier
+        return tier.get(name, FULL_TIER)
+
+    def flicker_analyzer(self, key: Hashable = None) -> FlickerAnalyzer:
+        """``key`` 의 플리커 분석기. 없으면 만든다."""
+        analyzer = self._flicker.get(key)
+        if analyzer is None:
+            analyzer = self._flicker[key] = FlickerAnalyzer(
+                self.flicker_window, self.flicker_history, self.fps, self.flicker_bands
+            )
+        return analyzer
+
+    def observe(
+        self, frame, key: Hashable = None, timestamp: float | None = None
+    ) -> FrameContext:
+        """프레임의 평균 밝기를 ``key`` 의 플리커 분석기에 추가한다."""
+        ctx = frame if isinstance(frame, FrameContext) else FrameContext(frame)
+        analyzer = self.flicker_analyzer(key)
+        bands = band_means(ctx.gray, analyzer.bands) if analyzer.bands > 1 else None
+        analyzer.update(ctx.mean, bands, timestamp)
+        return ctx
+
+    def flicker(self, key: Hashable = None) -> float:
+        """``key`` 의 최근 창에서 계산한 플리커율."""
+        analyzer = self._flicker.get(key)
+        return analyzer.rate if analyzer is not None else 0.0
+
+    def _mtf50(self, ctx: FrameContext, tier: Tier, key: Hashable):
+        # slanted-edge 는 ROI 별 에지 기하 캐시를 쓰므로 커널 대신 여기서 계산한다.
+        if tier.kind == ROI:
+            values = tuple(self.sfr.mtf50(ctx.gray, roi, key) for roi in tier.rois)
+            return float(np.mean(values)), values
+        roi = self.roi
+        if tier.kind == PYRAMID:
+            scale = 2**tier.level
+            if roi is not None:
+                roi = tuple(v // scale for v in roi)
+            return self.sfr.mtf50(ctx.level(tier.level).gray, roi, key) / scale, ()
+        return self.sfr.mtf50(ctx.gray, roi, key), ()
+
+    def _measure(self, name: str, ctx: FrameContext, tier: Tier, key: Hashable):
+        cache = self.cache
+        if cache is not None:
+            params = (tier, self.roi) if name == "mtf50" else tier
+            version = METRIC_VERSIONS.get(name, 0)
+            cached = cache.get(ctx.digest, name, params, version)
+            if cached is not None:
+                return cached
+        if name == "mtf50":
+            measured = self._mtf50(ctx, tier, key)
+        else:
+            measured = measure(name, ctx, tier)
+        if cache is not None:
+            cache.put(ctx.digest, name, measured, params, version)
+        return measured
+
+    def compute(
+        self,
+        frame,
+        key: Hashable = None,
+        metrics: Iterable[str] | None = None,
+        observe: bool = True,
+        tier: Tier | Mapping[str, Tier] | None = None,
+    ) -> MetricResult:
+        """프레임(또는 :class:`FrameContext`) 에서 지표를 계산한다.
+
+        ``observe=False`` 면 이미 :meth:`observe` 로 이력에 넣은 프레임으로
+        보고 플리커 이력을 건드리지 않는다. ``tier`` 를 주면 이번 호출에서만
+        기본 단계를 대신한다.
+        """
+        names = self.metrics if metrics is None else self._validate(metrics)
+        tiers = self.tier if tier is None else tier
+        ctx = frame if isinstance(frame, FrameContext) else FrameContext(frame)
+        if observe and any(n in STREAM_METRICS for n in names):
+            self.observe(ctx, key)
+        result = MetricResult()
+        for name in names:
+            if name == "flicker":
+                result.flicker = self.flicker(key)
+                result.tiers[name] = FULL
+                continue
+            if name == "delta_l":
+                result.delta_l = self.flicker_analyzer(key).delta_l
+                result.tiers[name] = FULL
+                continue
+            t = self._tier_for(name, tiers)
+            value, per_roi = self._measure(name, ctx, t, key)
+            setattr(result, name, value)
+            result.tiers[name] = t.label
+            if per_roi:
+                result.per_roi[name] = per_roi
+        return result
+
+    def reset(self, key: Hashable = None) -> None:
+        """``key`` 의 플리커 이력과 에지 기하 캐시를 비운다."""
+        self._flicker.pop(key, None)
+        self.sfr.invalidate(key)
@@ -0,0 +1,220 @@
+"""프레임 평균 밝기만으로 플리커를 추적하는 스트리밍 분석기.
+
+:class:`FlickerAnalyzer` 는 프레임마다 평균 밝기(선택적으로 행 밴드별
+평균)만 받아 고정 크기 numpy 링에 넣고, 짧은 창의 통계는 누적 합과
+단조 덱으로 O(1) 에 갱신한다. 프레임은 보관하지 않으므로 메모리는
+``history`` 길이로 고정되고, 긴 창의 스펙트럼으로 지배 주파수와
+전원(50/60 Hz) 에일리어싱을 추정한다.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+
+MAINS_FREQUENCIES = (50.0, 60.0)
+
+
+def band_means(gray: np.ndarray, bands: int) -> np.ndarray:
+    """그레이 영상을 위아래 ``bands`` 개 행 밴드로 나눈 평균 밝기."""
+    if bands <= 1:
+        return np.array([cv2.mean(gray)[0]])
+    resized = cv2.resize(gray, (1, bands), interpolation=cv2.INTER_AREA)
+    return resized.ravel().astype(np.float64)
+
+
+def alias_frequency(freq: float, fps: float) -> float:
+    """``freq`` Hz 신호를 ``fps`` 로 샘플링했을 때 보이는 주파수 (0..fps/2)."""
+    folded = freq % fps
+    return min(folded, fps - folded)
+
+
+@dataclass
+class FlickerSpectrum:
+    """평균 밝기 시계열의 스펙트럼 분석 결과.
+
+    ``dominant_hz`` 는 DC 를 뺀 최대 파워 주파수(샘플링 후 보이는 값),
+    ``strength`` 는 그 성분이 AC 파워에서 차지하는 비율, ``mains_hz`` 는
+    지배 주파수를 에일리어싱으로 설명하는 전원 주파수(없으면 ``None``)다.
+    """
+
+    freq: np.ndarray
+    power: np.ndarray
+    fps: float
+    dominant_hz: float
+    strength: float
+    mains_hz: float | None
+
+
+class FlickerAnalyzer:
+    """평균 밝기 스트림에서 플리커 지표를 O(1) 로 갱신한다.
+
+    ``window`` 프레임 창에 대해
+
+    - :attr:`rate`: 평균 |ΔL| / 평균 밝기 × 100 (기존 ``detect_flicker`` 와 같음)
+    - :attr:`delta_l`: README 의 ΔL = (Lmax − Lmin)/(Lmax + Lmin) × 100
+
+    을, ``history`` 프레임 창에 대해 :meth:`spectrum` 을 제공한다.
+    ``bands`` > 1 이면 행 밴드별 평균도 받아 롤링 셔터 밴딩(:attr:`banding`)을
+    계산한다.
+    """
+
+    def __init__(
+        self, window: int = 10, history: int = 1024, fps: float = 30.0, bands: int = 1
+    ) -> None:
+        """짧은 창/긴 창 길이(프레임)와 공칭 FPS, 행 밴드 수를 받아 초기화."""
+        if window < 1:
+            raise ValueError("window must be >= 1")
+        self.window = int(window)
+        self.history = max(int(history), self.window)
+        self.nominal_fps = float(fps)
+        self.bands = max(int(bands), 1)
+        self.count = 0
+        self._means = np.zeros(self.history)
+        self._stamps = np.full(self.history, np.nan)
+        self._bands = np.zeros((self.history, self.bands)) if self.bands > 1 else None
+        self._band_sum = np.zeros(self.bands)
+        self._sum_mean = 0.0
+        self._sum_diff = 0.0
+        self._max: deque[tuple[int, float]] = deque()
+        self._min: deque[tuple[int, float]] = deque()
+
+    def reset(self) -> None:
+        """이력을 모두 비운다."""
+        self.__init__(self.window, self.history, self.nominal_fps, self.bands)
+
+    def update(
+        self,
+        mean: float,
+        bands: np.ndarray | None = None,
+        timestamp: float | None = None,
+    ) -> None:
+        """새 프레임의 평균 밝기(및 밴드 평균, 캡처 시각)를 추가한다."""
+        n = self.count
+        h = self.history
+        w = self.window
+        mean = float(mean)
+        pos = n % h
+        if n >= w:
+            old = (n - w) % h
+            self._sum_mean -= self._means[old]
+            if w > 1:
+                self._sum_diff -= abs(self._means[(old + 1) % h] - self._means[old])
+        if n >= h and self._bands is not None:
+            self._band_sum -= self._bands[pos]
+        self._sum_mean += mean
+        if n > 0 and w > 1:
+            self._sum_diff += abs(mean - self._means[(n - 1) % h])
+        self._means[pos] = mean
+        self._stamps[pos] = np.nan if timestamp is None else timestamp
+        if self._bands is not None:
+            values = np.full(self.bands, mean) if bands is None else bands
+            self._bands[pos] = values
+            self._band_sum += self._bands[pos]
+
+        # 창 안의 최댓값/최솟값을 단조 덱으로 유지한다.
+        while self._max and self._max[-1][1] <= mean:
+            self._max.pop()
+        self._max.append((n, mean))
+        while self._min and self._min[-1][1] >= mean:
+            self._min.pop()
+        self._min.append((n, mean))
+        for dq in (self._max, self._min):
+            if dq[0][0] <= n - w:
+                dq.popleft()
+
+        self.count = n + 1
+        if pos == h - 1:
+            self._resync()
+
+    def _resync(self) -> None:
+        # 누적 합의 부동소수 오차가 쌓이지 않도록 링이 한 바퀴 돌 때마다 다시 합한다.
+        recent = self._recent(self.window)
+        self._sum_mean = float(recent.sum())
+        self._sum_diff = float(np.abs(np.diff(recent)).sum())
+        if self._bands is not None:
+            self._band_sum = self._bands[: min(self.count, self.history)].sum(axis=0)
+
+    def _recent(self, n: int) -> np.ndarray:
+        """최근 ``n`` 프레임의 평균 밝기를 시간순으로."""
+        n = min(n, self.count, self.history)
+        end = self.count % self.history
+        idx = np.arange(end - n, end) % self.history
+        return self._means[idx]
+
+    # 짧은 창 지표 --------------------------------------------------------------
+
+    @property
+    def rate(self) -> float:
+        """창 안의 평균 |ΔL| / 평균 밝기 × 100."""
+        n = min(self.count, self.window)
+        if n < 2:
+            return 0.0
+        return float((self._sum_diff / (n - 1)) / (self._sum_mean / n + 1e-8) * 100)
+
+    @property
+    def delta_l(self) -> float:
+        """창 안의 (Lmax − Lmin)/(Lmax + Lmin) × 100."""
+        if self.count == 0:
+            return 0.0
+        high = self._max[0][1]
+        low = self._min[0][1]
+        if high + low <= 0:
+            return 0.0
+        return (high - low) / (high + low) * 100
+
+    @property
+    def banding(self) -> float:
+        """최신 프레임의 밴드 간 ΔL (%). 장면 자체의 밝기 분포는 밴드별 장기 평균으로 나눠 없앤다."""
+        if self._bands is None or self.count == 0:
+            return 0.0
+        filled = min(self.count, self.history)
+        baseline = self._band_sum / filled
+        latest = self._bands[(self.count - 1) % self.history]
+        ratio = latest / np.maximum(baseline, 1e-8)
+        high, low = float(ratio.max()), float(ratio.min())
+        return (high - low) / (high + low) * 100
+
+    # 긴 창 스펙트럼 ------------------------------------------------------------
+
+    @property
+    def fps(self) -> float:
+        """타임스탬프가 있으면 실측 FPS, 없으면 공칭 FPS."""
+        n = min(self.count, self.history)
+        if n >= 2:
+            end = self.count % self.history
+            first = self._stamps[(end - n) % self.history]
+            last = self._stamps[(end - 1) % self.history]
+            if np.isfinite(first) and np.isfinite(last) and last > first:
+                return (n - 1) / (last - first)
+        return self.nominal_fps
+
+    def spectrum(self, min_frames: int = 32) -> FlickerSpectrum | None:
+        """최근 ``history`` 프레임의 밝기 스펙트럼. 프레임이 부족하면 ``None``."""
+        n = min(self.count, self.history)
+        if n < min_frames:
+            return None
+        series = self._recent(n)
+        series = (series - series.mean()) * np.hanning(n)
+        power = np.abs(np.fft.rfft(series)) ** 2
+        fps = self.fps
+        freq = np.fft.rfftfreq(n, d=1.0 / fps)
+        ac = power[1:]
+        total = float(ac.sum())
+        if total <= 0:
+            return FlickerSpectrum(freq, power, fps, 0.0, 0.0, None)
+        k = int(np.argmax(ac)) + 1
+        dominant = float(freq[k])
+        # 한 빈의 해상도 안에서 전원 주파수의 에일리어스와 맞는지 본다.
+        resolution = 1.5 * fps / n
+        mains = None
+        best = resolution
+        for hz in MAINS_FREQUENCIES:
+            error = abs(alias_frequency(2 * hz, fps) - dominant)
+            if error <= best:
+                mains, best = hz, error
+        return FlickerSpectrum(freq, power, fps, dominant, float(ac[k - 1]) / total, mains)
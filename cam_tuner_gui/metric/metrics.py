@@ -1,84 +1,67 @@
-"""영상 품질 지표 계산 모듈."""
+"""영상 품질 지표 계산 모듈.
+
+각 함수는 프레임 하나만 분석하는 간단한 API 이다. ``tier`` 로 전체 해상도
+대신 피라미드 단계나 ROI 목록에서 계산할 수 있다
+(:class:`~cam_tuner_gui.metric.engine.Tier`). 여러 지표를 함께 계산할
+때는 그레이 변환 등 중간 결과를 공유하는
+:class:`~cam_tuner_gui.metric.engine.MetricEngine` 을 쓴다.
+"""
 
 from __future__ import annotations
 
-import numpy as np
-import cv2
+from cam_tuner_gui.metric.blur import BlurEstimate, estimate_blur
+from cam_tuner_gui.metric.engine import (
+    FULL_TIER,
+    FrameContext,
+    Tier,
+    flicker_from_means,
+    measure,
+)
+
+__all__ = [
+    "calc_mtf50",
+    "calc_snr",
+    "detect_flicker",
+    "flicker_from_means",
+    "calc_lapvar",
+    "calc_motion_blur_width",
+    "calc_motion_blur_profile",
+]
+
 
-def calc_mtf50(image) -> float:
+def calc_mtf50(image, tier: Tier = FULL_TIER) -> float:
     """이미지로부터 MTF50을 계산한다.
 
     Notes
     -----
-    이 함수는 간단한 FFT 기반 방식으로 이미지를 분석하여
-    50% Modulation Transfer Frequency를 추정한다. 정확도는
-    전문 라이브러리 대비 낮을 수 있지만 의존성을 최소화하기
-    위한 구현이다.
+    영상 전체를 ROI 로 하는 ISO 12233 slanted-edge 방식으로
+    50% Modulation Transfer Frequency(cycles/pixel)를 구한다.
+    에지가 없으면 0을 반환한다. ROI 지정과 기하 정보 캐시는
+    :mod:`cam_tuner_gui.metric.sfr` 를 직접 쓴다.
     """
+    return measure("mtf50", FrameContext(image), tier)[0]
 
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    row = gray[gray.shape[0] // 2].astype(np.float32)
-    row -= row.mean()
-    spec = np.abs(np.fft.rfft(row))
-    if spec.size == 0:
-        return 0.0
-    max_val = spec.max()
-    if max_val == 0:
-        return 0.0
-    spec /= max_val
-    idx = np.searchsorted(spec, 0.5)
-    if idx >= spec.size:
-        idx = spec.size - 1
-    return float(idx / len(row))
-
-def calc_snr(image) -> float:
+
+def calc_snr(image, tier: Tier = FULL_TIER) -> float:
     """이미지의 신호 대 잡음비(SNR)를 계산한다."""
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    data = gray.astype(np.float32)
-    mean = float(data.mean())
-    std = float(data.std())
-    if std == 0:
-        return float("inf")
-    snr = 20 * np.log10(mean / (std + 1e-8))
-    return float(snr)
+    return measure("snr", FrameContext(image), tier)[0]
+
 
 def detect_flicker(frames) -> float:
     """프레임 시퀀스에서 플리커율을 계산한다."""
-    if not frames:
-        return 0.0
+    return flicker_from_means([FrameContext(img).mean for img in frames])
 
-    means = []
-    for img in frames:
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        means.append(float(gray.mean()))
 
-    diffs = np.abs(np.diff(means))
-    flicker = diffs.mean() / (np.mean(means) + 1e-8) * 100
-    return float(flicker)
+def calc_lapvar(image, tier: Tier = FULL_TIER) -> float:
+    """라플라시안 분산을 이용한 샤프니스 지표."""
+    return measure("lapvar", FrameContext(image), tier)[0]
 
 
-def calc_lapvar(image) -> float:
-    """라플라시안 분산을 이용한 샤프니스 지표."""
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    lap = cv2.Laplacian(gray, cv2.CV_64F)
-    return float(lap.var())
-
-
-def calc_motion_blur_width(image) -> float:
-    """간단한 에지 전이 폭 기반 모션 블러 추정."""
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    row = gray[gray.shape[0] // 2].astype(np.float32)
-    row_blur = cv2.GaussianBlur(row.reshape(1, -1), (9, 1), 0).ravel()
-    grad = np.abs(np.gradient(row_blur))
-    if grad.max() == 0:
-        return 0.0
-    peak = np.argmax(grad)
-    thresh = grad.max() * 0.1
-    left = peak
-    while left > 0 and grad[left] > thresh:
-        left -= 1
-    right = peak
-    while right < len(grad) - 1 and grad[right] > thresh:
-        right += 1
-    width = right - left
-    return float(width)
+def calc_motion_blur_width(image, tier: Tier = FULL_TIER) -> float:
+    """여러 스캔라인의 10–90% 에지 전이 폭 중앙값(px)으로 모션 블러를 추정한다."""
+    return measure("motion_blur", FrameContext(image), tier)[0]
+
+
+def calc_motion_blur_profile(image) -> BlurEstimate:
+    """스캔라인별 에지 전이 폭 분포 (중앙값, 백분위, 에지를 찾은 비율)."""
+    return estimate_blur(FrameContext(image).gray)
@@ -0,0 +1,217 @@
+"""프레임 시간 예산 안에서 지표 계산을 나눠 돌리는 스케줄러.
+
+:class:`MetricScheduler` 는 지표별 계산 시간을 지수 이동 평균으로 재고,
+프레임당 예산(프레임 간격 × ``budget_fraction``) 안에 평균 비용이 들어오도록
+지표마다 실행 주기(몇 프레임에 한 번)를 정한다. 싼 지표는 매 프레임,
+비싼 지표는 N 프레임마다 돌고, 이번 프레임에 계산하지 않은 값은 이전 값을
+그대로 쓰되 :attr:`MetricResult.ages` 에 몇 프레임 전 값인지 기록한다.
+
+해상도가 바뀌면 비용을 픽셀 수 비율로 다시 어림하고, FPS 는 프레임
+타임스탬프로 추정해 예산을 자동으로 맞춘다.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from typing import Hashable
+
+from cam_tuner_gui.metric.engine import (
+    FRAME_METRICS,
+    FrameContext,
+    MetricEngine,
+    MetricResult,
+    STREAM_METRICS,
+    Tier,
+)
+
+
+class _KeyState:
+    """카메라(``key``) 하나의 스케줄 상태."""
+
+    __slots__ = (
+        "index",
+        "costs",
+        "last_run",
+        "values",
+        "tiers",
+        "per_roi",
+        "pixels",
+        "tier",
+        "fps",
+        "stamp",
+    )
+
+    def __init__(self) -> None:
+        self.index = 0
+        self.costs: dict[str, float] = {}
+        self.last_run: dict[str, int] = {}
+        self.values: dict[str, float] = {}
+        self.tiers: dict[str, str] = {}
+        self.per_roi: dict[str, tuple[float, ...]] = {}
+        self.pixels = 0
+        self.tier = None
+        self.fps: float | None = None
+        self.stamp: float | None = None
+
+
+class MetricScheduler:
+    """지표 엔진을 프레임당 시간 예산에 맞춰 돌린다.
+
+    ``budget`` (초) 을 주면 그 값을, 아니면 ``budget_fraction / fps`` 를
+    프레임당 예산으로 쓴다. ``fps`` 는 :meth:`step` 에 타임스탬프를 넘기면
+    실측값으로 바뀐다.
+    """
+
+    def __init__(
+        self,
+        engine: MetricEngine,
+        budget: float | None = None,
+        fps: float = 30.0,
+        budget_fraction: float = 0.5,
+        alpha: float = 0.2,
+        max_period: int = 120,
+    ) -> None:
+        """엔진과 프레임 예산(초, 또는 FPS 대비 비율), 비용 평균 계수를 받아 초기화."""
+        self.engine = engine
+        self.fixed_budget = budget
+        self.fps = fps
+        self.budget_fraction = budget_fraction
+        self.alpha = alpha
+        self.max_period = max_period
+        self._states: dict[Hashable, _KeyState] = {}
+
+    def _state(self, key: Hashable) -> _KeyState:
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = _KeyState()
+        return state
+
+    def budget(self, key: Hashable = None) -> float:
+        """``key`` 의 프레임당 지표 예산(초)."""
+        if self.fixed_budget is not None:
+            return self.fixed_budget
+        state = self._states.get(key)
+        fps = state.fps if state is not None and state.fps else self.fps
+        return self.budget_fraction / fps
+
+    def costs(self, key: Hashable = None) -> dict[str, float]:
+        """지표별 평균 계산 시간(초)."""
+        return dict(self._state(key).costs)
+
+    def periods(self, key: Hashable = None) -> dict[str, int]:
+        """지표별 실행 주기(프레임). 비용이 먼저 측정되어야 한다."""
+        state = self._state(key)
+        names = [n for n in self.engine.metrics if n in FRAME_METRICS]
+        return self._periods(names, state.costs, self.budget(key))
+
+    def _periods(self, names, costs: dict[str, float], budget: float) -> dict[str, int]:
+        # 싼 지표부터 남은 예산을 남은 지표 수로 나눈 몫을 배정한다. 몫보다 싼
+        # 지표는 매 프레임 돌고 남긴 예산은 비싼 지표 몫으로 넘어간다.
+        periods: dict[str, int] = {}
+        remaining = budget
+        pending = sorted(names, key=lambda n: costs.get(n, 0.0))
+        for i, name in enumerate(pending):
+            cost = costs.get(name)
+            if cost is None:
+                periods[name] = 1
+                continue
+            share = remaining / (len(pending) - i)
+            if share <= 0:
+                period = self.max_period
+            else:
+                period = min(max(1, math.ceil(cost / share)), self.max_period)
+            periods[name] = period
+            remaining -= cost / period
+        return periods
+
+    def _adapt(self, state: _KeyState, ctx: FrameContext, tier, timestamp) -> None:
+        pixels = ctx.image.shape[0] * ctx.image.shape[1]
+        if state.pixels and pixels != state.pixels:
+            # 해상도가 바뀌면 비용이 픽셀 수에 비례한다고 보고 다시 어림한다.
+            ratio = pixels / state.pixels
+            state.costs = {n: c * ratio for n, c in state.costs.items()}
+        state.pixels = pixels
+        if tier != state.tier:
+            # 계산 단계가 바뀌면 비용이 전혀 달라지므로 다시 잰다.
+            state.costs.clear()
+            state.tier = tier
+        if timestamp is not None:
+            if state.stamp is not None and timestamp > state.stamp:
+                fps = 1.0 / (timestamp - state.stamp)
+                if state.fps is None:
+                    state.fps = fps
+                else:
+                    state.fps += self.alpha * (fps - state.fps)
+            state.stamp = timestamp
+
+    def _select(self, state: _KeyState, budget: float) -> list[str]:
+        names = [n for n in self.engine.metrics if n in FRAME_METRICS]
+        periods = self._periods(names, state.costs, budget)
+        due = []
+        for name in names:
+            last = state.last_run.get(name)
+            age = math.inf if last is None else state.index - last
+            if age >= periods[name]:
+                due.append((age / periods[name], name))
+        # 가장 밀린 지표부터 고르되, 예산을 넘으면 다음 프레임으로 미룬다.
+        # 매 프레임 도는 지표와 가장 밀린 지표 하나는 항상 돌린다.
+        due.sort(key=lambda item: (-item[0], state.costs.get(item[1], 0.0)))
+        selected = []
+        spent = 0.0
+        for _, name in due:
+            cost = state.costs.get(name)
+            if cost is None or periods[name] == 1 or not selected or spent + cost <= budget:
+                selected.append(name)
+                spent += cost or 0.0
+        return selected
+
+    def step(
+        self,
+        frame,
+        key: Hashable = None,
+        timestamp: float | None = None,
+        observe: bool = True,
+        tier: Tier | None = None,
+    ) -> MetricResult:
+        """프레임 하나에서 이번 차례인 지표만 계산하고 나머지는 이전 값으로 채운다."""
+        state = self._state(key)
+        ctx = frame if isinstance(frame, FrameContext) else FrameContext(frame)
+        self._adapt(state, ctx, tier, timestamp)
+        engine = self.engine
+        stream = [n for n in engine.metrics if n in STREAM_METRICS]
+        if observe and stream:
+            engine.observe(ctx, key, timestamp)
+
+        for name in self._select(state, self.budget(key)):
+            start = time.perf_counter()
+            partial = engine.compute(ctx, key, metrics=(name,), observe=False, tier=tier)
+            cost = time.perf_counter() - start
+            old = state.costs.get(name)
+            state.costs[name] = cost if old is None else old + self.alpha * (cost - old)
+            state.values[name] = getattr(partial, name)
+            state.tiers[name] = partial.tiers[name]
+            if name in partial.per_roi:
+                state.per_roi[name] = partial.per_roi[name]
+            else:
+                state.per_roi.pop(name, None)
+            state.last_run[name] = state.index
+
+        if stream:
+            result = engine.compute(ctx, key, metrics=stream, observe=False)
+        else:
+            result = MetricResult()
+        for name in stream:
+            result.ages[name] = 0
+        for name, value in state.values.items():
+            setattr(result, name, value)
+            result.tiers[name] = state.tiers[name]
+            result.ages[name] = state.index - state.last_run[name]
+            if name in state.per_roi:
+                result.per_roi[name] = state.per_roi[name]
+        state.index += 1
+        return result
+
+    def reset(self, key: Hashable = None) -> None:
+        """``key`` 의 비용 측정과 이전 값을 버린다."""
+        self._states.pop(key, None)
@@ -0,0 +1,342 @@
+"""프로세스 풀에서 지표를 계산하는 지표 서비스.
+
+GUI 스레드는 :meth:`MetricService.submit` 으로 프레임을 공유 메모리 슬롯에
+복사만 하고 곧바로 돌아간다. 워커 프로세스는 슬롯 이름으로 같은 메모리를
+ndarray 로 열어 계산하므로 픽셀 데이터는 pickle 되지 않는다. 결과는 수집
+스레드가 받아 ``callback(key, tag, timestamp, result, error)`` 로 넘긴다
+(Qt 에서는 :class:`~cam_tuner_gui.ui.metric_bridge.MetricBridge` 가 시그널로
+바꾼다). ``tag`` 는 제출할 때 준 값(보통 캡처 시퀀스)이라 호출자가 제출
+기록을 따로 둘 필요가 없다. 실패하면 ``result`` 는 ``None`` 이고 ``error`` 에
+오류 문자열이 온다.
+
+카메라(``key``)마다 워커 하나와 슬롯 ``slots_per_key`` 개가 정해진다.
+빈 슬롯이 없으면 그 프레임은 버리므로 워커가 밀려도 큐가 끝없이 쌓이지
+않고, 한 카메라가 밀려도 다른 카메라의 슬롯에는 영향이 없다. 워커가
+죽으면 :meth:`MetricService.submit`/:meth:`~MetricService.pending` 에서 알아채
+그 워커의 슬롯을 풀고, 계산 중이던 제출을 오류로 알린 뒤 워커를 다시 띄운다.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+import multiprocessing
+from multiprocessing import shared_memory
+import os
+import threading
+from typing import Any, Callable, Hashable, Iterable
+
+import numpy as np
+
+from cam_tuner_gui.metric.engine import MetricEngine, MetricResult, Tier
+
+
+ResultCallback = Callable[
+    [Hashable, Any, "float | None", "MetricResult | None", "str | None"], None
+]
+
+# 남겨 두는 최근 오류 수.
+MAX_ERRORS = 64
+
+# 워커 하나를 다시 띄우는 최대 횟수. 넘으면 그 워커의 카메라 프레임은 버린다.
+MAX_RESTARTS = 3
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    # spawn 된 워커는 부모의 resource_tracker 를 같이 쓴다. 여기서 unregister 하면
+    # 부모의 등록까지 지워지므로 열기만 하고 수명은 부모(:class:`_Slot`)에 맡긴다.
+    return shared_memory.SharedMemory(name=name)
+
+
+def _worker_main(tasks, results, engine_kwargs: dict) -> None:
+    """워커 프로세스 본체. ``None`` 을 받으면 끝난다."""
+    import cv2
+
+    cv2.setNumThreads(1)
+    engine = MetricEngine(**engine_kwargs)
+    # 슬롯 번호별로 연 공유 메모리. 부모가 슬롯을 키워 이름이 바뀌면 다시 연다.
+    attached: dict[int, shared_memory.SharedMemory] = {}
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        slot, ticket, name, shape, dtype, key, tag, timestamp, tier, metrics = task
+        try:
+            shm = attached.get(slot)
+            if shm is None or shm.name != name:
+                if shm is not None:
+                    shm.close()
+                shm = attached[slot] = _attach(name)
+            image = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+            result = engine.compute(image, key, metrics=metrics, tier=tier)
+            results.put((slot, ticket, key, tag, timestamp, result, None))
+        except Exception as exc:  # 워커는 죽지 않고 오류를 돌려준다.
+            results.put((slot, ticket, key, tag, timestamp, None, repr(exc)))
+    for shm in attached.values():
+        shm.close()
+
+
+class _Slot:
+    """공유 메모리 프레임 슬롯 하나.
+
+    ``ticket`` 은 제출마다 1 씩 올라, 슬롯을 풀고 다시 쓴 뒤에 도착한 이전
+    제출의 결과를 가려낸다. ``task`` 는 계산 중인 제출의 ``(tag, timestamp)``.
+    """
+
+    __slots__ = ("index", "key", "shm", "busy", "ticket", "task")
+
+    def __init__(self, index: int, key: Hashable) -> None:
+        self.index = index
+        self.key = key
+        self.shm: shared_memory.SharedMemory | None = None
+        self.busy = False
+        self.ticket = 0
+        self.task: tuple[Any, float | None] | None = None
+
+    def fit(self, nbytes: int) -> shared_memory.SharedMemory:
+        """``nbytes`` 이상의 공유 메모리를 보장한다. 작으면 새로 만든다."""
+        if self.shm is None or self.shm.size < nbytes:
+            self.free()
+            self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        return self.shm
+
+    def free(self) -> None:
+        if self.shm is not None:
+            self.shm.close()
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+            self.shm = None
+
+
+class MetricService:
+    """공유 메모리로 프레임을 넘겨 워커 프로세스에서 지표를 계산한다.
+
+    ``workers`` 는 워커 프로세스 수(기본: CPU 수, 최대 4)이고, 카메라는
+    처음 들어온 순서대로 워커에 돌아가며 배정된다. 엔진 설정
+    (``metrics``, ``tier`` 등)은 ``engine_kwargs`` 로 워커의
+    :class:`MetricEngine` 에 그대로 전달된다.
+
+    :attr:`errors` 는 최근 :data:`MAX_ERRORS` 개의 오류만, :attr:`failed` 는
+    실패한 제출 수를 센다. :attr:`restarts` 는 다시 띄운 워커 수다.
+    """
+
+    def __init__(
+        self,
+        callback: ResultCallback | None = None,
+        workers: int | None = None,
+        slots_per_key: int = 2,
+        **engine_kwargs,
+    ) -> None:
+        """결과 콜백, 워커 수, 카메라별 슬롯 수, 워커 엔진 설정을 받아 워커를 띄운다."""
+        self.callback = callback
+        self.slots_per_key = max(1, slots_per_key)
+        self.submitted = 0
+        self.dropped = 0
+        self.failed = 0
+        self.restarts = 0
+        self.errors: deque[str] = deque(maxlen=MAX_ERRORS)
+        count = workers or min(os.cpu_count() or 1, 4)
+        # Qt 스레드가 있는 프로세스를 fork 하지 않도록 spawn 으로 띄운다.
+        self._ctx = multiprocessing.get_context("spawn")
+        self._engine_kwargs = engine_kwargs
+        self._results = self._ctx.Queue()
+        self._queues: list = [None] * count
+        self._procs: list = [None] * count
+        self._restarts = [0] * count
+        for i in range(count):
+            self._spawn(i)
+        self._lock = threading.Lock()
+        self._slots: list[_Slot] = []
+        self._by_key: dict[Hashable, list[_Slot]] = {}
+        self._worker_of: dict[Hashable, int] = {}
+        self._seq: dict[Hashable, int] = {}
+        self._closed = False
+        self._collector = threading.Thread(target=self._collect, daemon=True)
+        self._collector.start()
+
+    @property
+    def workers(self) -> int:
+        return len(self._procs)
+
+    def _spawn(self, index: int) -> None:
+        # 죽은 워커의 큐에는 이미 못 받을 작업이 남아 있을 수 있어 큐도 새로 만든다.
+        old = self._queues[index]
+        if old is not None:
+            old.close()
+            old.cancel_join_thread()
+        queue = self._queues[index] = self._ctx.Queue()
+        proc = self._procs[index] = self._ctx.Process(
+            target=_worker_main,
+            args=(queue, self._results, self._engine_kwargs),
+            daemon=True,
+            name=f"metric-worker-{index}",
+        )
+        proc.start()
+
+    def _reap(self) -> list[tuple]:
+        """죽은 워커의 슬롯을 풀고 알릴 오류 목록을 돌려준다. 잠금을 잡은 채 부른다."""
+        failures = []
+        for index, proc in enumerate(self._procs):
+            if proc is None or proc.is_alive():
+                continue
+            error = f"metric worker {index} exited with code {proc.exitcode}"
+            self.errors.append(error)
+            for slot in self._slots:
+                if slot.busy and self._worker_of.get(slot.key) == index:
+                    tag, timestamp = slot.task
+                    slot.busy = False
+                    slot.task = None
+                    self.failed += 1
+                    failures.append((slot.key, tag, timestamp, None, error))
+            proc.join(0)
+            if self._restarts[index] < MAX_RESTARTS:
+                self._restarts[index] += 1
+                self.restarts += 1
+                self._spawn(index)
+            else:
+                self._procs[index] = None
+                self._queues[index].close()
+                self._queues[index].cancel_join_thread()
+                self._queues[index] = None
+        return failures
+
+    def _report(self, failures: list[tuple]) -> None:
+        if self.callback is not None:
+            for failure in failures:
+                self.callback(*failure)
+
+    def _key_slots(self, key: Hashable) -> list[_Slot]:
+        slots = self._by_key.get(key)
+        if slots is None:
+            slots = []
+            for _ in range(self.slots_per_key):
+                slot = _Slot(len(self._slots), key)
+                self._slots.append(slot)
+                slots.append(slot)
+            self._by_key[key] = slots
+            self._worker_of[key] = len(self._worker_of) % len(self._procs)
+        return slots
+
+    def submit(
+        self,
+        frame: np.ndarray,
+        key: Hashable = None,
+        timestamp: float | None = None,
+        tier: Tier | None = None,
+        metrics: Iterable[str] | None = None,
+        tag: Any = None,
+    ) -> bool:
+        """프레임을 빈 슬롯에 복사해 계산을 맡긴다. 빈 슬롯이 없으면 버리고 ``False``.
+
+        ``tag`` 는 결과 콜백에 그대로 돌아온다. 주지 않으면 카메라별 제출
+        일련번호(1 부터)를 쓴다. 워커를 더 띄울 수 없는 카메라도 ``False``.
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("MetricService is closed")
+            failures = self._reap()
+            slots = self._key_slots(key)
+            worker = self._worker_of[key]
+            slot = next((s for s in slots if not s.busy), None)
+            if slot is None or self._procs[worker] is None:
+                self.dropped += 1
+                slot = None
+            else:
+                seq = self._seq.get(key, 0) + 1
+                self._seq[key] = seq
+                if tag is None:
+                    tag = seq
+                slot.busy = True
+                slot.ticket += 1
+                slot.task = (tag, timestamp)
+                ticket = slot.ticket
+                queue = self._queues[worker]
+        self._report(failures)
+        if slot is None:
+            return False
+        try:
+            shm = slot.fit(frame.nbytes)
+            view = np.ndarray(frame.shape, dtype=frame.dtype, buffer=shm.buf)
+            np.copyto(view, frame)
+            del view
+            metrics = tuple(metrics) if metrics is not None else None
+            queue.put(
+                (
+                    slot.index,
+                    ticket,
+                    shm.name,
+                    frame.shape,
+                    frame.dtype.str,
+                    key,
+                    tag,
+                    timestamp,
+                    tier,
+                    metrics,
+                )
+            )
+        except BaseException:
+            # 맡기지 못한 슬롯은 바로 돌려준다.
+            with self._lock:
+                slot.busy = False
+                slot.task = None
+            raise
+        self.submitted += 1
+        return True
+
+    def pending(self, key: Hashable = None) -> int:
+        """``key`` 의 계산 중인 프레임 수."""
+        with self._lock:
+            failures = self._reap() if not self._closed else []
+            count = sum(s.busy for s in self._by_key.get(key, ()))
+        self._report(failures)
+        return count
+
+    def _collect(self) -> None:
+        while True:
+            item = self._results.get()
+            if item is None:
+                return
+            slot_index, ticket, key, tag, timestamp, result, error = item
+            with self._lock:
+                slot = self._slots[slot_index]
+                if slot.ticket != ticket or not slot.busy:
+                    # 죽은 워커로 보고 이미 풀어 준 슬롯의 늦은 결과.
+                    continue
+                slot.busy = False
+                slot.task = None
+                if error is not None:
+                    self.failed += 1
+                    self.errors.append(error)
+            if self.callback is not None:
+                self.callback(key, tag, timestamp, result, error)
+
+    def close(self, timeout: float = 2.0) -> None:
+        """워커를 멈추고 공유 메모리 슬롯을 해제한다."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        queues = [q for q in self._queues if q is not None]
+        for queue in queues:
+            queue.put(None)
+        for proc in self._procs:
+            if proc is None:
+                continue
+            proc.join(timeout)
+            if proc.is_alive():
+                proc.terminate()
+                proc.join(timeout)
+        self._results.put(None)
+        self._collector.join(timeout)
+        for slot in self._slots:
+            slot.free()
+        for queue in queues + [self._results]:
+            queue.close()
+            queue.join_thread()
+
+    def __enter__(self) -> MetricService:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,34 @@
+"""지표별 PASS/FAIL 기준값.
+
+비교 창의 판정과 자동 튜너(:mod:`cam_tuner_gui.control.autotune`)의 제약이
+같은 기준을 쓰도록 한곳에 둔다. :data:`UPPER_BOUNDS` 에 든 지표는 값이
+기준 이하일 때, 나머지는 기준 이상일 때 PASS 다.
+"""
+
+from __future__ import annotations
+
+
+__all__ = ["THRESHOLDS", "UPPER_BOUNDS", "passes"]
+
+# MTF50 은 cycles/pixel 이라 나이퀴스트(0.5)를 넘지 못한다. 0.25 는
+# 나이퀴스트의 절반으로, 선명한 렌즈가 중심부에서 내는 값이다.
+THRESHOLDS = {
+    "mtf50": 0.25,
+    "snr": 20.0,
+    "flicker": 10.0,
+    "lapvar": 50.0,
+    "motion_blur": 5.0,
+}
+
+# 작을수록 좋은 지표 (블러 폭 px, 플리커율 %).
+UPPER_BOUNDS = frozenset({"motion_blur", "flicker"})
+
+
+def passes(name: str, value: float) -> bool:
+    """``value`` 가 ``name`` 지표의 기준을 넘는지. 기준이 없으면 ``True``."""
+    limit = THRESHOLDS.get(name)
+    if limit is None:
+        return True
+    if name in UPPER_BOUNDS:
+        return value <= limit
+    return value >= limit
@@ -0,0 +1,472 @@
+"""색인 파일을 둔 프리셋 디렉터리 저장소와 최소 쓰기 적용.
+
+센서 모델·조명 조건마다 프리셋이 수백 개라 검색할 때마다 JSON 을 모두
+읽을 수는 없다. :class:`PresetLibrary` 는 디렉터리의 ``*.json`` 프리셋마다
+이름·장치 모델·태그·mtime·크기·내용 해시를 ``index.json`` 에 두고 검색은
+색인만 본다. 색인은 열 때 파일의 mtime/크기가 바뀐 것만 다시 읽어 맞춘다.
+프리셋과 색인은 모두 :func:`~cam_tuner_gui.util.atomic_write` 로
+임시 파일에 쓴 뒤 바꿔 넣는다.
+
+:func:`apply` 는 장치의 현재 값을 한 번 읽어 다른 컨트롤만, 의존 순서대로
+쓴다. 예를 들어 노출 시간은 자동 노출이 꺼져 있을 때만 쓸 수 있으므로
+자동 노출을 끄는 프리셋은 자동 노출 → 노출 시간, 켜는 프리셋은 노출 시간 →
+자동 노출 순서로 쓴다. 자동 노출이 계속 켜져 있으면 노출 시간은 쓰지 않는다.
+쓰기 없이 순서만 정하는 :func:`plan` 은 GUI 가 쓰기 워커로 넘길 때 쓴다.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import hashlib
+import json
+import math
+import os
+from pathlib import Path
+import re
+import threading
+from typing import Any, Iterable, Mapping
+
+from cam_tuner_gui.control.caps import ControlDescriptor, DeviceKey
+from cam_tuner_gui.control.params import get_param, set_param
+from cam_tuner_gui.util import atomic_write
+
+
+__all__ = [
+    "APPLY_ORDER",
+    "DEPENDENCIES",
+    "ApplyResult",
+    "IndexEntry",
+    "Preset",
+    "PresetLibrary",
+    "apply",
+    "device_model",
+    "diff",
+    "plan",
+    "read_state",
+]
+
+INDEX_NAME = "index.json"
+INDEX_VERSION = 1
+
+# 자동 노출 메뉴 값 (V4L2: 1 = 수동, 3 = 조리개 우선).
+MANUAL_EXPOSURE = 1
+
+# 쓰기 순서. 다른 컨트롤을 좌우하는 컨트롤이 앞에 온다. 없는 이름은 뒤에 이름순.
+APPLY_ORDER = ("auto_exposure", "exposure_abs", "gain", "gamma", "contrast")
+
+# 파라미터 → (좌우하는 컨트롤, 그 컨트롤이 이 값일 때만 쓸 수 있다).
+DEPENDENCIES: dict[str, tuple[str, float]] = {
+    "exposure_abs": ("auto_exposure", MANUAL_EXPOSURE),
+}
+
+
+def device_model(key) -> str:
+    """장치 키(:class:`~cam_tuner_gui.control.caps.DeviceKey` 또는 장치 ID)의 모델 이름.
+
+    USB 장치는 시리얼을 뺀 ``vid:pid`` 라 같은 모델의 카메라끼리 프리셋을 나눈다.
+    """
+    if isinstance(key, DeviceKey):
+        return f"{key.vid}:{key.pid}"
+    return "" if key is None else str(key)
+
+
+@dataclass
+class Preset:
+    """이름 붙은 파라미터 묶음과 검색용 메타데이터."""
+
+    name: str
+    params: dict[str, float]
+    device: str = ""
+    tags: tuple[str, ...] = ()
+    description: str = ""
+
+    def to_json(self) -> bytes:
+        data = {
+            "name": self.name,
+            "device": self.device,
+            "tags": list(self.tags),
+            "description": self.description,
+            "params": self.params,
+        }
+        return json.dumps(data, indent=2, ensure_ascii=False, sort_keys=True).encode("utf-8")
+
+    @classmethod
+    def from_json(cls, data: bytes | str, name: str = "") -> Preset:
+        """JSON 에서 만든다. 예전 ``save_json`` 형식(파라미터만 있는 딕셔너리)도 읽는다."""
+        obj = json.loads(data)
+        if not isinstance(obj, dict):
+            raise ValueError("preset must be a JSON object")
+        if not isinstance(obj.get("params"), dict):
+            return cls(name, dict(obj))
+        return cls(
+            obj.get("name") or name,
+            dict(obj["params"]),
+            obj.get("device", ""),
+            tuple(obj.get("tags", ())),
+            obj.get("description", ""),
+        )
+
+
+@dataclass(frozen=True)
+class IndexEntry:
+    """색인 한 줄. ``hash`` 는 파일 내용의 SHA-256."""
+
+    name: str
+    file: str
+    device: str = ""
+    tags: tuple[str, ...] = ()
+    mtime: float = 0.0
+    size: int = 0
+    hash: str = ""
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "device": self.device,
+            "tags": list(self.tags),
+            "mtime": self.mtime,
+            "size": self.size,
+            "hash": self.hash,
+        }
+
+    @classmethod
+    def from_dict(cls, file: str, data: Mapping[str, Any]) -> IndexEntry:
+        return cls(
+            data["name"],
+            file,
+            data.get("device", ""),
+            tuple(data.get("tags", ())),
+            float(data.get("mtime", 0.0)),
+            int(data.get("size", 0)),
+            data.get("hash", ""),
+        )
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^0-9A-Za-z._-]+", "_", name).strip("._") or "preset"
+
+
+class PresetLibrary:
+    """프리셋 디렉터리와 그 색인.
+
+    ``parsed`` 는 색인을 맞추느라 실제로 읽은 프리셋 파일 수다. 같은
+    디렉터리를 여러 프로세스가 쓰면 마지막 색인 쓰기가 이기지만, 다음에
+    열 때 mtime/크기 비교로 다시 맞춰진다.
+    """
+
+    def __init__(self, root: str | os.PathLike) -> None:
+        """프리셋 디렉터리를 받는다. 없으면 처음 저장할 때 만든다."""
+        self.root = Path(root)
+        self.parsed = 0
+        self._entries: dict[str, IndexEntry] | None = None
+        self._lock = threading.RLock()
+
+    @property
+    def index_path(self) -> Path:
+        return self.root / INDEX_NAME
+
+    # 색인 ----------------------------------------------------------------------
+
+    def _read_index(self) -> dict[str, IndexEntry]:
+        try:
+            data = json.loads(self.index_path.read_bytes())
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != INDEX_VERSION:
+            return {}
+        entries = {}
+        for file, entry in data.get("presets", {}).items():
+            try:
+                entries[file] = IndexEntry.from_dict(file, entry)
+            except (KeyError, TypeError, ValueError):
+                continue
+        return entries
+
+    def _write_index(self) -> None:
+        data = {
+            "version": INDEX_VERSION,
+            "presets": {f: e.to_dict() for f, e in sorted(self._entries.items())},
+        }
+        atomic_write(self.index_path, json.dumps(data, indent=1, ensure_ascii=False).encode("utf-8"))
+
+    def _scan(self, path: Path, stat: os.stat_result) -> IndexEntry | None:
+        try:
+            data = path.read_bytes()
+            preset = Preset.from_json(data, path.stem)
+        except (OSError, ValueError):
+            return None
+        self.parsed += 1
+        return IndexEntry(
+            preset.name,
+            path.name,
+            preset.device,
+            preset.tags,
+            stat.st_mtime,
+            stat.st_size,
+            hashlib.sha256(data).hexdigest(),
+        )
+
+    def refresh(self) -> dict[str, IndexEntry]:
+        """색인을 디렉터리와 맞춘다. mtime/크기가 같은 파일은 다시 읽지 않는다."""
+        with self._lock:
+            if not self.root.is_dir():
+                self._entries = {}
+                return {}
+            old = self._read_index() if self._entries is None else self._entries
+            entries = {}
+            for path in sorted(self.root.glob("*.json")):
+                if path.name == INDEX_NAME:
+                    continue
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                entry = old.get(path.name)
+                if entry is None or entry.mtime != stat.st_mtime or entry.size != stat.st_size:
+                    entry = self._scan(path, stat)
+                if entry is not None:
+                    entries[path.name] = entry
+            changed = entries != old or not self.index_path.exists()
+            self._entries = entries
+            if changed:
+                self._write_index()
+            return dict(entries)
+
+    def _index(self) -> dict[str, IndexEntry]:
+        if self._entries is None:
+            self.refresh()
+        return self._entries
+
+    def entries(self) -> list[IndexEntry]:
+        with self._lock:
+            return sorted(self._index().values(), key=lambda e: e.name)
+
+    def names(self) -> list[str]:
+        return [e.name for e in self.entries()]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._index())
+
+    def __contains__(self, name: str) -> bool:
+        return self._find(name) is not None
+
+    def _find(self, name: str) -> IndexEntry | None:
+        with self._lock:
+            for entry in self._index().values():
+                if entry.name == name:
+                    return entry
+        return None
+
+    def search(
+        self,
+        device: str | None = None,
+        tags: Iterable[str] = (),
+        text: str | None = None,
+    ) -> list[IndexEntry]:
+        """색인만 보고 찾는다. ``tags`` 는 모두 있어야 하고 ``text`` 는 이름 부분 일치."""
+        tags = set(tags)
+        text = text.lower() if text else None
+        return [
+            e
+            for e in self.entries()
+            if (device is None or e.device == device)
+            and tags <= set(e.tags)
+            and (text is None or text in e.name.lower())
+        ]
+
+    # 프리셋 --------------------------------------------------------------------
+
+    def _file_for(self, name: str) -> str:
+        entry = self._find(name)
+        if entry is not None:
+            return entry.file
+        taken = set(self._index())
+        stem = _slug(name)
+        file, n = f"{stem}.json", 2
+        while file in taken or file == INDEX_NAME:
+            file, n = f"{stem}-{n}.json", n + 1
+        return file
+
+    def save(self, preset: Preset) -> IndexEntry:
+        """프리셋을 저장한다. 같은 이름이 있으면 덮어쓴다."""
+        data = preset.to_json()
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            file = self._file_for(preset.name)
+            path = self.root / file
+            atomic_write(path, data)
+            stat = path.stat()
+            entry = IndexEntry(
+                preset.name,
+                file,
+                preset.device,
+                tuple(preset.tags),
+                stat.st_mtime,
+                stat.st_size,
+                hashlib.sha256(data).hexdigest(),
+            )
+            self._index()[file] = entry
+            self._write_index()
+        return entry
+
+    def load(self, name: str) -> Preset:
+        entry = self._find(name)
+        if entry is None:
+            raise KeyError(f"Unknown preset: {name}")
+        return Preset.from_json((self.root / entry.file).read_bytes(), name)
+
+    def delete(self, name: str) -> None:
+        with self._lock:
+            entry = self._find(name)
+            if entry is None:
+                raise KeyError(f"Unknown preset: {name}")
+            try:
+                os.unlink(self.root / entry.file)
+            except FileNotFoundError:
+                pass
+            del self._index()[entry.file]
+            self._write_index()
+
+    def diff(self, a: str, b: str) -> dict[str, tuple[Any, Any]]:
+        """두 프리셋의 파라미터 차이. 내용 해시가 같으면 읽지 않는다."""
+        ea, eb = self._find(a), self._find(b)
+        if ea is not None and eb is not None and ea.hash == eb.hash:
+            return {}
+        return diff(self.load(a), self.load(b))
+
+
+def _same(a, b) -> bool:
+    try:
+        return math.isclose(float(a), float(b), abs_tol=1e-6)
+    except (TypeError, ValueError):
+        return a == b
+
+
+def diff(a: Preset | Mapping[str, Any], b: Preset | Mapping[str, Any]) -> dict[str, tuple[Any, Any]]:
+    """파라미터별 ``(a 값, b 값)``. 한쪽에만 있으면 다른 쪽은 ``None``."""
+    pa = a.params if isinstance(a, Preset) else a
+    pb = b.params if isinstance(b, Preset) else b
+    return {
+        name: (pa.get(name), pb.get(name))
+        for name in sorted(set(pa) | set(pb))
+        if name not in pa or name not in pb or not _same(pa[name], pb[name])
+    }
+
+
+@dataclass
+class ApplyResult:
+    """:func:`plan`/:func:`apply` 결과. ``writes`` 는 쓸(쓴) 순서대로의 (파라미터, 값)."""
+
+    writes: list[tuple[str, Any]] = field(default_factory=list)
+    unchanged: list[str] = field(default_factory=list)
+    skipped: list[str] = field(default_factory=list)
+    errors: dict[str, Exception] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+def read_state(device, params: Iterable[str]) -> dict[str, float]:
+    """장치(``CameraDevice`` 또는 캡처)에서 ``params`` 의 현재 값을 한 번씩 읽는다."""
+    capture = getattr(device, "cap", device)
+    state = {}
+    for param_id in params:
+        try:
+            state[param_id] = get_param(capture, param_id)
+        except KeyError:
+            continue
+    return state
+
+
+def _rank(param_id: str) -> tuple[int, str]:
+    if param_id in APPLY_ORDER:
+        return APPLY_ORDER.index(param_id), ""
+    return len(APPLY_ORDER), param_id
+
+
+def plan(
+    preset: Preset | Mapping[str, Any],
+    device,
+    current: Mapping[str, Any] | None = None,
+    controls: Mapping[str, ControlDescriptor] | None = None,
+) -> ApplyResult:
+    """장치 현재 값과 다른 파라미터를 의존 순서대로 고른다. 장치에 쓰지는 않는다.
+
+    돌려준 ``writes`` 는 이 순서대로 써야 하는 (파라미터, 값)이다. ``current``
+    를 주면 장치를 읽지 않고 그 값을 현재 상태로 본다. ``controls``
+    (:func:`~cam_tuner_gui.control.caps.describe_controls`)를 주면 장치에
+    없거나 읽기 전용인 컨트롤은 ``skipped`` 에 넣고 값을 범위/step 에 맞춘다.
+    좌우하는 컨트롤이 쓸 수 없는 값에 머무는 파라미터(자동 노출이 계속 켜진
+    채의 노출 시간 등)도 장치가 거부하므로 ``skipped`` 로 보낸다.
+    """
+    params = dict(preset.params if isinstance(preset, Preset) else preset)
+    result = ApplyResult()
+    if controls is not None:
+        for name in list(params):
+            desc = controls.get(name)
+            if desc is None or not desc.writable:
+                result.skipped.append(name)
+                del params[name]
+            else:
+                params[name] = desc.clamp(params[name])
+    needed = set(params) | {DEPENDENCIES[p][0] for p in params if p in DEPENDENCIES}
+    if current is None:
+        state = read_state(device, needed)
+    else:
+        state = {k: current[k] for k in needed if k in current}
+
+    # 좌우하는 컨트롤이 앞에 오도록 정렬한다.
+    changed = sorted(
+        (p for p in params if p not in state or not _same(state[p], params[p])), key=_rank
+    )
+    result.unchanged = sorted(set(params) - set(changed), key=_rank)
+    # 좌우하는 컨트롤이 쓸 수 없는 값으로 바뀌면 그 전에 먼저 쓰고, 지금도
+    # 나중에도 쓸 수 없는 값이면 쓰지 않는다. 값을 모르면 써 본다.
+    before: dict[str, list[str]] = {}
+    for param_id in list(changed):
+        dependency = DEPENDENCIES.get(param_id)
+        if dependency is None:
+            continue
+        control, enabling = dependency
+        final = params.get(control, state.get(control))
+        if final is None or _same(final, enabling):
+            continue
+        if control in changed and _same(state.get(control, enabling), enabling):
+            before.setdefault(control, []).append(param_id)
+        else:
+            changed.remove(param_id)
+            result.skipped.append(param_id)
+    deferred = {p for group in before.values() for p in group}
+    for param_id in changed:
+        if param_id not in deferred:
+            for dependent in before.get(param_id, ()):
+                result.writes.append((dependent, params[dependent]))
+            result.writes.append((param_id, params[param_id]))
+    return result
+
+
+def apply(
+    preset: Preset | Mapping[str, Any],
+    device,
+    current: Mapping[str, Any] | None = None,
+    controls: Mapping[str, ControlDescriptor] | None = None,
+) -> ApplyResult:
+    """:func:`plan` 대로 장치에 바로 쓴다.
+
+    쓰기가 실패한 파라미터는 ``errors`` 에 남기고 나머지는 계속 쓴다.
+    GUI 에서는 이 함수 대신 :func:`plan` 의 ``writes`` 를
+    :class:`~cam_tuner_gui.control.writer.ParamWriter` 로 넘긴다.
+    """
+    result = plan(preset, device, current, controls)
+    writes, result.writes = result.writes, []
+    capture = getattr(device, "cap", device)
+    for param_id, value in writes:
+        try:
+            set_param(capture, param_id, value)
+        except (KeyError, RuntimeError) as exc:
+            result.errors[param_id] = exc
+        else:
+            result.writes.append((param_id, value))
+    return result
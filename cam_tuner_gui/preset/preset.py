@@ -4,11 +4,13 @@ from __future__ import annotations
 
 import json
 
+from cam_tuner_gui.util import atomic_write
+
 
 def save_json(params: dict, path: str) -> None:
     """파라미터 딕셔너리를 JSON 파일로 저장한다."""
-    with open(path, "w", encoding="utf-8") as fp:
-        json.dump(params, fp, indent=2, ensure_ascii=False)
+    text = json.dumps(params, indent=2, ensure_ascii=False)
+    atomic_write(path, text.encode("utf-8"))
 
 
 def load_json(path: str) -> dict:
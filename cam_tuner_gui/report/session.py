@@ -0,0 +1,582 @@
+"""세션 동안의 프레임별 지표 시계열 저장소.
+
+:class:`SessionStore` 는 지표 결과 하나를 한 행으로 받아 열(column)별
+numpy 배열에 쌓는다. 기본 열은 시각 ``t``, 캡처 시퀀스 ``seq``, 카메라
+번호 ``camera`` 이고, 그 뒤에 지표 열, 지표마다 값이 계산된 단계를 담는
+``<지표>_tier`` 열, 파라미터 스냅샷 열이 온다. 값이 없는 칸은 NaN 이다.
+
+한 프레임의 지표가 여러 번에 나눠 도착하면(스트림 지표는 바로, 나머지는
+워커에서 나중에) ``complete=False`` 로 먼저 들어온 값을 대기 행에 모아
+두었다가 같은 ``(camera, seq)`` 의 마지막 조각과 합쳐 한 행으로 쓴다. 대기
+행은 시각 순서대로만 내보내므로 버퍼의 ``t`` 는 단조 증가를 유지한다.
+
+메모리에는 최대 ``chunk_rows`` 행짜리 버퍼만 둔다. 버퍼가 차면 열마다
+스필 파일(``<열 이름>.bin``)에 원시 바이트로 덧붙이고 비운다. 스필된 행은
+:class:`numpy.memmap` 으로 읽으므로 한 시간짜리 세션이라도 프로세스가 쥐는
+메모리는 버퍼 크기로 고정되고, 나머지는 OS 페이지 캐시가 맡는다.
+
+시각이 단조 증가하는 동안은 창(window) 경계를 ``searchsorted`` 로 찾아 그
+구간의 행만 읽는다. CSV/npz 내보내기도 ``chunk_rows`` 씩 잘라 쓰므로
+세션 전체를 한꺼번에 메모리에 올리지 않는다.
+"""
+
+from __future__ import annotations
+
+from bisect import insort
+from collections import deque
+import csv
+from dataclasses import dataclass, field
+import os
+from pathlib import Path
+import shutil
+import tempfile
+from typing import Iterable, Iterator, Mapping
+import weakref
+import zipfile
+
+import numpy as np
+
+from cam_tuner_gui.metric.engine import FULL, METRIC_NAMES, MetricResult
+
+
+__all__ = ["BASE_COLUMNS", "SessionStore", "Stats", "tier_column"]
+
+
+BASE_COLUMNS = {"t": np.dtype("<f8"), "seq": np.dtype("<i8"), "camera": np.dtype("<u2")}
+_VALUE = np.dtype("<f8")
+_CODE = np.dtype("<u2")
+_FIRST_CAPACITY = 256
+
+
+def tier_column(metric: str) -> str:
+    """``metric`` 값이 계산된 단계 번호를 담는 열 이름."""
+    return f"{metric}_tier"
+
+
+@dataclass(frozen=True)
+class Stats:
+    """한 지표의 창 집계. 값이 하나도 없으면 ``count`` 가 0 이고 나머지는 NaN."""
+
+    count: int
+    mean: float
+    std: float
+    min: float
+    max: float
+    percentiles: dict[float, float] = field(default_factory=dict)
+
+    def as_dict(self) -> dict[str, float]:
+        """``p50`` 처럼 백분위를 펼친 이름→값 딕셔너리."""
+        data = {
+            "count": self.count,
+            "mean": self.mean,
+            "std": self.std,
+            "min": self.min,
+            "max": self.max,
+        }
+        data.update({f"p{q:g}": v for q, v in self.percentiles.items()})
+        return data
+
+
+def _stats(values: np.ndarray, percentiles: tuple[float, ...]) -> Stats:
+    values = values[np.isfinite(values)]
+    if not values.size:
+        nan = float("nan")
+        return Stats(0, nan, nan, nan, nan, {q: nan for q in percentiles})
+    qs = np.percentile(values, percentiles) if percentiles else ()
+    return Stats(
+        int(values.size),
+        float(values.mean()),
+        float(values.std()),
+        float(values.min()),
+        float(values.max()),
+        {q: float(v) for q, v in zip(percentiles, qs)},
+    )
+
+
+@dataclass
+class _Pending:
+    """아직 조각이 다 모이지 않은 행."""
+
+    t: float
+    code: int
+    seq: int
+    params: dict[str, float]
+    values: dict[str, float] = field(default_factory=dict)
+    tiers: dict[str, str] = field(default_factory=dict)
+    done: bool = False
+
+    def __lt__(self, other: _Pending) -> bool:
+        return self.t < other.t
+
+
+class SessionStore:
+    """프레임별 지표·파라미터를 열 배열에 쌓고 창 집계와 내보내기를 제공한다.
+
+    ``params`` 에 없던 파라미터가 :meth:`set_params` 나 :meth:`append` 로
+    들어오면 열을 새로 만들고 이전 행은 NaN 으로 채운다. 스필 파일은
+    ``spill_dir`` 아래 임시 디렉터리에 만들고 :meth:`close` 에서 지운다.
+    메모리 사용량은 대략 ``chunk_rows × 8 B × 열 수`` 다.
+
+    ``tiers`` 는 ``<지표>_tier`` 열 번호에 대응하는 단계 이름(``full``,
+    ``pyr1``, ``roi2`` 등)이고 0 번은 값이 없는 칸의 빈 문자열이다. 대기 행이
+    ``max_pending`` 개를 넘으면 가장 오래된 행을 모인 값만으로 내보내고, 그
+    행에 늦게 도착한 조각은 버린 뒤 ``late`` 로 센다.
+    """
+
+    def __init__(
+        self,
+        metrics: Iterable[str] = METRIC_NAMES,
+        params: Iterable[str] = (),
+        chunk_rows: int = 4096,
+        spill_dir: str | os.PathLike | None = None,
+        max_pending: int = 64,
+    ) -> None:
+        """지표·파라미터 열 이름, 메모리 버퍼 행 수, 스필 위치, 대기 행 한도를 받아 초기화."""
+        if chunk_rows < 1:
+            raise ValueError("chunk_rows must be >= 1")
+        if max_pending < 0:
+            raise ValueError("max_pending must be >= 0")
+        self.metrics = tuple(metrics)
+        self.params: list[str] = []
+        self.cameras: list[str] = []
+        self.tiers: list[str] = [""]
+        self.chunk_rows = int(chunk_rows)
+        self.max_pending = int(max_pending)
+        self.spilled = 0
+        self.late = 0
+        self._spill_root = spill_dir
+        self._spill_path: Path | None = None
+        self._finalizer: weakref.finalize | None = None
+        self._columns: dict[str, np.dtype] = dict(BASE_COLUMNS)
+        for name in self.metrics:
+            self._add_column(name)
+        for name in self.metrics:
+            self._add_column(tier_column(name), _CODE)
+        self._capacity = min(_FIRST_CAPACITY, self.chunk_rows)
+        self._fill = 0
+        self._buffers = {
+            name: self._blank(dtype, self._capacity) for name, dtype in self._columns.items()
+        }
+        self._mapped: dict[str, np.memmap] = {}
+        self._snapshots: dict[int, dict[str, float]] = {}
+        self._last_t = -np.inf
+        self._sorted = True
+        self._pending: list[_Pending] = []
+        self._pending_keys: dict[tuple[int, int], _Pending] = {}
+        self._expired: deque[tuple[int, int]] = deque(maxlen=max(1, 2 * self.max_pending))
+        for name in params:
+            self._ensure_param(name)
+
+    def __enter__(self) -> SessionStore:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.spilled + self._fill
+
+    @property
+    def columns(self) -> tuple[str, ...]:
+        return tuple(self._columns)
+
+    @property
+    def pending(self) -> int:
+        """조각을 기다리는 대기 행 수 (``len`` 에 들어가지 않는다)."""
+        return len(self._pending)
+
+    @property
+    def nbytes(self) -> int:
+        """메모리 버퍼가 차지하는 바이트 수 (스필된 행은 세지 않는다)."""
+        return sum(buf.nbytes for buf in self._buffers.values())
+
+    @property
+    def spill_path(self) -> Path | None:
+        """스필 파일 디렉터리. 아직 스필하지 않았으면 ``None``."""
+        return self._spill_path
+
+    # 열 관리
+    @staticmethod
+    def _blank(dtype: np.dtype, rows: int) -> np.ndarray:
+        if dtype.kind == "f":
+            return np.full(rows, np.nan, dtype)
+        return np.zeros(rows, dtype)
+
+    def _add_column(self, name: str, dtype: np.dtype = _VALUE) -> None:
+        if name in self._columns:
+            raise ValueError(f"duplicate column: {name}")
+        self._columns[name] = dtype
+
+    def _ensure_param(self, name: str) -> None:
+        if name in self.params:
+            return
+        self._add_column(name)
+        self.params.append(name)
+        self._buffers[name] = self._blank(_VALUE, self._capacity)
+        if self.spilled:
+            # 스필 파일도 지금까지의 행 수만큼 NaN 으로 맞춘다.
+            with open(self._spill_file(name), "wb") as fp:
+                self._blank(_VALUE, self.spilled).tofile(fp)
+
+    def camera_code(self, camera: str) -> int:
+        """카메라 ID 의 열 값. 처음 보는 ID 면 새 번호를 준다."""
+        camera = str(camera)
+        try:
+            return self.cameras.index(camera)
+        except ValueError:
+            self.cameras.append(camera)
+            return len(self.cameras) - 1
+
+    def tier_code(self, tier: str) -> int:
+        """단계 이름의 ``<지표>_tier`` 열 값. 처음 보는 이름이면 새 번호를 준다."""
+        tier = str(tier)
+        try:
+            return self.tiers.index(tier)
+        except ValueError:
+            self.tiers.append(tier)
+            return len(self.tiers) - 1
+
+    # 쓰기
+    def set_params(self, camera: str, params: Mapping[str, float]) -> None:
+        """``camera`` 의 이후 행에 기록할 파라미터 스냅샷을 갱신한다."""
+        snapshot = self._snapshots.setdefault(self.camera_code(camera), {})
+        for name, value in params.items():
+            self._ensure_param(name)
+            snapshot[name] = float(value)
+
+    def append(
+        self,
+        camera: str,
+        timestamp: float,
+        seq: int,
+        metrics: MetricResult | Mapping[str, float],
+        params: Mapping[str, float] | None = None,
+        complete: bool = True,
+    ) -> None:
+        """지표 결과 한 건을 ``(camera, seq)`` 행에 기록한다.
+
+        :class:`MetricResult` 를 주면 스케줄러가 이전 프레임에서 가져온 값
+        (``ages`` > 0)은 빼고 이번 프레임에서 계산한 값만 기록하고, 지표마다
+        ``tiers`` 의 단계를 함께 남긴다. 일반 매핑의 값은 ``full`` 단계로 본다.
+        ``complete=False`` 면 같은 행의 나머지 조각이 올 때까지 대기 행에 둔다.
+        """
+        if isinstance(metrics, MetricResult):
+            tiers = metrics.tiers
+            metrics = {
+                k: v for k, v in metrics.as_dict().items() if not metrics.ages.get(k)
+            }
+        else:
+            tiers = {}
+        code = self.camera_code(camera)
+        if params:
+            self.set_params(camera, params)
+        key = (code, int(seq))
+        row = self._pending_keys.get(key)
+        if row is None:
+            if key in self._expired:
+                # 한도에 밀려 이미 내보낸 행의 늦은 조각은 같은 seq 로 두 번 쓰지 않는다.
+                self.late += 1
+                return
+            if complete and not self._pending:
+                self._write(timestamp, code, seq, metrics, tiers, self._snapshots.get(code, {}))
+                return
+            row = _Pending(float(timestamp), code, int(seq), dict(self._snapshots.get(code, {})))
+            insort(self._pending, row)
+            self._pending_keys[key] = row
+        for name, value in metrics.items():
+            # 먼저 온 조각의 값을 빈 값(NaN)으로 덮어쓰지 않는다.
+            if np.isfinite(value) or name not in row.values:
+                row.values[name] = value
+                row.tiers[name] = tiers.get(name, FULL)
+        row.done = row.done or complete
+        self._release()
+
+    def _release(self, force: bool = False) -> None:
+        # 앞선 행이 모두 끝났을 때만 내보내야 시각 순서가 유지된다.
+        pending = self._pending
+        while pending and (force or pending[0].done or len(pending) > self.max_pending):
+            row = pending.pop(0)
+            key = (row.code, row.seq)
+            del self._pending_keys[key]
+            if not row.done:
+                self._expired.append(key)
+            self._write(row.t, row.code, row.seq, row.values, row.tiers, row.params)
+
+    def commit(self) -> None:
+        """대기 행을 모인 값만으로 모두 내보낸다 (늦은 조각은 버려진다)."""
+        self._release(force=True)
+
+    def _write(
+        self,
+        timestamp: float,
+        code: int,
+        seq: int,
+        metrics: Mapping[str, float],
+        tiers: Mapping[str, str],
+        snapshot: Mapping[str, float],
+    ) -> None:
+        if self._fill == self._capacity:
+            self._make_room()
+        row = self._fill
+        buffers = self._buffers
+        buffers["t"][row] = timestamp
+        buffers["seq"][row] = seq
+        buffers["camera"][row] = code
+        for name in self.metrics:
+            value = metrics.get(name, np.nan)
+            buffers[name][row] = value
+            buffers[tier_column(name)][row] = (
+                self.tier_code(tiers.get(name, FULL)) if np.isfinite(value) else 0
+            )
+        for name in self.params:
+            buffers[name][row] = snapshot.get(name, np.nan)
+        self._fill += 1
+        if timestamp < self._last_t:
+            self._sorted = False
+        self._last_t = max(self._last_t, timestamp)
+
+    def _make_room(self) -> None:
+        if self._capacity < self.chunk_rows:
+            capacity = min(self._capacity * 2, self.chunk_rows)
+            for name, buf in self._buffers.items():
+                grown = self._blank(buf.dtype, capacity)
+                grown[: self._fill] = buf[: self._fill]
+                self._buffers[name] = grown
+            self._capacity = capacity
+        else:
+            self._spill()
+
+    def _spill_file(self, name: str) -> Path:
+        return self._spill_path / f"{name}.bin"
+
+    def flush(self) -> None:
+        """메모리 버퍼의 행을 스필 파일로 내보내고 버퍼를 비운다. 대기 행은 그대로 둔다."""
+        self._spill()
+
+    def _spill(self) -> None:
+        if not self._fill:
+            return
+        if self._spill_path is None:
+            self._spill_path = Path(tempfile.mkdtemp(prefix="cam_session_", dir=self._spill_root))
+            self._finalizer = weakref.finalize(
+                self, shutil.rmtree, str(self._spill_path), True
+            )
+        for name, buf in self._buffers.items():
+            with open(self._spill_file(name), "ab") as fp:
+                buf[: self._fill].tofile(fp)
+        self.spilled += self._fill
+        self._fill = 0
+        self._mapped.clear()
+
+    def close(self) -> None:
+        """스필 파일을 지우고 저장소를 비운다. 내보내기는 그 전에 한다."""
+        self._mapped.clear()
+        if self._finalizer is not None:
+            self._finalizer()
+            self._finalizer = None
+        self._spill_path = None
+        self.spilled = 0
+        self._fill = 0
+        self._pending.clear()
+        self._pending_keys.clear()
+        self._expired.clear()
+
+    # 읽기
+    def _mapped_column(self, name: str) -> np.ndarray:
+        view = self._mapped.get(name)
+        if view is None:
+            view = np.memmap(
+                self._spill_file(name), self._columns[name], mode="r", shape=(self.spilled,)
+            )
+            self._mapped[name] = view
+        return view
+
+    def column(self, name: str, rows: slice = slice(None)) -> np.ndarray:
+        """``rows`` 구간의 열 값. 한 계층 안이면 복사 없는 읽기 전용 뷰다."""
+        if name not in self._columns:
+            raise KeyError(name)
+        start, stop, step = rows.indices(len(self))
+        if step != 1:
+            raise ValueError("step slices are not supported")
+        stop = max(start, stop)
+        buf = self._buffers[name]
+        if start >= self.spilled:
+            view = buf[start - self.spilled : stop - self.spilled]
+            view = view.view()
+            view.flags.writeable = False
+            return view
+        mapped = self._mapped_column(name)
+        if stop <= self.spilled:
+            return mapped[start:stop]
+        return np.concatenate([mapped[start:], buf[: stop - self.spilled]])
+
+    def window(
+        self,
+        since: float | None = None,
+        until: float | None = None,
+        seconds: float | None = None,
+    ) -> slice:
+        """시각 구간 ``[since, until)`` 에 드는 행 범위.
+
+        ``seconds`` 는 마지막 행 시각에서 거슬러 올라간 길이로 ``since`` 를
+        정한다. 시각이 뒤섞여 들어온 세션에서는 구간 밖 행도 포함될 수 있으므로
+        :meth:`stats` 가 행마다 다시 거른다.
+        """
+        n = len(self)
+        if seconds is not None and n:
+            since = self._last_t - seconds
+        if not self._sorted or not n:
+            return slice(0, n)
+        start = 0 if since is None else self._search(since)
+        stop = n if until is None else self._search(until)
+        return slice(start, stop)
+
+    def _search(self, value: float) -> int:
+        if self.spilled and value <= self._mapped_column("t")[-1]:
+            return int(np.searchsorted(self._mapped_column("t"), value))
+        buf = self._buffers["t"][: self._fill]
+        return self.spilled + int(np.searchsorted(buf, value))
+
+    def _selection(
+        self,
+        camera: str | None,
+        since: float | None,
+        until: float | None,
+        seconds: float | None,
+    ) -> tuple[slice, np.ndarray | None]:
+        rows = self.window(since, until, seconds)
+        mask = None
+        if camera is not None:
+            try:
+                code = self.cameras.index(str(camera))
+            except ValueError:
+                return slice(0, 0), None
+            mask = self.column("camera", rows) == code
+        if not self._sorted and (since is not None or until is not None or seconds is not None):
+            t = self.column("t", rows)
+            if seconds is not None:
+                since = self._last_t - seconds
+            inside = np.ones(t.shape, bool)
+            if since is not None:
+                inside &= t >= since
+            if until is not None:
+                inside &= t < until
+            mask = inside if mask is None else mask & inside
+        return rows, mask
+
+    def values(
+        self,
+        name: str,
+        camera: str | None = None,
+        since: float | None = None,
+        until: float | None = None,
+        seconds: float | None = None,
+    ) -> np.ndarray:
+        """카메라·시각 창으로 거른 열 값."""
+        rows, mask = self._selection(camera, since, until, seconds)
+        data = self.column(name, rows)
+        return data if mask is None else data[mask]
+
+    def stats(
+        self,
+        camera: str | None = None,
+        metrics: Iterable[str] | None = None,
+        since: float | None = None,
+        until: float | None = None,
+        seconds: float | None = None,
+        percentiles: Iterable[float] = (5, 50, 95),
+        tier: str | Mapping[str, str] | None = None,
+    ) -> dict[str, Stats]:
+        """창 안 지표별 평균·표준편차·최소/최대·백분위. NaN 은 건너뛴다.
+
+        ``tier`` 를 주면 그 단계(지표별 매핑도 된다)에서 계산된 값만 모은다.
+        ``None`` 이면 단계를 가리지 않는다.
+        """
+        percentiles = tuple(percentiles)
+        rows, mask = self._selection(camera, since, until, seconds)
+        result = {}
+        for name in self.metrics if metrics is None else metrics:
+            data = self.column(name, rows)
+            if mask is not None:
+                data = data[mask]
+            label = tier.get(name) if isinstance(tier, Mapping) else tier
+            if label is not None:
+                codes = self.column(tier_column(name), rows)
+                if mask is not None:
+                    codes = codes[mask]
+                code = self.tiers.index(label) if label in self.tiers else -1
+                data = data[codes == code]
+            result[name] = _stats(data, percentiles)
+        return result
+
+    def latest(self, camera: str, metrics: Iterable[str] | None = None) -> dict[str, float]:
+        """카메라별로 지표마다 가장 최근에 기록된 값."""
+        names = list(self.metrics if metrics is None else metrics)
+        found: dict[str, float] = {}
+        if str(camera) not in self.cameras:
+            return found
+        code = self.cameras.index(str(camera))
+        # 최근 청크부터 거슬러 올라가며 아직 못 찾은 지표만 본다.
+        stop = len(self)
+        while names and stop > 0:
+            rows = slice(max(0, stop - self.chunk_rows), stop)
+            mine = np.flatnonzero(self.column("camera", rows) == code)
+            for name in list(names):
+                data = self.column(name, rows)[mine]
+                hit = np.flatnonzero(np.isfinite(data))
+                if hit.size:
+                    found[name] = float(data[hit[-1]])
+                    names.remove(name)
+            stop = rows.start
+        return found
+
+    # 내보내기
+    def _blocks(self) -> Iterator[slice]:
+        for start in range(0, len(self), self.chunk_rows):
+            yield slice(start, min(start + self.chunk_rows, len(self)))
+
+    def to_npz(self, path: str | os.PathLike, compress: bool = False) -> None:
+        """열마다 ``.npy`` 하나씩 담은 npz 로 저장한다 (``numpy.load`` 로 읽는다).
+
+        ``cameras`` 에는 ``camera`` 열 번호에 대응하는 카메라 ID 가,
+        ``tiers`` 에는 ``<지표>_tier`` 열 번호에 대응하는 단계 이름이 들어간다.
+        """
+        mode = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+        with zipfile.ZipFile(path, "w", compression=mode, allowZip64=True) as zf:
+            for name, dtype in self._columns.items():
+                with zf.open(f"{name}.npy", "w", force_zip64=True) as fp:
+                    header = {"descr": dtype.str, "fortran_order": False, "shape": (len(self),)}
+                    np.lib.format.write_array_header_2_0(fp, header)
+                    for rows in self._blocks():
+                        fp.write(np.ascontiguousarray(self.column(name, rows)).tobytes())
+            with zf.open("cameras.npy", "w") as fp:
+                np.lib.format.write_array(fp, np.array(self.cameras, dtype=str))
+            with zf.open("tiers.npy", "w") as fp:
+                np.lib.format.write_array(fp, np.array(self.tiers, dtype=str))
+
+    def to_csv(self, path: str | os.PathLike) -> None:
+        """CSV 로 저장한다. 카메라·단계는 이름 문자열로, NaN 은 빈 칸으로 쓴다.
+
+        블록마다 열을 ``tolist`` 로 바꿔 ``csv.writer.writerows`` 에 넘기므로
+        행 단위 파이썬 코드가 돌지 않는다.
+        """
+        names = np.array(self.cameras + [""], dtype=object)
+        tiers = np.array(self.tiers, dtype=object)
+        tier_columns = {tier_column(name) for name in self.metrics}
+        with open(path, "w", newline="", encoding="utf-8") as fp:
+            writer = csv.writer(fp)
+            writer.writerow(self.columns)
+            for rows in self._blocks():
+                columns = []
+                for name, dtype in self._columns.items():
+                    data = self.column(name, rows)
+                    if name == "camera":
+                        data = names[data]
+                    elif name in tier_columns:
+                        data = tiers[data]
+                    elif dtype.kind == "f":
+                        missing = np.isnan(data)
+                        data = data.astype(object)
+                        data[missing] = None
+                    columns.append(data.tolist())
+                writer.writerows(zip(*columns))
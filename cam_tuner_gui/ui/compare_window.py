@@ -4,6 +4,7 @@ from __future__ import annotations
 
 from typing import List, Dict
 import glob
+import time
 
 from PySide6.QtCore import Qt, QTimer
 from PySide6.QtWidgets import (
@@ -22,17 +23,73 @@ from PySide6.QtGui import QImage, QPixmap
 import cv2
 
 from cam_tuner_gui.capture.device import CameraDevice
-from cam_tuner_gui.metric import metrics as m
+from cam_tuner_gui.capture.sync import CaptureGroup, SyncedFrames
+from cam_tuner_gui.metric.cache import MetricCache
+from cam_tuner_gui.metric.engine import (
+    FRAME_METRICS,
+    FULL,
+    FULL_TIER,
+    FrameContext,
+    MetricEngine,
+    SCALE_INVARIANT,
+    STREAM_METRICS,
+    Tier,
+    exact_label,
+)
+from cam_tuner_gui.metric.scheduler import MetricScheduler
+from cam_tuner_gui.metric.thresholds import passes
+from cam_tuner_gui.preset.library import APPLY_ORDER, read_state
 from cam_tuner_gui.report.builder import render_html, export_pdf
-
-
-THRESHOLDS = {
-    "mtf50": 1.0,
-    "snr": 20.0,
-    "flicker": 10.0,
-    "lapvar": 50.0,
-    "motion_blur": 5.0,
-}
+from cam_tuner_gui.report.session import SessionStore
+from cam_tuner_gui.ui.metric_bridge import MetricBridge
+from cam_tuner_gui.ui.roi import RoiLabel
+
+
+METRIC_KEYS = ["mtf50", "snr", "motion_blur", "lapvar", "flicker", "delta_l"]
+
+# 라이브 미리보기는 ROI 가 없으면 축소해도 추세를 따르는 지표만 절반
+# 해상도에서 근사하고(``pyr1`` 로 표시), 나머지는 전체 해상도에서 계산한다.
+# 리포트는 정확값을 다시 계산한다.
+LIVE_TIER = {name: Tier.pyramid(1) for name in SCALE_INVARIANT}
+
+# 두 카메라 grab 시각 차이 허용치(초). 넘으면 앞선 카메라를 다시 grab 한다.
+SYNC_TOLERANCE = 0.005
+
+# 미리보기 프레임 최대 크기. 캡처 스레드(또는 tee 파이프라인)가 줄여 두므로
+# GUI 스레드는 원본 해상도 영상을 축소하지 않는다.
+PREVIEW_SIZE = (640, 400)
+
+# 프레임 지표를 계산할 워커 프로세스 수 기본값. 0 이면 GUI 스레드에서
+# 스케줄러로 계산한다 (``CompareWindow(workers=...)``, ``--workers``).
+METRIC_WORKERS = 2
+
+
+def _format_metric(key: str, val: float, tier: str = FULL, age: int = 0) -> str:
+    text = f"{val:.2f}"
+    # 임계값은 원본 해상도 기준이라 피라미드 근사값에는 판정을 붙이지 않는다.
+    if exact_label(tier):
+        text += " (PASS)" if passes(key, val) else " (FAIL)"
+    if tier != FULL:
+        text += f" [{tier}]"
+    if age:
+        # 예산 때문에 이번 프레임에 다시 계산하지 않은 값은 나이를 붙인다.
+        text += f" (+{age}f)"
+    return text
+
+
+def _format_summary(key: str, data: dict) -> str:
+    """리포트용: 최신 정확값과 세션 집계를 한 줄로. 근사 집계는 단계를 붙인다."""
+    value = data.get("value")
+    text = "--" if value is None else _format_metric(key, value)
+    if data.get("count"):
+        text += (
+            f" | mean {data['mean']:.2f}, p5 {data['p5']:.2f}, p95 {data['p95']:.2f},"
+            f" min {data['min']:.2f}, max {data['max']:.2f} (n={data['count']})"
+        )
+        tier = data.get("tier", FULL)
+        if not exact_label(tier):
+            text += f" [{tier}]"
+    return text
 
 
 def _list_devices() -> List[str]:
@@ -46,9 +103,14 @@ def _list_devices() -> List[str]:
 
 
 class CompareWindow(QMainWindow):
-    """두 카메라 성능 비교용 메인 윈도우."""
+    """두 카메라 성능 비교용 메인 윈도우.
+
+    ``workers`` 가 0 이면 프레임 지표를 워커 프로세스 대신 GUI 스레드의
+    :class:`~cam_tuner_gui.metric.scheduler.MetricScheduler` 가 프레임 예산
+    안에서 계산한다. 코어가 적거나 워커를 띄울 수 없는 환경에서 쓴다.
+    """
 
-    def __init__(self) -> None:
+    def __init__(self, workers: int = METRIC_WORKERS) -> None:
         super().__init__()
         self.setWindowTitle("Camera Tuner Compare")
 
@@ -76,10 +138,9 @@ class CompareWindow(QMainWindow):
         top.addWidget(self._start2)
         top.addWidget(self._stop2)
 
-        self._view1 = QLabel()
-        self._view1.setAlignment(Qt.AlignCenter)
-        self._view2 = QLabel()
-        self._view2.setAlignment(Qt.AlignCenter)
+        # 미리보기에서 드래그해 ROI 를 그리면 지표를 그 영역에서 계산한다.
+        self._view1 = RoiLabel()
+        self._view2 = RoiLabel()
 
         views = QHBoxLayout()
         views.addWidget(self._view1)
@@ -90,7 +151,7 @@ class CompareWindow(QMainWindow):
         self.metrics2: Dict[str, QLabel] = {}
         form1 = QFormLayout()
         form2 = QFormLayout()
-        for key in ["mtf50", "snr", "motion_blur", "lapvar", "flicker"]:
+        for key in METRIC_KEYS:
             lbl1 = QLabel("--")
             lbl2 = QLabel("--")
             form1.addRow(key, lbl1)
@@ -102,10 +163,15 @@ class CompareWindow(QMainWindow):
         metrics_layout.addLayout(form1, 0, 0)
         metrics_layout.addLayout(form2, 0, 1)
 
+        # 두 카메라는 한 CaptureGroup 으로 함께 grab 하고 묶음별 시각 차이를 보인다.
+        self._skew_label = QLabel("Skew: --")
+
         self._snap_btn = QPushButton("Snapshot Both")
         self._report_btn = QPushButton("Export Report")
         self._save_btn = QPushButton("Save Metrics.csv")
         bottom = QHBoxLayout()
+        bottom.addWidget(self._skew_label)
+        bottom.addStretch(1)
         bottom.addWidget(self._snap_btn)
         bottom.addWidget(self._report_btn)
         bottom.addWidget(self._save_btn)
@@ -121,8 +187,35 @@ class CompareWindow(QMainWindow):
         self._timer = QTimer(self)
         self._timer.timeout.connect(self._update)
 
-        self._buffers1: List = []
-        self._buffers2: List = []
+        # 카메라별 플리커 이력은 엔진이 평균 밝기로만 보관한다.
+        self._engine = MetricEngine()
+        # 스냅샷/리포트/CSV 는 같은 프레임을 거듭 분석하므로 내용 다이제스트로
+        # 캐시한다. 라이브 경로는 프레임마다 달라 캐시하지 않는다.
+        self._exact_engine = MetricEngine(FRAME_METRICS, cache=MetricCache())
+        self._last_seq: Dict[str, int] = {}
+        # 라이브 지표는 모두 세션 저장소에 쌓인다. 리포트/CSV 는 라벨 글자 대신
+        # 여기서 숫자 집계와 시계열을 꺼낸다.
+        self._session = SessionStore(METRIC_KEYS)
+        # 두 카메라가 타이머 한 번을 나눠 쓰므로 각각 프레임 간격의 1/4 만 쓴다.
+        self._scheduler = MetricScheduler(self._engine, budget_fraction=0.25)
+        # 프레임 지표는 워커 프로세스에서 계산하고 결과는 시그널로 받는다.
+        # 플리커처럼 이력이 필요한 지표만 GUI 스레드 엔진에 남는다.
+        self._labels = {"cam1": self.metrics1, "cam2": self.metrics2}
+        self._views = {"cam1": self._view1, "cam2": self._view2}
+        self._group: CaptureGroup | None = None
+        self._group_keys: List[str] = []
+        self._pair: SyncedFrames | None = None
+        self._live: set = set()
+        self._bridge: MetricBridge | None = None
+        if workers:
+            self._bridge = MetricBridge(
+                self, workers=workers, metrics=tuple(FRAME_METRICS)
+            )
+            self._bridge.resultReady.connect(self._on_worker_result)
+
+        # 멈춘 스트림에서도 ROI 를 바꾸면 지표를 다시 계산한다.
+        self._view1.roisChanged.connect(lambda _: self._last_seq.pop("cam1", None))
+        self._view2.roisChanged.connect(lambda _: self._last_seq.pop("cam2", None))
 
         self._start1.clicked.connect(self._start_cam1)
         self._stop1.clicked.connect(self._stop_cam1)
@@ -144,125 +237,281 @@ class CompareWindow(QMainWindow):
     def _start_cam1(self) -> None:
         if self.cam1 is None:
             self.cam1 = CameraDevice(self._combo1.currentText())
-        self.cam1.start_stream()
-        if not self._timer.isActive():
-            self._timer.start(30)
+        self._start_cam(self.cam1, "cam1")
 
     def _start_cam2(self) -> None:
         if self.cam2 is None:
             self.cam2 = CameraDevice(self._combo2.currentText())
-        self.cam2.start_stream()
-        if not self._timer.isActive():
-            self._timer.start(30)
+        self._start_cam(self.cam2, "cam2")
+
+    def _start_cam(self, cam: CameraDevice, key: str) -> None:
+        # 묶음 캡처 스레드가 cap 을 쓰는 동안에는 장치를 건드리지 않는다.
+        self._stop_group()
+        cam.start_stream()
+        self._live.add(key)
+        self._session.set_params(key, read_state(cam, APPLY_ORDER))
+        if self._bridge is not None:
+            self._bridge.start()
+        self._start_group()
 
     def _stop_cam1(self) -> None:
-        if self.cam1:
-            self.cam1.stop_stream()
-        if self.cam2 is None or (self.cam2 and self.cam2.cap is None):
-            self._timer.stop()
+        self._stop_cam(self.cam1, "cam1")
 
     def _stop_cam2(self) -> None:
-        if self.cam2:
-            self.cam2.stop_stream()
-        if self.cam1 is None or (self.cam1 and self.cam1.cap is None):
+        self._stop_cam(self.cam2, "cam2")
+
+    def _stop_cam(self, cam: CameraDevice | None, key: str) -> None:
+        self._stop_group()
+        if cam:
+            cam.stop_stream()
+        self._engine.reset(key)
+        self._scheduler.reset(key)
+        self._live.discard(key)
+        self._last_seq.pop(key, None)
+        self._start_group()
+
+    def _start_group(self) -> None:
+        """켜진 카메라들을 한 :class:`CaptureGroup` 으로 묶어 캡처 스레드를 띄운다."""
+        cams = {"cam1": self.cam1, "cam2": self.cam2}
+        keys = [k for k in ("cam1", "cam2") if k in self._live and cams[k].cap is not None]
+        if not keys:
             self._timer.stop()
+            self._skew_label.setText("Skew: --")
+            return
+        self._group = CaptureGroup(
+            [cams[k] for k in keys],
+            tolerance=SYNC_TOLERANCE,
+            parallel=len(keys) > 1,
+            preview_size=PREVIEW_SIZE,
+        )
+        self._group_keys = keys
+        self._group.start()
+        if not self._timer.isActive():
+            self._timer.start(15)
+
+    def _stop_group(self) -> None:
+        if self._group is not None:
+            self._group.close()
+            self._group = None
+        self._group_keys = []
+        self._pair = None
 
     def _update(self) -> None:
-        if self.cam1 and self.cam1.cap and self.cam1.cap.isOpened():
-            frame1 = self.cam1.read_frame()
-            pixmap1 = self._ndarray_to_pixmap(frame1)
-            if not self._view1.size().isEmpty():
-                pixmap1 = pixmap1.scaled(
-                    self._view1.size(),
-                    Qt.KeepAspectRatio,
-                    Qt.SmoothTransformation,
-                )
-            self._view1.setPixmap(pixmap1)
-            self._buffers1.append(frame1)
-            if len(self._buffers1) > 10:
-                self._buffers1.pop(0)
-            self._update_metrics(frame1, self.metrics1, self._buffers1)
-        if self.cam2 and self.cam2.cap and self.cam2.cap.isOpened():
-            frame2 = self.cam2.read_frame()
-            pixmap2 = self._ndarray_to_pixmap(frame2)
-            if not self._view2.size().isEmpty():
-                pixmap2 = pixmap2.scaled(
-                    self._view2.size(),
-                    Qt.KeepAspectRatio,
-                    Qt.SmoothTransformation,
-                )
-            self._view2.setPixmap(pixmap2)
-            self._buffers2.append(frame2)
-            if len(self._buffers2) > 10:
-                self._buffers2.pop(0)
-            self._update_metrics(frame2, self.metrics2, self._buffers2)
-
-    def _update_metrics(self, frame, labels: Dict[str, QLabel], buffer: List) -> None:
-        mtf50 = m.calc_mtf50(frame)
-        snr = m.calc_snr(frame)
-        lapvar = m.calc_lapvar(frame)
-        blur = m.calc_motion_blur_width(frame)
-        flicker = m.detect_flicker(buffer)
-        metrics = {
-            "mtf50": mtf50,
-            "snr": snr,
-            "motion_blur": blur,
-            "lapvar": lapvar,
-            "flicker": flicker,
-        }
-        for key, val in metrics.items():
-            thresh = THRESHOLDS.get(key)
-            if thresh is None:
-                status = "PASS"
-            else:
-                if key == "motion_blur":
-                    status = "PASS" if val <= thresh else "FAIL"
-                else:
-                    status = "PASS" if val >= thresh else "FAIL"
-            labels[key].setText(f"{val:.2f} ({status})")
+        group = self._group
+        if group is None:
+            return
+        # 타이머 사이에 쌓인 묶음의 밝기는 모두 플리커 분석기에 넣는다.
+        for synced in group.iter_frames():
+            for key, image, ts in zip(self._group_keys, synced.frames, synced.timestamps):
+                self._engine.observe(image, key, ts)
+            self._pair = synced
+        if not group.running and group.error is not None:
+            self.statusBar().showMessage(f"Capture stopped: {group.error}", 5000)
+            self._stop_group()
+            self._timer.stop()
+        pair = self._pair
+        if pair is None:
+            return
+        self._show_skew(pair)
+        for i, key in enumerate(self._group_keys):
+            self._update_view(
+                pair.frames[i], pair.previews[i], key, pair.timestamps[i], pair.seq
+            )
+
+    def _show_skew(self, pair: SyncedFrames) -> None:
+        if len(pair.frames) < 2:
+            self._skew_label.setText("Skew: --")
+            return
+        stats = self._group.skew_stats() if self._group is not None else None
+        text = f"Skew: {pair.skew * 1e3:.1f} ms"
+        if stats is not None:
+            text += (
+                f" (mean {stats['mean'] * 1e3:.1f}, max {stats['max'] * 1e3:.1f},"
+                f" {stats['within_tolerance']:.0%} within {SYNC_TOLERANCE * 1e3:.0f} ms)"
+            )
+        self._skew_label.setText(text)
+
+    def _update_view(
+        self, image, preview, key: str, timestamp: float, seq: int
+    ) -> None:
+        # 새 묶음이 없으면 (정지/일시정지) 같은 프레임을 다시 계산하지 않는다.
+        if self._last_seq.get(key) == seq:
+            return
+        self._last_seq[key] = seq
+        view = self._views[key]
+        # 지표와 ROI 좌표는 원본, 화면은 미리 줄인 프레임을 쓴다.
+        view.set_source_size(image.shape[1], image.shape[0])
+        self._update_metrics(
+            image, self._labels[key], key, self._live_tier(view), timestamp, seq
+        )
+        pixmap = self._ndarray_to_pixmap(preview)
+        if not view.size().isEmpty() and pixmap.size() != view.size():
+            pixmap = pixmap.scaled(view.size(), Qt.KeepAspectRatio, Qt.FastTransformation)
+        view.setPixmap(pixmap)
+
+    def _latest_image(self, key: str):
+        """화면에 보이는(마지막 묶음의) ``key`` 카메라 프레임. 없으면 ``None``."""
+        pair = self._pair
+        if pair is None or key not in self._group_keys:
+            return None
+        return pair.frames[self._group_keys.index(key)]
+
+    @staticmethod
+    def _live_tier(view: RoiLabel) -> Tier | Dict[str, Tier]:
+        rois = view.rois()
+        return Tier.from_rois(rois) if rois else LIVE_TIER
+
+    def _update_metrics(
+        self,
+        frame,
+        labels: Dict[str, QLabel],
+        cam_key: str,
+        tier: Tier | Dict[str, Tier] = FULL_TIER,
+        timestamp: float | None = None,
+        seq: int = 0,
+    ) -> None:
+        # 최신 프레임은 iter_frames 로 이미 이력에 들어갔으므로 observe 하지 않는다.
+        if self._bridge is not None:
+            # 프레임은 공유 메모리로 복사만 하고 결과는 _on_worker_result 에서
+            # 받는다. 워커가 밀려 있으면 이 프레임은 버려진다.
+            # 결과에는 캡처 시각과 시퀀스가 그대로 돌아온다.
+            if timestamp is None:
+                timestamp = time.monotonic()
+            submitted = self._bridge.submit(frame, cam_key, timestamp, tier=tier, tag=seq)
+            result = self._engine.compute(
+                frame, cam_key, metrics=STREAM_METRICS, observe=False
+            )
+            # 워커 결과가 올 프레임은 스트림 지표를 대기 행에 두었다가 한 행으로 합친다.
+            complete = not submitted
+        else:
+            # 스케줄러가 프레임 예산 안에서 이번 차례인 지표만 계산한다.
+            result = self._scheduler.step(
+                frame, cam_key, timestamp, observe=False, tier=tier
+            )
+            complete = True
+        self._show_result(result, labels)
+        self._record(cam_key, timestamp, seq, result, complete)
+
+    def _record(
+        self, cam_key: str, timestamp: float | None, seq: int, result, complete: bool = True
+    ) -> None:
+        if timestamp is None:
+            timestamp = time.monotonic()
+        self._session.append(cam_key, timestamp, seq, result, complete=complete)
+
+    @staticmethod
+    def _show_result(result, labels: Dict[str, QLabel]) -> None:
+        for key, val in result.as_dict().items():
+            labels[key].setText(
+                _format_metric(key, val, result.tiers[key], result.ages.get(key, 0))
+            )
+
+    def _on_worker_result(self, cam_key, seq: int, timestamp, result, error) -> None:
+        if error is not None:
+            self.statusBar().showMessage(f"{cam_key} metrics: {error}", 5000)
+            # 대기 중인 스트림 지표만으로 이 프레임의 행을 마무리한다.
+            self._record(cam_key, timestamp, seq, {})
+            return
+        # 카메라를 멈춘 뒤 늦게 도착한 결과는 화면에 올리지 않고 기록만 한다.
+        if cam_key in self._live:
+            self._show_result(result, self._labels[cam_key])
+        self._record(cam_key, timestamp, seq, result)
+
+    def _exact_metrics(self, view: RoiLabel, cam_key: str) -> Dict[str, float]:
+        """리포트용으로 최신 프레임의 지표를 전체 해상도(또는 ROI)에서 다시 계산한다.
+
+        스트림이 멈춰 프레임이 없으면 세션에 마지막으로 기록된 값을 쓴다.
+        """
+        values = self._session.latest(cam_key)
+        image = self._latest_image(cam_key)
+        if image is None:
+            return values
+        rois = view.rois()
+        tier = Tier.from_rois(rois) if rois else FULL_TIER
+        ctx = FrameContext(image)
+        result = self._exact_engine.compute(ctx, cam_key, tier=tier)
+        stream = self._engine.compute(ctx, cam_key, metrics=STREAM_METRICS, observe=False)
+        for res in (result, stream):
+            values.update(res.as_dict())
+        return values
 
     def _snapshot(self) -> None:
-        if self.cam1 and self.cam1.cap and self.cam1.cap.isOpened():
-            frame1 = self.cam1.read_frame()
-            cv2.imwrite("snapshot_cam1.jpg", frame1)
-        if self.cam2 and self.cam2.cap and self.cam2.cap.isOpened():
-            frame2 = self.cam2.read_frame()
-            cv2.imwrite("snapshot_cam2.jpg", frame2)
+        # 새 프레임을 기다리지 않고 화면에 보이는(리포트가 분석할) 프레임을 저장한다.
+        for key in ("cam1", "cam2"):
+            image = self._latest_image(key)
+            if image is not None:
+                cv2.imwrite(f"snapshot_{key}.jpg", image)
+
+    def _report_data(self) -> Dict[str, Dict[str, dict]]:
+        """카메라별 지표의 최신 정확값(``value``)과 세션 전체 집계.
+
+        집계는 지금 라이브 미리보기가 쓰는 단계(ROI 개수, 전체 해상도 또는
+        ``pyr1``)에서 계산된 행만 모으고 그 단계를 ``tier`` 로 함께 넘긴다.
+        서로 다른 단계의 값은 섞지 않는다.
+        """
+        data = {}
+        for key, view in self._views.items():
+            exact = self._exact_metrics(view, key)
+            live = self._live_tier(view)
+            tiers = {
+                name: (live.get(name, FULL_TIER) if isinstance(live, dict) else live).label
+                for name in FRAME_METRICS
+            }
+            tiers.update({name: FULL for name in STREAM_METRICS})
+            stats = self._session.stats(key, tier=tiers)
+            data[key] = {
+                metric: {
+                    "value": exact.get(metric),
+                    "tier": tiers[metric],
+                    **stats[metric].as_dict(),
+                }
+                for metric in METRIC_KEYS
+            }
+        return data
 
     def _export_report(self) -> None:
-        data = {
-            "cam1": {k: lbl.text() for k, lbl in self.metrics1.items()},
-            "cam2": {k: lbl.text() for k, lbl in self.metrics2.items()},
-        }
-        html = render_html(data)
+        data = self._report_data()
+        html = render_html(
+            {
+                cam: {k: _format_summary(k, v) for k, v in metrics.items()}
+                for cam, metrics in data.items()
+            }
+        )
         export_pdf(html, "compare_report.pdf")
 
     def _save_metrics(self) -> None:
-        import csv
-
-        with open("metrics.csv", "w", newline="", encoding="utf-8") as fp:
-            writer = csv.writer(fp)
-            writer.writerow(["metric", "cam1", "cam2"])
-            for key in ["mtf50", "snr", "motion_blur", "lapvar", "flicker"]:
-                writer.writerow([
-                    key,
-                    self.metrics1[key].text(),
-                    self.metrics2[key].text(),
-                ])
+        # 프레임별 시계열 전체를 CSV 로, 분석용으로 같은 내용을 npz 로도 남긴다.
+        # 워커 결과를 기다리던 마지막 행도 모인 값만으로 먼저 내보낸다.
+        self._session.commit()
+        self._session.to_csv("metrics.csv")
+        self._session.to_npz("metrics.npz")
 
     def closeEvent(self, event) -> None:  # type: ignore[override]
+        self._stop_group()
         if self.cam1:
             self.cam1.stop_stream()
         if self.cam2:
             self.cam2.stop_stream()
+        if self._bridge is not None:
+            self._bridge.close()
+        self._session.close()
         super().closeEvent(event)
 
 
 if __name__ == "__main__":
+    import argparse
     import sys
 
-    app = QApplication(sys.argv)
-    win = CompareWindow()
+    parser = argparse.ArgumentParser(description="Compare two camera streams.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=METRIC_WORKERS,
+        help="metric worker processes; 0 computes on the GUI thread with the scheduler",
+    )
+    args, qt_args = parser.parse_known_args()
+    app = QApplication(sys.argv[:1] + qt_args)
+    win = CompareWindow(workers=args.workers)
     win.resize(1000, 600)
     win.show()
     sys.exit(app.exec())
@@ -2,10 +2,13 @@
 
 from __future__ import annotations
 
-from PySide6.QtCore import QTimer, Qt
+import time
+
+from PySide6.QtCore import QSignalBlocker, QTimer, Qt
 from PySide6.QtGui import QImage, QPixmap
 from PySide6.QtWidgets import (
     QApplication,
+    QCheckBox,
     QComboBox,
     QHBoxLayout,
     QLabel,
@@ -16,12 +19,26 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
-from cam_tuner_gui.metric.metrics import calc_snr
 from cam_tuner_gui.capture.device import CameraDevice
-from cam_tuner_gui.control.params import set_param
+from cam_tuner_gui.capture.recording import RECORDING_SUFFIX
+from cam_tuner_gui.control.caps import (
+    CONTROL_TABLE,
+    FALLBACK_CONTROLS,
+    ControlDescriptor,
+    describe_controls,
+)
+from cam_tuner_gui.control.latency import LATENCY_TABLE, LatencyMonitor
+from cam_tuner_gui.preset.library import Preset, PresetLibrary, device_model, plan
+from cam_tuner_gui.ui.metric_bridge import MetricBridge
+from cam_tuner_gui.ui.param_bridge import ParamBridge
+from cam_tuner_gui.ui.overlay import OverlayRenderer
 import cv2
 
 
+# 프리셋은 녹화와 같이 현재 디렉터리 아래에 둔다.
+PRESET_DIR = "presets"
+
+
 class MainWindow(QMainWindow):
     """애플리케이션의 주 윈도우."""
 
@@ -42,28 +59,45 @@ class MainWindow(QMainWindow):
         # Preview and snapshot area
         self._preview_label = QLabel()
         self._preview_label.setAlignment(Qt.AlignCenter)
+        # 오버레이를 켜면 미리보기는 라벨 크기에 맞춰 그리므로 최소 크기를 둔다.
+        self._preview_label.setMinimumSize(320, 240)
         self._snapshot_label = QLabel()
         self._snapshot_label.setAlignment(Qt.AlignCenter)
         preview_row = QHBoxLayout()
         preview_row.addWidget(self._preview_label)
         preview_row.addWidget(self._snapshot_label)
 
+        # Overlays
+        self._hist_check = QCheckBox("Histogram")
+        self._peaking_check = QCheckBox("Focus Peaking")
+        self._latency_check = QCheckBox("Measure Latency")
+        overlay_row = QHBoxLayout()
+        overlay_row.addWidget(self._hist_check)
+        overlay_row.addWidget(self._peaking_check)
+        overlay_row.addWidget(self._latency_check)
+        overlay_row.addStretch(1)
+
         # Metrics
         self._snr_label = QLabel("SNR: -- dB")
+        # 파라미터별 쓰기 → 프레임 반영 지연 요약.
+        self._latency_label = QLabel()
+        self._latency_label.setVisible(False)
 
-        # Sliders for basic controls
+        # Sliders for basic controls. 범위는 장치 컨트롤 표에서 정한다.
         self._exp_slider = QSlider(Qt.Horizontal)
-        self._exp_slider.setRange(1, 1000)
-        self._exp_slider.setValue(100)
         self._gain_slider = QSlider(Qt.Horizontal)
-        self._gain_slider.setRange(0, 255)
         self._gamma_slider = QSlider(Qt.Horizontal)
-        self._gamma_slider.setRange(0, 500)
         self._contrast_slider = QSlider(Qt.Horizontal)
-        self._contrast_slider.setRange(0, 255)
+        self._sliders = {
+            "exposure_abs": self._exp_slider,
+            "gain": self._gain_slider,
+            "gamma": self._gamma_slider,
+            "contrast": self._contrast_slider,
+        }
         self._ae_combo = QComboBox()
         self._ae_combo.addItems(["Auto", "Manual"])
         self._ae_mode_label = QLabel("AE Mode: Auto")
+        self._configure_controls(FALLBACK_CONTROLS, reset=True)
         controls_col = QVBoxLayout()
         controls_col.addWidget(QLabel("Exposure"))
         exp_row = QHBoxLayout()
@@ -73,19 +107,19 @@ class MainWindow(QMainWindow):
         controls_col.addLayout(exp_row)
         controls_col.addWidget(QLabel("Gain"))
         gain_row = QHBoxLayout()
-        self._gain_value = QLabel("0")
+        self._gain_value = QLabel(str(self._gain_slider.value()))
         gain_row.addWidget(self._gain_slider)
         gain_row.addWidget(self._gain_value)
         controls_col.addLayout(gain_row)
         controls_col.addWidget(QLabel("Gamma"))
         gamma_row = QHBoxLayout()
-        self._gamma_value = QLabel("0")
+        self._gamma_value = QLabel(str(self._gamma_slider.value()))
         gamma_row.addWidget(self._gamma_slider)
         gamma_row.addWidget(self._gamma_value)
         controls_col.addLayout(gamma_row)
         controls_col.addWidget(QLabel("Contrast"))
         contrast_row = QHBoxLayout()
-        self._contrast_value = QLabel("0")
+        self._contrast_value = QLabel(str(self._contrast_slider.value()))
         contrast_row.addWidget(self._contrast_slider)
         contrast_row.addWidget(self._contrast_value)
         controls_col.addLayout(contrast_row)
@@ -95,31 +129,67 @@ class MainWindow(QMainWindow):
 
         self._snapshot_btn = QPushButton("Snapshot")
         self._export_btn = QPushButton("Export Report")
+        self._record_btn = QPushButton("Record")
+        self._record_btn.setCheckable(True)
         bottom_bar = QHBoxLayout()
         bottom_bar.addWidget(self._snapshot_btn)
         bottom_bar.addWidget(self._export_btn)
+        bottom_bar.addWidget(self._record_btn)
+
+        # Presets
+        self._preset_combo = QComboBox()
+        self._preset_combo.setEditable(True)
+        self._preset_save_btn = QPushButton("Save Preset")
+        self._preset_apply_btn = QPushButton("Apply Preset")
+        preset_row = QHBoxLayout()
+        preset_row.addWidget(self._preset_combo, 1)
+        preset_row.addWidget(self._preset_save_btn)
+        preset_row.addWidget(self._preset_apply_btn)
 
         container = QWidget()
         layout = QVBoxLayout(container)
         layout.addLayout(top_bar)
         layout.addLayout(preview_row)
+        layout.addLayout(overlay_row)
         layout.addWidget(self._snr_label)
+        layout.addWidget(self._latency_label)
         layout.addLayout(controls_col)
+        layout.addLayout(preset_row)
         layout.addLayout(bottom_bar)
         self.setCentralWidget(container)
 
         self.device = None
+        self._recorder = None
+        self._last_seq = -1
+        self._latency: LatencyMonitor | None = None
+        self._presets: PresetLibrary | None = None
         self._timer = QTimer(self)
         self._timer.timeout.connect(self._update_frame)
+        # 오버레이는 미리보기 크기로 줄인 영상에 그린다.
+        self._overlay = OverlayRenderer()
+        # SNR 은 워커 프로세스에서 계산해 미리보기 타이머를 막지 않는다.
+        self._metrics = MetricBridge(self, workers=1, metrics=("snr",))
+        self._metrics.resultReady.connect(self._on_metrics)
+        # 파라미터 쓰기는 쓰기 스레드가 모아서 하므로 슬라이더를 끌어도 막히지 않는다.
+        self._params = ParamBridge(self)
+        self._params.paramWritten.connect(self._on_param_written)
 
         self._start_btn.clicked.connect(self._start_stream)
         self._stop_btn.clicked.connect(self._stop_stream)
         self._snapshot_btn.clicked.connect(self._take_snapshot)
+        self._record_btn.toggled.connect(self._toggle_recording)
+        self._preset_save_btn.clicked.connect(self._save_preset)
+        self._preset_apply_btn.clicked.connect(self._apply_preset)
+        self._hist_check.toggled.connect(self._toggle_histogram)
+        self._peaking_check.toggled.connect(self._toggle_peaking)
+        self._latency_check.toggled.connect(self._toggle_latency)
         self._ae_combo.currentTextChanged.connect(self._apply_auto_exposure)
         self._exp_slider.valueChanged.connect(self._apply_exposure)
         self._gain_slider.valueChanged.connect(self._apply_gain)
         self._gamma_slider.valueChanged.connect(self._apply_gamma)
         self._contrast_slider.valueChanged.connect(self._apply_contrast)
+        # 색인만 읽으므로 프리셋이 많아도 창을 여는 데 부담이 없다.
+        self._preset_library()
 
     def _ndarray_to_pixmap(self, frame) -> QPixmap:
         height, width = frame.shape[:2]
@@ -132,11 +202,78 @@ class MainWindow(QMainWindow):
     def _update_frame(self) -> None:
         if self.device is None:
             return
-        frame = self.device.read_frame()
-        pixmap = self._ndarray_to_pixmap(frame)
-        self._preview_label.setPixmap(pixmap)
-        snr = calc_snr(frame)
-        self._snr_label.setText(f"SNR: {snr:.2f} dB")
+        frame = self.device.latest()
+        if frame is None:
+            return
+        with frame:
+            if frame.seq == self._last_seq:
+                return
+            self._last_seq = frame.seq
+            image = frame.image
+            if self._overlay.enabled:
+                size = self._preview_label.size()
+                image = self._overlay.render(image, (size.width(), size.height()))
+            pixmap = self._ndarray_to_pixmap(image)
+            self._preview_label.setPixmap(pixmap)
+            self._metrics.submit(frame.image, timestamp=frame.timestamp)
+            if self._latency is not None and self._latency.observe(
+                frame.image, frame.timestamp, frame.seq
+            ):
+                self._show_latency()
+
+    def _on_metrics(self, key, tag, timestamp, result, error) -> None:
+        if error is not None:
+            self.statusBar().showMessage(f"Metric worker: {error}", 5000)
+            return
+        if result.snr is not None:
+            self._snr_label.setText(f"SNR: {result.snr:.2f} dB")
+
+    def _toggle_histogram(self, checked: bool) -> None:
+        self._overlay.histogram = checked
+        self._last_seq = -1
+
+    def _toggle_peaking(self, checked: bool) -> None:
+        self._overlay.peaking = checked
+        self._last_seq = -1
+
+    def _device_key(self):
+        return CONTROL_TABLE.key(self.device.device_id) if self.device else None
+
+    def _toggle_latency(self, checked: bool) -> None:
+        """켜면 슬라이더 쓰기마다 반영 지연을 재서 장치별 히스토그램에 쌓는다."""
+        self._latency = LatencyMonitor(self._device_key()) if checked else None
+        self._latency_label.setVisible(checked)
+        self._show_latency()
+
+    def _show_latency(self) -> None:
+        lines = LATENCY_TABLE.summary(self._device_key())
+        self._latency_label.setText(
+            "\n".join(lines) or "Latency: move a slider on a static scene"
+        )
+
+    def _configure_controls(
+        self, controls: dict[str, ControlDescriptor], reset: bool = False
+    ) -> None:
+        """컨트롤 표로 슬라이더 범위/간격을 맞춘다. 장치에 없는 컨트롤은 끈다.
+
+        ``reset`` 이면 슬라이더를 컨트롤 기본값으로 옮긴다. 범위를 바꾸는
+        동안에는 값이 잘려도 장치에 쓰지 않도록 시그널을 막는다.
+        """
+        for name, slider in self._sliders.items():
+            desc = controls.get(name)
+            blocker = QSignalBlocker(slider)
+            if desc is None:
+                slider.setEnabled(False)
+            else:
+                slider.setRange(desc.minimum, desc.maximum)
+                slider.setSingleStep(max(desc.step, 1))
+                slider.setPageStep(max(desc.step, (desc.maximum - desc.minimum) // 10, 1))
+                slider.setEnabled(desc.writable)
+                if reset:
+                    slider.setValue(desc.default)
+            blocker.unblock()
+        ae = controls.get("auto_exposure")
+        self._ae_combo.setEnabled(ae is not None and ae.writable)
 
     def _sync_sliders_with_device(self) -> None:
         """디바이스의 현재 파라미터 값을 읽어 슬라이더 위치를 맞춘다."""
@@ -153,49 +290,167 @@ class MainWindow(QMainWindow):
     def _start_stream(self) -> None:
         if self.device is None:
             device_id = self._device_combo.currentText()
-            self.device = CameraDevice(device_id)
+            self.device = CameraDevice(device_id, threaded=True, pool_size=8)
         self.device.start_stream()
+        self._configure_controls(describe_controls(self.device.device_id, self.device.cap))
+        # 잰 반영 지연이 있으면 같은 파라미터를 그보다 자주 쓰지 않는다.
+        key = self._device_key()
+        self._params.start(self.device.cap, settle=LATENCY_TABLE.settle_times(key))
+        if self._latency is not None:
+            self._latency = LatencyMonitor(key)
+        self._metrics.start()
         self._sync_sliders_with_device()
-        self._timer.start(30)
+        self._timer.start(15)
 
     def _stop_stream(self) -> None:
+        self._record_btn.setChecked(False)
+        self._params.close()
         if self.device:
             self.device.stop_stream()
         self._timer.stop()
 
+    def _toggle_recording(self, checked: bool) -> None:
+        """녹화를 시작/중지한다. 파일은 현재 디렉터리에 세션 시각으로 저장한다."""
+        if not checked:
+            if self.device is not None:
+                self.device.stop_recording()
+            self._recorder = None
+            return
+        if not (self.device and self.device.cap and self.device.cap.isOpened()):
+            self._record_btn.setChecked(False)
+            return
+        path = time.strftime("session_%Y%m%d_%H%M%S") + RECORDING_SUFFIX
+        self._recorder = self.device.start_recording(
+            path,
+            exposure_abs=self._exp_slider.value(),
+            gain=self._gain_slider.value(),
+            gamma=self._gamma_slider.value(),
+            contrast=self._contrast_slider.value(),
+            auto_exposure=3 if self._ae_combo.currentText() == "Auto" else 1,
+        )
+
+    def _set_param(self, param_id: str, value) -> None:
+        """쓰기 스레드에 파라미터 쓰기를 맡긴다. 결과는 :meth:`_on_param_written` 로 온다."""
+        self._params.write(param_id, value)
+
+    def _on_param_written(self, param_id: str, value, error) -> None:
+        """쓰기가 끝나면 녹화 중인 파라미터 상태를 갱신하고, 실패는 상태 표시줄에 알린다."""
+        if error is not None:
+            self.statusBar().showMessage(str(error), 5000)
+            return
+        if self._recorder is not None:
+            self._recorder.update_params(**{param_id: value})
+        writer = self._params.writer
+        if self._latency is not None and writer is not None:
+            if self._latency.mark(param_id, value, writer.written_at.get(param_id)):
+                self._show_latency()
+
+    def _preset_library(self) -> PresetLibrary:
+        if self._presets is None:
+            self._presets = PresetLibrary(PRESET_DIR)
+            self._preset_combo.addItems(self._presets.names())
+        return self._presets
+
+    def _current_params(self) -> dict[str, int]:
+        """슬라이더/콤보의 현재 파라미터 값."""
+        params = {name: slider.value() for name, slider in self._sliders.items()}
+        params["auto_exposure"] = 3 if self._ae_combo.currentText() == "Auto" else 1
+        return params
+
+    def _save_preset(self) -> None:
+        name = self._preset_combo.currentText().strip()
+        if not name:
+            return
+        library = self._preset_library()
+        model = device_model(CONTROL_TABLE.key(self.device.device_id)) if self.device else ""
+        library.save(Preset(name, self._current_params(), model))
+        if self._preset_combo.findText(name) < 0:
+            self._preset_combo.addItem(name)
+        self.statusBar().showMessage(f"Saved preset {name}", 3000)
+
+    def _apply_preset(self) -> None:
+        """프리셋을 장치에 쓴다. 현재 값과 다른 컨트롤만 의존 순서대로 쓰기 워커에 넘긴다.
+
+        현재 값은 장치 대신 슬라이더에서 읽는다. 슬라이더 값은 모두 쓰기
+        워커에 넘겨졌고, 밀린 같은 파라미터 값은 프리셋 값이 덮어쓴다.
+        결과는 슬라이더 쓰기와 같이 :meth:`_on_param_written` 로 온다.
+        """
+        if not (self.device and self.device.cap and self.device.cap.isOpened()):
+            return
+        if self._params.writer is None:
+            return
+        name = self._preset_combo.currentText().strip()
+        try:
+            preset = self._preset_library().load(name)
+        except (KeyError, OSError, ValueError) as exc:
+            self.statusBar().showMessage(str(exc), 5000)
+            return
+        controls = describe_controls(self.device.device_id, self.device.cap)
+        result = plan(preset, None, current=self._current_params(), controls=controls)
+        previous = None
+        for param_id, value in result.writes:
+            self._params.write(param_id, value, after=previous)
+            previous = param_id
+            slider = self._sliders.get(param_id)
+            if slider is not None:
+                blocker = QSignalBlocker(slider)
+                slider.setValue(int(value))
+                blocker.unblock()
+            elif param_id == "auto_exposure":
+                blocker = QSignalBlocker(self._ae_combo)
+                self._ae_combo.setCurrentText("Manual" if value == 1 else "Auto")
+                blocker.unblock()
+        self._refresh_value_labels()
+        message = f"Applying {preset.name}: {len(result.writes)} writes"
+        if result.skipped:
+            message += ", skipped: " + ", ".join(result.skipped)
+        self.statusBar().showMessage(message, 5000)
+
+    def _refresh_value_labels(self) -> None:
+        self._exp_value.setText(str(self._exp_slider.value()))
+        self._gain_value.setText(str(self._gain_slider.value()))
+        self._gamma_value.setText(str(self._gamma_slider.value()))
+        self._contrast_value.setText(str(self._contrast_slider.value()))
+        self._ae_mode_label.setText(f"AE Mode: {self._ae_combo.currentText()}")
+
     def _take_snapshot(self) -> None:
         if self.device is None:
             return
-        frame = self.device.read_frame()
-        self._snapshot_label.setPixmap(self._ndarray_to_pixmap(frame))
+        # 링에서 꺼내지 않고 화면에 올라간 최신 프레임을 복사해 둔다.
+        frame = self.device.latest()
+        if frame is None:
+            return
+        with frame:
+            image = frame.image.copy()
+        self._snapshot_label.setPixmap(self._ndarray_to_pixmap(image))
 
     def _apply_exposure(self, value: int) -> None:
         mode = self._ae_combo.currentText()
         if mode == "Manual":
             if self.device and self.device.cap and self.device.cap.isOpened():
-                set_param(self.device.cap, "exposure_abs", value)
+                self._set_param("exposure_abs", value)
         self._exp_value.setText(str(value))
 
     def _apply_gain(self, value: int) -> None:
         if self.device and self.device.cap and self.device.cap.isOpened():
-            set_param(self.device.cap, "gain", value)
+            self._set_param("gain", value)
         self._gain_value.setText(str(value))
 
     def _apply_gamma(self, value: int) -> None:
         if self.device and self.device.cap and self.device.cap.isOpened():
-            set_param(self.device.cap, "gamma", value)
+            self._set_param("gamma", value)
         self._gamma_value.setText(str(value))
 
     def _apply_contrast(self, value: int) -> None:
         if self.device and self.device.cap and self.device.cap.isOpened():
-            set_param(self.device.cap, "contrast", value)
+            self._set_param("contrast", value)
         self._contrast_value.setText(str(value))
 
     def _apply_auto_exposure(self) -> None:
         mode = self._ae_combo.currentText()
         value = 3 if mode == "Auto" else 1
         if self.device and self.device.cap and self.device.cap.isOpened():
-            set_param(self.device.cap, "auto_exposure", value)
+            self._set_param("auto_exposure", value)
         self._ae_mode_label.setText(f"AE Mode: {mode}")
 
     def show(self) -> None:
@@ -204,6 +459,7 @@ class MainWindow(QMainWindow):
 
     def closeEvent(self, event) -> None:  # type: ignore[override]
         self._stop_stream()
+        self._metrics.close()
         super().closeEvent(event)
 
 if __name__ == "__main__":
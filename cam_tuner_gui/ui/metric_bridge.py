@@ -0,0 +1,84 @@
+"""워커 프로세스의 지표 결과를 Qt 시그널로 넘기는 브리지.
+
+:class:`~cam_tuner_gui.metric.service.MetricService` 의 결과 콜백은 수집
+스레드에서 불리므로 바로 위젯을 건드릴 수 없다. :class:`MetricBridge` 는
+그 콜백을 :attr:`MetricBridge.resultReady` 시그널로 내보내고, Qt 가 큐
+연결로 GUI 스레드에 전달한다. 워커 오류도 같은 시그널의 ``error`` 로 온다.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Hashable
+
+from PySide6.QtCore import QObject, Signal
+
+from cam_tuner_gui.metric.engine import MetricResult
+from cam_tuner_gui.metric.service import MetricService
+
+
+__all__ = ["MetricBridge"]
+
+
+class MetricBridge(QObject):
+    """:class:`MetricService` 를 감싸 결과를 ``resultReady(key, tag, timestamp, result, error)`` 로 낸다.
+
+    워커는 spawn 으로 띄우므로 시작에 시간이 걸린다. 서비스는 처음
+    :meth:`submit` (또는 :meth:`start`) 할 때 만든다.
+    """
+
+    resultReady = Signal(object, object, object, object, object)
+
+    def __init__(
+        self,
+        parent: QObject | None = None,
+        workers: int | None = None,
+        **service_kwargs,
+    ) -> None:
+        """워커 수와 :class:`MetricService` 에 넘길 설정을 받는다."""
+        super().__init__(parent)
+        self._workers = workers
+        self._kwargs = service_kwargs
+        self._service: MetricService | None = None
+
+    @property
+    def service(self) -> MetricService | None:
+        return self._service
+
+    def start(self) -> MetricService:
+        """워커를 띄운다. 이미 떠 있으면 그대로 둔다."""
+        if self._service is None:
+            self._service = MetricService(
+                callback=self._emit, workers=self._workers, **self._kwargs
+            )
+        return self._service
+
+    def _emit(
+        self,
+        key: Hashable,
+        tag: Any,
+        timestamp: float | None,
+        result: MetricResult | None,
+        error: str | None,
+    ) -> None:
+        # 수집 스레드에서 불린다. 시그널 전달은 Qt 가 GUI 스레드로 옮긴다.
+        self.resultReady.emit(key, tag, timestamp, result, error)
+
+    def submit(
+        self,
+        frame,
+        key: Hashable = None,
+        timestamp: float | None = None,
+        tier=None,
+        metrics=None,
+        tag: Any = None,
+    ) -> bool:
+        """프레임을 워커에 맡긴다. 워커가 밀려 버려지면 ``False``."""
+        return self.start().submit(
+            frame, key, timestamp, tier=tier, metrics=metrics, tag=tag
+        )
+
+    def close(self) -> None:
+        """워커를 멈추고 공유 메모리를 해제한다."""
+        if self._service is not None:
+            self._service.close()
+            self._service = None
@@ -0,0 +1,215 @@
+"""미리보기용 히스토그램/포커스 피킹 오버레이.
+
+캡처 프레임과 ``QLabel`` 사이에서 미리보기 크기로 줄인 영상을 만들고 그
+위에 오버레이를 그린다. Qt 에 의존하지 않는다.
+
+- 히스토그램은 원본 프레임을 ``hist_step`` 간격 격자로 솎아 채널별로
+  ``cv2.calcHist`` 한다. 노출 판단(클리핑)에는 원본 화소 값이 필요하므로
+  줄인 영상이 아니라 원본을 솎는다. 격자 위상을 프레임마다 옮기며 이전
+  결과와 평균하므로 몇 프레임이면 모든 화소가 반영되고 선이 떨리지 않는다.
+- 포커스 피킹은 미리보기 크기 영상에서 가로/세로 이웃 화소 차의 최댓값이
+  ``peak_threshold`` 를 넘는 화소를 ``peak_color`` 로 칠한다. 에지 마스크는
+  행을 ``peak_interlace`` 개 띠로 나눠 프레임마다 한 띠씩 돌아가며 다시
+  계산하고, 칠하기는 전체 마스크로 한다. 그레이 변환이 피킹 비용의
+  대부분이므로 기본값(3)에서 720p 피킹 비용이 절반 아래로 준다. 마스크는
+  최대 ``peak_interlace - 1`` 프레임 늦는다.
+
+미리보기/그레이/에지/마스크 버퍼는 크기가 바뀔 때만 새로 만들고, 합성은
+미리보기 버퍼에 제자리로 한다.
+"""
+
+from __future__ import annotations
+
+import cv2
+import numpy as np
+
+
+__all__ = ["OverlayRenderer", "fit_size", "sample_histogram"]
+
+# 채널 순서(BGR)별 히스토그램 선 색.
+_HIST_COLORS = ((255, 96, 96), (96, 255, 96), (96, 96, 255))
+
+
+def fit_size(source: tuple[int, int], bounds: tuple[int, int]) -> tuple[int, int]:
+    """``source`` (w, h) 를 비율을 지켜 ``bounds`` 안에 넣은 크기. 확대하지는 않는다."""
+    sw, sh = source
+    bw, bh = bounds
+    if bw <= 0 or bh <= 0:
+        return sw, sh
+    scale = min(bw / sw, bh / sh, 1.0)
+    return max(1, round(sw * scale)), max(1, round(sh * scale))
+
+
+def sample_histogram(
+    image: np.ndarray, step: int = 4, bins: int = 64, phase: tuple[int, int] = (0, 0)
+) -> np.ndarray:
+    """``step`` 간격 격자 화소의 채널별 히스토그램 (채널 수 × ``bins``).
+
+    ``phase`` (x, y) 는 격자의 시작 오프셋이다.
+    """
+    height, width = image.shape[:2]
+    px, py = phase[0] % step, phase[1] % step
+    gw, gh = max((width - px) // step, 1), max((height - py) // step, 1)
+    # 최근접 보간으로 정수 배 축소하면 격자 화소만 골라 연속 배열로 만든다.
+    view = image[py : py + gh * step, px : px + gw * step]
+    grid = cv2.resize(view, (gw, gh), interpolation=cv2.INTER_NEAREST)
+    channels = 1 if grid.ndim == 2 else grid.shape[2]
+    return np.stack(
+        [
+            cv2.calcHist([grid], [c], None, [bins], [0, 256]).ravel()
+            for c in range(channels)
+        ]
+    )
+
+
+def _resize_interpolation(source: tuple[int, int], target: tuple[int, int]) -> int:
+    # 정수 배 축소는 INTER_AREA 가 빠르고 깨끗하다. 그 밖에는 INTER_AREA 가
+    # 크게 느려지므로 Qt 의 SmoothTransformation 과 같은 쌍선형을 쓴다.
+    sw, sh = source
+    tw, th = target
+    if sw % tw == 0 and sh % th == 0 and sw // tw == sh // th:
+        return cv2.INTER_AREA
+    return cv2.INTER_LINEAR
+
+
+class OverlayRenderer:
+    """프레임을 미리보기 크기로 줄이고 켜진 오버레이를 합성한다.
+
+    :meth:`render` 가 돌려주는 배열은 내부 버퍼이므로 다음 호출 전에
+    화면에 옮기거나 복사해야 한다 (``QPixmap.fromImage`` 는 복사한다).
+    ``hist_decay`` 는 새 히스토그램의 가중치다 (1 이면 평균하지 않는다).
+    """
+
+    def __init__(
+        self,
+        histogram: bool = False,
+        peaking: bool = False,
+        peak_threshold: int = 24,
+        peak_color: tuple[int, int, int] = (0, 0, 255),
+        hist_step: int = 8,
+        bins: int = 64,
+        hist_decay: float = 0.5,
+        peak_interlace: int = 3,
+    ) -> None:
+        """켤 오버레이, 피킹 문턱값/색(BGR), 히스토그램 격자 간격/구간 수/평균 가중치,
+        피킹 마스크를 나눠 갱신할 띠 수를 받는다."""
+        if peak_interlace < 1:
+            raise ValueError("peak_interlace must be >= 1")
+        self.histogram = histogram
+        self.peaking = peaking
+        self.peak_threshold = peak_threshold
+        self.peak_color = peak_color
+        self.hist_step = hist_step
+        self.bins = bins
+        self.hist_decay = hist_decay
+        self.peak_interlace = peak_interlace
+        self.last_histogram: np.ndarray | None = None
+        self._frame = 0
+        self._shape: tuple[int, int] | None = None
+        self._preview: np.ndarray | None = None
+        self._gray: np.ndarray | None = None
+        self._dx: np.ndarray | None = None
+        self._dy: np.ndarray | None = None
+        self._mask: np.ndarray | None = None
+        self._color: np.ndarray | None = None
+        # 버퍼를 새로 만든 뒤 첫 피킹은 모든 행을 계산한다.
+        self._mask_fresh = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.histogram or self.peaking
+
+    def _buffers(self, width: int, height: int) -> None:
+        if self._shape == (height, width):
+            return
+        self._shape = (height, width)
+        self._preview = np.empty((height, width, 3), np.uint8)
+        self._gray = np.empty((height, width), np.uint8)
+        # 차분 버퍼의 첫 열/행은 차분이 없으므로 0 으로 둔다.
+        self._dx = np.zeros((height, width), np.uint8)
+        self._dy = np.zeros((height, width), np.uint8)
+        self._mask = np.empty((height, width), np.uint8)
+        self._mask_fresh = False
+        self._color = np.empty((height, width, 3), np.uint8)
+        self._color[:] = self.peak_color
+
+    def render(
+        self, image: np.ndarray, size: tuple[int, int] | None = None
+    ) -> np.ndarray:
+        """``image`` 를 ``size`` (w, h) 안에 맞춰 줄이고 오버레이를 그린 BGR 영상."""
+        src = (image.shape[1], image.shape[0])
+        width, height = fit_size(src, size or src)
+        self._buffers(width, height)
+        preview = self._preview
+        inter = _resize_interpolation(src, (width, height))
+        if image.ndim == 2:
+            cv2.resize(image, (width, height), dst=self._gray, interpolation=inter)
+            cv2.cvtColor(self._gray, cv2.COLOR_GRAY2BGR, dst=preview)
+        else:
+            cv2.resize(image, (width, height), dst=preview, interpolation=inter)
+
+        if self.peaking:
+            self._draw_peaking(preview, gray_ready=image.ndim == 2)
+        if self.histogram:
+            self._update_histogram(image)
+            self._draw_histogram(preview, self.last_histogram)
+        self._frame += 1
+        return preview
+
+    def _update_histogram(self, image: np.ndarray) -> None:
+        step = self.hist_step
+        # 프레임마다 격자 위상을 옮겨 step² 프레임에 걸쳐 모든 화소를 본다.
+        k = self._frame % (step * step)
+        hist = sample_histogram(image, step, self.bins, (k % step, k // step))
+        old = self.last_histogram
+        if old is None or old.shape != hist.shape:
+            self.last_histogram = hist
+        else:
+            old += self.hist_decay * (hist - old)
+
+    def _draw_peaking(self, preview: np.ndarray, gray_ready: bool) -> None:
+        if self._mask_fresh:
+            bands = self.peak_interlace
+            self._update_mask(preview, gray_ready, self._frame % bands, bands)
+        else:
+            self._update_mask(preview, gray_ready, 0, 1)
+            self._mask_fresh = True
+        if tuple(self._color[0, 0]) != tuple(self.peak_color):
+            self._color[:] = self.peak_color
+        cv2.copyTo(self._color, self._mask, preview)
+
+    def _update_mask(
+        self, preview: np.ndarray, gray_ready: bool, band: int, bands: int
+    ) -> None:
+        """행을 ``bands`` 개 띠로 나눈 것 중 ``band`` 번째 띠의 에지 마스크를 다시 계산한다."""
+        height = preview.shape[0]
+        start, stop = height * band // bands, height * (band + 1) // bands
+        if start >= stop:
+            return
+        # 세로 차분에 쓸 바로 윗줄까지 그레이로 바꿔 띠 경계에도 묵은 값이 없게 한다.
+        top = max(start - 1, 0)
+        gray, dx, dy, mask = self._gray, self._dx, self._dy, self._mask
+        if not gray_ready:
+            cv2.cvtColor(preview[top:stop], cv2.COLOR_BGR2GRAY, dst=gray[top:stop])
+        cv2.absdiff(gray[start:stop, 1:], gray[start:stop, :-1], dst=dx[start:stop, 1:])
+        first = max(start, 1)
+        if first < stop:
+            cv2.absdiff(gray[first:stop], gray[first - 1 : stop - 1], dst=dy[first:stop])
+        cv2.max(dx[start:stop], dy[start:stop], dst=mask[start:stop])
+        cv2.compare(mask[start:stop], self.peak_threshold, cv2.CMP_GT, dst=mask[start:stop])
+
+    def _draw_histogram(self, preview: np.ndarray, hist: np.ndarray) -> None:
+        height, width = preview.shape[:2]
+        pw, ph = max(width // 4, 16), max(height // 5, 16)
+        if pw + 8 > width or ph + 8 > height:
+            return
+        panel = preview[height - ph - 4 : height - 4, 4 : 4 + pw]
+        # 패널 배경을 어둡게 해 어떤 장면에서도 선이 보이게 한다.
+        cv2.convertScaleAbs(panel, dst=panel, alpha=0.35)
+        xs = np.linspace(0, pw - 1, hist.shape[1]).astype(np.int32)
+        peak = float(hist.max()) or 1.0
+        ys = (ph - 1 - hist / peak * (ph - 1)).astype(np.int32)
+        colors = _HIST_COLORS if hist.shape[0] == 3 else ((230, 230, 230),)
+        for row, line_color in zip(ys, colors):
+            points = np.stack([xs, row], axis=1).reshape(-1, 1, 2)
+            cv2.polylines(panel, [points], False, line_color, 1, cv2.LINE_8)
@@ -0,0 +1,79 @@
+"""파라미터 쓰기 결과를 Qt 시그널로 넘기는 브리지.
+
+:class:`~cam_tuner_gui.control.writer.ParamWriter` 의 결과 콜백은 쓰기
+스레드에서 불린다. :class:`ParamBridge` 는 그 콜백을
+:attr:`ParamBridge.paramWritten` 시그널로 내보내고, Qt 가 큐 연결로 GUI
+스레드에 전달한다. 슬롯에서는 예외 대신 ``error`` 인자로 실패를 받는다.
+"""
+
+from __future__ import annotations
+
+from typing import Mapping
+
+from PySide6.QtCore import QObject, Signal
+
+from cam_tuner_gui.control.writer import DEFAULT_SETTLE, ParamWriter
+
+
+__all__ = ["ParamBridge"]
+
+
+class ParamBridge(QObject):
+    """:class:`ParamWriter` 를 감싸 결과를 ``paramWritten(param_id, value, error)`` 로 낸다.
+
+    스트림을 열 때마다 캡처 객체가 바뀌므로 :meth:`start` 로 새 캡처에
+    붙이고 :meth:`close` 로 밀린 쓰기를 버린다. 성공하면 ``error`` 는 ``None``.
+    """
+
+    paramWritten = Signal(str, object, object)
+
+    def __init__(
+        self,
+        parent: QObject | None = None,
+        settle: float | Mapping[str, float] = DEFAULT_SETTLE,
+    ) -> None:
+        """파라미터별 안정화 시간(초)을 받는다."""
+        super().__init__(parent)
+        self._settle = settle
+        self._writer: ParamWriter | None = None
+
+    @property
+    def writer(self) -> ParamWriter | None:
+        return self._writer
+
+    def start(
+        self, capture, settle: float | Mapping[str, float] | None = None
+    ) -> ParamWriter:
+        """``capture`` 에 쓰는 워커를 만든다. 이전 워커는 닫는다.
+
+        ``settle`` 을 주면 이 장치에서는 생성 시 받은 안정화 시간 대신 쓴다
+        (예: :meth:`~cam_tuner_gui.control.latency.LatencyTable.settle_times`).
+        """
+        if settle is None:
+            settle = self._settle
+        if self._writer is not None and self._writer.capture is capture:
+            self._writer.settle = settle
+            return self._writer
+        self.close()
+        self._writer = ParamWriter(capture, settle, callback=self._emit)
+        return self._writer
+
+    def _emit(self, param_id: str, value, error: Exception | None) -> None:
+        # 쓰기 스레드에서 불린다. 시그널 전달은 Qt 가 GUI 스레드로 옮긴다.
+        self.paramWritten.emit(param_id, value, error)
+
+    def write(self, param_id: str, value, after: str | None = None) -> bool:
+        """쓰기를 예약한다. 스트림이 열려 있지 않으면 ``False``.
+
+        ``after`` 는 :meth:`ParamWriter.write` 와 같다.
+        """
+        if self._writer is None:
+            return False
+        self._writer.write(param_id, value, after)
+        return True
+
+    def close(self) -> None:
+        """밀린 쓰기를 버리고 워커를 멈춘다."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
@@ -0,0 +1,134 @@
+"""미리보기 위에 ROI 를 그리는 라벨 위젯.
+
+왼쪽 드래그로 사각형 ROI 를 추가하고 오른쪽 클릭으로 모두 지운다. ROI 는
+화면 좌표가 아니라 원본 프레임 픽셀 좌표 ``(x, y, w, h)`` 로 보관한다.
+"""
+
+from __future__ import annotations
+
+from PySide6.QtCore import QPoint, QRect, QSize, Qt, Signal
+from PySide6.QtGui import QColor, QPainter, QPen
+from PySide6.QtWidgets import QLabel, QWidget
+
+
+__all__ = ["RoiLabel", "pixmap_rect", "widget_to_image", "image_to_widget"]
+
+_MIN_SIZE = 8
+
+
+def pixmap_rect(widget: QSize, pixmap: QSize) -> QRect:
+    """가운데 정렬된 pixmap 이 위젯 안에서 차지하는 영역."""
+    x = (widget.width() - pixmap.width()) // 2
+    y = (widget.height() - pixmap.height()) // 2
+    return QRect(x, y, pixmap.width(), pixmap.height())
+
+
+def widget_to_image(
+    rect: QRect, shown: QRect, source: tuple[int, int]
+) -> tuple[int, int, int, int]:
+    """위젯 좌표 사각형을 원본 프레임 ``(x, y, w, h)`` 로 바꾼다. 프레임 밖은 잘린다."""
+    width, height = source
+    sx = width / max(shown.width(), 1)
+    sy = height / max(shown.height(), 1)
+    r = rect.normalized()
+    x0 = min(max(int((r.left() - shown.left()) * sx), 0), width)
+    y0 = min(max(int((r.top() - shown.top()) * sy), 0), height)
+    x1 = min(max(int((r.right() + 1 - shown.left()) * sx), 0), width)
+    y1 = min(max(int((r.bottom() + 1 - shown.top()) * sy), 0), height)
+    return (x0, y0, x1 - x0, y1 - y0)
+
+
+def image_to_widget(
+    roi: tuple[int, int, int, int], shown: QRect, source: tuple[int, int]
+) -> QRect:
+    """원본 프레임 ROI 를 화면에 그릴 위젯 좌표 사각형으로 바꾼다."""
+    width, height = source
+    sx = shown.width() / max(width, 1)
+    sy = shown.height() / max(height, 1)
+    x, y, w, h = roi
+    return QRect(
+        shown.left() + round(x * sx),
+        shown.top() + round(y * sy),
+        round(w * sx),
+        round(h * sy),
+    )
+
+
+class RoiLabel(QLabel):
+    """ROI 를 그릴 수 있는 미리보기 라벨."""
+
+    roisChanged = Signal(list)
+
+    def __init__(self, parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        self.setAlignment(Qt.AlignCenter)
+        self._source: tuple[int, int] | None = None
+        self._rois: list[tuple[int, int, int, int]] = []
+        self._origin: QPoint | None = None
+        self._drag: QRect | None = None
+
+    def rois(self) -> list[tuple[int, int, int, int]]:
+        """원본 프레임 좌표의 ROI 목록."""
+        return list(self._rois)
+
+    def set_rois(self, rois) -> None:
+        self._rois = [tuple(int(v) for v in roi) for roi in rois]
+        self.update()
+        self.roisChanged.emit(self.rois())
+
+    def clear_rois(self) -> None:
+        self.set_rois([])
+
+    def set_source_size(self, width: int, height: int) -> None:
+        """표시 중인 프레임의 원본 크기. 크기가 바뀌면 ROI 를 지운다."""
+        size = (int(width), int(height))
+        if self._source is not None and self._source != size and self._rois:
+            self.clear_rois()
+        self._source = size
+
+    def _shown(self) -> QRect | None:
+        pixmap = self.pixmap()
+        if pixmap is None or pixmap.isNull() or self._source is None:
+            return None
+        return pixmap_rect(self.size(), pixmap.size())
+
+    def mousePressEvent(self, event) -> None:  # type: ignore[override]
+        if event.button() == Qt.RightButton:
+            self.clear_rois()
+        elif event.button() == Qt.LeftButton and self._shown() is not None:
+            self._origin = event.position().toPoint()
+            self._drag = QRect(self._origin, self._origin)
+        super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event) -> None:  # type: ignore[override]
+        if self._origin is not None:
+            self._drag = QRect(self._origin, event.position().toPoint())
+            self.update()
+        super().mouseMoveEvent(event)
+
+    def mouseReleaseEvent(self, event) -> None:  # type: ignore[override]
+        shown = self._shown()
+        if self._origin is not None and self._drag is not None and shown is not None:
+            roi = widget_to_image(self._drag, shown, self._source)
+            if roi[2] >= _MIN_SIZE and roi[3] >= _MIN_SIZE:
+                self.set_rois(self._rois + [roi])
+        self._origin = None
+        self._drag = None
+        self.update()
+        super().mouseReleaseEvent(event)
+
+    def paintEvent(self, event) -> None:  # type: ignore[override]
+        super().paintEvent(event)
+        shown = self._shown()
+        if shown is None or not (self._rois or self._drag):
+            return
+        painter = QPainter(self)
+        painter.setPen(QPen(QColor(0, 255, 0), 2))
+        for i, roi in enumerate(self._rois):
+            rect = image_to_widget(roi, shown, self._source)
+            painter.drawRect(rect)
+            painter.drawText(rect.topLeft() + QPoint(3, 14), str(i + 1))
+        if self._drag is not None:
+            painter.setPen(QPen(QColor(255, 255, 0), 1, Qt.DashLine))
+            painter.drawRect(self._drag.normalized())
+        painter.end()
@@ -0,0 +1,33 @@
+"""여러 계층이 함께 쓰는 작은 도구."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+import tempfile
+
+
+__all__ = ["atomic_write"]
+
+
+def atomic_write(path: str | os.PathLike, data: bytes, sync: bool = True) -> None:
+    """``data`` 를 같은 디렉터리의 임시 파일에 쓴 뒤 ``path`` 로 바꿔 넣는다.
+
+    도중에 죽어도 ``path`` 에는 이전 내용이나 새 내용 중 하나만 남는다.
+    다시 만들 수 있는 파일(캐시 등)은 ``sync=False`` 로 fsync 를 건너뛴다.
+    """
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fp:
+            fp.write(data)
+            if sync:
+                fp.flush()
+                os.fsync(fp.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,80 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import csv
+
+import cv2
+import numpy as np
+import pytest
+
+from cam_tuner_gui import analyze
+from cam_tuner_gui.capture.recording import Recorder
+from cam_tuner_gui.capture.synthetic import SyntheticSource
+from cam_tuner_gui.metric import metrics as m
+
+
+def _make_inputs(root):
+    src = SyntheticSource("slanted_edge", width=64, height=48)
+    with Recorder(str(root / "run.camrec"), fps=30, chunk_frames=4) as rec:
+        for i in range(6):
+            rec.write(src.read()[1], seq=i, timestamp=i / 30)
+    seq = root / "seq"
+    seq.mkdir()
+    for i in range(3):
+        cv2.imwrite(str(seq / f"{i:03d}.png"), src.read()[1])
+
+
+def test_discover_and_plan(tmp_path):
+    _make_inputs(tmp_path)
+    sources = analyze.discover(str(tmp_path))
+    kinds = sorted((s.kind, s.frames) for s in sources)
+    assert kinds == [("images", 3), ("recording", 6)]
+    tasks = analyze.plan(sources, chunk=4)
+    assert sum(t.stop - t.start for t in tasks) == 9
+    assert len(tasks) == 3
+
+
+def test_discover_skips_corrupt_recordings(tmp_path):
+    _make_inputs(tmp_path)
+    (tmp_path / "broken.camrec").write_bytes(b"JUNK" * 32)
+    with pytest.warns(UserWarning, match="broken.camrec"):
+        sources = analyze.discover(str(tmp_path))
+    assert sorted(s.kind for s in sources) == ["images", "recording"]
+
+
+def test_main_writes_csv_matching_serial_metrics(tmp_path):
+    _make_inputs(tmp_path)
+    out = tmp_path / "metrics.csv"
+    assert analyze.main([str(tmp_path), "-o", str(out), "--workers", "2", "--chunk", "4"]) == 0
+    with open(out, newline="") as fp:
+        rows = list(csv.DictReader(fp))
+    assert len(rows) == 9
+    assert tuple(rows[0]) == analyze.COLUMNS
+    first = next(r for r in rows if r["source"].endswith(".camrec") and r["frame"] == "0")
+    frame = SyntheticSource("slanted_edge", width=64, height=48).read()[1]
+    assert float(first["mtf50"]) == m.calc_mtf50(frame)
+
+
+def test_npz_output(tmp_path):
+    _make_inputs(tmp_path)
+    out = tmp_path / "metrics.npz"
+    assert analyze.main([str(tmp_path), "-o", str(out), "--workers", "1"]) == 0
+    data = np.load(out)
+    assert data["frame"].size == 9
+    assert data["flicker"][0] == 0.0
+
+
+def test_unreadable_image_keeps_frame_index(tmp_path):
+    _make_inputs(tmp_path)
+    (tmp_path / "seq" / "001.png").write_bytes(b"not a png")
+    source = next(s for s in analyze.discover(str(tmp_path)) if s.kind == "images")
+    columns = analyze.analyze_task(analyze.Task(source, 0, source.frames))
+    assert columns["frame"].tolist() == [0, 2]
+    last = cv2.imread(source.paths[2], cv2.IMREAD_COLOR)
+    assert columns["luma"][1] == cv2.cvtColor(last, cv2.COLOR_BGR2GRAY).mean()
+
+
+def test_main_without_inputs(tmp_path):
+    assert analyze.main([str(tmp_path)]) == 1
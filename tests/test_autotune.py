@@ -0,0 +1,119 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import pytest
+
+from cam_tuner_gui.capture.synthetic import SyntheticSource
+from cam_tuner_gui.control.autotune import (
+    AutoTuner,
+    Constraint,
+    clipped_percent,
+    threshold_constraints,
+)
+from cam_tuner_gui.metric.engine import Tier
+from cam_tuner_gui.metric.thresholds import THRESHOLDS, passes
+
+
+# moving_edge 의 왼쪽 150 px 는 에지가 지나가지 않는 평탄한 어두운 영역이다.
+DARK_ROI = {"snr": Tier.from_rois([(0, 0, 150, 480)])}
+
+
+class CountingSource(SyntheticSource):
+    """``set`` 호출 수를 세는 합성 소스."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sets = 0
+
+    def set(self, prop, value):
+        self.sets += 1
+        return super().set(prop, value)
+
+
+def test_constraint_violation_is_relative_and_capped():
+    blur = Constraint("motion_blur", 5.0)
+    assert blur.violation({"motion_blur": 4.0}) == 0.0
+    assert blur.violation({"motion_blur": 6.0}) == pytest.approx(0.2)
+    assert blur.violation({"motion_blur": 50.0}) == 1.0
+    assert blur.violation({}) == 1.0
+    snr = Constraint("snr", 20.0, upper=False)
+    assert snr.violation({"snr": 15.0}) == pytest.approx(0.25)
+
+
+def test_threshold_constraints_and_passes():
+    constraints = threshold_constraints(("motion_blur", "flicker", "snr"))
+    assert [(c.metric, c.limit, c.upper) for c in constraints] == [
+        ("motion_blur", THRESHOLDS["motion_blur"], True),
+        ("flicker", THRESHOLDS["flicker"], True),
+        ("snr", THRESHOLDS["snr"], False),
+    ]
+    # 플리커는 작을수록 좋다.
+    assert passes("flicker", 2.0) and not passes("flicker", 15.0)
+    assert passes("snr", 25.0) and not passes("snr", 15.0)
+    assert passes("delta_l", 99.0)
+    # MTF50 기준은 나이퀴스트(0.5 cy/px) 아래여야 만족할 수 있다.
+    assert THRESHOLDS["mtf50"] < 0.5
+    assert passes("mtf50", 0.3) and not passes("mtf50", 0.1)
+
+
+def test_clipped_percent():
+    image = np.full((64, 64, 3), 128, np.uint8)
+    assert clipped_percent(image) == 0.0
+    image[:16] = 255
+    assert clipped_percent(image) == pytest.approx(25.0)
+    assert clipped_percent(image[..., 0], step=1) == pytest.approx(25.0)
+
+
+def test_unknown_metric_rejected():
+    with pytest.raises(ValueError):
+        AutoTuner("sharpness")
+    with pytest.raises(ValueError):
+        AutoTuner(constraints=[Constraint("delta_l", 1.0)])
+
+
+def test_converges_to_blur_limit():
+    source = CountingSource("moving_edge", blur_px=8.0)
+    result = AutoTuner(tier=DARK_ROI).run(source)
+    # 블러 폭은 0.8·8·노출/100 이므로 5 px 이하인 가장 긴 노출은 78.
+    assert result.feasible
+    assert 70 <= result.params["exposure_abs"] <= 78
+    assert result.params["gain"] <= 5
+    assert passes("motion_blur", result.metrics["motion_blur"])
+    assert passes("flicker", result.metrics["flicker"])
+    assert result.metrics["clipped"] == 0.0
+    # 같은 점은 다시 재지 않고, 바뀐 파라미터만 쓴다.
+    keys = [tuple(e.params.values()) for e in result.evaluations]
+    assert len(keys) == len(set(keys)) < 40
+    assert result.writes == source.sets <= len(keys) + 2
+    assert result.frames == source.index
+    assert result.frames == 1 + sum(e.frames for e in result.evaluations)
+    assert "PASS" in result.summary()
+
+
+def test_minimize_under_lower_bound():
+    # SNR ≥ 20 dB 를 지키는 가장 짧은 노출(블러 최소)을 찾는다.
+    source = SyntheticSource("moving_edge", blur_px=8.0)
+    tuner = AutoTuner(
+        "motion_blur",
+        maximize=False,
+        constraints=threshold_constraints(("snr",)),
+        params=("exposure_abs",),
+        tier=DARK_ROI,
+    )
+    result = tuner.run(source)
+    assert result.feasible
+    assert result.metrics["snr"] >= THRESHOLDS["snr"]
+    assert result.params["exposure_abs"] < 60
+
+
+def test_infeasible_reported():
+    source = SyntheticSource("moving_edge", blur_px=8.0)
+    tuner = AutoTuner(
+        constraints=[Constraint("snr", 80.0, upper=False)], params=("gain",), tier=DARK_ROI
+    )
+    result = tuner.run(source)
+    assert not result.feasible
+    assert "FAIL" in result.summary()
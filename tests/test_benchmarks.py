@@ -0,0 +1,67 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+
+import pytest
+
+from benchmarks import bench_metrics as bench
+
+
+def _run(tmp_path, *extra):
+    out = tmp_path / "bench.json"
+    args = ["-o", str(out), "--resolutions", "64x48", "--repeat", "2", "--no-pixmap"]
+    code = bench.main(args + list(extra))
+    return code, json.loads(out.read_text())
+
+
+def test_writes_json_for_every_case(tmp_path):
+    code, data = _run(tmp_path)
+    assert code == 0
+    assert data["version"] == bench.SCHEMA_VERSION
+    cases = {v["case"] for v in data["results"].values()}
+    assert set(bench.METRIC_CASES) | {"detect_flicker"} <= cases
+    assert {"pipeline.capture", "pipeline.metrics", "pipeline.total"} <= cases
+    assert "pipeline.pixmap" not in cases
+    stats = data["results"]["calc_snr@64x48"]
+    assert stats["runs"] == 2
+    assert stats["min_ms"] <= stats["median_ms"] <= stats["p90_ms"]
+
+
+def test_compare_flags_slowdown_beyond_threshold():
+    baseline = {"results": {"a@1x1": {"median_ms": 10.0}, "b@1x1": {"median_ms": 10.0}}}
+    current = {
+        "results": {
+            "a@1x1": {"median_ms": 11.5},
+            "b@1x1": {"median_ms": 10.5},
+            "new@1x1": {"median_ms": 99.0},
+        }
+    }
+    regressions = bench.compare(current, baseline, max_slowdown=10.0)
+    assert [r.name for r in regressions] == ["a@1x1"]
+    assert regressions[0].slowdown == pytest.approx(15.0)
+
+
+def test_compare_ignores_tiny_absolute_changes():
+    baseline = {"results": {"a@1x1": {"median_ms": 0.01}}}
+    current = {"results": {"a@1x1": {"median_ms": 0.03}}}
+    assert bench.compare(current, baseline, min_delta_ms=0.05) == []
+    assert bench.compare(current, baseline, min_delta_ms=0.0)
+
+
+def test_main_exit_code_against_baseline(tmp_path):
+    _, data = _run(tmp_path)
+    fast = tmp_path / "fast.json"
+    for stats in data["results"].values():
+        stats["median_ms"] /= 100
+    fast.write_text(json.dumps(data))
+    code, _ = _run(tmp_path, "--compare", str(fast), "--min-delta-ms", "0")
+    assert code == 1
+    slow = tmp_path / "slow.json"
+    for stats in data["results"].values():
+        stats["median_ms"] *= 10000
+    slow.write_text(json.dumps(data))
+    code, _ = _run(tmp_path, "--compare", str(slow))
+    assert code == 0
@@ -0,0 +1,73 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import cv2
+import numpy as np
+import pytest
+
+from cam_tuner_gui.capture.synthetic import SyntheticSource
+from cam_tuner_gui.metric import metrics as m
+from cam_tuner_gui.metric.blur import estimate_blur, scanlines, transition_widths
+
+
+def _gray(**kwargs):
+    source = SyntheticSource("moving_edge", **kwargs)
+    return source, cv2.cvtColor(source.read()[1], cv2.COLOR_BGR2GRAY)
+
+
+@pytest.mark.parametrize("blur_px", [2.0, 8.0, 24.0])
+def test_width_matches_ground_truth(blur_px):
+    source, gray = _gray(blur_px=blur_px)
+    estimate = estimate_blur(gray)
+    assert estimate.median == pytest.approx(source.true_blur_width, rel=0.03)
+    assert estimate.coverage == 1.0
+    assert estimate.spread < 0.1 * source.true_blur_width
+
+
+def test_stable_across_frames():
+    source = SyntheticSource("moving_edge", blur_px=8.0, speed=3.0)
+    widths = [m.calc_motion_blur_width(source.read()[1]) for _ in range(20)]
+    assert np.std(widths) < 0.05
+    assert np.mean(widths) == pytest.approx(source.true_blur_width, rel=0.03)
+
+
+def test_falling_edge():
+    source, gray = _gray(blur_px=8.0)
+    assert estimate_blur(255 - gray).median == pytest.approx(
+        source.true_blur_width, rel=0.03
+    )
+
+
+def test_flat_frame_has_no_edge():
+    gray = cv2.cvtColor(SyntheticSource("flat").read()[1], cv2.COLOR_BGR2GRAY)
+    estimate = estimate_blur(gray)
+    assert estimate.widths.size == 0
+    assert estimate.median == 0.0
+    assert m.calc_motion_blur_width(gray) == 0.0
+
+
+def test_edge_off_center_row_is_found():
+    source, gray = _gray(blur_px=8.0)
+    # 위쪽 절반만 에지가 있어도 가운데 행과 상관없이 찾는다.
+    gray[gray.shape[0] // 2 :] = 128
+    estimate = estimate_blur(gray)
+    assert estimate.coverage == pytest.approx(0.5, abs=0.05)
+    assert estimate.median == pytest.approx(source.true_blur_width, rel=0.03)
+
+
+def test_rows_are_independent():
+    _, gray = _gray(blur_px=4.0)
+    _, wide = _gray(blur_px=16.0)
+    lines = np.vstack([scanlines(gray, max_lines=4), scanlines(wide, max_lines=4)])
+    widths = transition_widths(lines)
+    assert widths[:4] == pytest.approx([3.2] * 4, rel=0.05)
+    assert widths[4:] == pytest.approx([12.8] * 4, rel=0.05)
+
+
+def test_profile_wrapper():
+    source, gray = _gray(blur_px=8.0)
+    profile = m.calc_motion_blur_profile(source.read()[1])
+    assert profile.lines == 120
+    assert profile.percentile(10) <= profile.median <= profile.percentile(90)
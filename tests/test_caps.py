@@ -0,0 +1,160 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from cam_tuner_gui.capture import v4l2
+from cam_tuner_gui.capture.synthetic import SyntheticSource
+from cam_tuner_gui.control import caps
+from cam_tuner_gui.control.caps import (
+    FALLBACK_CONTROLS,
+    ControlDescriptor,
+    ControlTable,
+    DeviceKey,
+    device_path,
+    probe_v4l2,
+    usb_key,
+)
+
+
+# (id, type, name, min, max, step, default, flags)
+CONTROLS = [
+    (0x00980001, v4l2.V4L2_CTRL_TYPE_CTRL_CLASS, b"User Controls", 0, 0, 0, 0, 0),
+    (v4l2.V4L2_CID_CONTRAST, 1, b"Contrast", 0, 95, 1, 32, 0),
+    (v4l2.V4L2_CID_GAMMA, 1, b"Gamma", 48, 300, 1, 100, 0),
+    (v4l2.V4L2_CID_GAIN, 1, b"Gain", 0, 100, 2, 0, 0),
+    (v4l2.V4L2_CID_BASE + 12, 2, b"White Balance Temperature, Auto", 0, 1, 1, 1, 0),
+    (v4l2.V4L2_CID_BASE + 2, 1, b"Saturation", 0, 128, 1, 64, v4l2.V4L2_CTRL_FLAG_DISABLED),
+    (v4l2.V4L2_CID_EXPOSURE_AUTO, v4l2.V4L2_CTRL_TYPE_MENU, b"Auto Exposure", 0, 3, 1, 3, 0),
+    (
+        v4l2.V4L2_CID_EXPOSURE_ABSOLUTE,
+        1,
+        b"Exposure Time, Absolute",
+        3,
+        2047,
+        1,
+        250,
+        v4l2.V4L2_CTRL_FLAG_INACTIVE,
+    ),
+]
+MENU = {v4l2.V4L2_CID_EXPOSURE_AUTO: {1: b"Manual Mode", 3: b"Aperture Priority Mode"}}
+
+
+class FakeControls:
+    """QUERYCTRL/QUERYMENU 만 흉내내는 가짜 드라이버."""
+
+    def __init__(self, next_ctrl=True):
+        self.next_ctrl = next_ctrl
+        self.calls = 0
+
+    def __call__(self, fd, request, arg, mutate=True):
+        self.calls += 1
+        if request == v4l2.VIDIOC_QUERYCTRL:
+            cid = arg.id
+            if cid & v4l2.V4L2_CTRL_FLAG_NEXT_CTRL:
+                if not self.next_ctrl:
+                    raise OSError(22, "Invalid argument")
+                base = cid & ~v4l2.V4L2_CTRL_FLAG_NEXT_CTRL
+                entry = next((c for c in sorted(CONTROLS) if c[0] > base), None)
+            else:
+                entry = next((c for c in CONTROLS if c[0] == cid), None)
+            if entry is None:
+                raise OSError(22, "Invalid argument")
+            (arg.id, arg.type, arg.name, arg.minimum, arg.maximum, arg.step,
+             arg.default_value, arg.flags) = entry
+        elif request == v4l2.VIDIOC_QUERYMENU:
+            name = MENU.get(arg.id, {}).get(arg.index)
+            if name is None:
+                raise OSError(22, "Invalid argument")
+            arg.item.name = name
+        else:
+            raise OSError(f"unexpected ioctl {request:#x}")
+
+
+@pytest.fixture
+def node(tmp_path):
+    path = tmp_path / "video0"
+    path.write_bytes(b"")
+    return str(path)
+
+
+@pytest.mark.parametrize("next_ctrl", [True, False])
+def test_probe_reads_ranges_menus_and_flags(node, next_ctrl):
+    table = probe_v4l2(node, FakeControls(next_ctrl))
+    assert table["gain"] == ControlDescriptor(
+        "gain", 0, 100, 2, 0, "int", {}, False, False, v4l2.V4L2_CID_GAIN
+    )
+    assert table["gamma"].minimum == 48
+    assert table["auto_exposure"].kind == "menu"
+    assert table["auto_exposure"].menu == {1: "Manual Mode", 3: "Aperture Priority Mode"}
+    assert table["exposure_abs"].inactive and table["exposure_abs"].writable
+    assert table["white_balance_temperature_auto"].kind == "bool"
+    # 꺼진 컨트롤과 클래스 표지는 빠진다.
+    assert "saturation" not in table and "user_controls" not in table
+
+
+def test_probe_unavailable_device_returns_none(tmp_path):
+    assert probe_v4l2(str(tmp_path / "missing")) is None
+
+
+def test_clamp_snaps_to_step():
+    desc = ControlDescriptor("gain", 0, 100, step=2)
+    assert desc.clamp(-5) == 0
+    assert desc.clamp(37) == 36
+    assert desc.clamp(1000) == 100
+
+
+def test_device_path():
+    assert device_path("0") == "/dev/video0"
+    assert device_path("v4l2:2") == "/dev/video2"
+    assert device_path("v4l2:/dev/video4") == "/dev/video4"
+    assert device_path("synthetic:flat") is None
+
+
+def _usb_sysfs(root, video, vid, pid, serial=None):
+    usb = root / "devices" / "usb1" / f"1-{video}"
+    interface = usb / f"1-{video}:1.0"
+    interface.mkdir(parents=True)
+    (usb / "idVendor").write_text(vid + "\n")
+    (usb / "idProduct").write_text(pid + "\n")
+    if serial is not None:
+        (usb / "serial").write_text(serial + "\n")
+    cls = root / "class" / "video4linux" / f"video{video}"
+    cls.mkdir(parents=True)
+    (cls / "device").symlink_to(interface)
+
+
+def test_usb_key_from_sysfs(tmp_path):
+    _usb_sysfs(tmp_path, 0, "046d", "085b", "ABC123")
+    _usb_sysfs(tmp_path, 1, "0c45", "6366")
+    assert usb_key("/dev/video0", tmp_path) == DeviceKey("046d", "085b", "ABC123")
+    assert usb_key("/dev/video1", tmp_path) == DeviceKey("0c45", "6366", "")
+    assert usb_key("/dev/video9", tmp_path) is None
+
+
+def test_table_caches_per_usb_device(tmp_path, node, monkeypatch):
+    _usb_sysfs(tmp_path, 0, "046d", "085b", "ABC123")
+    _usb_sysfs(tmp_path, 1, "046d", "085b", "ABC123")  # 같은 카메라가 다른 노드로
+    monkeypatch.setattr(caps, "device_path", lambda device_id: f"/dev/video{device_id}")
+    fake = FakeControls()
+    table = ControlTable(sysfs=tmp_path, ioctl=fake)
+    real_open = os.open
+    monkeypatch.setattr(caps.os, "open", lambda path, flags: real_open(node, flags))
+    first = table.describe("0")
+    assert first["gain"].maximum == 100
+    calls = fake.calls
+    assert table.describe("1") is first
+    assert table.probes == 1 and fake.calls == calls
+    table.forget("1")
+    table.describe("0")
+    assert table.probes == 2
+
+
+def test_non_v4l2_source_uses_fallback():
+    table = ControlTable()
+    controls = table.describe("synthetic:flat", SyntheticSource("flat"))
+    assert controls == FALLBACK_CONTROLS
+    assert table.describe("synthetic:flat") is controls
+    assert table.probes == 1
@@ -13,7 +13,7 @@ from cam_tuner_gui.control.params import set_param, get_param
 def test_start_stream_opens_capture():
     device = CameraDevice("0")
     device.start_stream()
-    assert isinstance(device.cap, cv2.VideoCapture)
+    assert device.cap is not None
     assert device.cap.isOpened()
     device.stop_stream()
 
@@ -39,6 +39,16 @@ def test_stop_stream_releases_capture():
     assert device.cap is None
 
 
+def test_tee_source_opens_pipeline_or_falls_back():
+    device = CameraDevice("tee:videotestsrc is-live=true ! video/x-raw,width=320,height=240")
+    device.start_stream()
+    try:
+        assert device.cap.isOpened()
+        assert device.cap.read()[0]
+    finally:
+        device.stop_stream()
+
+
 def test_set_param_sets_value():
     cap = cv2.VideoCapture(0)
     cap.open(0)
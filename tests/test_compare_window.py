@@ -0,0 +1,138 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip("PySide6")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication
+
+from cam_tuner_gui.capture.synthetic import SyntheticSource
+from cam_tuner_gui.ui.compare_window import CompareWindow, _format_metric, _format_summary
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def test_pass_fail_only_for_exact_tiers():
+    assert _format_metric("snr", 41.0) == "41.00 (PASS)"
+    assert _format_metric("snr", 41.0, "roi1") == "41.00 (PASS) [roi1]"
+    # 피라미드 근사값은 원본 해상도 임계값으로 판정하지 않는다.
+    assert _format_metric("snr", 41.0, "pyr1") == "41.00 [pyr1]"
+
+
+def test_zero_workers_uses_scheduler(app):
+    win = CompareWindow(workers=0)
+    try:
+        assert win._bridge is None
+        frame = SyntheticSource("slanted_edge", 320, 240).read()[1]
+        win._update_metrics(frame, win.metrics1, "cam1", timestamp=0.0, seq=1)
+        # 스케줄러가 이번 프레임에 계산한 지표가 라벨과 세션에 남는다.
+        assert win._session.latest("cam1")
+        assert any(label.text() != "--" for label in win.metrics1.values())
+    finally:
+        win.close()
+        win.deleteLater()
+        app.processEvents()
+
+
+def test_both_cameras_are_captured_as_pairs(app):
+    win = CompareWindow(workers=0)
+    try:
+        win._combo1.addItem("synthetic:flat")
+        win._combo1.setCurrentText("synthetic:flat")
+        win._combo2.addItem("synthetic:slanted_edge")
+        win._combo2.setCurrentText("synthetic:slanted_edge")
+        win._start_cam1()
+        win._start_cam2()
+        # 하나의 그룹이 두 장치를 함께 grab 한다. 장치 자체는 스레드를 띄우지 않는다.
+        assert win._group_keys == ["cam1", "cam2"]
+        assert not win.cam1.threaded and not win.cam2.threaded
+        deadline = time.monotonic() + 5.0
+        while win._last_seq.get("cam2") is None:
+            assert time.monotonic() < deadline
+            app.processEvents()
+            time.sleep(0.01)
+        assert win._last_seq["cam1"] == win._last_seq["cam2"]
+        assert win._skew_label.text().startswith("Skew: ")
+        assert win._latest_image("cam2") is not None
+        # 화면에는 캡처 스레드가 줄인 프레임이 올라간다.
+        preview = win._pair.previews[1]
+        assert preview.shape[1] <= 640 and preview.shape[0] <= 400
+        win._stop_cam1()
+        assert win._group_keys == ["cam2"]
+        assert win._latest_image("cam1") is None
+    finally:
+        win.close()
+        win.deleteLater()
+        app.processEvents()
+    assert win._group is None
+
+
+def test_worker_results_merge_into_one_row_per_frame(app):
+    win = CompareWindow(workers=1)
+    try:
+        win._live.add("cam1")
+        frame = SyntheticSource("slanted_edge", 320, 240).read()[1]
+        for seq in range(3):
+            win._update_metrics(frame, win.metrics1, "cam1", timestamp=seq * 0.1, seq=seq)
+            deadline = time.monotonic() + 10.0
+            while win._session.pending:
+                assert time.monotonic() < deadline
+                app.processEvents()
+                time.sleep(0.01)
+        session = win._session
+        # 스트림 지표와 워커 지표가 프레임마다 한 행으로 합쳐지고 시각 순서를 지킨다.
+        assert session.column("seq").tolist() == [0, 1, 2]
+        assert session.column("t").tolist() == [0.0, 0.1, 0.2]
+        assert np.isfinite(session.column("snr")).all()
+        assert session.stats("cam1", tier="full")["snr"].count == 3
+    finally:
+        win.close()
+        win.deleteLater()
+        app.processEvents()
+
+
+def test_live_preview_tags_pyramid_approximations(app):
+    win = CompareWindow(workers=0)
+    try:
+        frame = SyntheticSource("slanted_edge", 640, 480).read()[1]
+        tier = win._live_tier(win._view1)
+        for seq in range(8):
+            win._update_metrics(frame, win.metrics1, "cam1", tier, seq * 0.1, seq)
+            text = win.metrics1["mtf50"].text()
+            if text != "--":
+                break
+        # 근사값은 단계를 붙여 보이고 PASS/FAIL 은 붙이지 않는다.
+        assert text.endswith("[pyr1]") and "PASS" not in text and "FAIL" not in text
+        # 리포트 집계도 같은 단계의 행만 모으고 단계를 밝힌다.
+        summary = win._report_data()["cam1"]["mtf50"]
+        assert summary["tier"] == "pyr1" and summary["count"] >= 1
+        assert _format_summary("mtf50", summary).endswith("[pyr1]")
+    finally:
+        win.close()
+        win.deleteLater()
+        app.processEvents()
+
+
+def test_save_metrics_includes_pending_rows(app, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    win = CompareWindow(workers=0)
+    try:
+        win._session.append("cam1", 0.0, 0, {"flicker": 0.1}, complete=False)
+        win._save_metrics()
+        assert win._session.pending == 0
+        with np.load(tmp_path / "metrics.npz") as data:
+            assert data["seq"].tolist() == [0]
+    finally:
+        win.close()
+        win.deleteLater()
+        app.processEvents()
@@ -0,0 +1,77 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import cv2
+import numpy as np
+import pytest
+
+from cam_tuner_gui.capture.synthetic import SyntheticSource
+from cam_tuner_gui.metric.flicker import (
+    FlickerAnalyzer,
+    alias_frequency,
+    band_means,
+)
+from cam_tuner_gui.metric.metrics import flicker_from_means
+
+
+def test_window_stats_match_direct_computation():
+    values = np.random.default_rng(0).uniform(50, 200, 300)
+    analyzer = FlickerAnalyzer(window=10, history=32)
+    for i, value in enumerate(values):
+        analyzer.update(value)
+        window = values[max(0, i - 9) : i + 1]
+        assert analyzer.rate == pytest.approx(flicker_from_means(window))
+        expected = (window.max() - window.min()) / (window.max() + window.min()) * 100
+        assert analyzer.delta_l == pytest.approx(expected)
+
+
+def test_memory_is_fixed_size():
+    analyzer = FlickerAnalyzer(window=10, history=64)
+    for value in range(1000):
+        analyzer.update(float(value % 7))
+    assert analyzer.count == 1000
+    assert analyzer._means.size == 64
+    assert len(analyzer._max) <= 10
+
+
+def test_alias_frequency():
+    assert alias_frequency(100.0, 30.0) == pytest.approx(10.0)
+    assert alias_frequency(120.0, 25.0) == pytest.approx(5.0)
+    assert alias_frequency(120.0, 30.0) == pytest.approx(0.0)
+
+
+@pytest.mark.parametrize("fps, hz, mains", [(30.0, 100.0, 50.0), (25.0, 120.0, 60.0)])
+def test_spectrum_detects_mains_alias(fps, hz, mains):
+    source = SyntheticSource(
+        "flicker", width=32, height=24, fps=fps, flicker_hz=hz, flicker_depth=0.05
+    )
+    analyzer = FlickerAnalyzer(fps=fps, history=256)
+    assert analyzer.spectrum() is None
+    for _ in range(256):
+        analyzer.update(source.read()[1].mean())
+    spectrum = analyzer.spectrum()
+    assert spectrum.dominant_hz == pytest.approx(alias_frequency(hz, fps), abs=0.2)
+    assert spectrum.mains_hz == mains
+
+
+def test_fps_is_estimated_from_timestamps():
+    analyzer = FlickerAnalyzer(fps=30.0)
+    for i in range(20):
+        analyzer.update(100.0, timestamp=i / 50.0)
+    assert analyzer.fps == pytest.approx(50.0)
+
+
+def test_rolling_shutter_banding():
+    def banding(line_time):
+        source = SyntheticSource(
+            "flicker", width=32, height=240, fps=30, flicker_hz=100, line_time=line_time
+        )
+        analyzer = FlickerAnalyzer(bands=8)
+        for _ in range(30):
+            gray = cv2.cvtColor(source.read()[1], cv2.COLOR_BGR2GRAY)
+            analyzer.update(gray.mean(), band_means(gray, 8))
+        return analyzer.banding
+
+    assert banding(1 / 30 / 240) > 3 * banding(0.0)
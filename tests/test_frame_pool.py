@@ -0,0 +1,159 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import threading
+
+import numpy as np
+import pytest
+
+from cam_tuner_gui.capture.device import CameraDevice, FrameRing
+from cam_tuner_gui.capture.pool import FramePool
+
+
+class _CountingCapture:
+    """cap.read(image=...) 를 지원하는 테스트용 캡처."""
+
+    def __init__(self, shape=(4, 6, 3)):
+        self.shape = shape
+        self.value = 0
+        self.allocations = 0
+
+    def isOpened(self):
+        return True
+
+    def read(self, image=None):
+        self.value += 1
+        if image is None or image.shape != self.shape:
+            self.allocations += 1
+            image = np.empty(self.shape, np.uint8)
+        image[...] = self.value % 256
+        return True, image
+
+    def release(self):
+        pass
+
+
+def _pooled_device(capture, pool_size=3):
+    device = CameraDevice("test", pool_size=pool_size)
+    device.cap = capture
+    device.start_stream()
+    return device
+
+
+def test_pool_recycles_buffers():
+    pool = FramePool(2)
+    pool.allocate((2, 2), np.uint8)
+    slot, buf = pool.acquire(timeout=0)
+    frame = pool.wrap(slot, 1, 0.0)
+    assert pool.available == 1
+    frame.release()
+    assert pool.available == 2
+    assert frame.released
+    frame.release()
+    assert pool.available == 2
+
+
+def test_read_pooled_reuses_buffers_without_allocation():
+    capture = _CountingCapture()
+    device = _pooled_device(capture)
+    seqs = []
+    buffers = set()
+    for _ in range(10):
+        with device.read_pooled() as frame:
+            seqs.append(frame.seq)
+            buffers.add(id(frame.image))
+            assert frame.image[0, 0, 0] == capture.value
+    assert seqs == list(range(1, 11))
+    assert capture.allocations == 1
+    assert len(buffers) <= 3
+
+
+def test_exhausted_pool_raises_without_thread():
+    device = _pooled_device(_CountingCapture(), pool_size=1)
+    held = device.read_pooled()
+    with pytest.raises(RuntimeError):
+        device.read_pooled()
+    held.release()
+    device.read_pooled().release()
+
+
+def test_resolution_change_reallocates_pool():
+    capture = _CountingCapture()
+    device = _pooled_device(capture)
+    old = device.read_pooled()
+    capture.shape = (8, 8, 3)
+    with device.read_pooled() as frame:
+        assert frame.image.shape == (8, 8, 3)
+    old.release()
+
+
+def test_threaded_pool_mode_yields_frames():
+    capture = _CountingCapture()
+    device = CameraDevice("test", threaded=True, ring_size=2, pool_size=4)
+    device.cap = capture
+    device.start_stream()
+    try:
+        with device.read_pooled() as frame:
+            assert frame.seq >= 1
+        latest = device.latest()
+        assert latest is not None
+        latest.release()
+    finally:
+        device.stop_stream()
+
+
+def test_ring_releases_dropped_frames():
+    pool = FramePool(4)
+    pool.allocate((1,), np.uint8)
+    ring = FrameRing(2)
+    for seq in range(3):
+        slot, _ = pool.acquire(timeout=0)
+        ring.put(pool.wrap(slot, seq, 0.0))
+    # 링에 2개 + latest 참조(마지막 프레임은 링에도 있음)
+    assert pool.available == 2
+    latest = ring.latest()
+    assert latest.seq == 2
+    latest.release()
+    ring.clear()
+    assert pool.available == 4
+
+
+class _BlockingCapture(_CountingCapture):
+    """``gate`` 가 열릴 때까지 read() 에서 멈추는 캡처."""
+
+    def __init__(self):
+        super().__init__()
+        self.gate = threading.Event()
+        self.blocked = threading.Event()
+        self.released = False
+
+    def read(self, image=None):
+        if self.value >= 1:
+            self.blocked.set()
+            self.gate.wait()
+        return super().read(image)
+
+    def isOpened(self):
+        return not self.released
+
+    def release(self):
+        self.released = True
+
+
+def test_stuck_capture_thread_releases_device_on_exit():
+    capture = _BlockingCapture()
+    device = CameraDevice("test", threaded=True, ring_size=2, pool_size=4)
+    device.cap = capture
+    device.start_stream()
+    assert capture.blocked.wait(2.0)
+    thread = device._thread
+    with pytest.warns(RuntimeWarning, match="did not stop"):
+        device.stop_stream()
+    # 스레드가 read() 안에 있는 동안에는 장치를 닫지 않는다.
+    assert not capture.released and device.cap is None
+    capture.gate.set()
+    thread.join(2.0)
+    assert not thread.is_alive()
+    assert capture.released
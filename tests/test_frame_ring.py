@@ -0,0 +1,54 @@
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from cam_tuner_gui.capture.device import CameraDevice, FrameRing
+
+
+def test_ring_drops_oldest_when_full():
+    ring = FrameRing(3)
+    for i in range(5):
+        ring.put(i)
+    assert len(ring) == 3
+    assert ring.dropped == 2
+    assert ring.latest() == 4
+    assert [ring.get(timeout=0) for _ in range(3)] == [2, 3, 4]
+    assert ring.get(timeout=0) is None
+
+
+def test_ring_get_returns_none_after_close():
+    ring = FrameRing(2)
+    ring.close()
+    assert ring.get(timeout=1.0) is None
+
+
+def test_ring_rejects_zero_capacity():
+    with pytest.raises(ValueError):
+        FrameRing(0)
+
+
+def test_threaded_stream_fills_ring():
+    device = CameraDevice("0", threaded=True, ring_size=8)
+    device.start_stream()
+    try:
+        deadline = time.monotonic() + 2.0
+        while device.latest() is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert device.latest() is not None
+        frames = list(device.iter_frames())
+        assert 0 < len(frames) <= 8
+    finally:
+        device.stop_stream()
+    assert device.latest() is None
+
+
+def test_latest_without_thread_is_none():
+    device = CameraDevice("0")
+    device.start_stream()
+    assert device.latest() is None
+    assert list(device.iter_frames()) == []
+    device.stop_stream()
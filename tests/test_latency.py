@@ -0,0 +1,99 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import pytest
+
+from cam_tuner_gui.capture.synthetic import SyntheticSource
+from cam_tuner_gui.control.latency import (
+    LatencyHistogram,
+    LatencyMonitor,
+    LatencyTable,
+    measure_latency,
+)
+from cam_tuner_gui.control.sweep import ParamSweep, grid
+from cam_tuner_gui.control.writer import DEFAULT_SETTLE, ParamWriter
+
+
+def _frame(level):
+    return np.full((48, 64, 3), level, np.uint8)
+
+
+def test_histogram_quantiles_and_overflow():
+    histogram = LatencyHistogram(max_frames=10)
+    for frames in (2, 3, 3, 3, 4, 50):
+        histogram.add(frames, frames / 30)
+    assert histogram.count == 6
+    assert histogram.quantile(0.5) == 3
+    assert histogram.quantile(0.9) == 10  # 최대 칸에 모인다.
+    assert histogram.seconds_quantile(0.5) == pytest.approx(0.1)
+    assert len(histogram.sparkline()) == 11
+    assert LatencyHistogram().quantile(0.5) is None
+
+
+@pytest.mark.parametrize("control_latency", [0, 2, 4])
+def test_measures_synthetic_control_latency(control_latency):
+    table = LatencyTable()
+    source = SyntheticSource("flat", control_latency=control_latency)
+    samples = measure_latency(source, "exposure_abs", [50, 80, 120], "cam", table)
+    # 쓰기 뒤 control_latency 프레임이 지난 다음 프레임에서 처음 보인다.
+    assert [s.frames for s in samples] == [control_latency + 1] * 3
+    assert table.hint("cam", ["exposure_abs", "gain"]) == control_latency + 1
+    assert table.hint("other", ["exposure_abs"]) is None
+    assert table.summary("cam")[0].startswith(
+        f"exposure_abs: p50 {control_latency + 1} / p90 {control_latency + 1} frames"
+    )
+
+
+def test_late_mark_replays_recent_frames():
+    monitor = LatencyMonitor("cam", LatencyTable())
+    monitor.observe(_frame(100), timestamp=1.0, seq=10)
+    monitor.observe(_frame(100), timestamp=2.0, seq=11)
+    monitor.observe(_frame(100), timestamp=3.0, seq=14)  # 미리보기가 건너뛴 프레임
+    monitor.observe(_frame(150), timestamp=4.0, seq=15)
+    # 쓰기 결과가 프레임들보다 늦게 알려져도 쓰기 시각 뒤부터 센다.
+    samples = monitor.mark("gain", 10, timestamp=2.5)
+    assert [(s.frames, s.seconds) for s in samples] == [(4, 1.5)]
+    assert monitor.table.histogram("cam", "gain").count == 1
+    assert monitor.pending == []
+
+
+def test_unresolved_and_superseded():
+    monitor = LatencyMonitor("cam", LatencyTable(), max_frames=3)
+    assert monitor.mark("gain", 1, timestamp=0.5) == []  # 앞선 프레임이 없다.
+    assert monitor.unresolved == 1
+    monitor.observe(_frame(100), timestamp=1.0)
+    monitor.mark("gain", 2, timestamp=1.5)
+    monitor.mark("gain", 3, timestamp=1.6)
+    assert monitor.superseded == 1
+    for n in range(3):
+        assert monitor.observe(_frame(100), timestamp=2.0 + n) == []
+    assert monitor.unresolved == 2 and monitor.pending == []
+
+
+def test_settle_times_feed_param_writer():
+    table = LatencyTable()
+    table.record("cam", "exposure_abs", 3, 0.1)
+    table.record("cam", "gain", 2)
+    settle = table.settle_times("cam", fps=20.0)
+    assert dict(settle) == {"exposure_abs": pytest.approx(0.1), "gain": pytest.approx(0.1)}
+    writer = ParamWriter(SyntheticSource("flat"), settle)
+    assert writer.settle_time("exposure_abs") == pytest.approx(0.1)
+    assert writer.settle_time("gamma") == DEFAULT_SETTLE
+    table.record("cam", "gamma", 6)  # 측정이 쌓이면 바로 반영된다.
+    assert writer.settle_time("gamma") == pytest.approx(0.3)
+    writer.close()
+
+
+def test_sweep_records_and_uses_latency_table():
+    table = LatencyTable()
+    points = grid(exposure_abs=[60, 90, 120])
+    source = SyntheticSource("flat", control_latency=2)
+    ParamSweep(points, metrics=("snr",), latency_table=table).run_camera("cam", source)
+    assert table.hint("cam", ["exposure_abs"]) == 3
+    # 다음 스윕은 처음부터 배운 지연으로 바뀌지 않는 점을 빨리 끝낸다.
+    sweep = ParamSweep(grid(exposure_abs=[100]), metrics=("snr",), latency_table=table)
+    results = sweep.run_camera("cam", SyntheticSource("flat", control_latency=2))
+    assert results[0].settle_frames <= 4
@@ -0,0 +1,116 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from unittest import mock
+
+import numpy as np
+
+from cam_tuner_gui import analyze
+from cam_tuner_gui.capture.recording import Recorder
+from cam_tuner_gui.capture.synthetic import SyntheticSource
+from cam_tuner_gui.metric import engine as engine_mod
+from cam_tuner_gui.metric.cache import MetricCache, frame_digest
+from cam_tuner_gui.metric.engine import FRAME_METRICS, FrameContext, MetricEngine, Tier
+
+
+def _frame(pattern="slanted_edge"):
+    return SyntheticSource(pattern, width=160, height=120).read()[1]
+
+
+def test_digest_depends_on_content_and_shape():
+    a = np.zeros((4, 6), np.uint8)
+    b = a.copy()
+    assert frame_digest(a) == frame_digest(b)
+    b[0, 0] = 1
+    assert frame_digest(a) != frame_digest(b)
+    assert frame_digest(a) != frame_digest(a.reshape(6, 4))
+    assert frame_digest(a[:, ::2]) == frame_digest(np.ascontiguousarray(a[:, ::2]))
+
+
+def test_lru_bounded_by_bytes():
+    cache = MetricCache(max_bytes=2000)
+    for i in range(100):
+        cache.put(i, "snr", float(i))
+    assert cache.nbytes <= 2000
+    assert 0 < len(cache) < 100
+    assert cache.get(99, "snr") == 99.0
+    assert cache.get(0, "snr") is None
+    # 최근에 읽은 항목은 살아남는다.
+    cache.get(99, "snr")
+    for i in range(100, 100 + len(cache) - 1):
+        cache.put(i, "snr", float(i))
+    assert cache.get(99, "snr") == 99.0
+
+
+def test_params_are_part_of_key():
+    cache = MetricCache()
+    cache.put(b"d", "snr", 1.0, Tier.full())
+    assert cache.get(b"d", "snr", Tier.pyramid(1)) is None
+    assert cache.get(b"d", "lapvar", Tier.full()) is None
+    assert cache.get(b"d", "snr", Tier.full()) == 1.0
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_disk_tier_survives_new_instance(tmp_path):
+    MetricCache(path=tmp_path).put(b"d", "snr", (3.0, ()), Tier.full())
+    fresh = MetricCache(path=tmp_path)
+    assert fresh.get(b"d", "snr", Tier.full()) == (3.0, ())
+    assert len(fresh) == 1
+
+
+def test_disk_tier_is_keyed_by_version_and_skips_sequence_ids(tmp_path):
+    MetricCache(path=tmp_path).put(b"d", "mtf50", (0.2, ()), Tier.full(), version=1)
+    MetricCache(path=tmp_path).put(7, "snr", (3.0, ()), Tier.full())
+    fresh = MetricCache(path=tmp_path)
+    # 구현이 바뀐 지표의 예전 값은 다시 쓰지 않는다.
+    assert fresh.get(b"d", "mtf50", Tier.full(), version=2) is None
+    assert fresh.get(b"d", "mtf50", Tier.full(), version=1) == (0.2, ())
+    # 시퀀스 ID 는 실행마다 달라지므로 디스크에 남기지 않는다.
+    assert fresh.get(7, "snr", Tier.full()) is None
+
+
+def test_engine_reuses_results_for_unchanged_frame():
+    frame = _frame()
+    engine = MetricEngine(FRAME_METRICS, cache=MetricCache())
+    first = engine.compute(frame)
+    fail = mock.Mock(side_effect=AssertionError)
+    with mock.patch.object(engine_mod, "measure", fail), mock.patch.object(
+        MetricEngine, "_mtf50", fail
+    ):
+        again = engine.compute(frame.copy())
+    assert again.as_dict() == first.as_dict()
+    assert engine.cache.hits == len(FRAME_METRICS)
+    # 다른 단계는 따로 계산한다.
+    assert engine.compute(frame, tier=Tier.pyramid(1)).tiers["snr"] == "pyr1"
+
+
+def test_engine_uses_ident_instead_of_digest():
+    engine = MetricEngine(["snr"], cache=MetricCache())
+    flat = _frame("flat")
+    engine.compute(FrameContext(flat, ident=("cam", 1)))
+    with mock.patch.object(engine_mod, "frame_digest", side_effect=AssertionError):
+        result = engine.compute(FrameContext(_frame(), ident=("cam", 1)))
+    # 같은 ident 면 내용과 상관없이 저장된 값을 쓴다.
+    assert result.snr == MetricEngine(["snr"]).compute(flat).snr
+
+
+def test_analyze_cache_dir(tmp_path):
+    src = SyntheticSource("slanted_edge", width=64, height=48)
+    inputs = tmp_path / "in"
+    inputs.mkdir()
+    with Recorder(str(inputs / "run.camrec"), fps=30) as rec:
+        for i in range(4):
+            rec.write(src.read()[1], seq=i, timestamp=i / 30)
+    cache_dir = tmp_path / "cache"
+    out = tmp_path / "a.npz"
+    args = [str(inputs), "-o", str(out), "--workers", "1", "--cache", str(cache_dir)]
+    assert analyze.main(args) == 0
+    first = dict(np.load(out))
+    assert any(cache_dir.rglob("*.pkl"))
+    with mock.patch.object(engine_mod, "measure", side_effect=AssertionError):
+        assert analyze.main(args) == 0
+    second = np.load(out)
+    for name in FRAME_METRICS:
+        np.testing.assert_array_equal(first[name], second[name])
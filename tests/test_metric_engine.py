@@ -0,0 +1,75 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from unittest import mock
+
+import cv2
+import numpy as np
+import pytest
+
+from cam_tuner_gui.capture.synthetic import SyntheticSource
+from cam_tuner_gui.metric import metrics as m
+from cam_tuner_gui.metric.engine import (
+    FrameContext,
+    MetricEngine,
+    MetricResult,
+)
+
+
+def _frames(n=4, pattern="flicker"):
+    source = SyntheticSource(pattern, width=96, height=64, fps=30, flicker_hz=7.0)
+    return [source.read()[1] for _ in range(n)]
+
+
+def test_context_converts_once():
+    ctx = FrameContext(_frames(1, "slanted_edge")[0])
+    with mock.patch("cam_tuner_gui.metric.engine.cv2.cvtColor", wraps=cv2.cvtColor) as cvt:
+        MetricEngine().compute(ctx)
+    assert cvt.call_count == 1
+
+
+def test_context_accepts_grayscale():
+    gray = np.full((8, 8), 50, np.uint8)
+    ctx = FrameContext(gray)
+    assert ctx.gray is gray
+    assert ctx.mean == 50.0
+
+
+def test_engine_matches_wrappers():
+    frames = _frames(6, "moving_edge")
+    engine = MetricEngine()
+    for frame in frames:
+        result = engine.compute(frame, key="cam")
+    frame = frames[-1]
+    # 엔진은 첫 프레임에서 맞춘 에지 기하를 재사용하므로 근사적으로만 같다.
+    assert result.mtf50 == pytest.approx(m.calc_mtf50(frame), rel=0.05)
+    assert result.snr == m.calc_snr(frame)
+    assert result.lapvar == m.calc_lapvar(frame)
+    assert result.motion_blur == m.calc_motion_blur_width(frame)
+    assert result.flicker == pytest.approx(m.detect_flicker(frames))
+
+
+def test_flicker_history_is_per_key_and_windowed():
+    frames = _frames(12)
+    engine = MetricEngine(["flicker"], flicker_window=5)
+    for frame in frames:
+        engine.observe(frame, "a")
+    engine.observe(frames[0], "b")
+    assert engine.flicker("a") == pytest.approx(m.detect_flicker(frames[-5:]))
+    assert engine.flicker("b") == 0.0
+    engine.reset("a")
+    assert engine.flicker("a") == 0.0
+
+
+def test_subset_leaves_other_fields_empty():
+    result = MetricEngine().compute(_frames(1)[0], metrics=["snr"])
+    assert isinstance(result, MetricResult)
+    assert result.mtf50 is None
+    assert list(result.as_dict()) == ["snr"]
+
+
+def test_unknown_metric_rejected():
+    with pytest.raises(ValueError):
+        MetricEngine(["mtf50", "bogus"])
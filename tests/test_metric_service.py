@@ -0,0 +1,139 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import threading
+import time
+from multiprocessing import shared_memory
+
+import pytest
+
+from cam_tuner_gui.capture.synthetic import SyntheticSource
+from cam_tuner_gui.metric.engine import FRAME_METRICS, MetricEngine, Tier
+from cam_tuner_gui.metric.service import MetricService
+
+
+def _wait(predicate, timeout=30.0):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class _Collector:
+    def __init__(self):
+        self.results = []
+        self.lock = threading.Lock()
+
+    def __call__(self, key, tag, timestamp, result, error):
+        with self.lock:
+            self.results.append((key, tag, timestamp, result, error))
+
+
+def test_results_match_engine():
+    frames = {
+        "edge": SyntheticSource("slanted_edge", 320, 240).read()[1],
+        "flat": SyntheticSource("flat", 320, 240).read()[1],
+    }
+    tier = Tier.pyramid(1)
+    collect = _Collector()
+    with MetricService(collect, workers=2, metrics=tuple(FRAME_METRICS)) as service:
+        for key, frame in frames.items():
+            assert service.submit(frame, key, timestamp=0.0, tier=tier)
+        assert _wait(lambda: len(collect.results) == 2)
+        assert not service.errors
+        assert service.pending("edge") == 0
+    for key, seq, timestamp, result, error in collect.results:
+        expected = MetricEngine(tuple(FRAME_METRICS)).compute(frames[key], tier=tier)
+        assert seq == 1 and timestamp == 0.0 and error is None
+        assert result.as_dict() == pytest.approx(expected.as_dict())
+        assert result.tiers["snr"] == "pyr1"
+
+
+def test_busy_slots_drop_frames():
+    frame = SyntheticSource("flat", 64, 48).read()[1]
+    collect = _Collector()
+    with MetricService(collect, workers=1, slots_per_key=1) as service:
+        # 워커가 아직 뜨는 중이므로 첫 프레임이 슬롯을 차지하고 있다.
+        assert service.submit(frame, "cam")
+        assert not service.submit(frame, "cam")
+        # 다른 카메라는 자기 슬롯이 있으므로 영향을 받지 않는다.
+        assert service.submit(frame, "other")
+        assert service.dropped == 1
+        assert _wait(lambda: len(collect.results) == 2)
+        assert service.submit(frame, "cam")
+        assert _wait(lambda: len(collect.results) == 3)
+    assert service.submitted == 3
+
+
+def test_close_unlinks_shared_memory():
+    frame = SyntheticSource("flat", 64, 48).read()[1]
+    collect = _Collector()
+    service = MetricService(collect, workers=1, metrics=("snr",))
+    service.submit(frame, "cam")
+    assert _wait(lambda: collect.results)
+    names = [slot.shm.name for slot in service._slots if slot.shm is not None]
+    assert names
+    service.close()
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+    with pytest.raises(RuntimeError):
+        service.submit(frame, "cam")
+
+
+def test_tag_and_timestamp_round_trip():
+    frame = SyntheticSource("flat", 64, 48).read()[1]
+    collect = _Collector()
+    with MetricService(collect, workers=1, metrics=("snr",)) as service:
+        assert service.submit(frame, "cam", timestamp=12.5, tag=("capture", 7))
+        assert _wait(lambda: collect.results)
+    key, tag, timestamp, result, error = collect.results[0]
+    assert (key, tag, timestamp, error) == ("cam", ("capture", 7), 12.5, None)
+    assert result.snr is not None
+
+
+def test_failed_copy_releases_slot():
+    frame = SyntheticSource("flat", 64, 48).read()[1]
+    collect = _Collector()
+    with MetricService(collect, workers=1, slots_per_key=1, metrics=("snr",)) as service:
+        with pytest.raises(TypeError):
+            service.submit(frame, "cam", metrics=object())  # tuple() 에서 실패
+        assert service.pending("cam") == 0
+        assert service.submit(frame, "cam", tag=1)
+        assert _wait(lambda: collect.results)
+    assert collect.results[0][1] == 1
+
+
+def test_dead_worker_frees_slots_and_reports():
+    frame = SyntheticSource("flat", 64, 48).read()[1]
+    collect = _Collector()
+    with MetricService(collect, workers=1, slots_per_key=1, metrics=("snr",)) as service:
+        assert service.submit(frame, "cam", timestamp=1.0, tag=5)
+        service._procs[0].kill()
+        service._procs[0].join(5)
+        assert service.pending("cam") == 0
+        failure = [r for r in collect.results if r[4] is not None]
+        assert failure and failure[0][:4] == ("cam", 5, 1.0, None)
+        assert service.restarts == 1 and service.errors
+        # 다시 띄운 워커가 다음 제출을 계산한다.
+        assert service.submit(frame, "cam", tag=6)
+        assert _wait(lambda: any(r[1] == 6 and r[4] is None for r in collect.results))
+
+
+def test_worker_errors_are_reported_and_bounded(monkeypatch):
+    from cam_tuner_gui.metric import service as service_mod
+
+    monkeypatch.setattr(service_mod, "MAX_ERRORS", 2)
+    frame = SyntheticSource("flat", 64, 48).read()[1]
+    collect = _Collector()
+    with MetricService(collect, workers=1, slots_per_key=1) as service:
+        for tag in range(3):
+            assert service.submit(frame, "cam", tier="bogus", tag=tag)
+            assert _wait(lambda: len(collect.results) == tag + 1)
+    assert [r[1] for r in collect.results] == [0, 1, 2]
+    assert all(r[3] is None and r[4] for r in collect.results)
+    assert service.failed == 3 and len(service.errors) == 2
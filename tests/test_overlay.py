@@ -0,0 +1,90 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import cv2
+import numpy as np
+
+from cam_tuner_gui.capture.synthetic import SyntheticSource
+from cam_tuner_gui.ui.overlay import OverlayRenderer, fit_size, sample_histogram
+
+RED = (0, 0, 255)
+
+
+def _painted(image):
+    return np.all(image == RED, axis=2)
+
+
+def test_fit_size_keeps_aspect_and_never_upscales():
+    assert fit_size((1280, 720), (640, 640)) == (640, 360)
+    assert fit_size((1280, 720), (2000, 2000)) == (1280, 720)
+    assert fit_size((1280, 720), (0, 0)) == (1280, 720)
+
+
+def test_sample_histogram_counts_grid():
+    image = np.zeros((40, 64, 3), np.uint8)
+    image[:, :, 2] = 255
+    hist = sample_histogram(image, step=4, bins=16)
+    assert hist.shape == (3, 16)
+    assert hist.sum(axis=1).tolist() == [160.0] * 3
+    assert hist[0, 0] == 160 and hist[2, 15] == 160
+    # 위상을 옮기면 다른 화소를 본다.
+    marked = np.zeros((9, 9), np.uint8)
+    marked[1::4, 1::4] = 255
+    assert sample_histogram(marked, 4, 2, (0, 0))[0, 1] == 0
+    assert sample_histogram(marked, 4, 2, (1, 1))[0, 1] == 4
+
+
+def test_render_reuses_buffer_and_leaves_source():
+    frame = SyntheticSource("slanted_edge", 320, 240).read()[1]
+    original = frame.copy()
+    renderer = OverlayRenderer(histogram=True, peaking=True)
+    first = renderer.render(frame, (160, 160))
+    second = renderer.render(frame, (160, 160))
+    assert first is second
+    assert first.shape == (120, 160, 3)
+    np.testing.assert_array_equal(frame, original)
+
+
+def test_peaking_marks_edge_only():
+    source = SyntheticSource("slanted_edge", 320, 240, noise_sigma=0.0, edge_sigma=0.5)
+    out = OverlayRenderer(peaking=True).render(source.read()[1])
+    painted = _painted(out)
+    assert painted[:, 150:170].any(axis=1).mean() > 0.9
+    assert not painted[:, :120].any() and not painted[:, 200:].any()
+
+    flat = SyntheticSource("flat", 320, 240).read()[1]
+    assert not _painted(OverlayRenderer(peaking=True).render(flat)).any()
+
+
+def test_peaking_mask_is_refreshed_in_interlaced_rows():
+    edge = SyntheticSource("slanted_edge", 320, 240, noise_sigma=0.0).read()[1]
+    flat = SyntheticSource("flat", 320, 240).read()[1]
+    renderer = OverlayRenderer(peaking=True, peak_interlace=2)
+    assert _painted(renderer.render(edge)).any(axis=1).mean() > 0.9
+    # 장면이 바뀌면 한 프레임에 띠 하나(절반의 행)만 새로 계산된다.
+    rows = _painted(renderer.render(flat)).any(axis=1)
+    assert 0.4 < rows.mean() < 0.6
+    assert not _painted(renderer.render(flat)).any()
+
+
+def test_histogram_panel_and_gray_input():
+    gray = np.full((240, 320), 128, np.uint8)
+    renderer = OverlayRenderer(histogram=True)
+    out = renderer.render(gray)
+    assert out.shape == (240, 320, 3)
+    hist = renderer.last_histogram
+    assert hist.shape == (1, renderer.bins)
+    assert hist[0, 128 * renderer.bins // 256] == hist.sum()
+    # 패널 영역은 어두워지고 선이 그려진다. 나머지는 원본 그대로.
+    assert (out[:150] == 128).all()
+    assert (out[-30:, 10:60] != 128).any()
+
+
+def test_disabled_renderer_only_resizes():
+    frame = SyntheticSource("slanted_edge", 320, 240).read()[1]
+    renderer = OverlayRenderer()
+    assert not renderer.enabled
+    out = renderer.render(frame, (160, 120))
+    np.testing.assert_array_equal(out, cv2.resize(frame, (160, 120), interpolation=cv2.INTER_AREA))
@@ -0,0 +1,133 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import threading
+import time
+
+import cv2
+import pytest
+
+from cam_tuner_gui.control.writer import ParamWriter
+
+
+class FakeCapture:
+    """``set`` 호출을 기록하고, ``gate`` 가 열릴 때까지 막는 캡처."""
+
+    def __init__(self, delay=0.0, fail=()):
+        self.delay = delay
+        self.fail = set(fail)
+        self.calls = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def set(self, prop, value):
+        self.gate.wait()
+        time.sleep(self.delay)
+        self.calls.append((prop, value, time.monotonic()))
+        return prop not in self.fail
+
+
+def _collect():
+    results = []
+    return results, lambda *args: results.append(args)
+
+
+def test_pending_writes_coalesce_last_wins():
+    cap = FakeCapture()
+    results, callback = _collect()
+    with ParamWriter(cap, settle=0.0, callback=callback) as writer:
+        cap.gate.clear()
+        writer.write("gain", 1)
+        time.sleep(0.05)  # 첫 쓰기가 gate 에서 막힌 동안 값을 쌓는다.
+        for value in range(2, 101):
+            writer.write("gain", value)
+        cap.gate.set()
+        assert writer.flush(2.0)
+    assert [value for _, value, _ in cap.calls] == [1, 100]
+    assert writer.coalesced == 98
+    assert writer.written == 2
+    assert results == [("gain", 1, None), ("gain", 100, None)]
+
+
+def test_same_param_is_rate_limited():
+    cap = FakeCapture()
+    with ParamWriter(cap, settle=0.05) as writer:
+        for value in range(3):
+            writer.write("exposure_abs", value)
+            assert writer.flush(2.0)
+    times = [t for _, _, t in cap.calls]
+    assert len(times) == 3
+    assert min(b - a for a, b in zip(times, times[1:])) >= 0.045
+
+
+def test_settle_does_not_block_other_params():
+    cap = FakeCapture()
+    with ParamWriter(cap, settle={"exposure_abs": 1.0}) as writer:
+        writer.write("exposure_abs", 1)
+        assert writer.flush(2.0)
+        writer.write("exposure_abs", 2)
+        writer.write("gain", 5)
+        start = time.monotonic()
+        while not any(p == cv2.CAP_PROP_GAIN for p, _, _ in cap.calls):
+            assert time.monotonic() - start < 0.5
+            time.sleep(0.005)
+        assert writer.pending == {"exposure_abs": 2}
+
+
+def test_after_keeps_order_across_settle():
+    cap = FakeCapture()
+    with ParamWriter(cap, settle={"auto_exposure": 0.2}) as writer:
+        writer.write("auto_exposure", 3)
+        assert writer.flush(2.0)
+        # 자동 노출이 아직 안정화 중이어도 노출 시간은 그 뒤에 쓴다.
+        writer.write("auto_exposure", 1)
+        writer.write("exposure_abs", 300, after="auto_exposure")
+        writer.write("exposure_abs", 310)  # 덮어써도 순서는 남는다.
+        assert writer.flush(2.0)
+    assert [(p, v) for p, v, _ in cap.calls] == [
+        (cv2.CAP_PROP_AUTO_EXPOSURE, 3),
+        (cv2.CAP_PROP_AUTO_EXPOSURE, 1),
+        (cv2.CAP_PROP_EXPOSURE, 310),
+    ]
+
+
+def test_failure_is_reported_not_raised():
+    cap = FakeCapture(fail={cv2.CAP_PROP_GAMMA})
+    results, callback = _collect()
+    with ParamWriter(cap, settle=0.0, callback=callback) as writer:
+        writer.write("gamma", 7)
+        writer.write("unknown", 1)
+        writer.write("gain", 3)
+        assert writer.flush(2.0)
+    errors = {param: error for param, _, error in results}
+    assert isinstance(errors["gamma"], RuntimeError)
+    assert isinstance(errors["unknown"], KeyError)
+    assert errors["gain"] is None
+    assert writer.failed == 2 and writer.written == 1
+    assert set(writer.written_at) == {"gain"}
+
+
+def test_write_does_not_block_caller():
+    cap = FakeCapture(delay=0.05)
+    with ParamWriter(cap, settle=0.0) as writer:
+        start = time.monotonic()
+        for value in range(50):
+            writer.write("contrast", value)
+        assert time.monotonic() - start < 0.02
+        assert writer.flush(2.0)
+    assert cap.calls[-1][1] == 49
+    assert len(cap.calls) < 5
+
+
+def test_close_drops_pending_and_rejects_writes():
+    cap = FakeCapture()
+    writer = ParamWriter(cap, settle=10.0)
+    writer.write("gain", 1)
+    assert writer.flush(2.0)
+    writer.write("gain", 2)  # settle 동안 기다리는 중에 닫는다.
+    writer.close()
+    assert [value for _, value, _ in cap.calls] == [1]
+    with pytest.raises(RuntimeError):
+        writer.write("gain", 3)
@@ -0,0 +1,79 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from cam_tuner_gui.capture.pipeline import TeePipeline, build_tee_pipeline
+
+SOURCE = "videotestsrc is-live=false ! video/x-raw,width=1280,height=800"
+
+
+def test_tee_description_has_bounded_branches():
+    desc = build_tee_pipeline(SOURCE, preview_size=(320, 200), max_buffers=3)
+    assert desc.startswith(SOURCE)
+    assert "tee name=t" in desc
+    assert desc.count("appsink") == 2
+    assert desc.count("max-buffers=3 drop=true") == 2
+    assert desc.count("leaky=downstream") == 2
+    assert "width=320,height=200" in desc
+
+
+def test_preview_is_scaled_before_conversion():
+    desc = build_tee_pipeline(SOURCE, preview_size=(320, 200))
+    preview = desc.split("t. ! ")[1]
+    assert preview.index("videoscale") < preview.index("videoconvert")
+    assert preview.index("width=320,height=200") < preview.index("videoconvert")
+
+
+def test_capture_api_before_play():
+    pipeline = TeePipeline(SOURCE)
+    assert not pipeline.isOpened()
+    assert pipeline.retrieve() == (False, None)
+    assert pipeline.capture_time is None and pipeline.preview is None
+
+
+def test_tee_description_without_drop():
+    desc = build_tee_pipeline(SOURCE, drop=False)
+    assert "leaky" not in desc
+    assert "drop=false" in desc
+
+
+def test_pull_before_play_raises():
+    with pytest.raises(RuntimeError):
+        TeePipeline(SOURCE).pull_preview()
+
+
+def test_videotestsrc_branches_have_expected_sizes():
+    pytest.importorskip("gi")
+    pipeline = TeePipeline(SOURCE, preview_size=(320, 200))
+    try:
+        pipeline.play()
+    except RuntimeError:
+        pytest.skip("GStreamer elements not available")
+    try:
+        preview = pipeline.pull_preview(timeout=2.0)
+        full = pipeline.pull_full(timeout=2.0)
+    finally:
+        pipeline.stop()
+    assert preview is not None and full is not None
+    assert preview[1].shape == (200, 320, 3)
+    assert full[1].shape == (800, 1280, 3)
+
+
+def test_grab_keeps_latest_preview():
+    pytest.importorskip("gi")
+    pipeline = TeePipeline(SOURCE, preview_size=(320, 200))
+    try:
+        pipeline.play()
+    except RuntimeError:
+        pytest.skip("GStreamer elements not available")
+    try:
+        assert pipeline.grab(timeout=2.0)
+        ret, frame = pipeline.retrieve()
+    finally:
+        pipeline.stop()
+    assert ret and frame.shape == (800, 1280, 3)
+    # 라이브가 아닌 소스의 PTS 는 캡처 시각이 아니다.
+    assert pipeline.capture_time is None
@@ -0,0 +1,161 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+
+import cv2
+import pytest
+
+from cam_tuner_gui.control.caps import ControlDescriptor, DeviceKey
+from cam_tuner_gui import util
+from cam_tuner_gui.preset import preset as preset_io
+from cam_tuner_gui.preset.library import (
+    Preset,
+    PresetLibrary,
+    apply,
+    device_model,
+    diff,
+    plan,
+)
+
+
+class FakeCapture:
+    """``get``/``set`` 호출을 기록하는 캡처."""
+
+    PROPS = {
+        "auto_exposure": cv2.CAP_PROP_AUTO_EXPOSURE,
+        "exposure_abs": cv2.CAP_PROP_EXPOSURE,
+        "gain": cv2.CAP_PROP_GAIN,
+        "gamma": cv2.CAP_PROP_GAMMA,
+        "contrast": cv2.CAP_PROP_CONTRAST,
+    }
+
+    def __init__(self, **state):
+        self.state = {self.PROPS[k]: float(v) for k, v in state.items()}
+        self.gets = []
+        self.sets = []
+
+    def get(self, prop):
+        self.gets.append(prop)
+        return self.state.get(prop, 0.0)
+
+    def set(self, prop, value):
+        name = next(k for k, v in self.PROPS.items() if v == prop)
+        self.sets.append((name, value))
+        self.state[prop] = float(value)
+        return True
+
+
+DAY = Preset("day", {"auto_exposure": 1, "exposure_abs": 120, "gain": 0}, "046d:085b", ("office",))
+NIGHT = Preset("night/low", {"auto_exposure": 1, "exposure_abs": 600, "gain": 64}, "046d:085b", ("office", "night"))
+
+
+def test_save_load_search_and_index(tmp_path):
+    library = PresetLibrary(tmp_path)
+    assert len(library) == 0
+    library.save(DAY)
+    entry = library.save(NIGHT)
+    assert entry.file == "night_low.json"
+    assert library.load("night/low") == NIGHT
+    assert [e.name for e in library.search(tags=["night"])] == ["night/low"]
+    assert [e.name for e in library.search(device="046d:085b", text="DA")] == ["day"]
+    index = json.loads((tmp_path / "index.json").read_text())
+    assert set(index["presets"]) == {"day.json", "night_low.json"}
+    # 다시 열면 색인만 읽고 프리셋 파일은 파싱하지 않는다.
+    reopened = PresetLibrary(tmp_path)
+    assert reopened.names() == ["day", "night/low"]
+    assert reopened.parsed == 0
+
+
+def test_refresh_picks_up_external_changes(tmp_path):
+    PresetLibrary(tmp_path).save(DAY)
+    preset_io.save_json({"gain": 10}, str(tmp_path / "legacy.json"))  # 예전 형식
+    (tmp_path / "broken.json").write_text("{")
+    library = PresetLibrary(tmp_path)
+    assert library.names() == ["day", "legacy"]
+    assert library.parsed == 1
+    assert library.load("legacy").params == {"gain": 10}
+    os.unlink(tmp_path / "day.json")
+    assert "day" not in library.refresh().values()
+    assert library.names() == ["legacy"]
+
+
+def test_atomic_write_leaves_old_content_on_failure(tmp_path, monkeypatch):
+    path = tmp_path / "p.json"
+    preset_io.save_json({"gain": 1}, str(path))
+
+    def fail(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(util.os, "replace", fail)
+    with pytest.raises(OSError):
+        preset_io.save_json({"gain": 2}, str(path))
+    assert preset_io.load_json(str(path)) == {"gain": 1}
+    assert os.listdir(tmp_path) == ["p.json"]
+
+
+def test_diff(tmp_path):
+    assert diff(DAY, NIGHT) == {"exposure_abs": (120, 600), "gain": (0, 64)}
+    assert diff({"gain": 1.0}, {"gain": 1, "gamma": 100}) == {"gamma": (None, 100)}
+    library = PresetLibrary(tmp_path)
+    library.save(DAY)
+    library.save(Preset("copy", DAY.params, DAY.device, DAY.tags))
+    assert library.diff("day", "copy") == {}
+    library.save(NIGHT)
+    assert library.diff("day", "night/low") == diff(DAY, NIGHT)
+
+
+def test_apply_writes_only_changes_in_dependency_order():
+    cap = FakeCapture(auto_exposure=3, exposure_abs=100, gain=0, gamma=100)
+    result = apply(
+        Preset("p", {"gain": 0, "exposure_abs": 300, "gamma": 120, "auto_exposure": 1}),
+        cap,
+    )
+    # 자동 노출을 먼저 꺼야 노출 시간을 쓸 수 있다.
+    assert cap.sets == [("auto_exposure", 1), ("exposure_abs", 300), ("gamma", 120)]
+    assert result.writes == cap.sets and result.unchanged == ["gain"]
+    assert len(cap.gets) == 4  # 상태는 파라미터마다 한 번만 읽는다.
+    cap.sets.clear()
+    assert apply(Preset("p", {"exposure_abs": 300, "auto_exposure": 1}), cap).writes == []
+    assert cap.sets == []
+
+
+def test_apply_enabling_auto_exposure_writes_exposure_first():
+    cap = FakeCapture(auto_exposure=1, exposure_abs=100)
+    apply({"auto_exposure": 3, "exposure_abs": 250}, cap)
+    assert cap.sets == [("exposure_abs", 250), ("auto_exposure", 3)]
+
+
+def test_apply_skips_exposure_while_auto_exposure_stays_on():
+    cap = FakeCapture(auto_exposure=3, exposure_abs=100, gain=0)
+    result = apply({"auto_exposure": 3, "exposure_abs": 250, "gain": 4}, cap)
+    assert cap.sets == [("gain", 4)]
+    assert result.skipped == ["exposure_abs"] and result.ok
+    # 프리셋에 자동 노출이 없어도 장치 값으로 판단한다.
+    assert plan({"exposure_abs": 250}, cap).skipped == ["exposure_abs"]
+
+
+def test_plan_does_not_write():
+    cap = FakeCapture(auto_exposure=3, exposure_abs=100)
+    result = plan({"auto_exposure": 1, "exposure_abs": 300}, cap)
+    assert result.writes == [("auto_exposure", 1), ("exposure_abs", 300)]
+    assert cap.sets == []
+
+
+def test_apply_with_controls_and_known_state():
+    cap = FakeCapture()
+    controls = {
+        "gain": ControlDescriptor("gain", 0, 100, step=2),
+        "gamma": ControlDescriptor("gamma", 0, 500, read_only=True),
+    }
+    result = apply({"gain": 37, "gamma": 120, "contrast": 5}, cap, current={"gain": 0}, controls=controls)
+    assert cap.gets == []
+    assert result.writes == [("gain", 36)]
+    assert result.skipped == ["gamma", "contrast"]
+
+
+def test_device_model():
+    assert device_model(DeviceKey("046d", "085b", "ABC")) == "046d:085b"
+    assert device_model("synthetic:flat") == "synthetic:flat"
@@ -0,0 +1,130 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import cv2
+import numpy as np
+import pytest
+
+from cam_tuner_gui.capture.device import CameraDevice
+from cam_tuner_gui.capture.recording import (
+    INDEX_DTYPE,
+    Recorder,
+    Recording,
+    RecordingSource,
+)
+
+
+def _frames(n, shape=(12, 16, 3)):
+    return [np.full(shape, i, np.uint8) for i in range(n)]
+
+
+@pytest.fixture
+def recorded(tmp_path):
+    path = str(tmp_path / "session.camrec")
+    with Recorder(path, fps=120, chunk_frames=4) as rec:
+        for i, frame in enumerate(_frames(10)):
+            params = {"gain": 10} if i == 0 else ({"gain": 20} if i == 6 else None)
+            rec.write(frame, seq=100 + i, timestamp=i / 120, params=params)
+    return path
+
+
+def test_random_access_returns_memmap_views(recorded):
+    rec = Recording(recorded)
+    assert len(rec) == 10
+    assert rec.fps == 120
+    assert rec.shape == (12, 16, 3)
+    frame = rec.frame(7)
+    assert isinstance(frame, np.memmap)
+    assert (frame == 7).all()
+    assert not frame.flags.writeable
+    assert rec.seq(7) == 107
+    assert rec.timestamp(7) == pytest.approx(7 / 120)
+
+
+def test_params_follow_changes(recorded):
+    rec = Recording(recorded)
+    assert rec.params(0) == {"gain": 10}
+    assert rec.params(5) == {"gain": 10}
+    assert rec.params(6) == {"gain": 20}
+    assert rec.params(9) == {"gain": 20}
+
+
+def test_update_right_after_snapshot_is_kept(tmp_path):
+    path = str(tmp_path / "race.camrec")
+    rec = Recorder(path, chunk_frames=8)
+    rec.update_params(gain=10)
+    lock = rec._params_lock
+    exits = []
+
+    class Interleave:
+        # 첫 프레임의 스냅샷을 뜬 직후 GUI 스레드의 갱신이 끼어든다.
+        def __enter__(self):
+            lock.acquire()
+
+        def __exit__(self, *exc):
+            lock.release()
+            exits.append(None)
+            if len(exits) == 2:  # 첫 번째는 청크 시작(_new_meta)
+                rec.update_params(gain=30)
+
+    rec._params_lock = Interleave()
+    for frame in _frames(3):
+        rec.write(frame)
+    rec.close()
+    played = Recording(path)
+    assert [played.params(i)["gain"] for i in range(3)] == [10, 30, 30]
+
+
+def test_index_rebuilt_when_footer_missing(recorded):
+    size = os.path.getsize(recorded)
+    with open(recorded, "r+b") as fp:
+        fp.truncate(size - 16 - 10 * INDEX_DTYPE.itemsize)
+    rec = Recording(recorded)
+    assert len(rec) == 10
+    assert (rec.frame(9) == 9).all()
+
+
+def test_recorder_closed_before_first_frame_reads_as_empty(tmp_path):
+    path = str(tmp_path / "empty.camrec")
+    Recorder(path).close()
+    assert os.path.getsize(path) == 0
+    assert len(Recording(path)) == 0
+    assert RecordingSource(path).read() == (False, None)
+    with open(path, "wb") as fp:
+        fp.write(b"CAMREC01\x01")  # 헤더가 잘린 파일
+    assert len(Recording(path)) == 0
+    with open(path, "wb") as fp:
+        fp.write(b"JUNK")
+    with pytest.raises(ValueError):
+        Recording(path)
+
+
+def test_source_plays_back_and_seeks(recorded):
+    source = RecordingSource(recorded)
+    ret, frame = source.read()
+    assert ret and (frame == 0).all()
+    source.set(cv2.CAP_PROP_POS_FRAMES, 8)
+    buf = np.empty((12, 16, 3), np.uint8)
+    ret, frame = source.read(image=buf)
+    assert frame is buf and (buf == 8).all()
+    source.read()
+    assert source.read() == (False, None)
+    assert source.get(cv2.CAP_PROP_FRAME_COUNT) == 10
+
+
+def test_device_records_and_replays(tmp_path):
+    path = str(tmp_path / "cam.camrec")
+    device = CameraDevice("synthetic:flat")
+    device.start_stream()
+    device.start_recording(path, gain=5)
+    frames = [device.read_frame() for _ in range(5)]
+    device.stop_stream()
+
+    replay = CameraDevice(path)
+    replay.start_stream()
+    assert isinstance(replay.cap, RecordingSource)
+    assert np.array_equal(replay.read_frame(), frames[0])
+    assert replay.cap.recording.params(0) == {"gain": 5}
+    replay.stop_stream()
@@ -0,0 +1,29 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+pytest.importorskip("PySide6")
+
+from PySide6.QtCore import QRect, QSize
+
+from cam_tuner_gui.ui.roi import image_to_widget, pixmap_rect, widget_to_image
+
+
+def test_pixmap_rect_is_centered():
+    assert pixmap_rect(QSize(400, 300), QSize(320, 240)) == QRect(40, 30, 320, 240)
+
+
+def test_widget_roundtrip_scales_to_source():
+    shown = QRect(40, 30, 320, 240)
+    rect = QRect(80, 60, 160, 120)
+    roi = widget_to_image(rect, shown, (640, 480))
+    assert roi == (80, 60, 320, 240)
+    assert image_to_widget(roi, shown, (640, 480)) == rect
+
+
+def test_widget_to_image_clips_to_frame():
+    shown = QRect(0, 0, 320, 240)
+    assert widget_to_image(QRect(-20, -20, 60, 60), shown, (320, 240)) == (0, 0, 40, 40)
@@ -0,0 +1,102 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import time
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from cam_tuner_gui.metric import engine as engine_mod
+from cam_tuner_gui.metric.engine import MetricEngine, Tier
+from cam_tuner_gui.metric.scheduler import MetricScheduler
+
+COSTS = {"mtf50": 0.040, "snr": 0.001, "lapvar": 0.004, "motion_blur": 0.0005}
+
+
+def _frame(w=64, h=48):
+    return np.full((h, w, 3), 100, np.uint8)
+
+
+@pytest.fixture
+def fake_clock():
+    """지표마다 정해진 비용만큼 시간이 흐르는 것처럼 보이게 한다."""
+    clock = [0.0]
+
+    def compute(self, ctx, key=None, metrics=None, observe=True, tier=None):
+        result = engine_mod.MetricResult()
+        for name in metrics:
+            scale = ctx.image.shape[0] * ctx.image.shape[1] / (64 * 48)
+            clock[0] += COSTS.get(name, 0.0) * scale
+            setattr(result, name, 1.0)
+            result.tiers[name] = "full"
+        return result
+
+    with mock.patch.object(MetricEngine, "compute", compute), mock.patch.object(
+        time, "perf_counter", lambda: clock[0]
+    ):
+        yield clock
+
+
+def test_cheap_metrics_every_frame_expensive_less_often(fake_clock):
+    engine = MetricEngine(["mtf50", "snr", "lapvar", "motion_blur"])
+    scheduler = MetricScheduler(engine, budget=0.010)
+    runs = {name: 0 for name in COSTS}
+    for _ in range(100):
+        before = dict(scheduler._state(None).last_run)
+        scheduler.step(_frame())
+        for name, idx in scheduler._state(None).last_run.items():
+            if before.get(name) != idx:
+                runs[name] += 1
+    periods = scheduler.periods()
+    assert periods["snr"] == 1 and periods["motion_blur"] == 1
+    assert periods["mtf50"] > 1
+    assert runs["snr"] == 100
+    assert 0 < runs["mtf50"] < 30
+    spent = sum(COSTS[n] * runs[n] for n in COSTS) / 100
+    assert spent <= 0.010 * 1.3
+
+
+def test_stale_values_report_age(fake_clock):
+    scheduler = MetricScheduler(MetricEngine(["mtf50", "snr"]), budget=0.005)
+    for _ in range(5):
+        result = scheduler.step(_frame())
+    assert result.ages["snr"] == 0
+    assert result.mtf50 is not None
+    assert result.ages["mtf50"] > 0
+
+
+def test_budget_follows_measured_fps():
+    scheduler = MetricScheduler(MetricEngine(["snr"]), fps=30.0, budget_fraction=0.5)
+    assert scheduler.budget() == pytest.approx(0.5 / 30)
+    for i in range(30):
+        scheduler.step(_frame(), timestamp=i / 120.0)
+    assert scheduler.budget() == pytest.approx(0.5 / 120, rel=0.01)
+
+
+def test_resolution_change_rescales_costs(fake_clock):
+    scheduler = MetricScheduler(MetricEngine(["snr"]), budget=1.0)
+    scheduler.step(_frame())
+    before = scheduler.costs()["snr"]
+    scheduler.step(_frame(128, 96))
+    assert scheduler.costs()["snr"] == pytest.approx(before * 4)
+
+
+def test_tier_change_remeasures(fake_clock):
+    scheduler = MetricScheduler(MetricEngine(["snr"]), budget=1.0)
+    scheduler.step(_frame())
+    assert scheduler.costs()
+    scheduler.step(_frame(), tier=Tier.pyramid(1))
+    assert set(scheduler.costs()) == {"snr"}
+    assert scheduler._state(None).tier == Tier.pyramid(1)
+
+
+def test_stream_metrics_every_frame():
+    scheduler = MetricScheduler(MetricEngine(), budget=1e-9)
+    values = [80, 120] * 5
+    for v in values:
+        result = scheduler.step(np.full((32, 32, 3), v, np.uint8))
+    assert result.ages["delta_l"] == 0
+    assert result.delta_l == pytest.approx(20.0)
@@ -0,0 +1,143 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import csv
+
+import numpy as np
+import pytest
+
+from cam_tuner_gui.metric.engine import MetricResult
+from cam_tuner_gui.report.session import SessionStore
+
+
+def _fill(store, rows, cameras=("cam1", "cam2")):
+    for i in range(rows):
+        camera = cameras[i % len(cameras)]
+        store.append(camera, i * 0.1, i, {"snr": float(i), "mtf50": 0.25})
+
+
+def test_append_grows_then_spills_with_fixed_buffer(tmp_path):
+    store = SessionStore(metrics=("snr", "mtf50"), chunk_rows=512, spill_dir=tmp_path)
+    store.append("cam1", 0.0, 0, {"snr": 1.0})
+    small = store.nbytes  # 처음에는 256 행
+    _fill(store, 1999)
+    assert len(store) == 2000
+    # 버퍼는 chunk_rows 까지만 자라고 나머지는 스필 파일에 있다.
+    assert store.nbytes == 2 * small
+    assert store.spilled == 1536
+    assert store.spill_path.parent == tmp_path
+    snr = store.column("snr")
+    assert snr[0] == 1.0 and np.array_equal(snr[1:], np.arange(1999))
+    assert isinstance(store.column("snr", slice(10, 20)), np.memmap)
+    assert not store.column("snr", slice(1990, 2000)).flags.writeable
+    store.close()
+    assert not any(tmp_path.iterdir())
+
+
+def test_windowed_stats_and_camera_filter():
+    store = SessionStore(metrics=("snr", "mtf50"), chunk_rows=32)
+    _fill(store, 200)
+    assert store.window(seconds=1.0) == slice(189, 200)
+    assert store.window(since=5.0, until=6.0) == slice(50, 60)
+    stats = store.stats("cam1", since=5.0, until=6.0)
+    assert stats["snr"].count == 5
+    assert stats["snr"].mean == pytest.approx(np.mean([50, 52, 54, 56, 58]))
+    assert stats["snr"].percentiles[50] == pytest.approx(54)
+    assert (stats["snr"].min, stats["snr"].max) == (50, 58)
+    assert stats["mtf50"].as_dict()["p95"] == pytest.approx(0.25)
+    everything = store.stats(metrics=("snr",))["snr"]
+    assert everything.count == 200 and everything.max == 199
+    assert store.stats("nope")["snr"].count == 0
+    assert store.latest("cam2") == {"snr": 199.0, "mtf50": 0.25}
+
+
+def test_out_of_order_timestamps_are_masked():
+    store = SessionStore(metrics=("snr",), chunk_rows=4)
+    for t in (0.0, 2.0, 1.0, 3.0, 0.5, 4.0):
+        store.append("cam", t, 0, {"snr": t})
+    assert store.values("snr", since=1.0, until=3.0).tolist() == [2.0, 1.0]
+    assert store.values("snr", seconds=1.5).tolist() == [3.0, 4.0]
+
+
+def test_params_snapshot_and_late_columns():
+    store = SessionStore(metrics=("snr",), chunk_rows=4)
+    store.set_params("cam1", {"gain": 0})
+    _fill(store, 6, cameras=("cam1",))
+    store.append("cam1", 1.0, 6, {"snr": 1.0}, params={"exposure_abs": 200})
+    store.append("cam2", 1.1, 0, {"snr": 2.0})
+    assert store.params == ["gain", "exposure_abs"]
+    assert store.column("gain")[:7].tolist() == [0.0] * 7
+    assert np.isnan(store.column("gain")[-1])  # cam2 스냅샷은 따로다.
+    exposure = store.column("exposure_abs")
+    assert np.isnan(exposure[:6]).all() and exposure[6] == 200
+    with pytest.raises(ValueError):
+        store.set_params("cam1", {"snr": 1})
+
+
+def test_metric_result_skips_stale_values():
+    store = SessionStore()
+    result = MetricResult(snr=30.0, lapvar=5.0, ages={"lapvar": 2})
+    store.append("cam", 0.0, 1, result)
+    assert store.latest("cam") == {"snr": 30.0}
+
+
+def test_export_npz_and_csv(tmp_path):
+    store = SessionStore(metrics=("snr", "mtf50"), chunk_rows=16)
+    store.set_params("cam1", {"gain": 4})
+    _fill(store, 50)
+    store.append("cam2", 5.0, 50, {"snr": 1.5})
+    store.to_npz(tmp_path / "s.npz")
+    with np.load(tmp_path / "s.npz") as data:
+        assert data["cameras"].tolist() == ["cam1", "cam2"]
+        assert np.array_equal(data["snr"][:50], np.arange(50))
+        assert data["seq"].dtype == np.int64 and len(data["t"]) == 51
+        assert np.isnan(data["mtf50"][-1])
+    store.to_csv(tmp_path / "s.csv")
+    with open(tmp_path / "s.csv", newline="") as fp:
+        rows = list(csv.reader(fp))
+    assert rows[0] == ["t", "seq", "camera", "snr", "mtf50", "snr_tier", "mtf50_tier", "gain"]
+    assert rows[1] == ["0.0", "0", "cam1", "0.0", "0.25", "full", "full", "4.0"]
+    assert rows[-1] == ["5.0", "50", "cam2", "1.5", "", "full", "", ""]
+    assert len(rows) == 52
+
+
+def test_partial_rows_merge_into_one_row_per_seq():
+    store = SessionStore(metrics=("snr", "flicker"))
+    # 스트림 지표가 먼저 오고 프레임 지표는 워커에서 순서가 바뀌어 도착한다.
+    store.append("cam1", 0.0, 0, {"flicker": 0.1}, complete=False)
+    store.append("cam1", 0.1, 1, {"flicker": 0.2}, complete=False)
+    store.append("cam1", 0.1, 1, {"snr": 31.0})
+    assert len(store) == 0 and store.pending == 2
+    store.append("cam1", 0.0, 0, {"snr": 30.0, "flicker": float("nan")})
+    assert len(store) == 2 and store.pending == 0
+    assert store.column("seq").tolist() == [0, 1]
+    assert store.column("snr").tolist() == [30.0, 31.0]
+    assert store.column("flicker").tolist() == [0.1, 0.2]
+    assert store.window(since=0.05) == slice(1, 2)  # 시각 순서가 유지된다.
+
+
+def test_pending_limit_releases_oldest_and_drops_late_parts():
+    store = SessionStore(metrics=("snr", "flicker"), max_pending=2)
+    for seq in range(3):
+        store.append("cam", seq * 0.1, seq, {"flicker": 0.5}, complete=False)
+    assert len(store) == 1 and store.pending == 2
+    store.append("cam", 0.0, 0, {"snr": 30.0})
+    assert len(store) == 1 and store.late == 1
+    assert np.isnan(store.column("snr")[0])
+    store.commit()
+    assert store.column("seq").tolist() == [0, 1, 2]
+
+
+def test_stats_by_tier():
+    store = SessionStore(metrics=("snr", "flicker"))
+    store.append("cam", 0.0, 0, MetricResult(snr=40.0, tiers={"snr": "pyr1"}))
+    store.append("cam", 0.1, 1, MetricResult(snr=30.0, flicker=0.1, tiers={"snr": "full", "flicker": "full"}))
+    store.append("cam", 0.2, 2, MetricResult(snr=32.0, tiers={"snr": "roi1"}))
+    assert store.stats("cam")["snr"].count == 3
+    assert store.stats("cam", tier="full")["snr"].mean == 30.0
+    stats = store.stats("cam", tier={"snr": "roi1", "flicker": "full"})
+    assert stats["snr"].mean == 32.0 and stats["flicker"].count == 1
+    assert store.stats("cam", tier="pyr2")["snr"].count == 0
+    assert store.tiers == ["", "pyr1", "full", "roi1"]
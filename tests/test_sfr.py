@@ -0,0 +1,81 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import cv2
+import numpy as np
+import pytest
+
+from cam_tuner_gui.capture.synthetic import SyntheticSource
+from cam_tuner_gui.metric.sfr import (
+    SlantedEdgeSFR,
+    fit_edge,
+    mtf50_from_curve,
+    slanted_edge_mtf50,
+)
+
+ROI = (220, 140, 200, 200)
+
+
+def _gray(**kwargs):
+    source = SyntheticSource("slanted_edge", **kwargs)
+    return source, cv2.cvtColor(source.read()[1], cv2.COLOR_BGR2GRAY)
+
+
+@pytest.mark.parametrize("sigma", [0.7, 1.0, 2.0])
+@pytest.mark.parametrize("angle", [4.0, -7.0])
+def test_mtf50_matches_ground_truth(sigma, angle):
+    source, gray = _gray(edge_sigma=sigma, edge_angle=angle)
+    assert slanted_edge_mtf50(gray, ROI) == pytest.approx(source.true_mtf50, rel=0.05)
+
+
+def test_horizontal_edge_is_transposed():
+    source, gray = _gray(edge_sigma=1.0, edge_angle=5.0)
+    rotated = np.ascontiguousarray(gray.T)
+    x, y, w, h = ROI
+    assert slanted_edge_mtf50(rotated, (y, x, h, w)) == pytest.approx(
+        source.true_mtf50, rel=0.05
+    )
+
+
+def test_fit_recovers_edge_angle():
+    _, gray = _gray(edge_angle=6.0, noise_sigma=0)
+    x, y, w, h = ROI
+    geom = fit_edge(gray[y : y + h, x : x + w])
+    assert np.degrees(geom.angle) == pytest.approx(6.0, abs=0.2)
+
+
+def test_flat_patch_has_no_edge():
+    gray = np.full((100, 100), 128, np.uint8)
+    assert fit_edge(gray) is None
+    assert slanted_edge_mtf50(gray) == 0.0
+
+
+def test_geometry_is_cached_per_roi():
+    source, gray = _gray(edge_sigma=1.0)
+    sfr = SlantedEdgeSFR(refit_every=0)
+    first = sfr.measure(gray, ROI, key="cam")
+    geom = sfr.geometry(gray[140:340, 220:420], ("cam", ROI, (200, 200)))
+    again = sfr.measure(cv2.cvtColor(source.read()[1], cv2.COLOR_BGR2GRAY), ROI, key="cam")
+    assert sfr.geometry(gray[140:340, 220:420], ("cam", ROI, (200, 200))) is geom
+    assert again.mtf50 == pytest.approx(first.mtf50, rel=0.02)
+    sfr.invalidate("cam")
+    assert sfr.geometry(gray[140:340, 220:420], ("cam", ROI, (200, 200))) is not geom
+
+
+def test_failed_fit_is_not_cached():
+    source, gray = _gray(edge_sigma=1.0)
+    sfr = SlantedEdgeSFR()
+    flat = np.full_like(gray, 128)
+    assert sfr.measure(flat, ROI, key="cam") is None
+    # 다음 프레임에 차트가 들어오면 바로 다시 맞춘다.
+    result = sfr.measure(gray, ROI, key="cam")
+    assert result is not None
+    assert result.mtf50 == pytest.approx(slanted_edge_mtf50(gray, ROI), rel=1e-6)
+
+
+def test_mtf50_interpolates_crossing():
+    freq = np.array([0.0, 0.1, 0.2, 0.3])
+    mtf = np.array([1.0, 0.8, 0.4, 0.1])
+    assert mtf50_from_curve(freq, mtf) == pytest.approx(0.175)
@@ -0,0 +1,124 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from cam_tuner_gui.capture.synthetic import SyntheticSource
+from cam_tuner_gui.control.sweep import (
+    ParamSweep,
+    SettleDetector,
+    SweepTable,
+    frame_stats,
+    grid,
+)
+
+
+def test_grid_order():
+    points = grid(exposure_abs=[50, 100], gain=[0, 32, 64])
+    assert len(points) == 6
+    assert points[0] == {"exposure_abs": 50, "gain": 0}
+    assert points[1] == {"exposure_abs": 50, "gain": 32}
+    assert points[-1] == {"exposure_abs": 100, "gain": 64}
+
+
+def _feed(detector, values, std=2.0):
+    for n, value in enumerate(values, 1):
+        if detector.update((value, std)):
+            return n
+    return None
+
+
+def test_detector_waits_for_change_then_stability():
+    detector = SettleDetector(stable=2)
+    detector.reset((100.0, 2.0))
+    assert _feed(detector, [100, 100, 150, 150, 150, 150]) == 5
+    assert detector.first_change == 3
+    assert not detector.timed_out
+
+
+def test_detector_follows_convergence():
+    detector = SettleDetector(stable=2)
+    detector.reset((100.0, 2.0))
+    assert _feed(detector, [100, 130, 145, 149, 149.8, 150, 150, 150]) == 7
+
+
+def test_unchanged_point_waits_only_latency():
+    detector = SettleDetector(stable=2, latency=3)
+    detector.reset((100.0, 2.0))
+    assert _feed(detector, [100] * 10) == 4
+    detector = SettleDetector(stable=2, max_frames=8)
+    detector.reset((100.0, 2.0))
+    assert _feed(detector, [100] * 10) == 8
+    assert detector.timed_out
+
+
+def test_frame_stats_sampling():
+    frame = SyntheticSource("flat", noise_sigma=4.0).read()[1]
+    mean, std = frame_stats(frame)
+    assert mean == pytest.approx(127.5, abs=0.5)
+    assert std == pytest.approx(4.0, rel=0.1)
+
+
+def test_sweep_settles_on_latency_and_scores_points():
+    source = SyntheticSource("flat", noise_sigma=2.0, control_latency=3)
+    points = grid(exposure_abs=[60, 80], gain=[0, 16])
+    table = SweepTable()
+    results = ParamSweep(points, frames_per_point=3, metrics=("snr",)).run(
+        {"cam": source}, table.append
+    )
+    assert len(results) == len(table) == 4
+    # 3 프레임 지연 뒤 밝기가 바뀌고, 2 번 더 같으면 안정이다.
+    assert [r.settle_frames for r in results] == [6, 6, 6, 6]
+    assert all(r.settled and r.frames == 3 and r.error is None for r in results)
+    lumas = [r.luma for r in results]
+    assert lumas == sorted(lumas)
+    last = results[-1]
+    assert last.metrics["snr"] == pytest.approx(source.true_snr, abs=0.5)
+    # 게인은 신호와 노이즈를 같이 키우므로 SNR 은 노출이 정한다.
+    assert table.best("snr").params["exposure_abs"] == 80
+
+
+def test_unchanged_points_use_learned_latency():
+    source = SyntheticSource("flat", noise_sigma=0, control_latency=2)
+    # 합성 소스는 contrast 를 모델링하지 않으므로 두 번째 점은 밝기가 변하지 않는다.
+    points = [{"exposure_abs": 50}, {"exposure_abs": 50, "contrast": 10}]
+    results = ParamSweep(points, metrics=("snr",), max_settle_frames=20).run_camera(
+        "cam", source
+    )
+    assert results[0].settle_frames == 5
+    assert results[1].settled
+    assert results[1].settle_frames == 4
+
+
+def test_sweep_runs_cameras_in_parallel():
+    cameras = {
+        "a": SyntheticSource("slanted_edge", control_latency=1, seed=1),
+        "b": SyntheticSource("slanted_edge", control_latency=2, settle_tau=1.5, seed=2),
+    }
+    seen = []
+    points = grid(exposure_abs=[70, 90, 110])
+    results = ParamSweep(points, frames_per_point=2).run(cameras, seen.append)
+    assert [r.camera for r in results] == ["a"] * 3 + ["b"] * 3
+    assert len(seen) == 6
+    assert all({"snr", "mtf50", "lapvar"} <= set(r.metrics) for r in results)
+
+
+def test_write_failure_is_recorded_and_sweep_continues():
+    source = SyntheticSource("flat")
+    points = [{"bogus": 1}, {"exposure_abs": 90}]
+    results = ParamSweep(points, metrics=("snr",)).run({"cam": source})
+    assert "bogus" in results[0].error
+    assert results[1].error is None and "snr" in results[1].metrics
+
+
+def test_table_csv(tmp_path):
+    source = SyntheticSource("flat")
+    table = SweepTable()
+    ParamSweep(grid(gain=[0, 8]), metrics=("snr",)).run({"cam": source}, table.append)
+    path = tmp_path / "sweep.csv"
+    table.write_csv(str(path))
+    header = path.read_text().splitlines()[0].split(",")
+    assert header[:3] == ["camera", "index", "gain"]
+    assert "snr" in header
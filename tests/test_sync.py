@@ -0,0 +1,120 @@
+import sys
+import os
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from cam_tuner_gui.capture.device import CameraDevice
+from cam_tuner_gui.capture.sync import CaptureGroup, pair_by_timestamp
+
+
+class _SlowCapture:
+    def __init__(self, delay, value):
+        self.delay = delay
+        self.value = value
+        self.calls = []
+
+    def grab(self):
+        self.calls.append("grab")
+        time.sleep(self.delay)
+        return True
+
+    def retrieve(self):
+        self.calls.append("retrieve")
+        return True, self.value
+
+
+def test_grabs_all_before_retrieving():
+    caps = [_SlowCapture(0, i) for i in range(3)]
+    group = CaptureGroup(caps, tolerance=1.0)
+    synced = group.read()
+    assert synced.frames == [0, 1, 2]
+    assert len(synced.timestamps) == 3
+    assert all(cap.calls == ["grab", "retrieve"] for cap in caps)
+
+
+def test_parallel_grab_latency_is_max_not_sum():
+    caps = [_SlowCapture(0.05, i) for i in range(4)]
+    group = CaptureGroup(caps, tolerance=1.0, parallel=True)
+    try:
+        start = time.monotonic()
+        synced = group.read()
+        elapsed = time.monotonic() - start
+    finally:
+        group.close()
+    assert elapsed < 0.15
+    assert synced.skew < 0.05
+
+
+def test_lagging_device_is_regrabbed():
+    caps = [_SlowCapture(0, "a"), _SlowCapture(0.03, "b")]
+    group = CaptureGroup(caps, tolerance=0.01, max_regrab=1)
+    group.read()
+    assert caps[0].calls.count("grab") == 2
+    assert group.skew_stats()["max"] < 0.03
+
+
+def test_empty_group_rejected():
+    with pytest.raises(ValueError):
+        CaptureGroup([])
+
+
+def test_threaded_device_rejected():
+    with pytest.raises(ValueError):
+        CaptureGroup([CameraDevice("synthetic", threaded=True)])
+
+
+def test_device_capture_time_is_used():
+    caps = [_SlowCapture(0, "a"), _SlowCapture(0, "b")]
+    caps[0].capture_time = 10.000
+    caps[1].capture_time = 10.003
+    synced = CaptureGroup(caps, tolerance=0.01).read()
+    assert synced.timestamps == [10.000, 10.003]
+    assert synced.skew == pytest.approx(0.003)
+
+
+def test_background_capture_fills_ring():
+    devices = [CameraDevice("synthetic:flat"), CameraDevice("synthetic:slanted_edge")]
+    for device in devices:
+        device.start_stream()
+    group = CaptureGroup(devices, tolerance=1.0, parallel=True)
+    try:
+        group.start()
+        deadline = time.monotonic() + 5.0
+        while group.latest() is None:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        seqs = [synced.seq for synced in group.iter_frames()]
+        assert seqs == sorted(seqs)
+        assert len(group.latest().frames) == 2
+    finally:
+        group.close()
+        for device in devices:
+            device.stop_stream()
+    assert not group.running and group.error is None
+
+
+def test_previews_fit_size_or_come_from_device():
+    import numpy as np
+
+    caps = [_SlowCapture(0, np.zeros((720, 1280, 3), np.uint8)) for _ in range(2)]
+    caps[1].preview = np.ones((10, 16, 3), np.uint8)
+    synced = CaptureGroup(caps, tolerance=1.0, preview_size=(640, 400)).read()
+    assert synced.previews[0].shape == (360, 640, 3)
+    assert synced.previews[1] is caps[1].preview
+    assert synced.frames[0].shape == (720, 1280, 3)
+    assert CaptureGroup(caps[:1]).read().previews[0] is caps[0].value
+
+
+def test_pair_by_timestamp_skips_unmatched():
+    def frames(*stamps):
+        return [SimpleNamespace(timestamp=t) for t in stamps]
+
+    pairs = pair_by_timestamp(
+        [frames(0.0, 0.010, 0.020), frames(0.001, 0.015, 0.021)], tolerance=0.002
+    )
+    assert [round(skew, 3) for _, skew in pairs] == [0.001, 0.001]
+    assert pairs[1][0][0].timestamp == 0.020
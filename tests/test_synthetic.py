@@ -0,0 +1,133 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import cv2
+import numpy as np
+import pytest
+
+from cam_tuner_gui.capture.device import CameraDevice
+from cam_tuner_gui.capture.synthetic import PATTERNS, SyntheticSource
+from cam_tuner_gui.metric.metrics import calc_snr
+
+
+@pytest.mark.parametrize("pattern", PATTERNS)
+def test_frames_have_requested_shape(pattern):
+    source = SyntheticSource(pattern, width=320, height=200)
+    ret, frame = source.read()
+    assert ret
+    assert frame.shape == (200, 320, 3)
+    assert frame.dtype == np.uint8
+
+
+def test_same_seed_is_deterministic():
+    a = SyntheticSource("slanted_edge", seed=3)
+    b = SyntheticSource("slanted_edge", seed=3)
+    for _ in range(3):
+        assert np.array_equal(a.read()[1], b.read()[1])
+
+
+def test_read_reuses_output_buffer():
+    source = SyntheticSource("flat", width=64, height=48)
+    buf = np.empty((48, 64, 3), np.uint8)
+    ret, frame = source.read(image=buf)
+    assert frame is buf
+
+
+def test_flat_snr_matches_ground_truth():
+    source = SyntheticSource("flat", noise_sigma=4.0)
+    _, frame = source.read()
+    assert calc_snr(frame) == pytest.approx(source.true_snr, abs=0.5)
+
+
+def test_flicker_modulates_brightness():
+    source = SyntheticSource("flicker", fps=30, flicker_hz=7.0, flicker_depth=0.2)
+    means = [source.read()[1].mean() for _ in range(10)]
+    assert max(means) - min(means) > 20
+
+
+def test_moving_edge_moves():
+    source = SyntheticSource("moving_edge", noise_sigma=0, speed=3)
+    first = source.read()[1][0, :, 0].astype(int)
+    second = source.read()[1][0, :, 0].astype(int)
+    assert np.argmax(np.diff(first)) != np.argmax(np.diff(second))
+
+
+def test_timestamps_follow_fps():
+    source = SyntheticSource("flat", fps=120)
+    for _ in range(5):
+        source.read()
+    assert source.timestamp == pytest.approx(4 / 120)
+    assert source.get(cv2.CAP_PROP_POS_FRAMES) == 5
+
+
+def test_set_resolution_rebuilds_templates():
+    source = SyntheticSource("slanted_edge")
+    source.set(cv2.CAP_PROP_FRAME_WIDTH, 160)
+    source.set(cv2.CAP_PROP_FRAME_HEIGHT, 120)
+    assert source.read()[1].shape == (120, 160, 3)
+
+
+def test_camera_device_opens_synthetic_pattern():
+    device = CameraDevice("synthetic:moving_edge")
+    device.start_stream()
+    assert isinstance(device.cap, SyntheticSource)
+    assert device.cap.pattern == "moving_edge"
+    assert device.read_frame().shape == (480, 640, 3)
+    device.stop_stream()
+
+
+def test_unknown_pattern_rejected():
+    with pytest.raises(ValueError):
+        SyntheticSource("checkerboard")
+
+
+def test_reference_controls_leave_frames_unchanged():
+    a = SyntheticSource("slanted_edge", seed=3)
+    b = SyntheticSource("slanted_edge", seed=3)
+    b.set(cv2.CAP_PROP_EXPOSURE, 100)
+    b.set(cv2.CAP_PROP_GAIN, 0)
+    b.set(cv2.CAP_PROP_GAMMA, 100)
+    for _ in range(4):
+        assert np.array_equal(a.read()[1], b.read()[1])
+
+
+def test_exposure_applies_after_control_latency():
+    source = SyntheticSource("flat", noise_sigma=0, control_latency=2)
+    source.read()
+    source.set(cv2.CAP_PROP_EXPOSURE, 150)
+    assert source.get(cv2.CAP_PROP_EXPOSURE) == 150
+    means = [source.read()[1].mean() for _ in range(4)]
+    assert means == pytest.approx([128, 128, 192, 192], abs=1)
+    assert source.settled
+
+
+def test_settle_tau_converges_gradually():
+    source = SyntheticSource("flat", noise_sigma=0, control_latency=0, settle_tau=2.0)
+    source.set(cv2.CAP_PROP_EXPOSURE, 50)
+    means = [source.read()[1].mean() for _ in range(30)]
+    assert all(a >= b for a, b in zip(means, means[1:]))
+    assert means[0] < 128 and means[0] > 80
+    assert means[-1] == pytest.approx(64, abs=1)
+
+
+def test_gain_scales_noise_and_exposure_scales_blur():
+    flat = SyntheticSource("flat", noise_sigma=2.0, control_latency=0)
+    flat.set(cv2.CAP_PROP_GAIN, 32)
+    flat.set(cv2.CAP_PROP_EXPOSURE, 80)
+    _, frame = flat.read()
+    assert calc_snr(frame) == pytest.approx(flat.true_snr, abs=0.5)
+    assert flat.true_snr < SyntheticSource("flat", noise_sigma=2.0).true_snr
+
+    edge = SyntheticSource("moving_edge", blur_px=16.0, control_latency=0)
+    edge.set(cv2.CAP_PROP_EXPOSURE, 50)
+    edge.read()
+    assert edge.true_blur_width == pytest.approx(6.4)
+
+
+def test_gamma_applies_tone_curve():
+    source = SyntheticSource("flat", noise_sigma=0, control_latency=0)
+    source.set(cv2.CAP_PROP_GAMMA, 200)
+    # (128/255)^(1/2) * 255
+    assert source.read()[1].mean() == pytest.approx(181, abs=1)
@@ -0,0 +1,103 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from unittest import mock
+
+import cv2
+import numpy as np
+import pytest
+
+from cam_tuner_gui.capture.synthetic import SyntheticSource
+from cam_tuner_gui.metric import metrics as m
+from cam_tuner_gui.metric.engine import (
+    FULL_TIER,
+    FrameContext,
+    MetricEngine,
+    SCALE_INVARIANT,
+    Tier,
+    exact_label,
+)
+
+ROI = (220, 140, 200, 200)
+
+
+@pytest.fixture
+def frame():
+    return SyntheticSource("slanted_edge").read()[1]
+
+
+def test_tier_labels():
+    assert FULL_TIER.label == "full"
+    assert Tier.pyramid(2).label == "pyr2"
+    assert Tier.from_rois([ROI, (0, 0, 10, 10)]).label == "roi2"
+    assert not Tier.pyramid(1).exact
+    with pytest.raises(ValueError):
+        Tier.pyramid(0)
+    with pytest.raises(ValueError):
+        Tier.from_rois([])
+
+
+def test_pyramid_levels_are_built_once(frame):
+    ctx = FrameContext(frame)
+    with mock.patch("cam_tuner_gui.metric.engine.cv2.pyrDown", wraps=cv2.pyrDown) as down:
+        MetricEngine(tier=Tier.pyramid(2)).compute(ctx)
+        assert ctx.level(2).gray.shape == (120, 160)
+        assert ctx.level(1).gray.shape == (240, 320)
+    assert down.call_count == 2
+
+
+def test_result_records_tiers(frame):
+    tiers = {"lapvar": Tier.pyramid(1), "snr": Tier.from_rois([ROI])}
+    result = MetricEngine(tier=tiers).compute(frame)
+    assert result.tiers["lapvar"] == "pyr1"
+    assert result.tiers["snr"] == "roi1"
+    assert result.tiers["mtf50"] == "full"
+    assert result.per_roi["snr"] == (result.snr,)
+
+
+def test_per_call_tier_override(frame):
+    engine = MetricEngine(tier=Tier.pyramid(1))
+    assert engine.compute(frame).tiers["lapvar"] == "pyr1"
+    assert engine.compute(frame, tier=FULL_TIER).tiers["lapvar"] == "full"
+
+
+def test_roi_tier_is_exact(frame):
+    x, y, w, h = ROI
+    crop = np.ascontiguousarray(frame[y : y + h, x : x + w])
+    tier = Tier.from_rois([ROI])
+    assert m.calc_lapvar(frame, tier) == m.calc_lapvar(crop)
+    assert m.calc_snr(frame, tier) == m.calc_snr(crop)
+
+
+def test_roi_mtf50_matches_ground_truth():
+    source = SyntheticSource("slanted_edge", edge_sigma=1.0)
+    frame = source.read()[1]
+    result = MetricEngine(tier=Tier.from_rois([ROI, (240, 160, 160, 160)])).compute(frame)
+    assert len(result.per_roi["mtf50"]) == 2
+    assert result.mtf50 == pytest.approx(source.true_mtf50, rel=0.05)
+
+
+def test_pyramid_mtf50_is_in_full_resolution_units():
+    source = SyntheticSource("slanted_edge", edge_sigma=2.0)
+    value = m.calc_mtf50(source.read()[1], Tier.pyramid(1))
+    assert value == pytest.approx(source.true_mtf50, rel=0.25)
+
+
+@pytest.mark.parametrize("name", SCALE_INVARIANT)
+def test_scale_invariant_metrics_track_full_resolution(name):
+    # 라이브 미리보기의 pyr1 근사값은 원본 값과 같은 순서로 움직여야 한다.
+    full, pyr = [], []
+    for sigma in (1.0, 2.0, 3.0):
+        frame = SyntheticSource("slanted_edge", 1280, 720, edge_sigma=sigma).read()[1]
+        full.append(MetricEngine([name]).compute(frame).as_dict()[name])
+        pyr.append(MetricEngine([name]).compute(frame, tier=Tier.pyramid(1)).as_dict()[name])
+    assert np.argsort(pyr).tolist() == np.argsort(full).tolist()
+    assert pyr == pytest.approx(full, rel=0.6)
+
+
+def test_exact_label():
+    assert exact_label(FULL_TIER.label)
+    assert exact_label(Tier.from_rois([ROI]).label)
+    assert not exact_label(Tier.pyramid(1).label)
@@ -0,0 +1,171 @@
+import sys
+import os
+import mmap
+from collections import deque
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import cv2
+import numpy as np
+import pytest
+
+from cam_tuner_gui.capture import v4l2
+
+
+class FakeV4L2:
+    """일반 파일을 장치처럼 쓰는 가짜 V4L2 드라이버.
+
+    ioctl 만 흉내내고 버퍼 메모리는 실제 파일 mmap 을 그대로 쓴다.
+    DQBUF 때 파일에 직접 써서 드라이버의 DMA 를 흉내낸다.
+    """
+
+    def __init__(self, width=8, height=4):
+        self.width = width
+        self.height = height
+        self.sizeimage = width * height * 2
+        self.length = -(-self.sizeimage // mmap.PAGESIZE) * mmap.PAGESIZE
+        self.count = 0
+        self.queued = deque()
+        self.sequence = 0
+        self.streaming = False
+        self.controls = {v4l2.V4L2_CID_GAIN: 4}
+        self.flags = v4l2.V4L2_BUF_FLAG_TIMESTAMP_MONOTONIC
+
+    def __call__(self, fd, request, arg, mutate=True):
+        if request == v4l2.VIDIOC_QUERYCAP:
+            arg.driver = b"fake"
+            arg.capabilities = v4l2.V4L2_CAP_VIDEO_CAPTURE | v4l2.V4L2_CAP_STREAMING
+        elif request in (v4l2.VIDIOC_G_FMT, v4l2.VIDIOC_S_FMT):
+            pix = arg.fmt.pix
+            if request == v4l2.VIDIOC_S_FMT:
+                self.width, self.height = pix.width, pix.height
+                self.sizeimage = self.width * self.height * 2
+                self.length = -(-self.sizeimage // mmap.PAGESIZE) * mmap.PAGESIZE
+            pix.width, pix.height = self.width, self.height
+            pix.pixelformat = v4l2.fourcc("YUYV")
+            pix.bytesperline = self.width * 2
+            pix.sizeimage = self.sizeimage
+        elif request == v4l2.VIDIOC_REQBUFS:
+            self.count = arg.count
+            self.queued.clear()
+            os.ftruncate(fd, self.count * self.length)
+        elif request == v4l2.VIDIOC_QUERYBUF:
+            arg.length = self.sizeimage
+            arg.m.offset = arg.index * self.length
+        elif request == v4l2.VIDIOC_QBUF:
+            self.queued.append(arg.index)
+        elif request == v4l2.VIDIOC_DQBUF:
+            if not self.streaming or not self.queued:
+                raise BlockingIOError
+            index = self.queued.popleft()
+            self.sequence += 1
+            os.pwrite(fd, bytes([self.sequence % 256]) * self.sizeimage, index * self.length)
+            arg.index = index
+            arg.bytesused = self.sizeimage
+            arg.sequence = self.sequence
+            arg.timestamp.tv_sec = 100 + self.sequence
+            arg.timestamp.tv_usec = 500000
+            arg.flags = self.flags
+        elif request == v4l2.VIDIOC_STREAMON:
+            self.streaming = True
+        elif request == v4l2.VIDIOC_STREAMOFF:
+            self.streaming = False
+            self.queued.clear()
+        elif request in (v4l2.VIDIOC_G_CTRL, v4l2.VIDIOC_S_CTRL):
+            if arg.id not in self.controls:
+                raise OSError(22, "Invalid argument")
+            if request == v4l2.VIDIOC_S_CTRL:
+                self.controls[arg.id] = arg.value
+            arg.value = self.controls[arg.id]
+        else:
+            raise OSError(f"unexpected ioctl {request:#x}")
+
+
+@pytest.fixture
+def fake_device(tmp_path):
+    path = tmp_path / "video0"
+    path.write_bytes(b"")
+    fake = FakeV4L2()
+    device = v4l2.V4L2Device(str(path), buffer_count=3, ioctl=fake)
+    device.open()
+    yield device, fake
+    device.close()
+
+
+def test_ioctl_numbers_match_kernel_headers():
+    assert v4l2.VIDIOC_QUERYCAP == 0x80685600
+    assert v4l2.VIDIOC_S_FMT == 0xC0D05605
+    assert v4l2.VIDIOC_REQBUFS == 0xC0145608
+    assert v4l2.VIDIOC_QBUF == 0xC058560F
+    assert v4l2.VIDIOC_DQBUF == 0xC0585611
+    assert v4l2.VIDIOC_STREAMON == 0x40045612
+    assert v4l2.VIDIOC_S_CTRL == 0xC008561C
+    assert v4l2.VIDIOC_QUERYCTRL == 0xC0445624
+    assert v4l2.VIDIOC_QUERYMENU == 0xC02C5625
+
+
+def test_open_requests_and_queues_buffers(fake_device):
+    device, fake = fake_device
+    assert fake.count == 3
+    assert device.buffer_count == 3
+    assert list(fake.queued) == [0, 1, 2]
+    assert device.pixelformat == "YUYV"
+
+
+def test_dequeue_exposes_kernel_metadata_zero_copy(fake_device):
+    device, fake = fake_device
+    frame = device.dequeue(timeout=0.1)
+    assert frame.sequence == 1
+    assert frame.timestamp == pytest.approx(101.5)
+    assert isinstance(frame.data, memoryview)
+    data = frame.to_ndarray()
+    assert data.size == fake.sizeimage
+    assert (data == 1).all()
+    # 같은 mmap 영역을 보고 있으므로 장치 쪽 쓰기가 그대로 보인다.
+    os.pwrite(device._fd, b"\x07" * 4, frame.index * fake.length)
+    assert data[0] == 7
+    del data
+    frame.release()
+    assert fake.queued[-1] == frame.index
+
+
+def test_read_returns_bgr_frame(fake_device):
+    device, fake = fake_device
+    ret, image = device.read()
+    assert ret
+    assert image.shape == (fake.height, fake.width, 3)
+    assert image.dtype == np.uint8
+    assert len(fake.queued) == 3
+
+
+def test_grab_then_retrieve_keeps_kernel_timestamp(fake_device):
+    device, fake = fake_device
+    assert device.grab()
+    assert device.capture_time == pytest.approx(101.5)
+    # 다시 grab 하면 앞서 잡은 버퍼는 드라이버에 돌아간다.
+    assert device.grab()
+    assert device.capture_time == pytest.approx(102.5)
+    assert len(fake.queued) == 2
+    ret, image = device.retrieve()
+    assert ret and image.shape == (fake.height, fake.width, 3)
+    assert len(fake.queued) == 3
+    assert device.retrieve() == (False, None)
+
+
+def test_non_monotonic_timestamp_is_not_a_capture_time(fake_device):
+    device, fake = fake_device
+    fake.flags = 0  # V4L2_BUF_FLAG_TIMESTAMP_UNKNOWN
+    assert device.read()[0]
+    assert device.capture_time is None
+
+
+def test_controls_map_opencv_props(fake_device):
+    device, fake = fake_device
+    assert device.get(cv2.CAP_PROP_GAIN) == 4.0
+    assert device.set(cv2.CAP_PROP_GAIN, 9.6)
+    assert fake.controls[v4l2.V4L2_CID_GAIN] == 10
+    assert device.get(cv2.CAP_PROP_GAIN) == 10.0
+    # 장치에 없는 컨트롤과 대응 없는 속성은 실패로 돌려준다.
+    assert not device.set(cv2.CAP_PROP_GAMMA, 100)
+    assert device.get(cv2.CAP_PROP_GAMMA) == 0.0
+    assert not device.set(cv2.CAP_PROP_SATURATION, 1)